@@ -0,0 +1,115 @@
+"""
+AI 分析缓存键基准
+
+模拟卖家把同一件商品删除后重新发布（新的商品ID/链接/发布时间、卖家评价与在售列表已变化），
+检查重新发布的商品与原商品得到相同的缓存键、改动标题或售价后缓存键不同，并统计缓存键计算耗时。
+
+用法:
+    python benchmarks/bench_ai_cache_key.py [--items 200] [--rounds 5]
+"""
+
+import argparse
+import copy
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ai_cache import build_analysis_cache_key
+
+PROMPT_TEXT = "请判断该商品是否值得购买。" * 20
+MODEL_NAME = "bench-model"
+BASE_URL = "https://example.com/v1"
+
+
+def build_record(index: int) -> dict:
+    """构造一条与采集结果结构一致的商品记录。"""
+    return {
+        "公开信息浏览时间": "2026-01-01T10:00:00",
+        "搜索关键字": "相机",
+        "任务名称": "相机监控",
+        "商品信息": {
+            "商品标题": f"二手相机 {index} 号 成色良好",
+            "当前售价": f"¥{1000 + index}",
+            "商品原价": "暂无",
+            "“想要”人数": 3,
+            "浏览量": 120,
+            "商品标签": ["包邮"],
+            "发货地区": "上海",
+            "卖家昵称": f"seller-{index % 20}",
+            "商品链接": f"https://www.goofish.com/item?id={index}",
+            "发布时间": "2026-01-01 09:00",
+            "商品ID": str(index),
+            "商品图片列表": [f"https://img.example.com/{index}/{n}.jpg" for n in range(4)],
+        },
+        "卖家信息": {
+            "卖家昵称": f"seller-{index % 20}",
+            "卖家信用等级": "极好",
+            "卖家注册时长": "来闲鱼3年整",
+            "卖家在售/已售商品数": 12,
+            "卖家收到的评价总数": 40,
+            "作为卖家的好评数": "38/40",
+            "作为卖家的好评率": "95.00%",
+            "卖家发布的商品列表": [{"商品ID": str(index), "商品标题": "旧商品"}],
+            "卖家收到的评价列表": [{"评价ID": "r1", "评价内容": "很好"}],
+        },
+    }
+
+
+def repost(record: dict, index: int) -> dict:
+    """同一件商品重新发布：标识、发布时间、热度与卖家统计变化，内容不变。"""
+    reposted = copy.deepcopy(record)
+    item = reposted["商品信息"]
+    item["商品ID"] = f"repost-{index}"
+    item["商品链接"] = f"https://www.goofish.com/item?id=repost-{index}"
+    item["发布时间"] = "2026-01-03 21:30"
+    item["浏览量"] = 5
+    item["“想要”人数"] = 0
+    seller = reposted["卖家信息"]
+    seller["卖家在售/已售商品数"] = 13
+    seller["卖家收到的评价总数"] = 41
+    seller["作为卖家的好评数"] = "39/41"
+    seller["作为卖家的好评率"] = "95.12%"
+    seller["卖家发布的商品列表"].append({"商品ID": f"repost-{index}", "商品标题": "新商品"})
+    seller["卖家收到的评价列表"].append({"评价ID": "r2", "评价内容": "不错"})
+    reposted["公开信息浏览时间"] = "2026-01-03T22:00:00"
+    reposted["任务名称"] = "另一个任务"
+    return reposted
+
+
+def cache_key(record: dict) -> str:
+    return build_analysis_cache_key(record, PROMPT_TEXT, MODEL_NAME, BASE_URL, True)
+
+
+def run(items: int, rounds: int) -> None:
+    records = [build_record(i) for i in range(items)]
+    reposts = [repost(record, i) for i, record in enumerate(records)]
+
+    hits = sum(cache_key(original) == cache_key(reposted) for original, reposted in zip(records, reposts))
+    changed = copy.deepcopy(records[0])
+    changed["商品信息"]["当前售价"] = "¥1"
+    print(f"reposted items hitting the original key: {hits}/{items}")
+    print(f"changed price produces a new key: {cache_key(changed) != cache_key(records[0])}")
+
+    started_at = time.perf_counter()
+    for _ in range(rounds):
+        for record in records:
+            cache_key(record)
+    elapsed = time.perf_counter() - started_at
+    print(f"key computation: {elapsed * 1000 / (items * rounds):.3f} ms per record")
+
+    if hits != items or cache_key(changed) == cache_key(records[0]):
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and benchmark AI analysis cache keys for reposted items")
+    parser.add_argument("--items", type=int, default=200, help="Number of distinct items")
+    parser.add_argument("--rounds", type=int, default=5, help="Key computations per item")
+    args = parser.parse_args()
+    run(max(1, args.items), max(1, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
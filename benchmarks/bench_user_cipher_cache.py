@@ -0,0 +1,72 @@
+"""
+用户敏感配置解密基准
+
+模拟一次加载用户完整配置集（AI 配置、通知渠道、平台账号 Cookie）所需的全部解密，
+对比关闭缓存（每次都 PBKDF2 派生，等同旧实现）与开启缓存的耗时。
+
+用法:
+    python benchmarks/bench_user_cipher_cache.py [--users 3] [--rounds 5]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.storage.utils import clear_user_cipher_cache, decrypt_sensitive, encrypt_sensitive
+
+API_CONFIG_COUNT = 3
+NOTIFICATION_CONFIG_COUNT = 8
+PLATFORM_ACCOUNT_COUNT = 4
+
+
+def build_user_config_set(user_id: str) -> list:
+    """构造一个用户的加密配置集（与 PostgresAdapter 中的加密字段对应）。"""
+    secrets = []
+    for i in range(API_CONFIG_COUNT):
+        secrets.append(encrypt_sensitive(user_id, f"sk-{user_id}-{i}" + "x" * 40))
+    for i in range(NOTIFICATION_CONFIG_COUNT):
+        config = {"url": f"https://example.com/hook/{i}", "token": "t" * 32, "enabled": True}
+        secrets.append(encrypt_sensitive(user_id, json.dumps(config)))
+    for i in range(PLATFORM_ACCOUNT_COUNT):
+        cookies = json.dumps([{"name": f"c{j}", "value": "v" * 64} for j in range(40)])
+        secrets.append(encrypt_sensitive(user_id, cookies))
+    return secrets
+
+
+def load_user_config_set(user_id: str, secrets: list, cached: bool) -> None:
+    for encrypted in secrets:
+        if not cached:
+            clear_user_cipher_cache()
+        decrypt_sensitive(user_id, encrypted)
+
+
+def run(users: int, rounds: int) -> None:
+    datasets = {f"user-{i}": build_user_config_set(f"user-{i}") for i in range(users)}
+    per_load = API_CONFIG_COUNT + NOTIFICATION_CONFIG_COUNT + PLATFORM_ACCOUNT_COUNT
+    print(f"{users} users x {rounds} rounds, {per_load} encrypted fields per config load")
+
+    for label, cached in (("without cache", False), ("with cache", True)):
+        clear_user_cipher_cache()
+        started_at = time.perf_counter()
+        for _ in range(rounds):
+            for user_id, secrets in datasets.items():
+                load_user_config_set(user_id, secrets, cached=cached)
+        elapsed = time.perf_counter() - started_at
+        loads = users * rounds
+        print(f"{label:>14}: {elapsed * 1000:9.1f} ms total, {elapsed * 1000 / loads:8.2f} ms per config load")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark user config decryption with and without the cipher cache")
+    parser.add_argument("--users", type=int, default=3, help="Number of users")
+    parser.add_argument("--rounds", type=int, default=5, help="Config loads per user")
+    args = parser.parse_args()
+    run(max(1, args.users), max(1, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
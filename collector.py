@@ -98,81 +98,9 @@ def _load_virtual_text_content(raw_path: str, owner_id: str = None) -> str:
 
         return f.read()
 
-async def main():
-
-    parser = argparse.ArgumentParser(
-
-        description="闲鱼商品公开内容查看脚本，支持多任务配置和实时AI分析。",
-
-        epilog="""
-
-使用示例:
+def _attach_task_prompts(tasks_config, owner_id=None):
 
-  # 运行 config.json 中定义的所有任务
-
-  python collector.py
-
-
-
-  # 只运行名为 "Sony A7M4" 的任务 (通常由调度器调用)
-
-  python collector.py --task-name "Sony A7M4"
-
-
-
-  # 只运行名为 "Sony A7M4" 的任务 (手动开始)
-
-  python collector.py --task-name "Sony A7M4" --start-reason manual
-
-
-
-  # 调试模式: 运行所有任务，但每个任务只处理前3个新发现的商品
-
-  python collector.py --debug-limit 3
-
-""",
-
-        formatter_class=argparse.RawDescriptionHelpFormatter
-
-    )
-
-    parser.add_argument("--debug-limit", type=int, default=0, help="调试模式：每个任务仅处理前 N 个新商品（0 表示无限制）")
-
-    parser.add_argument("--config", type=str, default="config.json", help="指定任务配置文件路径（默认为 config.json）")
-
-    parser.add_argument("--task-name", type=str, help="只运行指定名称的单个任务 (用于定时任务调度)")
-
-    parser.add_argument("--start-reason", type=str, default="手动开始", help="任务开始原因（可选值：manual 手动开始，scheduled 定时开始）")
-
-    args = parser.parse_args()
-
-
-
-    if not os.path.exists(args.config):
-
-        logger.error(f"配置文件 '{args.config}' 不存在。", extra={"event": "config_not_found"})
-
-        sys.exit(1)
-
-
-
-    try:
-
-        with open(args.config, 'r', encoding='utf-8') as f:
-
-            tasks_config = json.load(f)
-
-    except (json.JSONDecodeError, IOError) as e:
-
-        logger.error(f"读取或解析配置文件 '{args.config}' 失败: {e}", extra={"event": "config_parse_error"})
-
-        sys.exit(1)
-
-
-
-    owner_id = (os.getenv("GOOFISH_OWNER_ID") or "").strip() or None
-
-    # 读取所有prompt文件内容
+    """读取各启用任务的 prompt 文件，写入 task['ai_prompt_text']。"""
 
     for task in tasks_config:
 
@@ -325,27 +253,31 @@ async def main():
 
 
 
+async def _run_task_configs(tasks_config, task_name_filter=None, start_reason_arg=None, debug_limit=0, owner_id=None):
+
+    """执行配置中的任务（指定名称时只执行该任务），结束后发送完成通知。"""
+
     logger.info("--- 开始执行任务 ---", extra={"event": "tasks_start"})
 
-    if args.debug_limit > 0:
+    if debug_limit > 0:
 
         logger.info(
 
-            f"** 调试模式已激活，每个任务最多处理 {args.debug_limit} 个新商品 **",
+            f"** 调试模式已激活，每个任务最多处理 {debug_limit} 个新商品 **",
 
-            extra={"event": "debug_mode", "debug_limit": args.debug_limit}
+            extra={"event": "debug_mode", "debug_limit": debug_limit}
 
         )
 
     
 
-    if args.task_name:
+    if task_name_filter:
 
         logger.info(
 
-            f"** 定时任务模式：只执行任务 '{args.task_name}' **",
+            f"** 定时任务模式：只执行任务 '{task_name_filter}' **",
 
-            extra={"event": "scheduled_mode", "task_name": args.task_name}
+            extra={"event": "scheduled_mode", "task_name": task_name_filter}
 
         )
 
@@ -357,11 +289,11 @@ async def main():
 
     active_task_configs = []
 
-    if args.task_name:
+    if task_name_filter:
 
         # 如果指定了任务名称，只查找该任务
 
-        task_found = next((task for task in tasks_config if task.get('task_name') == args.task_name), None)
+        task_found = next((task for task in tasks_config if task.get('task_name') == task_name_filter), None)
 
         if task_found:
 
@@ -375,7 +307,7 @@ async def main():
 
                     "任务已被禁用，跳过执行。",
 
-                    extra={"task_name": args.task_name, "event": "task_disabled"}
+                    extra={"task_name": task_name_filter, "event": "task_disabled"}
 
                 )
 
@@ -383,9 +315,9 @@ async def main():
 
             logger.error(
 
-                f"在配置文件中未找到名为 '{args.task_name}' 的任务。",
+                f"在配置文件中未找到名为 '{task_name_filter}' 的任务。",
 
-                extra={"task_name": args.task_name, "event": "task_not_found"}
+                extra={"task_name": task_name_filter, "event": "task_not_found"}
 
             )
 
@@ -409,15 +341,15 @@ async def main():
 
     # 确定任务开始原因
 
-    if args.start_reason == "scheduled":
+    if start_reason_arg == "scheduled":
 
         start_reason = "定时开始"
 
-    elif args.start_reason == "manual":
+    elif start_reason_arg == "manual":
 
         start_reason = "手动开始"
 
-    elif args.task_name:
+    elif task_name_filter:
 
         # 默认情况下，如果有--task-name参数但没有指定--start-reason，视为定时开始
 
@@ -467,7 +399,7 @@ async def main():
 
             task_config=task_conf, 
 
-            debug_limit=args.debug_limit,
+            debug_limit=debug_limit,
 
             bound_account=task_conf.get('bound_account')
 
@@ -475,10 +407,26 @@ async def main():
 
 
 
+    # 推荐商品通知写入发件箱后由本进程的派发器异步发送
+    from src.notifier.outbox import start_notification_dispatcher, stop_notification_dispatcher
+    from src.config import NOTIFICATION_OUTBOX_DRAIN_TIMEOUT_SECONDS
+    start_notification_dispatcher(owner_id=owner_id)
+
     # 并发执行所有任务
 
     results = await asyncio.gather(*coroutines, return_exceptions=True)
 
+    # 先发完商品通知，再发送任务完成通知
+    await stop_notification_dispatcher(drain_timeout=NOTIFICATION_OUTBOX_DRAIN_TIMEOUT_SECONDS())
+
+    from src.ai_gateway import get_ai_gateway_stats
+    ai_gateway_stats = get_ai_gateway_stats()
+    if ai_gateway_stats:
+        logger.info(
+            f"AI 请求统计: {json.dumps(ai_gateway_stats, ensure_ascii=False)}",
+            extra={"event": "ai_gateway_stats"}
+        )
+
 
 
     logger.info("--- 所有任务执行完毕 ---", extra={"event": "tasks_complete"})
@@ -579,6 +527,192 @@ async def main():
 
 
 
+# 常驻采集进程与进程池之间的控制消息前缀（stdout 上单独一行 JSON）
+WORKER_CONTROL_PREFIX = "@@GOOFISH_WORKER@@ "
+
+
+def _emit_worker_event(event):
+    sys.stdout.write(WORKER_CONTROL_PREFIX + json.dumps(event, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+
+async def _reset_worker_runtime():
+    """按本次任务的环境变量（含用户私有 AI/通知配置）重建 AI 客户端、通知配置，并清零 AI 失败计数。"""
+    from src import ai_handler
+    from src import config as runtime_config
+    from src.notifier.config import config as notification_config
+    old_client = runtime_config.client
+    runtime_config.initialize_ai_client()
+    if old_client is not None and old_client is not runtime_config.client:
+        try:
+            await old_client.close()
+        except Exception:
+            pass
+    ai_handler.client = runtime_config.client
+    ai_handler.ai_call_failure_count = 0
+    notification_config.reload()
+
+
+async def _run_worker_job(job):
+    """执行进程池派发的一次任务，返回值与单次运行的退出码一致。"""
+    previous_env = dict(os.environ)
+    # 进程池下发的是 Web 端为该任务准备的完整环境变量，执行期间整体替换
+    os.environ.clear()
+    os.environ.update(job.get("env") or previous_env)
+    try:
+        await _reset_worker_runtime()
+        config_path = job.get("config") or "config.json"
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                tasks_config = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            logger.error(f"读取或解析配置文件 '{config_path}' 失败: {e}", extra={"event": "config_parse_error"})
+            return 1
+        owner_id = (os.getenv("GOOFISH_OWNER_ID") or "").strip() or None
+        _attach_task_prompts(tasks_config, owner_id)
+        await _run_task_configs(tasks_config, job.get("task_name"), job.get("start_reason"), 0, owner_id)
+        return 0
+    except Exception as e:
+        logger.error(f"常驻采集进程执行任务失败: {e}", extra={"event": "worker_job_failed"}, exc_info=e)
+        return 1
+    finally:
+        os.environ.clear()
+        os.environ.update(previous_env)
+
+
+async def _worker_main():
+    """常驻采集进程：逐行读取 stdin 中的任务依次执行，浏览器与账号上下文跨任务复用。"""
+    from src.browser_pool import activate_browser_pool, process_tree_rss_mb
+    from src.config import SCRAPER_WORKER_MAX_RSS_MB, SCRAPER_WORKER_MAX_TASKS
+    pool = activate_browser_pool()
+    loop = asyncio.get_running_loop()
+    jobs_done = 0
+    logger.info(f"常驻采集进程已启动 (PID: {os.getpid()})", extra={"event": "worker_started"})
+    try:
+        while True:
+            line = await loop.run_in_executor(None, sys.stdin.readline)
+            if not line:
+                # stdin 关闭：进程池关闭或 Web 进程已退出
+                break
+            try:
+                job = json.loads(line)
+            except ValueError:
+                continue
+            if job.get("type") != "run":
+                continue
+            returncode = await _run_worker_job(job)
+            jobs_done += 1
+            rss_mb = process_tree_rss_mb()
+            retire = jobs_done >= SCRAPER_WORKER_MAX_TASKS() or (
+                rss_mb is not None and rss_mb > SCRAPER_WORKER_MAX_RSS_MB()
+            )
+            _emit_worker_event({
+                "type": "done",
+                "job_id": job.get("job_id"),
+                "returncode": returncode,
+                "jobs_done": jobs_done,
+                "rss_mb": rss_mb,
+                "retire": retire,
+                **pool.stats(),
+            })
+            if retire:
+                logger.info(
+                    f"常驻采集进程已执行 {jobs_done} 次任务，内存 {rss_mb} MB，退出重建",
+                    extra={"event": "worker_retire"}
+                )
+                break
+    finally:
+        await pool.close()
+
+
+async def main():
+
+    parser = argparse.ArgumentParser(
+
+        description="闲鱼商品公开内容查看脚本，支持多任务配置和实时AI分析。",
+
+        epilog="""
+
+使用示例:
+
+  # 运行 config.json 中定义的所有任务
+
+  python collector.py
+
+
+
+  # 只运行名为 "Sony A7M4" 的任务 (通常由调度器调用)
+
+  python collector.py --task-name "Sony A7M4"
+
+
+
+  # 只运行名为 "Sony A7M4" 的任务 (手动开始)
+
+  python collector.py --task-name "Sony A7M4" --start-reason manual
+
+
+
+  # 调试模式: 运行所有任务，但每个任务只处理前3个新发现的商品
+
+  python collector.py --debug-limit 3
+
+""",
+
+        formatter_class=argparse.RawDescriptionHelpFormatter
+
+    )
+
+    parser.add_argument("--debug-limit", type=int, default=0, help="调试模式：每个任务仅处理前 N 个新商品（0 表示无限制）")
+
+    parser.add_argument("--config", type=str, default="config.json", help="指定任务配置文件路径（默认为 config.json）")
+
+    parser.add_argument("--task-name", type=str, help="只运行指定名称的单个任务 (用于定时任务调度)")
+
+    parser.add_argument("--start-reason", type=str, default="手动开始", help="任务开始原因（可选值：manual 手动开始，scheduled 定时开始）")
+
+    parser.add_argument("--worker", action="store_true", help="常驻采集进程模式（由 Web 端进程池启动，从标准输入读取任务）")
+
+    args = parser.parse_args()
+
+    if args.worker:
+
+        await _worker_main()
+
+        return
+
+
+
+    if not os.path.exists(args.config):
+
+        logger.error(f"配置文件 '{args.config}' 不存在。", extra={"event": "config_not_found"})
+
+        sys.exit(1)
+
+
+
+    try:
+
+        with open(args.config, 'r', encoding='utf-8') as f:
+
+            tasks_config = json.load(f)
+
+    except (json.JSONDecodeError, IOError) as e:
+
+        logger.error(f"读取或解析配置文件 '{args.config}' 失败: {e}", extra={"event": "config_parse_error"})
+
+        sys.exit(1)
+
+
+
+    owner_id = (os.getenv("GOOFISH_OWNER_ID") or "").strip() or None
+
+    _attach_task_prompts(tasks_config, owner_id)
+
+    await _run_task_configs(tasks_config, args.task_name, args.start_reason, args.debug_limit, owner_id)
+
+
+
 if __name__ == "__main__":
 
     asyncio.run(main())
@@ -0,0 +1,159 @@
+"""
+AI Analysis Cache - AI 分析结果缓存
+
+同一商品在多个任务/多次运行中会被重复分析，卖家也常把同一件商品删除后重新发布。这里按内容寻址：
+缓存键 = sha256(去掉标识/易变字段后的商品数据 + 提示词 + 模型 + Base URL + 多模态开关)，
+商品ID、链接、发布时间与随时间变化的卖家统计（评价、在售列表、好评数/率）不参与计算，
+重新发布的相同商品也能命中；卖家统计的变化最多滞后一个 TTL。
+命中时直接返回已通过格式校验的分析结果，不再请求模型。
+推荐度（recommendation_score_v2）依赖用户的贝叶斯样本，不进缓存，命中后重新计算。
+"""
+
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from src.config import AI_ANALYSIS_CACHE_TTL_SECONDS
+from src.logging_config import get_logger
+from src.storage.async_storage import run_storage_call
+
+logger = get_logger(__name__, service="system")
+
+# 每次采集都会变化、但不影响分析结论的字段（ml_precalc 随用户样本变化，命中后重新计算）
+_VOLATILE_RECORD_FIELDS = {"公开信息浏览时间", "任务名称", "ai_analysis", "ml_precalc"}
+# 商品标识与热度：重新发布后 ID/链接/发布时间都会变化
+_VOLATILE_ITEM_FIELDS = {"商品ID", "商品链接", "发布时间", "浏览量", "“想要”人数"}
+# 卖家主页上随时间累积的统计，保留昵称、信用等级、注册时长等稳定信息
+_VOLATILE_SELLER_FIELDS = {
+    "卖家发布的商品列表",
+    "卖家收到的评价列表",
+    "卖家在售/已售商品数",
+    "卖家收到的评价总数",
+    "作为卖家的好评数",
+    "作为卖家的好评率",
+    "作为买家的好评数",
+    "作为买家的好评率",
+}
+
+# 过期条目只在读取时被忽略，写入时顺带清理，每个进程最多每小时一次
+_PURGE_INTERVAL_SECONDS = 3600
+_last_purge_at = 0.0
+_purge_lock = threading.Lock()
+
+
+def _normalize_record(product_data: Dict[str, Any]) -> Dict[str, Any]:
+    record = {key: value for key, value in product_data.items() if key not in _VOLATILE_RECORD_FIELDS}
+    item_info = record.get("商品信息")
+    if isinstance(item_info, dict):
+        record["商品信息"] = {key: value for key, value in item_info.items() if key not in _VOLATILE_ITEM_FIELDS}
+    seller_info = record.get("卖家信息")
+    if isinstance(seller_info, dict):
+        record["卖家信息"] = {key: value for key, value in seller_info.items() if key not in _VOLATILE_SELLER_FIELDS}
+    return record
+
+
+def build_analysis_cache_key(
+    product_data: Dict[str, Any],
+    prompt_text: str,
+    model_name: str,
+    base_url: str,
+    vision_enabled: bool,
+) -> str:
+    """计算 AI 分析结果的缓存键。"""
+    material = json.dumps(
+        {
+            "record": _normalize_record(product_data),
+            "prompt": prompt_text,
+            "model": model_name,
+            "base_url": str(base_url or "").rstrip("/"),
+            "vision": bool(vision_enabled),
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+async def get_cached_analysis(cache_key: str) -> Optional[Dict[str, Any]]:
+    """读取未过期的分析结果；关闭缓存或读取失败时返回 None。"""
+    ttl_seconds = AI_ANALYSIS_CACHE_TTL_SECONDS()
+    if ttl_seconds <= 0:
+        return None
+    from src.storage import get_storage
+
+    try:
+        return await run_storage_call(get_storage().get_ai_analysis_cache, cache_key, ttl_seconds)
+    except Exception as e:
+        logger.warning(f"读取AI分析缓存失败: {e}", extra={"event": "ai_cache_read_failed"})
+        return None
+
+
+async def save_cached_analysis(
+    cache_key: str,
+    analysis: Dict[str, Any],
+    model_name: str,
+    usage: Any = None,
+) -> None:
+    """写入已通过校验的分析结果（连同本次 token 用量，用于统计节省量）。"""
+    if AI_ANALYSIS_CACHE_TTL_SECONDS() <= 0:
+        return
+    from src.storage import get_storage
+
+    try:
+        await run_storage_call(
+            get_storage().save_ai_analysis_cache,
+            cache_key,
+            analysis,
+            model_name,
+            int(getattr(usage, "prompt_tokens", 0) or 0),
+            int(getattr(usage, "completion_tokens", 0) or 0),
+        )
+    except Exception as e:
+        logger.warning(f"写入AI分析缓存失败: {e}", extra={"event": "ai_cache_write_failed"})
+        return
+    if _purge_due():
+        await run_storage_call(purge_expired_analysis_cache)
+
+
+def _purge_due() -> bool:
+    global _last_purge_at
+    with _purge_lock:
+        now = time.monotonic()
+        if _last_purge_at and now - _last_purge_at < _PURGE_INTERVAL_SECONDS:
+            return False
+        _last_purge_at = now
+        return True
+
+
+def purge_expired_analysis_cache() -> int:
+    """删除超过 TTL 的缓存条目，返回删除条数（失败只记录日志）。"""
+    from src.storage import get_storage
+
+    ttl = AI_ANALYSIS_CACHE_TTL_SECONDS()
+    if ttl <= 0:
+        return 0
+    try:
+        removed = get_storage().purge_ai_analysis_cache(ttl)
+    except Exception as e:
+        logger.warning(f"清理过期AI分析缓存失败: {e}", extra={"event": "ai_cache_purge_failed"})
+        return 0
+    if removed:
+        logger.info(f"已清理 {removed} 条过期AI分析缓存", extra={"event": "ai_cache_purged"})
+    return removed
+
+
+def get_ai_analysis_cache_stats() -> Dict[str, Any]:
+    """汇总缓存命中率与节省的调用次数/token 数（跨进程累计）。"""
+    from src.storage import get_storage
+
+    stats = get_storage().get_ai_analysis_cache_stats()
+    lookups = stats["hits"] + stats["misses"]
+    return {
+        **stats,
+        "enabled": AI_ANALYSIS_CACHE_TTL_SECONDS() > 0,
+        "ttl_seconds": AI_ANALYSIS_CACHE_TTL_SECONDS(),
+        "hit_rate": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+    }
@@ -0,0 +1,240 @@
+"""
+AI Gateway - AI 请求网关
+
+商品分析的模型调用统一经由此处发出：
+- 按 (base_url, 模型) 限制并发数，可选按每分钟请求数做令牌桶限流，同一进程内的多个任务共享额度；
+- 每次调用有总截止时间（含排队与重试）；
+- 429/5xx/网络错误按 Retry-After 或指数退避重试，429 时同一额度下的其他请求一起暂停；
+- 记录每个 (base_url, 模型) 的调用次数（一次调用含其全部重试）、重试次数、最终失败次数、耗时与 token 用量。
+网关是请求错误唯一的重试策略，调用方不应在外层再次重发。
+连接池与 keep-alive 由 initialize_ai_client 注入的 httpx 客户端负责，SDK 自身不再重试。
+"""
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+
+from openai import APIConnectionError, APIStatusError, RateLimitError
+
+from src.config import (
+    AI_MAX_CONCURRENCY,
+    AI_MAX_RETRIES,
+    AI_REQUEST_DEADLINE_SECONDS,
+    AI_REQUESTS_PER_MINUTE,
+    AI_RETRY_BASE_SECONDS,
+)
+from src.logging_config import get_logger
+
+logger = get_logger(__name__, service="system")
+
+LimiterKey = Tuple[str, str]
+
+MAX_RETRY_DELAY_SECONDS = 60.0
+_RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+class AIGatewayTimeout(TimeoutError):
+    """AI 调用超过总截止时间（排队、请求与重试合计）。"""
+
+
+class _ProviderLimiter:
+    """单个 (base_url, 模型) 的并发上限 + 令牌桶 + 429 暂停。"""
+
+    def __init__(self, concurrency: int, requests_per_minute: int):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.requests_per_minute = requests_per_minute
+        self.tokens = float(requests_per_minute)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait_turn(self, deadline: float) -> None:
+        """等待限流暂停结束并取得一个令牌（不限速时只检查暂停）。"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                wait = self.paused_until - now
+                if self.requests_per_minute > 0:
+                    rate = self.requests_per_minute / 60.0
+                    self.tokens = min(float(self.requests_per_minute), self.tokens + (now - self.updated_at) * rate)
+                    self.updated_at = now
+                    if self.tokens < 1:
+                        wait = max(wait, (1 - self.tokens) / rate)
+                if wait <= 0:
+                    if self.requests_per_minute > 0:
+                        self.tokens -= 1
+                    return
+                if now + wait >= deadline:
+                    raise AIGatewayTimeout("等待AI请求额度超过截止时间")
+                await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class _CallStats:
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        succeeded = self.calls - self.failures
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "avg_latency_ms": round(self.latency_total / succeeded * 1000, 1) if succeeded else 0.0,
+            "max_latency_ms": round(self.latency_max * 1000, 1),
+        }
+
+
+_stats: Dict[LimiterKey, _CallStats] = {}
+_stats_lock = threading.Lock()
+
+_limiters: Dict[LimiterKey, _ProviderLimiter] = {}
+_limiters_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_limiter(key: LimiterKey) -> _ProviderLimiter:
+    """获取当前事件循环内该 (base_url, 模型) 的限流器。"""
+    global _limiters_loop
+    loop = asyncio.get_running_loop()
+    if _limiters_loop is not loop:
+        _limiters.clear()
+        _limiters_loop = loop
+    limiter = _limiters.get(key)
+    if limiter is None:
+        limiter = _ProviderLimiter(AI_MAX_CONCURRENCY(), AI_REQUESTS_PER_MINUTE())
+        _limiters[key] = limiter
+    return limiter
+
+
+def _record(key: LimiterKey, **changes: Any) -> None:
+    with _stats_lock:
+        stats = _stats.get(key)
+        if stats is None:
+            stats = _CallStats()
+            _stats[key] = stats
+        for name, value in changes.items():
+            if name == "latency":
+                stats.latency_total += value
+                stats.latency_max = max(stats.latency_max, value)
+            else:
+                setattr(stats, name, getattr(stats, name) + value)
+
+
+def get_ai_gateway_stats() -> Dict[str, Dict[str, Any]]:
+    """返回本进程各 (base_url, 模型) 的调用统计。"""
+    with _stats_lock:
+        return {f"{base_url} | {model}": stats.snapshot() for (base_url, model), stats in _stats.items()}
+
+
+def _parse_retry_after(exc: APIStatusError) -> Optional[float]:
+    """读取 Retry-After（毫秒/秒/HTTP 日期）响应头。"""
+    headers = getattr(exc.response, "headers", None) or {}
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000.0)
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_delay(exc: Exception, attempt: int) -> Optional[float]:
+    """可重试的错误返回等待秒数，不可重试返回 None。"""
+    if isinstance(exc, APIStatusError):
+        if exc.status_code not in _RETRYABLE_STATUS_CODES and exc.status_code < 500:
+            return None
+        retry_after = _parse_retry_after(exc)
+        if retry_after is not None:
+            return min(retry_after, MAX_RETRY_DELAY_SECONDS)
+    elif not isinstance(exc, APIConnectionError):
+        return None
+    delay = min(MAX_RETRY_DELAY_SECONDS, AI_RETRY_BASE_SECONDS() * (2 ** attempt))
+    return delay * random.uniform(0.75, 1.25)
+
+
+async def create_chat_completion(client, deadline_seconds: Optional[float] = None, **params: Any):
+    """经网关调用 client.chat.completions.create，参数与 SDK 一致。"""
+    key: LimiterKey = (str(client.base_url).rstrip("/"), str(params.get("model") or ""))
+    limiter = _get_limiter(key)
+    deadline = time.monotonic() + (deadline_seconds or AI_REQUEST_DEADLINE_SECONDS())
+    max_retries = AI_MAX_RETRIES()
+    attempt = 0
+    _record(key, calls=1)
+
+    while True:
+        try:
+            await limiter.wait_turn(deadline)
+            await asyncio.wait_for(limiter.semaphore.acquire(), timeout=max(0.0, deadline - time.monotonic()))
+        except (AIGatewayTimeout, asyncio.TimeoutError) as exc:
+            _record(key, failures=1)
+            if isinstance(exc, AIGatewayTimeout):
+                raise
+            raise AIGatewayTimeout("等待AI请求并发名额超过截止时间") from exc
+
+        started_at = time.monotonic()
+        try:
+            remaining = deadline - started_at
+            if remaining <= 0:
+                raise AIGatewayTimeout("AI调用超过截止时间")
+            response = await client.with_options(timeout=remaining, max_retries=0).chat.completions.create(**params)
+        except Exception as exc:
+            if isinstance(exc, RateLimitError):
+                _record(key, rate_limited=1)
+            delay = _retry_delay(exc, attempt) if attempt < max_retries else None
+            if delay is None or time.monotonic() + delay >= deadline:
+                _record(key, failures=1)
+                raise
+            if isinstance(exc, RateLimitError):
+                # 同一额度下的其他请求一起暂停，避免接连触发 429
+                limiter.pause(delay)
+            logger.warning(
+                f"AI请求失败，{delay:.1f}秒后重试: {exc}",
+                extra={
+                    "event": "ai_request_retry",
+                    "base_url": key[0],
+                    "model_name": key[1],
+                    "attempt": attempt + 1,
+                    "retry_delay_seconds": round(delay, 2),
+                },
+            )
+            _record(key, retries=1)
+            attempt += 1
+        else:
+            latency = time.monotonic() - started_at
+            usage = getattr(response, "usage", None)
+            _record(
+                key,
+                latency=latency,
+                prompt_tokens=int(getattr(usage, "prompt_tokens", 0) or 0),
+                completion_tokens=int(getattr(usage, "completion_tokens", 0) or 0),
+            )
+            return response
+        finally:
+            limiter.semaphore.release()
+
+        await asyncio.sleep(delay)
@@ -6,9 +6,10 @@ import os
 import re
 import sys
 import shutil
-from datetime import datetime
+import time
 
 import requests
+from openai import APIError
 
 # 设置标准输出编码为UTF-8，解决Windows控制台编码问题
 if sys.platform.startswith('win'):
@@ -27,6 +28,9 @@ from src.config import (
     ENABLE_RESPONSE_FORMAT,
     client,
 )
+from src.ai_cache import build_analysis_cache_key, get_cached_analysis, save_cached_analysis
+from src.ai_gateway import AIGatewayTimeout, create_chat_completion
+from src.ai_trace import record_ai_trace, start_ai_trace
 from src.utils import retry_on_failure
 
 # 商品图片数量上限：站点固定最多9张，运行期用常量兜底
@@ -420,8 +424,24 @@ ai_call_failure_count = 0
 AI_CALL_FAILURE_THRESHOLD = 3
 
 
+def _attach_recommendation_score(product_data, parsed_response, owner_id, bayes_profile):
+    """计算多维度推荐度并写入 recommendation_score_v2（失败不影响主流程）。"""
+    try:
+        from src.recommendation_scorer import get_recommendation_scorer
+        scorer = get_recommendation_scorer(
+            owner_id=owner_id,
+            bayes_profile=bayes_profile,
+        )
+        recommendation_result = scorer.calculate(product_data, parsed_response)
+        parsed_response['recommendation_score_v2'] = recommendation_result
+        safe_print(f"   [推荐度] 综合推荐度: {recommendation_result['recommendation_score']}分")
+        safe_print(f"   [推荐度] 贝叶斯: {recommendation_result['bayesian']['score']*100:.1f}分 | "
+                 f"视觉AI: {recommendation_result['visual_ai']['score']*100:.1f}分 | "
+                 f"AI置信: {recommendation_result['fusion']['ai_score']:.1f}分")
+    except Exception as scorer_error:
+        safe_print(f"   [推荐度] 计算推荐度时出错(不影响主流程): {scorer_error}")
+
 
-@retry_on_failure(retries=3, delay=5)
 async def get_ai_analysis(
     product_data,
     image_paths=None,
@@ -457,6 +477,17 @@ async def get_ai_analysis(
         safe_print("   [AI分析] 错误：未提供AI分析所需的prompt文本。")
         return None
 
+    # 商品内容、提示词、模型与多模态开关都相同时复用上次的分析结果
+    model_name = MODEL_NAME()
+    cache_key = build_analysis_cache_key(
+        product_data, prompt_text, model_name, getattr(client, "base_url", ""), ai_vision_enabled
+    )
+    cached_response = await get_cached_analysis(cache_key)
+    if cached_response and validate_ai_response_format(cached_response):
+        safe_print("   [AI分析] 命中分析结果缓存，跳过模型调用")
+        _attach_recommendation_score(product_data, cached_response, owner_id, bayes_profile)
+        return cached_response
+
     system_prompt = prompt_text
 
     # 为提示词构造一个可控的payload副本，必要时按上限裁剪图片URL列表
@@ -524,30 +555,17 @@ async def get_ai_analysis(
 
     messages = [{"role": "user", "content": user_content_list}]
 
-    # 保存最终传输内容到日志文件
-    try:
-        # 创建logs文件夹
-        logs_dir = "logs"
-        os.makedirs(logs_dir, exist_ok=True)
-
-        # 生成日志文件名（当前时间）
-        current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_filename = f"{current_time}.log"
-        log_filepath = os.path.join(logs_dir, log_filename)
-
-        # 准备日志内容 - 直接保存原始传输内容
-        log_content = json.dumps(messages, ensure_ascii=False)
-
-        # 写入日志文件
-        with open(log_filepath, 'w', encoding='utf-8') as f:
-            f.write(log_content)
-
-        safe_print(f"   [日志] AI分析请求已保存到: {log_filepath}")
-
-    except Exception as e:
-        safe_print(f"   [日志] 保存AI分析日志时出错: {e}")
+    # 按采样率记录请求内容（后台线程压缩写入 logs/ai_traces/）
+    trace_id = start_ai_trace(
+        product_id=product_id,
+        task_name=product_data.get('任务名称'),
+        model_name=model_name,
+        cache_key=cache_key,
+        messages=messages,
+    )
 
     # 增强的AI调用，包含更严格的格式控制和重试机制
+    # （此处只对响应格式不合格重试；限流/服务端/网络错误由 AI 网关按 Retry-After 退避重试）
     max_retries = 3
     for attempt in range(max_retries):
         try:
@@ -558,7 +576,7 @@ async def get_ai_analysis(
             
             # 构建请求参数，根据ENABLE_RESPONSE_FORMAT决定是否使用response_format
             request_params = {
-                "model": MODEL_NAME(),
+                "model": model_name,
                 "messages": messages,
                 "temperature": current_temperature,
             }
@@ -567,7 +585,9 @@ async def get_ai_analysis(
             if ENABLE_RESPONSE_FORMAT():
                 request_params["response_format"] = {"type": "json_object"}
             
-            response = await client.chat.completions.create(
+            started_at = time.monotonic()
+            response = await create_chat_completion(
+                client,
                 **get_ai_request_params(**request_params)
             )
 
@@ -578,6 +598,18 @@ async def get_ai_analysis(
                 # 如果response是字符串，则直接使用
                 ai_response_content = response
 
+            if trace_id:
+                usage = getattr(response, 'usage', None)
+                record_ai_trace(
+                    trace_id,
+                    "response",
+                    attempt=attempt + 1,
+                    latency_ms=round((time.monotonic() - started_at) * 1000, 1),
+                    prompt_tokens=getattr(usage, 'prompt_tokens', None),
+                    completion_tokens=getattr(usage, 'completion_tokens', None),
+                    content=ai_response_content,
+                )
+
             if AI_DEBUG_MODE():
                 safe_print(f"\n--- [AI DEBUG] 第{attempt + 1}次尝试 ---")
                 safe_print("--- RAW AI RESPONSE ---")
@@ -591,24 +623,10 @@ async def get_ai_analysis(
                 # 验证响应格式
                 if validate_ai_response_format(parsed_response):
                     safe_print(f"   [AI分析] 第{attempt + 1}次尝试成功，响应格式验证通过")
-                    
-                    # 新增: 计算多维度推荐度
-                    try:
-                        from src.recommendation_scorer import RecommendationScorer
-                        scorer = RecommendationScorer(
-                            owner_id=owner_id,
-                            bayes_profile=bayes_profile,
-                        )
-                        recommendation_result = scorer.calculate(product_data, parsed_response)
-                        parsed_response['recommendation_score_v2'] = recommendation_result
-                        safe_print(f"   [推荐度] 综合推荐度: {recommendation_result['recommendation_score']}分")
-                        safe_print(f"   [推荐度] 贝叶斯: {recommendation_result['bayesian']['score']*100:.1f}分 | "
-                                 f"视觉AI: {recommendation_result['visual_ai']['score']*100:.1f}分 | "
-                                 f"AI置信: {recommendation_result['fusion']['ai_score']:.1f}分")
-                    except Exception as scorer_error:
-                        safe_print(f"   [推荐度] 计算推荐度时出错(不影响主流程): {scorer_error}")
-                        # 推荐度计算失败不影响主流程，继续返回原始AI分析
-                    
+                    await save_cached_analysis(
+                        cache_key, copy.deepcopy(parsed_response), model_name, getattr(response, 'usage', None)
+                    )
+                    _attach_recommendation_score(product_data, parsed_response, owner_id, bayes_profile)
                     return parsed_response
                 else:
                     safe_print(f"   [AI分析] 第{attempt + 1}次尝试格式验证失败")
@@ -648,20 +666,10 @@ async def get_ai_analysis(
                         parsed_response = json.loads(json_str)
                         if validate_ai_response_format(parsed_response):
                             safe_print(f"   [AI分析] 第{attempt + 1}次尝试清理后成功")
-                            
-                            # 新增: 计算多维度推荐度
-                            try:
-                                from src.recommendation_scorer import RecommendationScorer
-                                scorer = RecommendationScorer(
-                                    owner_id=owner_id,
-                                    bayes_profile=bayes_profile,
-                                )
-                                recommendation_result = scorer.calculate(product_data, parsed_response)
-                                parsed_response['recommendation_score_v2'] = recommendation_result
-                                safe_print(f"   [推荐度] 综合推荐度: {recommendation_result['recommendation_score']}分")
-                            except Exception as scorer_error:
-                                safe_print(f"   [推荐度] 计算推荐度时出错: {scorer_error}")
-                            
+                            await save_cached_analysis(
+                                cache_key, copy.deepcopy(parsed_response), model_name, getattr(response, 'usage', None)
+                            )
+                            _attach_recommendation_score(product_data, parsed_response, owner_id, bayes_profile)
                             return parsed_response
                         else:
                             if attempt < max_retries - 1:
@@ -693,6 +701,7 @@ async def get_ai_analysis(
 
         except Exception as e:
             safe_print(f"   [AI分析] 第{attempt + 1}次尝试AI调用失败: {e}")
+            record_ai_trace(trace_id, "error", attempt=attempt + 1, error=f"{type(e).__name__}: {e}")
             ai_call_failure_count += 1
             safe_print(f"   [AI分析] AI调用失败计数: {ai_call_failure_count}/{AI_CALL_FAILURE_THRESHOLD}")
             
@@ -700,6 +709,10 @@ async def get_ai_analysis(
                 safe_print(f"   [AI分析] AI调用失败次数已达到阈值 ({AI_CALL_FAILURE_THRESHOLD})，任务将停止")
                 raise AICallFailureException(f"AI调用连续失败 {AI_CALL_FAILURE_THRESHOLD} 次，任务需要停止。失败原因: {str(e)}")
             
+            # 网关已按退避重试过的请求错误不再立即重发
+            if isinstance(e, (APIError, AIGatewayTimeout)):
+                raise e
+
             if attempt < max_retries - 1:
                 safe_print(f"   [AI分析] 准备第{attempt + 2}次重试...")
                 continue
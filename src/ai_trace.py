@@ -0,0 +1,172 @@
+"""
+AI Trace - AI 请求/响应追踪
+
+按 AI_TRACE_SAMPLE_RATE 对 get_ai_analysis 调用采样，被采中的调用记录请求内容、
+每次尝试的原始响应/用量/耗时与错误，同一次调用的记录共享 trace_id。
+记录先放入内存队列，由后台线程批量压缩后追加到 logs/ai_traces/ai_trace_YYYYmmdd.jsonl.gz
+（每批是一个独立的 gzip 成员，多进程追加同一文件仍可用 gzip 整体读取）。
+未采中的调用只多一次随机数判断；队列满或当天文件超出上限时丢弃记录，不阻塞分析流程。
+"""
+
+import atexit
+import gzip
+import json
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.config import AI_TRACE_MAX_MB, AI_TRACE_SAMPLE_RATE, LOG_DIR, LOG_RETENTION_DAYS
+from src.logging_config import get_logger
+
+logger = get_logger(__name__, service="system")
+
+TRACE_DIR_NAME = "ai_traces"
+TRACE_FILE_PREFIX = "ai_trace_"
+TRACE_FILE_SUFFIX = ".jsonl.gz"
+QUEUE_SIZE = 1000
+BATCH_SIZE = 100
+
+
+def cleanup_ai_traces(log_dir: str, retention_days: int, max_bytes: Optional[int] = None) -> int:
+    """删除过期的追踪文件，并从最旧的开始删除直到总大小不超过上限，返回删除数量。"""
+    trace_dir = Path(log_dir) / TRACE_DIR_NAME
+    if not trace_dir.exists():
+        return 0
+    if max_bytes is None:
+        max_bytes = AI_TRACE_MAX_MB() * 1024 * 1024
+    cutoff_time = time.time() - retention_days * 86400
+    files = []
+    for trace_file in trace_dir.glob(f"{TRACE_FILE_PREFIX}*{TRACE_FILE_SUFFIX}"):
+        try:
+            stat = trace_file.stat()
+        except OSError:
+            continue
+        files.append((trace_file.name, trace_file, stat.st_size, stat.st_mtime))
+    files.sort()
+
+    removed = 0
+    total_size = sum(size for _, _, size, _ in files)
+    today_name = f"{TRACE_FILE_PREFIX}{datetime.now():%Y%m%d}{TRACE_FILE_SUFFIX}"
+    for name, trace_file, size, mtime in files:
+        if mtime >= cutoff_time and (total_size <= max_bytes or name == today_name):
+            continue
+        try:
+            trace_file.unlink()
+        except OSError:
+            continue
+        removed += 1
+        total_size -= size
+    return removed
+
+
+class AITraceSink:
+    """后台线程批量写入追踪记录。"""
+
+    def __init__(self, trace_dir: Path):
+        self.trace_dir = Path(trace_dir)
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=QUEUE_SIZE)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._current_date = ""
+        self.written = 0
+        self.dropped = 0
+
+    def submit(self, record: Dict[str, Any]) -> None:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """等待队列中的记录写完（进程退出前调用）。"""
+        deadline = time.monotonic() + timeout
+        while self._thread is not None and self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ai-trace-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception as e:
+                self.dropped += len(batch)
+                logger.warning(f"写入AI追踪记录失败: {e}", extra={"event": "ai_trace_write_failed"})
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        date = datetime.now().strftime("%Y%m%d")
+        if date != self._current_date:
+            self.trace_dir.mkdir(parents=True, exist_ok=True)
+            cleanup_ai_traces(str(self.trace_dir.parent), LOG_RETENTION_DAYS())
+            self._current_date = date
+        trace_file = self.trace_dir / f"{TRACE_FILE_PREFIX}{date}{TRACE_FILE_SUFFIX}"
+        try:
+            current_size = trace_file.stat().st_size
+        except FileNotFoundError:
+            current_size = 0
+        if current_size >= AI_TRACE_MAX_MB() * 1024 * 1024:
+            self.dropped += len(batch)
+            return
+
+        lines = "".join(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in batch)
+        data = gzip.compress(lines.encode("utf-8"))
+        # O_APPEND 单次写入整个 gzip 成员，多个采集进程同时追加也不会交错
+        fd = os.open(trace_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+        self.written += len(batch)
+
+
+_sink: Optional[AITraceSink] = None
+_sink_lock = threading.Lock()
+
+
+def _get_sink() -> AITraceSink:
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = AITraceSink(Path(LOG_DIR()) / TRACE_DIR_NAME)
+                atexit.register(_sink.flush)
+    return _sink
+
+
+def start_ai_trace(**fields: Any) -> Optional[str]:
+    """按采样率决定是否追踪本次调用；采中时写入请求记录并返回 trace_id，否则返回 None。"""
+    sample_rate = AI_TRACE_SAMPLE_RATE()
+    if sample_rate <= 0 or random.random() >= sample_rate:
+        return None
+    trace_id = uuid.uuid4().hex
+    record_ai_trace(trace_id, "request", **fields)
+    return trace_id
+
+
+def record_ai_trace(trace_id: Optional[str], kind: str, **fields: Any) -> None:
+    """追加一条追踪记录（kind: request/response/error），trace_id 为空时不做任何事。"""
+    if trace_id is None:
+        return
+    _get_sink().submit({"ts": datetime.now().isoformat(), "trace_id": trace_id, "kind": kind, **fields})
@@ -2,6 +2,8 @@ import json
 import math
 import os
 import re
+import threading
+import time
 from typing import Dict, List, Optional, Tuple, Any
 from src.user_file_store import resolve_virtual_task_file
 from src.config import STORAGE_BACKEND
@@ -10,6 +12,13 @@ from src.config import STORAGE_BACKEND
 # Bayes 配置文件目录
 BAYES_DIR = os.path.join("prompts", "bayes")
 
+# 已编译模型缓存：(profile, owner) -> (修订标识, 编译结果, 上次核对修订的时间)
+_compiled_models: Dict[Tuple[str, str], Tuple[str, "CompiledBayesModel", float]] = {}
+_compiled_models_lock = threading.Lock()
+# 核对修订标识（数据库一次查询）的最短间隔：本进程写入配置/样本时会直接失效缓存，
+# 其他进程的写入最多延迟该间隔后生效，逐条评分不再每条都查询数据库
+REVISION_CHECK_INTERVAL_SECONDS = 5.0
+
 
 def _safe_text(value: Any) -> str:
     return str(value) if value is not None else ""
@@ -357,10 +366,22 @@ def extract_features(final_record: Dict[str, Any], profile: Optional[Dict[str, A
 
 
 
+def _normalize_profile_name(profile_name: str) -> str:
+    return str(profile_name or "").replace(".json", "").strip()
+
+
+def _resolve_bayes_profile_file(normalized_version: str, owner_id: Optional[str] = None):
+    return resolve_virtual_task_file(
+        os.path.join("prompts", "bayes", f"{normalized_version}.json"),
+        owner_id=owner_id,
+        for_write=False
+    )
+
+
 def _load_bayes_profile(profile_name: str, owner_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
     if not profile_name or profile_name == "disabled":
         return None
-    normalized_version = str(profile_name or "").replace(".json", "").strip()
+    normalized_version = _normalize_profile_name(profile_name)
     if STORAGE_BACKEND() == "postgres":
         try:
             from src.storage import get_storage
@@ -372,12 +393,7 @@ def _load_bayes_profile(profile_name: str, owner_id: Optional[str] = None) -> Op
         except Exception:
             pass
 
-    filename = f"{normalized_version}.json"
-    filepath = resolve_virtual_task_file(
-        os.path.join("prompts", "bayes", filename),
-        owner_id=owner_id,
-        for_write=False
-    )
+    filepath = _resolve_bayes_profile_file(normalized_version, owner_id=owner_id)
     if not filepath.exists():
         return None
     with open(str(filepath), "r", encoding="utf-8") as f:
@@ -454,50 +470,157 @@ def _gaussian_logpdf(x: float, mean: float, var: float) -> float:
     return -0.5 * (math.log(2 * math.pi * var) + ((x - mean) ** 2) / var)
 
 
+class CompiledBayesModel:
+    """预先算好先验、均值、方差与对数归一化常数的高斯朴素贝叶斯模型。"""
+
+    __slots__ = (
+        "profile", "priors", "log_prior0", "log_prior1",
+        "mean0", "var0", "mean1", "var1",
+        "log_norm0", "log_norm1", "inv_two_var0", "inv_two_var1",
+    )
+
+    def __init__(self, profile: Dict[str, Any]):
+        priors, mean0, var0, mean1, var1 = _prepare_stats(profile)
+        self.profile = profile
+        self.priors = priors
+        self.log_prior0 = math.log(max(priors[0], 1e-12))
+        self.log_prior1 = math.log(max(priors[1], 1e-12))
+        self.mean0 = [float(v) for v in mean0]
+        self.var0 = [float(v) for v in var0]
+        self.mean1 = [float(v) for v in mean1]
+        self.var1 = [float(v) for v in var1]
+        self.log_norm0 = [-0.5 * math.log(2 * math.pi * v) for v in self.var0]
+        self.log_norm1 = [-0.5 * math.log(2 * math.pi * v) for v in self.var1]
+        self.inv_two_var0 = [0.5 / v for v in self.var0]
+        self.inv_two_var1 = [0.5 / v for v in self.var1]
+
+    def feature_logpdfs(self, idx: int, value: float) -> Tuple[float, float]:
+        """单特征在 (不可信, 可信) 两类下的对数似然。"""
+        diff0 = value - self.mean0[idx]
+        diff1 = value - self.mean1[idx]
+        return (
+            self.log_norm0[idx] - diff0 * diff0 * self.inv_two_var0[idx],
+            self.log_norm1[idx] - diff1 * diff1 * self.inv_two_var1[idx],
+        )
+
+    def batch_feature_logpdfs(self, matrix):
+        """批量计算 (n, d) 特征矩阵在两类下的逐特征对数似然，返回 (ll0, ll1)。"""
+        import numpy as np
+
+        ll0 = np.asarray(self.log_norm0) - np.square(matrix - np.asarray(self.mean0)) * np.asarray(self.inv_two_var0)
+        ll1 = np.asarray(self.log_norm1) - np.square(matrix - np.asarray(self.mean1)) * np.asarray(self.inv_two_var1)
+        return ll0, ll1
+
+    def predict_proba(self, features: List[float]) -> Tuple[float, List[float]]:
+        logp0 = self.log_prior0
+        logp1 = self.log_prior1
+        for idx, value in enumerate(features):
+            ll0, ll1 = self.feature_logpdfs(idx, value)
+            logp0 += ll0
+            logp1 += ll1
+        m = max(logp0, logp1)
+        p0 = math.exp(logp0 - m)
+        p1 = math.exp(logp1 - m)
+        p_credible = p1 / (p0 + p1)
+        return p_credible, [logp0, logp1]
+
+
 def predict_proba(features: List[float], profile: Dict[str, Any]) -> Tuple[float, List[float]]:
-    priors, mean0, var0, mean1, var1 = _prepare_stats(profile)
-    logp0 = math.log(max(priors[0], 1e-12))
-    logp1 = math.log(max(priors[1], 1e-12))
-    for idx, value in enumerate(features):
-        logp0 += _gaussian_logpdf(value, mean0[idx], var0[idx])
-        logp1 += _gaussian_logpdf(value, mean1[idx], var1[idx])
-    m = max(logp0, logp1)
-    p0 = math.exp(logp0 - m)
-    p1 = math.exp(logp1 - m)
-    p_credible = p1 / (p0 + p1)
-    return p_credible, [logp0, logp1]
+    return CompiledBayesModel(profile).predict_proba(features)
 
 
-def build_bayes_precalc(final_record: Dict[str, Any], profile_name: str, owner_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+def get_bayes_profile_revision(normalized_version: str, owner_id: Optional[str] = None) -> Optional[str]:
+    """获取配置修订标识（数据库取 updated_at 与样本摘要，本地取文件 mtime），用于判断缓存是否过期。"""
+    if STORAGE_BACKEND() == "postgres":
+        try:
+            from src.storage import get_storage
+
+            revision = get_storage().get_bayes_profile_revision(normalized_version, owner_id=owner_id)
+            if revision:
+                return f"db:{revision}"
+        except Exception:
+            pass
+
+    filepath = _resolve_bayes_profile_file(normalized_version, owner_id=owner_id)
+    try:
+        stat = filepath.stat()
+    except OSError:
+        return None
+    return f"file:{filepath}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def get_compiled_bayes_model(profile_name: str, owner_id: Optional[str] = None) -> Optional[CompiledBayesModel]:
+    """按 (profile, owner, 修订标识) 复用已编译模型，配置或样本变化后自动重新编译（修订标识按间隔核对）。"""
+    if not profile_name or profile_name == "disabled":
+        return None
+    normalized_version = _normalize_profile_name(profile_name)
+    cache_key = (normalized_version, str(owner_id or ""))
+
+    with _compiled_models_lock:
+        cached = _compiled_models.get(cache_key)
+    now = time.monotonic()
+    if cached and now - cached[2] < REVISION_CHECK_INTERVAL_SECONDS:
+        return cached[1]
+
+    revision = get_bayes_profile_revision(normalized_version, owner_id=owner_id)
+    if revision is not None and cached and cached[0] == revision:
+        with _compiled_models_lock:
+            # 核对期间被本进程写入失效的不再放回
+            if _compiled_models.get(cache_key) is cached:
+                _compiled_models[cache_key] = (revision, cached[1], now)
+        return cached[1]
+
     profile = _load_bayes_profile(profile_name, owner_id=owner_id)
     if not profile:
+        with _compiled_models_lock:
+            _compiled_models.pop(cache_key, None)
         return None
 
-    features, feature_display, feature_used, missing_rules, missing_features = extract_features(final_record, profile)
-    if features is None:
-        return {
-            "version": profile.get("version", profile_name),
-            "profile": profile_name,
-            "status": "missing_rules",
-            "missing_rules": missing_rules,
-            "missing_features": missing_features,
-            "features": feature_display,
-            "features_used": feature_used,
-            "notes": "Bayes评分规则缺失，无法完成先验预计算。"
-        }
-    p_credible, logps = predict_proba(features, profile)
+    model = CompiledBayesModel(profile)
+    if revision is not None:
+        with _compiled_models_lock:
+            _compiled_models[cache_key] = (revision, model, now)
+    return model
+
+
+def invalidate_bayes_model_cache(profile_name: Optional[str] = None, owner_id: Optional[str] = None) -> None:
+    """配置或样本写入后清理已编译模型；不指定 profile 时清空全部。"""
+    with _compiled_models_lock:
+        if not profile_name:
+            _compiled_models.clear()
+            return
+        normalized_version = _normalize_profile_name(profile_name)
+        for key in list(_compiled_models.keys()):
+            if key[0] != normalized_version:
+                continue
+            # owner_id 为空表示系统配置，变化会影响所有用户的回退结果
+            if owner_id and key[1] != str(owner_id):
+                continue
+            _compiled_models.pop(key, None)
+
+
+def _build_missing_rules_precalc(profile: Dict[str, Any], profile_name: str, extracted) -> Dict[str, Any]:
+    _, feature_display, feature_used, missing_rules, missing_features = extracted
+    return {
+        "version": profile.get("version", profile_name),
+        "profile": profile_name,
+        "status": "missing_rules",
+        "missing_rules": missing_rules,
+        "missing_features": missing_features,
+        "features": feature_display,
+        "features_used": feature_used,
+        "notes": "Bayes评分规则缺失，无法完成先验预计算。"
+    }
 
-    feature_names = profile.get("feature_names") or list(feature_used.keys())
-    # 使用单特征 log-likelihood 差异做简易贡献度
-    priors, mean0, var0, mean1, var1 = _prepare_stats(profile)
-    contributions = []
-    for idx, name in enumerate(feature_names):
-        value = features[idx]
-        diff = _gaussian_logpdf(value, mean1[idx], var1[idx]) - _gaussian_logpdf(value, mean0[idx], var0[idx])
-        contributions.append((name, abs(diff)))
-    contributions.sort(key=lambda x: x[1], reverse=True)
-    top_features = [name for name, _ in contributions[:3]]
 
+def _build_scored_precalc(
+    profile: Dict[str, Any],
+    profile_name: str,
+    extracted,
+    p_credible: float,
+    top_features: List[str],
+) -> Dict[str, Any]:
+    _, feature_display, feature_used, missing_rules, missing_features = extracted
     return {
         "version": profile.get("version", profile_name),
         "profile": profile_name,
@@ -509,3 +632,78 @@ def build_bayes_precalc(final_record: Dict[str, Any], profile_name: str, owner_i
         "missing_features": missing_features,
         "notes": "Bayes先验由样本自动估计（priors/mean/var），不参与AI证据评分。"
     }
+
+
+def build_bayes_precalc(final_record: Dict[str, Any], profile_name: str, owner_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    model = get_compiled_bayes_model(profile_name, owner_id=owner_id)
+    if not model:
+        return None
+    profile = model.profile
+
+    extracted = extract_features(final_record, profile)
+    features, _, feature_used, _, _ = extracted
+    if features is None:
+        return _build_missing_rules_precalc(profile, profile_name, extracted)
+    p_credible, logps = model.predict_proba(features)
+
+    feature_names = profile.get("feature_names") or list(feature_used.keys())
+    # 使用单特征 log-likelihood 差异做简易贡献度
+    contributions = []
+    for idx, name in enumerate(feature_names):
+        ll0, ll1 = model.feature_logpdfs(idx, features[idx])
+        contributions.append((name, abs(ll1 - ll0)))
+    contributions.sort(key=lambda x: x[1], reverse=True)
+    top_features = [name for name, _ in contributions[:3]]
+
+    return _build_scored_precalc(profile, profile_name, extracted, p_credible, top_features)
+
+
+def batch_build_bayes_precalc(
+    records: List[Dict[str, Any]],
+    profile_name: str,
+    owner_id: Optional[str] = None
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    批量计算 Bayes 先验：特征逐条提取后组成矩阵，似然、后验与贡献度用 NumPy 一次算完。
+    返回结果与 records 一一对应，与逐条调用 build_bayes_precalc 的输出一致。
+    """
+    import numpy as np
+
+    model = get_compiled_bayes_model(profile_name, owner_id=owner_id)
+    if not model or not records:
+        return [None] * len(records)
+    profile = model.profile
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(records)
+    extracted_rows = []
+    scored_positions: List[int] = []
+    for pos, record in enumerate(records):
+        extracted = extract_features(record, profile)
+        if extracted[0] is None:
+            results[pos] = _build_missing_rules_precalc(profile, profile_name, extracted)
+            continue
+        extracted_rows.append(extracted)
+        scored_positions.append(pos)
+
+    if not scored_positions:
+        return results
+
+    matrix = np.asarray([extracted[0] for extracted in extracted_rows], dtype=float)
+    ll0, ll1 = model.batch_feature_logpdfs(matrix)
+    logp0 = model.log_prior0 + ll0.sum(axis=1)
+    logp1 = model.log_prior1 + ll1.sum(axis=1)
+    # p1 / (p0 + p1) 的数值稳定写法
+    p_credible = 1.0 / (1.0 + np.exp(np.minimum(logp0 - logp1, 700.0)))
+
+    # 贡献度排序：绝对值降序，相同值保持特征顺序（与逐条计算一致）
+    contributions = np.abs(ll1 - ll0)
+    top_indexes = np.argsort(-contributions, axis=1, kind="stable")[:, :3]
+
+    for row_no, pos in enumerate(scored_positions):
+        extracted = extracted_rows[row_no]
+        feature_names = profile.get("feature_names") or list(extracted[2].keys())
+        top_features = [feature_names[idx] for idx in top_indexes[row_no] if idx < len(feature_names)]
+        results[pos] = _build_scored_precalc(
+            profile, profile_name, extracted, float(p_credible[row_no]), top_features
+        )
+    return results
@@ -0,0 +1,318 @@
+"""
+Browser Pool - 采集进程内的浏览器与账号上下文复用
+
+单次运行的 collector 每个任务都会启动一个浏览器并在结束时关闭。
+常驻采集进程（collector.py --worker）则激活本模块的 BrowserPool：
+- 浏览器在进程内常驻，断开或启动参数（无头/Edge）变化时重新启动；
+- 每个账号保留一个上下文（按账号快照、上下文参数与注入脚本的指纹区分），任务结束后关闭页面、保留 Cookie 供下次复用；
+- 上下文数量超过 BROWSER_POOL_MAX_CONTEXTS 时关闭最久未用的；触发风控的上下文不再复用。
+fetch_xianyu 统一通过 open_browser_lease() 取得浏览器，未激活池时行为与原来一致。
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from playwright.async_api import async_playwright
+
+from src.config import (
+    BROWSER_CONTEXT_WARM_SECONDS,
+    BROWSER_POOL_MAX_CONTEXTS,
+    LOGIN_IS_EDGE,
+    RUN_HEADLESS,
+    RUNNING_IN_DOCKER,
+)
+from src.logging_config import get_logger
+
+logger = get_logger(__name__, service="collector")
+
+# 访问策略适配启动参数
+BROWSER_LAUNCH_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--disable-dev-shm-usage',
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-web-security',
+    '--disable-features=IsolateOrigins,site-per-process'
+]
+
+
+def _launch_options() -> Dict[str, Any]:
+    options: Dict[str, Any] = {"headless": RUN_HEADLESS(), "args": BROWSER_LAUNCH_ARGS}
+    if LOGIN_IS_EDGE():
+        options["channel"] = "msedge"
+    elif not RUNNING_IN_DOCKER():
+        options["channel"] = "chrome"
+    return options
+
+
+async def launch_browser(playwright):
+    """按当前配置启动浏览器。"""
+    return await playwright.chromium.launch(**_launch_options())
+
+
+def context_fingerprint(storage_state: Any, context_kwargs: Dict[str, Any], init_script: str) -> str:
+    """账号上下文指纹：快照、上下文参数或注入脚本变化时不再复用旧上下文。"""
+    material = json.dumps([storage_state, context_kwargs, init_script], ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(material.encode("utf-8")).hexdigest()
+
+
+def process_tree_rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """进程及其所有子进程的常驻内存（MB），仅支持 Linux，其他平台返回 None。"""
+    if not sys.platform.startswith("linux"):
+        return None
+    root = pid or os.getpid()
+    children: Dict[int, List[int]] = {}
+    rss_kb: Dict[int, int] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/status", "r", encoding="utf-8") as f:
+                ppid, rss = 0, 0
+                for line in f:
+                    if line.startswith("PPid:"):
+                        ppid = int(line.split()[1])
+                    elif line.startswith("VmRSS:"):
+                        rss = int(line.split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        rss_kb[int(entry)] = rss
+        children.setdefault(ppid, []).append(int(entry))
+    if root not in rss_kb:
+        return None
+    total, stack = 0, [root]
+    while stack:
+        current = stack.pop()
+        total += rss_kb.get(current, 0)
+        stack.extend(children.get(current, []))
+    return round(total / 1024, 1)
+
+
+class _PooledContext:
+    def __init__(self, context, fingerprint: str):
+        self.context = context
+        self.fingerprint = fingerprint
+        self.in_use = False
+        self.warmed_at = 0.0
+        self.closed = False
+
+
+class BrowserPool:
+    """常驻浏览器 + 按账号复用的上下文。"""
+
+    def __init__(self):
+        self._playwright = None
+        self._browser = None
+        self._launch_signature: Optional[str] = None
+        self._contexts: "OrderedDict[str, _PooledContext]" = OrderedDict()
+        self.launches = 0
+        self.context_hits = 0
+        self.context_misses = 0
+
+    async def get_browser(self):
+        signature = json.dumps(_launch_options(), sort_keys=True)
+        if self._browser is not None and (not self._browser.is_connected() or signature != self._launch_signature):
+            await self._close_browser()
+        if self._browser is None:
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            self._browser = await launch_browser(self._playwright)
+            self._launch_signature = signature
+            self.launches += 1
+        return self._browser
+
+    async def acquire_context(
+        self,
+        account_key: str,
+        fingerprint: str,
+        storage_state: Any,
+        context_kwargs: Dict[str, Any],
+        init_script: str,
+    ) -> Tuple[Any, bool]:
+        """取得账号上下文，返回 (上下文, 是否为近期预热过的复用上下文)。"""
+        browser = await self.get_browser()
+        pooled = self._contexts.get(account_key)
+        if pooled is not None and not pooled.in_use:
+            if pooled.closed or pooled.fingerprint != fingerprint:
+                await self._discard(account_key)
+            else:
+                pooled.in_use = True
+                self._contexts.move_to_end(account_key)
+                self.context_hits += 1
+                warm = time.time() - pooled.warmed_at <= BROWSER_CONTEXT_WARM_SECONDS()
+                return pooled.context, warm
+
+        context = await browser.new_context(storage_state=storage_state, **context_kwargs)
+        await context.add_init_script(init_script)
+        self.context_misses += 1
+        if account_key in self._contexts:
+            # 同一账号的上下文正被占用（不应出现），本次使用不入池
+            return context, False
+
+        await self._evict_idle(BROWSER_POOL_MAX_CONTEXTS() - 1)
+        pooled = _PooledContext(context, fingerprint)
+        pooled.in_use = True
+        context.on("close", lambda _: setattr(pooled, "closed", True))
+        self._contexts[account_key] = pooled
+        return context, False
+
+    async def release_context(self, context, reuse: bool) -> None:
+        """任务结束：关闭页面并归还上下文；不复用时直接关闭。"""
+        for account_key, pooled in list(self._contexts.items()):
+            if pooled.context is not context:
+                continue
+            if not reuse or pooled.closed:
+                await self._discard(account_key)
+                return
+            for page in list(context.pages):
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+            pooled.in_use = False
+            pooled.warmed_at = time.time()
+            return
+        try:
+            await context.close()
+        except Exception:
+            pass
+
+    async def _evict_idle(self, keep: int) -> None:
+        idle_keys = [key for key, pooled in self._contexts.items() if not pooled.in_use]
+        while idle_keys and len(self._contexts) > max(0, keep):
+            await self._discard(idle_keys.pop(0))
+
+    async def _discard(self, account_key: str) -> None:
+        pooled = self._contexts.pop(account_key, None)
+        if pooled is None:
+            return
+        try:
+            await pooled.context.close()
+        except Exception:
+            pass
+
+    async def _close_browser(self) -> None:
+        for account_key in list(self._contexts.keys()):
+            await self._discard(account_key)
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+        self._browser = None
+
+    async def close(self) -> None:
+        await self._close_browser()
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "browser_launches": self.launches,
+            "contexts": len(self._contexts),
+            "context_hits": self.context_hits,
+            "context_misses": self.context_misses,
+        }
+
+
+class BrowserLease:
+    """一次任务对浏览器的使用权。
+
+    new_context() 创建的临时上下文在 close() 时关闭；open_account_context() 取得的账号上下文
+    在池模式下归还复用，单次运行模式下随浏览器一起关闭。
+    """
+
+    def __init__(self, browser, pool: Optional[BrowserPool] = None):
+        self.browser = browser
+        self.pool = pool
+        self._account_context = None
+        self._temporary_contexts: List[Any] = []
+        self._closed = False
+
+    async def new_context(self, **kwargs):
+        context = await self.browser.new_context(**kwargs)
+        self._temporary_contexts.append(context)
+        return context
+
+    async def open_account_context(
+        self,
+        account_key: str,
+        storage_state: Any,
+        context_kwargs: Dict[str, Any],
+        init_script: str,
+    ) -> Tuple[Any, bool]:
+        """创建或复用账号上下文，返回 (上下文, 是否可跳过首页预热)。"""
+        if self.pool is None:
+            context = await self.new_context(storage_state=storage_state, **context_kwargs)
+            await context.add_init_script(init_script)
+            return context, False
+        fingerprint = context_fingerprint(storage_state, context_kwargs, init_script)
+        context, warm = await self.pool.acquire_context(
+            account_key, fingerprint, storage_state, context_kwargs, init_script
+        )
+        self._account_context = context
+        return context, warm
+
+    async def close(self, reuse_context: bool = True) -> None:
+        """结束本次使用；reuse_context=False 表示账号上下文已不可信（如触发风控），不再复用。"""
+        if self._closed:
+            return
+        self._closed = True
+        for context in self._temporary_contexts:
+            try:
+                await context.close()
+            except Exception:
+                pass
+        if self.pool is None:
+            try:
+                await self.browser.close()
+            except Exception:
+                pass
+            return
+        if self._account_context is not None:
+            await self.pool.release_context(self._account_context, reuse_context)
+
+
+_active_pool: Optional[BrowserPool] = None
+
+
+def activate_browser_pool() -> BrowserPool:
+    """在常驻采集进程中启用浏览器池（进程内单例）。"""
+    global _active_pool
+    if _active_pool is None:
+        _active_pool = BrowserPool()
+    return _active_pool
+
+
+def get_browser_pool() -> Optional[BrowserPool]:
+    return _active_pool
+
+
+@asynccontextmanager
+async def open_browser_lease():
+    """取得本次任务使用的浏览器：池模式复用常驻浏览器，否则启动一个独占浏览器。"""
+    pool = _active_pool
+    if pool is not None:
+        lease = BrowserLease(await pool.get_browser(), pool)
+        try:
+            yield lease
+        finally:
+            await lease.close()
+        return
+
+    async with async_playwright() as p:
+        lease = BrowserLease(await launch_browser(p))
+        try:
+            yield lease
+        finally:
+            await lease.close()
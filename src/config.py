@@ -245,6 +245,171 @@ def DB_DEDUP_SCOPE():
     scope = str(get_env_value("DB_DEDUP_SCOPE", "owner") or "owner").strip().lower()
     return scope if scope in {"owner", "task"} else "owner"
 
+def _get_positive_int_env_value(key: str, default: int) -> int:
+    """读取正整数配置，非法值回退默认值。"""
+    value = get_env_value(key, default, int)
+    return value if isinstance(value, int) and value > 0 else default
+
+def SCRAPER_PIPELINE_ENABLED():
+    """是否启用详情页/AI分析并发流水线（默认关闭，逐个串行处理）。"""
+    return get_bool_env_value("SCRAPER_PIPELINE_ENABLED", False)
+
+def SCRAPER_DETAIL_CONCURRENCY():
+    """流水线模式下同时打开的详情页数量。"""
+    return _get_positive_int_env_value("SCRAPER_DETAIL_CONCURRENCY", 1)
+
+def SCRAPER_AI_CONCURRENCY():
+    """流水线模式下同时进行的AI分析数量。"""
+    return _get_positive_int_env_value("SCRAPER_AI_CONCURRENCY", 3)
+
+def SCRAPER_WORKER_POOL_ENABLED():
+    """是否由常驻采集进程池执行任务（默认关闭，每次运行启动一个 collector 子进程）。"""
+    return get_bool_env_value("SCRAPER_WORKER_POOL_ENABLED", False)
+
+def SCRAPER_WORKER_POOL_SIZE():
+    """常驻采集进程数量，即同时运行的任务上限（其余任务排队）。"""
+    return _get_positive_int_env_value("SCRAPER_WORKER_POOL_SIZE", 2)
+
+def SCRAPER_WORKER_MAX_TASKS():
+    """单个采集进程执行多少次任务后退出重建。"""
+    return _get_positive_int_env_value("SCRAPER_WORKER_MAX_TASKS", 50)
+
+def SCRAPER_WORKER_MAX_RSS_MB():
+    """采集进程（含浏览器子进程）常驻内存超过该值（MB）时，在任务结束后退出重建。"""
+    return _get_positive_int_env_value("SCRAPER_WORKER_MAX_RSS_MB", 1536)
+
+def BROWSER_POOL_MAX_CONTEXTS():
+    """每个常驻采集进程保留的账号浏览器上下文数量上限（超出时关闭最久未用的）。"""
+    return _get_positive_int_env_value("BROWSER_POOL_MAX_CONTEXTS", 3)
+
+def BROWSER_CONTEXT_WARM_SECONDS():
+    """复用的账号上下文在该时间（秒）内用过时跳过首页预热。"""
+    return _get_positive_int_env_value("BROWSER_CONTEXT_WARM_SECONDS", 900)
+
+def AI_HTTP_MAX_CONNECTIONS():
+    """AI 客户端连接池的最大连接数。"""
+    return _get_positive_int_env_value("AI_HTTP_MAX_CONNECTIONS", 20)
+
+def AI_HTTP_KEEPALIVE_SECONDS():
+    """AI 客户端空闲长连接的保留时间（秒）。"""
+    return _get_positive_int_env_value("AI_HTTP_KEEPALIVE_SECONDS", 60)
+
+def AI_MAX_CONCURRENCY():
+    """同一进程内每个 (base_url, 模型) 同时进行的 AI 请求上限。"""
+    return _get_positive_int_env_value("AI_MAX_CONCURRENCY", 4)
+
+def AI_REQUESTS_PER_MINUTE():
+    """同一进程内每个 (base_url, 模型) 每分钟请求数上限，0 表示不限制。"""
+    value = get_env_value("AI_REQUESTS_PER_MINUTE", 0, int)
+    return value if isinstance(value, int) and value >= 0 else 0
+
+def AI_REQUEST_DEADLINE_SECONDS():
+    """单次 AI 调用（含排队与重试）的总截止时间（秒）。"""
+    return _get_positive_int_env_value("AI_REQUEST_DEADLINE_SECONDS", 180)
+
+def AI_MAX_RETRIES():
+    """AI 请求遇到限流/服务端错误/网络错误时的最大重试次数。"""
+    value = get_env_value("AI_MAX_RETRIES", 3, int)
+    return value if isinstance(value, int) and value >= 0 else 3
+
+def AI_RETRY_BASE_SECONDS():
+    """AI 请求重试退避基数（秒），服务端返回 Retry-After 时以其为准。"""
+    return _get_positive_int_env_value("AI_RETRY_BASE_SECONDS", 2)
+
+def AI_ANALYSIS_CACHE_TTL_SECONDS():
+    """AI 分析结果缓存有效期（秒），0 表示关闭缓存。"""
+    value = get_env_value("AI_ANALYSIS_CACHE_TTL_SECONDS", 259200, int)
+    return value if isinstance(value, int) and value >= 0 else 259200
+
+def SELLER_PROFILE_CACHE_TTL_SECONDS():
+    """卖家信息缓存有效期（秒），0 表示关闭缓存。"""
+    value = get_env_value("SELLER_PROFILE_CACHE_TTL_SECONDS", 21600, int)
+    return value if isinstance(value, int) and value >= 0 else 21600
+
+def STORAGE_DB_POOL_SIZE():
+    """PostgreSQL 连接池常驻连接数。"""
+    return _get_positive_int_env_value("STORAGE_DB_POOL_SIZE", 5)
+
+def STORAGE_DB_MAX_OVERFLOW():
+    """PostgreSQL 连接池允许的溢出连接数（0 表示不溢出）。"""
+    value = get_env_value("STORAGE_DB_MAX_OVERFLOW", 10, int)
+    return value if isinstance(value, int) and value >= 0 else 10
+
+def STORAGE_DB_POOL_TIMEOUT():
+    """等待连接池空闲连接的超时时间（秒）。"""
+    return _get_positive_int_env_value("STORAGE_DB_POOL_TIMEOUT", 30)
+
+def STORAGE_THREAD_POOL_SIZE():
+    """Web 端执行存储调用的线程池大小（默认与连接池上限一致）。"""
+    return _get_positive_int_env_value(
+        "STORAGE_THREAD_POOL_SIZE", STORAGE_DB_POOL_SIZE() + STORAGE_DB_MAX_OVERFLOW()
+    )
+
+def AUTH_CACHE_TTL_SECONDS():
+    """多用户模式会话/权限缓存有效期（秒），0 表示关闭缓存。"""
+    value = get_env_value("AUTH_CACHE_TTL_SECONDS", 5, int)
+    return value if isinstance(value, int) and value >= 0 else 5
+
+def NOTIFICATION_ROUTING_CACHE_TTL_SECONDS():
+    """多用户模式通知路由表缓存有效期（秒），0 表示关闭缓存。"""
+    value = get_env_value("NOTIFICATION_ROUTING_CACHE_TTL_SECONDS", 30, int)
+    return value if isinstance(value, int) and value >= 0 else 30
+
+def RESULT_WRITE_BATCH_SIZE():
+    """流水线模式下采集结果批量写入的最大批次条数（串行模式逐条直接写入）。"""
+    return _get_positive_int_env_value("RESULT_WRITE_BATCH_SIZE", 20)
+
+def RESULT_WRITE_FLUSH_INTERVAL_MS():
+    """采集结果缓冲的最长等待时间（毫秒），到期即写出。"""
+    value = get_env_value("RESULT_WRITE_FLUSH_INTERVAL_MS", 200, int)
+    return value if isinstance(value, int) and value >= 0 else 200
+
+def NOTIFIER_HTTP_MAX_CONNECTIONS():
+    """通知渠道共享 HTTP 客户端的最大连接数（每个代理配置一个客户端）。"""
+    return _get_positive_int_env_value("NOTIFIER_HTTP_MAX_CONNECTIONS", 20)
+
+def NOTIFIER_HTTP_KEEPALIVE_SECONDS():
+    """通知渠道空闲长连接的保留时间（秒）。"""
+    return _get_positive_int_env_value("NOTIFIER_HTTP_KEEPALIVE_SECONDS", 60)
+
+def NOTIFICATION_OUTBOX_ENABLED():
+    """采集时商品通知是否先写入发件箱、由后台派发器异步发送（关闭则在采集流程内直接发送）。"""
+    return get_bool_env_value("NOTIFICATION_OUTBOX_ENABLED", True)
+
+def NOTIFICATION_OUTBOX_MAX_ATTEMPTS():
+    """发件箱事件最大发送次数，超过后标记为 dead 不再重试。"""
+    return _get_positive_int_env_value("NOTIFICATION_OUTBOX_MAX_ATTEMPTS", 6)
+
+def NOTIFICATION_OUTBOX_RETRY_BASE_SECONDS():
+    """发件箱重试退避基数（秒），第 n 次失败后等待 基数*2^(n-1)，上限 30 分钟。"""
+    return _get_positive_int_env_value("NOTIFICATION_OUTBOX_RETRY_BASE_SECONDS", 10)
+
+def NOTIFICATION_OUTBOX_DEAD_RETENTION_DAYS():
+    """发件箱中放弃重试（dead）的事件保留天数，超过后由派发器定期删除（0 表示不清理）。"""
+    value = get_env_value("NOTIFICATION_OUTBOX_DEAD_RETENTION_DAYS", 7, int)
+    return value if isinstance(value, int) and value >= 0 else 7
+
+def NOTIFICATION_OUTBOX_DRAIN_TIMEOUT_SECONDS():
+    """采集进程退出前等待发件箱发送完毕的最长时间（秒），未发完的事件由 Web 进程继续派发。"""
+    return _get_positive_int_env_value("NOTIFICATION_OUTBOX_DRAIN_TIMEOUT_SECONDS", 60)
+
+def NOTIFICATION_CHANNEL_CONCURRENCY():
+    """发件箱派发器每个通知渠道的最大并发发送数。"""
+    return _get_positive_int_env_value("NOTIFICATION_CHANNEL_CONCURRENCY", 2)
+
+def NOTIFICATION_DIGEST_SIZE():
+    """汇总通知最多合并的商品数，1 表示不合并（逐条发送）。"""
+    return _get_positive_int_env_value("NOTIFICATION_DIGEST_SIZE", 1)
+
+def NOTIFICATION_DIGEST_WINDOW_SECONDS():
+    """汇总通知的收集窗口（秒），窗口内的推荐商品合并为一条消息。"""
+    return _get_positive_int_env_value("NOTIFICATION_DIGEST_WINDOW_SECONDS", 60)
+
+def NOTIFICATION_DIGEST_CHANNELS():
+    """支持汇总通知的渠道列表（逗号分隔）。"""
+    raw = get_env_value("NOTIFICATION_DIGEST_CHANNELS", "wx_bot,ntfy") or ""
+    return [item.strip() for item in raw.split(",") if item.strip()]
+
 def JSONL_FALLBACK_ON_DB_ERROR():
     """数据库写入失败时是否回退jsonl。"""
     return get_bool_env_value("JSONL_FALLBACK_ON_DB_ERROR", False)
@@ -291,6 +456,38 @@ def LOG_JSON_FORMAT():
 def LOG_ENABLE_LEGACY():
     return get_bool_env_value("LOG_ENABLE_LEGACY", True)
 
+def LOG_INDEX_ENABLED():
+    """是否为日志页维护等级旁路索引（logs/.index/）。"""
+    return get_bool_env_value("LOG_INDEX_ENABLED", True)
+
+def RESULT_SEARCH_INDEX_ENABLED():
+    """本地模式是否为结果文件维护全文检索索引（jsonl/.index/*.search.db，供手动关键词搜索）。"""
+    return get_bool_env_value("RESULT_SEARCH_INDEX_ENABLED", True)
+
+def RESULT_ARCHIVE_AFTER_DAYS():
+    """本地模式结果文件中早于 N 天的记录在任务结束后归档为压缩段文件（jsonl/.archive/，0 表示不归档）。"""
+    value = get_env_value("RESULT_ARCHIVE_AFTER_DAYS", 0, int)
+    return value if isinstance(value, int) and value >= 0 else 0
+
+def LOG_STREAM_POLL_INTERVAL_MS():
+    """日志推送流检查文件增长的间隔（毫秒，所有订阅者共享一次检查）。"""
+    return max(50, int(get_env_value("LOG_STREAM_POLL_INTERVAL_MS", 500)))
+
+def LOG_STREAM_HEARTBEAT_SECONDS():
+    """日志推送流无新内容时发送心跳的间隔（秒）。"""
+    return max(1, int(get_env_value("LOG_STREAM_HEARTBEAT_SECONDS", 15)))
+
+def AI_TRACE_SAMPLE_RATE():
+    """AI 请求/响应追踪采样率（0-1，0 表示关闭；AI_DEBUG_MODE 开启时全量记录）。"""
+    if AI_DEBUG_MODE():
+        return 1.0
+    value = get_env_value("AI_TRACE_SAMPLE_RATE", 0.0, float)
+    return min(1.0, max(0.0, value)) if isinstance(value, float) else 0.0
+
+def AI_TRACE_MAX_MB():
+    """AI 追踪文件（logs/ai_traces/）总大小上限（MB），超出后删除最旧的文件、当天文件超限则停止写入。"""
+    return _get_positive_int_env_value("AI_TRACE_MAX_MB", 200)
+
 
 # --- Client Initialization ---
 def initialize_ai_client():
@@ -323,12 +520,23 @@ def initialize_ai_client():
             return False
 
         # 仅在开启AI代理时为AI客户端显式注入代理，避免影响其他请求
+        use_proxy = bool(proxy_ai_enabled and proxy_url)
+        max_connections = AI_HTTP_MAX_CONNECTIONS()
+        # 连接池长期复用；重试由 src.ai_gateway 按 Retry-After 退避处理，SDK 不再自行重试
         client_params = {
             "api_key": api_key,
             "base_url": base_url,
+            "max_retries": 0,
+            "http_client": httpx.AsyncClient(
+                proxy=proxy_url if use_proxy else None,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                    keepalive_expiry=AI_HTTP_KEEPALIVE_SECONDS(),
+                ),
+            ),
         }
-        if proxy_ai_enabled and proxy_url:
-            client_params["http_client"] = httpx.AsyncClient(proxy=proxy_url, timeout=30.0)
+        if use_proxy:
             logger.info(
                 "AI 请求启用代理",
                 extra={"event": "ai_proxy_enabled", "proxy_url": proxy_url}
@@ -382,6 +590,7 @@ def save_env_settings(settings: dict, setting_keys: list):
         "AI_VISION_ENABLED",
         "DB_DEDUP_ENABLED",
         "JSONL_FALLBACK_ON_DB_ERROR",
+        "SCRAPER_PIPELINE_ENABLED",
         "PCURL_TO_MOBILE",
         "NOTIFY_AFTER_TASK_COMPLETE",
         # 代理相关开关
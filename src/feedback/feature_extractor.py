@@ -58,6 +58,8 @@ class FeatureExtractor:
             keyword: 搜索关键词，用于计算标题相关性
         """
         self.keyword = keyword or ""
+        # 关键词分词只做一次，批量提取时复用
+        self._keyword_terms = [kw.strip().lower() for kw in self.keyword.split() if kw.strip()]
     
     def extract(self, product_data: Dict[str, Any]) -> List[float]:
         """
@@ -79,6 +81,10 @@ class FeatureExtractor:
             self._extract_title_relevance(product_data),
             self._extract_risk_indicator(product_data)
         ]
+
+    def extract_batch(self, items: List[Dict[str, Any]]) -> List[List[float]]:
+        """批量提取特征向量，按输入顺序返回"""
+        return [self.extract(item) for item in items]
     
     def _extract_price_score(self, data: Dict) -> float:
         """
@@ -328,13 +334,14 @@ class FeatureExtractor:
             return 0.0
         
         # 简化关键词匹配
-        keywords = [kw.strip() for kw in self.keyword.split() if kw.strip()]
+        keywords = self._keyword_terms
         
         if not keywords:
             return 0.5
         
         # 计算匹配率
-        matched = sum(1 for kw in keywords if kw.lower() in title.lower())
+        title_lower = title.lower()
+        matched = sum(1 for kw in keywords if kw in title_lower)
         match_ratio = matched / len(keywords)
         
         return match_ratio
@@ -3,7 +3,7 @@
 
 负责贝叶斯训练样本的CRUD操作，支持本地和PostgreSQL双后端。
 """
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 
 from src.storage import get_storage
 from src.web.auth import is_multi_user_mode
@@ -90,6 +90,54 @@ class SampleManager:
                 return normalized
         return DEFAULT_PROFILE_VERSION
 
+    def _prepare_feedback(
+        self,
+        result_id: str,
+        feedback_type: str,
+        product_data: Dict[str, Any],
+        profile_version: Optional[str],
+        owner_id: Optional[str]
+    ) -> Dict[str, Any]:
+        """校验反馈类型并解析标签、商品数据与 Bayes 版本（不含特征提取）"""
+        feedback_type_normalized = str(feedback_type or '').strip().lower()
+        if feedback_type_normalized not in VALID_FEEDBACK_TYPES:
+            raise ValueError("feedback_type 必须为 trusted 或 untrusted")
+
+        # 未提供商品数据时，尝试从存储层回填（兼容仅上传 result_id/item_id 的场景）
+        payload = product_data if isinstance(product_data, dict) else {}
+        if not payload:
+            payload = self._load_product_data_from_storage(result_id, owner_id)
+
+        return {
+            'result_id': result_id,
+            'feedback_type': feedback_type_normalized,
+            'label': LABEL_TRUSTED if feedback_type_normalized == 'trusted' else LABEL_UNTRUSTED,
+            'payload': payload,
+            'profile_version': self._resolve_profile_version(profile_version, payload)
+        }
+
+    def _save_feedback_record(
+        self,
+        prepared: Dict[str, Any],
+        feature_vector: List[float],
+        feedback_user_id: str
+    ) -> Tuple[Optional[Dict], Dict[str, Any]]:
+        """创建反馈记录（用于审计和后续统计），返回 (反馈记录, 对应的贝叶斯样本数据)"""
+        feedback = self.storage.save_feedback(
+            user_id=feedback_user_id,
+            result_id=prepared['result_id'],
+            feedback_type=prepared['feedback_type'],
+            feature_vector=feature_vector
+        )
+        sample_data = {
+            'vector': feature_vector,
+            'label': prepared['label'],
+            'source': SOURCE_USER,
+            'item_id': prepared['result_id'],
+            'profile_version': prepared['profile_version']
+        }
+        return feedback, sample_data
+
     def add_feedback(
         self,
         result_id: str,
@@ -110,43 +158,17 @@ class SampleManager:
         Returns:
             创建的反馈记录或None
         """
-        feedback_type_normalized = str(feedback_type or '').strip().lower()
-        if feedback_type_normalized not in VALID_FEEDBACK_TYPES:
-            raise ValueError("feedback_type 必须为 trusted 或 untrusted")
-
         owner_id = self._resolve_owner_id()
         feedback_user_id = str(self.user_id) if self.user_id else "local_admin"
+        prepared = self._prepare_feedback(result_id, feedback_type, product_data, profile_version, owner_id)
 
-        # 确定标签
-        label = LABEL_TRUSTED if feedback_type_normalized == 'trusted' else LABEL_UNTRUSTED
-
-        # 未提供商品数据时，尝试从存储层回填（兼容仅上传 result_id/item_id 的场景）
-        payload = product_data if isinstance(product_data, dict) else {}
-        if not payload:
-            payload = self._load_product_data_from_storage(result_id, owner_id)
-        resolved_profile_version = self._resolve_profile_version(profile_version, payload)
-        
         # 提取特征向量
         extractor = FeatureExtractor(keyword=keyword)
-        feature_vector = extractor.extract(payload)
+        feature_vector = extractor.extract(prepared['payload'])
 
-        # 创建反馈记录（用于审计和后续统计）
-        feedback = self.storage.save_feedback(
-            user_id=feedback_user_id,
-            result_id=result_id,
-            feedback_type=feedback_type_normalized,
-            feature_vector=feature_vector
-        )
-        
+        feedback, sample_data = self._save_feedback_record(prepared, feature_vector, feedback_user_id)
         if feedback:
             # 同时创建贝叶斯样本
-            sample_data = {
-                'vector': feature_vector,
-                'label': label,
-                'source': SOURCE_USER,
-                'item_id': result_id,
-                'profile_version': resolved_profile_version
-            }
             self.storage.add_bayes_sample(sample_data, owner_id=owner_id)
         
         return feedback
@@ -175,6 +197,9 @@ class SampleManager:
         """
         批量添加用户反馈
         
+        特征统一由一个提取器一次提取，贝叶斯样本通过 add_bayes_samples 一次写入
+        （本地模式每个配置文件只重写一次，PostgreSQL 为一条多行 INSERT）。
+        
         Args:
             feedbacks: 反馈列表，每项包含 result_id, feedback_type, product_data
             keyword: 搜索关键词
@@ -182,26 +207,51 @@ class SampleManager:
         Returns:
             统计结果 {'success': n, 'failed': m}
         """
-        success_count = 0
+        owner_id = self._resolve_owner_id()
+        feedback_user_id = str(self.user_id) if self.user_id else "local_admin"
         failed_count = 0
-        
+
+        prepared_items: List[Dict[str, Any]] = []
         for item in feedbacks:
             try:
-                result = self.add_feedback(
-                    result_id=item.get('result_id'),
-                    feedback_type=item.get('feedback_type'),
-                    product_data=item.get('product_data', {}),
-                    keyword=keyword,
-                    profile_version=item.get('profile_version')
-                )
-                if result:
-                    success_count += 1
-                else:
-                    failed_count += 1
+                prepared_items.append(self._prepare_feedback(
+                    item.get('result_id'),
+                    item.get('feedback_type'),
+                    item.get('product_data', {}),
+                    item.get('profile_version'),
+                    owner_id
+                ))
+            except Exception:
+                failed_count += 1
+
+        extractor = FeatureExtractor(keyword=keyword)
+        feature_vectors = extractor.extract_batch([prepared['payload'] for prepared in prepared_items])
+
+        samples: List[Dict[str, Any]] = []
+        for prepared, feature_vector in zip(prepared_items, feature_vectors):
+            try:
+                feedback, sample_data = self._save_feedback_record(prepared, feature_vector, feedback_user_id)
             except Exception:
                 failed_count += 1
+                continue
+            if feedback:
+                samples.append(sample_data)
+            else:
+                failed_count += 1
+
+        if samples:
+            try:
+                self.storage.add_bayes_samples(samples, owner_id=owner_id)
+            except Exception as e:
+                logger.error(
+                    f"批量写入贝叶斯样本失败（{len(samples)} 条）",
+                    extra={"event": "feedback_batch_samples_failed", "owner_id": owner_id},
+                    exc_info=e
+                )
+                failed_count += len(samples)
+                samples = []
         
-        return {'success': success_count, 'failed': failed_count}
+        return {'success': len(samples), 'failed': failed_count}
     
     def get_samples(
         self,
@@ -357,21 +407,20 @@ class SampleManager:
         Returns:
             导入的样本数量
         """
-        count = 0
-        
-        for sample in samples:
-            sample_data = {
+        if not samples:
+            return 0
+
+        sample_data = [
+            {
                 'vector': sample.get('vector'),
                 'label': sample.get('label'),
                 'source': SOURCE_PRESET,
                 'profile_version': sample.get('profile_version', DEFAULT_PROFILE_VERSION)
             }
-            
-            result = self.storage.add_bayes_sample(sample_data, owner_id=None)  # 系统预置
-            if result:
-                count += 1
-        
-        return count
+            for sample in samples
+        ]
+        created = self.storage.add_bayes_samples(sample_data, owner_id=None)  # 系统预置
+        return len(created)
 
 
 # 单例管理
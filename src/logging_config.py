@@ -211,7 +211,7 @@ def get_task_logger(task_name: str, task_id: int, log_dir: str = "logs") -> logg
 
 def cleanup_old_logs(log_dir: str = "logs", retention_days: int = 7) -> None:
     """
-    清理过期日志文件
+    清理过期日志文件（含 AI 追踪文件的过期与总大小上限清理）
     
     Args:
         log_dir: 日志目录
@@ -242,3 +242,12 @@ def cleanup_old_logs(log_dir: str = "logs", retention_days: int = 7) -> None:
                     extra={"service": "system", "event": "log_cleanup_error"},
                     exc_info=e
                 )
+
+    from src.ai_trace import cleanup_ai_traces
+
+    removed = cleanup_ai_traces(str(log_path), retention_days)
+    if removed:
+        get_logger(__name__).info(
+            f"已删除 {removed} 个AI追踪文件",
+            extra={"service": "system", "event": "log_cleanup"}
+        )
@@ -16,6 +16,7 @@ from src.notifier.channels import (
     DingTalkNotifier
 )
 from src.notifier.config import config
+from src.notifier.routing import notification_routing_cache
 from src.storage import get_storage
 
 
@@ -673,84 +674,132 @@ def _notifier_build_overrides(channel: str, raw_config: Dict[str, Any]) -> Dict[
     return overrides
 
 
-def _notifier_load_user_targets(
-    self,
-    owner_id: str,
-    event_type: str,
-    channel: Optional[str] = None,
-    bound_task: Optional[str] = None,
-    bound_account: Optional[str] = None,
-    config_id: Optional[str] = None,
-) -> List[Dict[str, Any]]:
-    """加载用户生效的通知配置目标列表。"""
-    try:
-        storage = get_storage()
-        user_configs = storage.get_user_notification_configs(owner_id)
-    except Exception as exc:
-        logger.error(
-            "读取用户通知配置失败",
-            extra={"event": "user_notification_config_load_failed", "owner_id": owner_id},
-            exc_info=exc,
-        )
-        return []
-
-    normalized_channel = _notifier_normalize_text(channel)
-    normalized_bound_task = _notifier_normalize_text(bound_task) or _notifier_normalize_text(bound_account)
-    normalized_config_id = _notifier_normalize_text(config_id)
-    grouped: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
-
+def _notifier_compile_user_configs(self, user_configs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """把用户通知配置编译为路由条目（规范化开关、提取绑定任务、预构建渠道运行时配置）。"""
+    entries: List[Dict[str, Any]] = []
     for item in user_configs:
         item_channel = _notifier_normalize_text(item.get("channel_type"))
         if item_channel not in self.channels:
             continue
-        if normalized_channel and item_channel != normalized_channel:
+
+        item_config = item.get("config") if isinstance(item.get("config"), dict) else {}
+        config_id = _notifier_normalize_text(item.get("id"))
+        entries.append(
+            {
+                "channel": item_channel,
+                "config_id": config_id,
+                "is_enabled": _notifier_to_bool(item.get("is_enabled"), default=True),
+                "notify_on_recommend": _notifier_to_bool(item.get("notify_on_recommend"), default=True),
+                "notify_on_complete": _notifier_to_bool(item.get("notify_on_complete"), default=True),
+                "bound_task": _notifier_extract_bound_task(item_config),
+                "target": {
+                    "channel": item_channel,
+                    "display_name": self.channel_name_map.get(item_channel, item_channel),
+                    "target_name": _notifier_normalize_text(item.get("name")) or self.channel_name_map.get(item_channel, item_channel),
+                    "config_id": config_id,
+                    "overrides": _notifier_build_overrides(item_channel, item_config),
+                },
+            }
+        )
+    return entries
+
+
+def _notifier_select_targets(
+    entries: List[Dict[str, Any]],
+    event_type: str,
+    channel: str = "",
+    bound_task: str = "",
+    config_id: str = "",
+    require_enabled: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    按事件类型/渠道/绑定任务从路由条目中选出通知目标（绑定任务精确匹配优先于默认配置）。
+    指定 config_id 时默认不检查开关（测试通知），require_enabled=True 时仍要求配置开启且订阅该事件类型。
+    """
+    grouped: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+
+    for entry in entries:
+        item_channel = entry["channel"]
+        if channel and item_channel != channel:
             continue
-        if normalized_config_id and _notifier_normalize_text(item.get("id")) != normalized_config_id:
+        if config_id and entry["config_id"] != config_id:
             continue
 
-        if not normalized_config_id and not _notifier_to_bool(item.get("is_enabled"), default=True):
+        check_flags = require_enabled or not config_id
+        if check_flags and not entry["is_enabled"]:
             continue
-        if event_type == "product" and not normalized_config_id and not _notifier_to_bool(item.get("notify_on_recommend"), default=True):
+        if event_type == "product" and check_flags and not entry["notify_on_recommend"]:
             continue
-        if event_type == "task_completion" and not normalized_config_id and not _notifier_to_bool(item.get("notify_on_complete"), default=True):
+        if event_type == "task_completion" and check_flags and not entry["notify_on_complete"]:
             continue
 
-        item_config = item.get("config") if isinstance(item.get("config"), dict) else {}
-        item_bound_task = _notifier_extract_bound_task(item_config)
+        item_bound_task = entry["bound_task"]
         bucket = grouped.setdefault(item_channel, {"exact": [], "default": []})
 
-        if normalized_config_id:
-            bucket["exact"].append(item)
+        if config_id:
+            bucket["exact"].append(entry)
             continue
 
-        if normalized_bound_task:
-            if item_bound_task and item_bound_task == normalized_bound_task:
-                bucket["exact"].append(item)
+        if bound_task:
+            if item_bound_task and item_bound_task == bound_task:
+                bucket["exact"].append(entry)
             elif not item_bound_task:
-                bucket["default"].append(item)
+                bucket["default"].append(entry)
         else:
             if not item_bound_task:
-                bucket["default"].append(item)
+                bucket["default"].append(entry)
 
     targets: List[Dict[str, Any]] = []
-    for item_channel, bucket in grouped.items():
+    for bucket in grouped.values():
         selected = bucket["exact"] if bucket["exact"] else bucket["default"]
-        for item in selected:
-            item_config = item.get("config") if isinstance(item.get("config"), dict) else {}
-            target_name = _notifier_normalize_text(item.get("name")) or self.channel_name_map.get(item_channel, item_channel)
-            targets.append(
-                {
-                    "channel": item_channel,
-                    "display_name": self.channel_name_map.get(item_channel, item_channel),
-                    "target_name": target_name,
-                    "config_id": _notifier_normalize_text(item.get("id")),
-                    "overrides": _notifier_build_overrides(item_channel, item_config),
-                }
-            )
-
+        targets.extend(entry["target"] for entry in selected)
     return targets
 
 
+def _notifier_load_user_targets(
+    self,
+    owner_id: str,
+    event_type: str,
+    channel: Optional[str] = None,
+    bound_task: Optional[str] = None,
+    bound_account: Optional[str] = None,
+    config_id: Optional[str] = None,
+    require_enabled: bool = False,
+) -> List[Dict[str, Any]]:
+    """加载用户生效的通知配置目标列表（路由表按用户缓存，配置变更时失效）。"""
+    try:
+        routes = notification_routing_cache.get_routes(
+            owner_id,
+            lambda: _notifier_compile_user_configs(self, get_storage().get_user_notification_configs(owner_id)),
+        )
+    except Exception as exc:
+        logger.error(
+            "读取用户通知配置失败",
+            extra={"event": "user_notification_config_load_failed", "owner_id": owner_id},
+            exc_info=exc,
+        )
+        return []
+
+    normalized_channel = _notifier_normalize_text(channel)
+    normalized_bound_task = _notifier_normalize_text(bound_task) or _notifier_normalize_text(bound_account)
+    normalized_config_id = _notifier_normalize_text(config_id)
+
+    # 指定渠道/配置的请求（测试通知、单渠道发送）较少，直接筛选不做记忆
+    if normalized_channel or normalized_config_id:
+        return _notifier_select_targets(
+            routes.entries,
+            event_type,
+            channel=normalized_channel,
+            bound_task=normalized_bound_task,
+            config_id=normalized_config_id,
+            require_enabled=require_enabled,
+        )
+    return routes.targets_for(
+        (event_type, normalized_bound_task),
+        lambda: _notifier_select_targets(routes.entries, event_type, bound_task=normalized_bound_task),
+    )
+
+
 def _notifier_build_local_targets(self, channel: Optional[str] = None) -> List[Dict[str, Any]]:
     """构造本地模式下的通知目标列表。"""
     targets: List[Dict[str, Any]] = []
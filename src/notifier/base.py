@@ -2,11 +2,12 @@
 import json
 import re
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
 
 from src.utils import convert_goofish_link
 from src.notifier.config import config
+from src.notifier.http_client import http_request
 
 
 class BaseNotifier(ABC):
@@ -41,6 +42,36 @@ class BaseNotifier(ABC):
         """发送任务完成通知"""
         pass
 
+    async def send_product_digest_notification(self, items: List[Tuple[Dict[str, Any], str]]) -> bool:
+        """发送汇总商品通知（items 为 (商品, 推荐理由) 列表）；默认逐条发送，支持合并的渠道覆盖此方法"""
+        results = [await self.send_product_notification(product, reason) for product, reason in items]
+        return all(results)
+
+    def _format_digest_content(self, items: List[Tuple[Dict[str, Any], str]]) -> Tuple[str, str]:
+        """格式化汇总通知：每个商品一段（标题、价格、理由、链接）"""
+        sections = []
+        for index, (product, reason) in enumerate(items, start=1):
+            product_info = self._get_product_info(product)
+            actual_product = product_info["actual_product"]
+            ai_analysis = product_info["ai_analysis"] or {}
+            link = product_info["mobile_link"] if config["PCURL_TO_MOBILE"] else product_info["pc_link"]
+            item_reason = ai_analysis.get("reason") or reason or ""
+            sections.append(
+                f"{index}. {actual_product.get('商品标题', 'N/A')[:30]}\n"
+                f"价格: {actual_product.get('当前售价', 'N/A')}\n"
+                f"推荐理由: {item_reason[:60]}\n"
+                f"链接: {link}"
+            )
+        return f"🐟 新推荐 {len(items)} 件商品", "\n\n".join(sections)
+
+    async def _http_get(self, url: str, proxies: Optional[Dict[str, str]] = None, timeout: float = 10, **kwargs):
+        """通过共享连接池发送 GET 请求"""
+        return await http_request("GET", url, proxies=proxies, timeout=timeout, **kwargs)
+
+    async def _http_post(self, url: str, proxies: Optional[Dict[str, str]] = None, timeout: float = 10, **kwargs):
+        """通过共享连接池发送 POST 请求"""
+        return await http_request("POST", url, proxies=proxies, timeout=timeout, **kwargs)
+
     def _replace_placeholders(self, template_str: str, notification_title: str, message: str) -> str:
         """替换模板中的占位符"""
         if not template_str:
@@ -1,14 +1,23 @@
 import asyncio
 import json
-import requests
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+import httpx
 
 from src.notifier.base import BaseNotifier
 from src.notifier.config import config
 
+# 企业微信 access_token 缓存：(corp_id, secret) -> (token, 过期时间)
+_wecom_token_cache: Dict[Tuple[str, str], Tuple[str, float]] = {}
+_wecom_token_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+_WECOM_TOKEN_REFRESH_MARGIN_SECONDS = 300
+# 40014: access_token 无效；42001: access_token 已过期
+_WECOM_TOKEN_EXPIRED_ERRCODES = {40014, 42001}
+
 
 def _get_channel_proxies(enabled_key: str) -> Optional[Dict[str, str]]:
-    """按渠道构建requests代理配置，仅在该渠道代理开关开启时生效。"""
+    """按渠道构建代理配置，仅在该渠道代理开关开启时生效（共享客户端按代理地址复用）。"""
     proxy_url = config.get("PROXY_URL", "")
     if proxy_url and config.get(enabled_key, False):
         return {"http": proxy_url, "https": proxy_url}
@@ -81,19 +90,16 @@ class NtfyNotifier(BaseNotifier):
             test_title = "测试通知 - 闲鱼公开内容查看智能处理程序"
             test_message = "这是一个测试通知，用于验证ntfy配置是否正确。\n\n如果您收到这条消息，说明ntfy配置已经生效！"
             
-            await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: requests.post(
-                    config["NTFY_TOPIC_URL"],
-                    data=test_message.encode('utf-8'),
-                    headers={
-                        "Title": test_title.encode('utf-8'),
-                        "Priority": "urgent",
-                        "Tags": "bell,vibration"
-                    },
-                    timeout=10,
-                    proxies=proxies
-                )
+            await self._http_post(
+                config["NTFY_TOPIC_URL"],
+                content=test_message.encode('utf-8'),
+                headers={
+                    "Title": test_title.encode('utf-8'),
+                    "Priority": "urgent",
+                    "Tags": "bell,vibration"
+                },
+                timeout=10,
+                proxies=proxies
             )
             return True
         except Exception as e:
@@ -132,21 +138,42 @@ class NtfyNotifier(BaseNotifier):
             if main_image:
                 headers["Attach"] = main_image.encode('utf-8')
             
-            await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: requests.post(
-                    config["NTFY_TOPIC_URL"],
-                    data=message.encode('utf-8'),
-                    headers=headers,
-                    timeout=10,
-                    proxies=proxies
-                )
+            await self._http_post(
+                config["NTFY_TOPIC_URL"],
+                content=message.encode('utf-8'),
+                headers=headers,
+                timeout=10,
+                proxies=proxies
             )
             return True
         except Exception as e:
             print(f"   -> 发送 ntfy 通知失败: {e}")
             return False
     
+    async def send_product_digest_notification(self, items: List[Tuple[Dict[str, Any], str]]) -> bool:
+        if not config["NTFY_TOPIC_URL"] or not config["NTFY_ENABLED"]:
+            return False
+            
+        try:
+            proxies = _get_channel_proxies("PROXY_NTFY_ENABLED")
+            notification_title, message = self._format_digest_content(items)
+            
+            await self._http_post(
+                config["NTFY_TOPIC_URL"],
+                content=message.encode('utf-8'),
+                headers={
+                    "Title": notification_title.encode('utf-8'),
+                    "Priority": "urgent",
+                    "Tags": "bell,vibration"
+                },
+                timeout=10,
+                proxies=proxies
+            )
+            return True
+        except Exception as e:
+            print(f"   -> 发送 ntfy 汇总通知失败: {e}")
+            return False
+    
     async def send_task_start_notification(self, task_name: str, reason: str) -> bool:
         if not config["NTFY_TOPIC_URL"] or not config["NTFY_ENABLED"]:
             return False
@@ -156,19 +183,16 @@ class NtfyNotifier(BaseNotifier):
             notification_title = "🚀 任务开始"
             message = f"🤖咸鱼AI监控机器人启动 - 我开始了 '{task_name}' 任务 - {reason}"
             
-            await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: requests.post(
-                    config["NTFY_TOPIC_URL"],
-                    data=message.encode('utf-8'),
-                    headers={
-                        "Title": notification_title.encode('utf-8'),
-                        "Priority": "normal",
-                        "Tags": "rocket"
-                    },
-                    timeout=10,
-                    proxies=proxies
-                )
+            await self._http_post(
+                config["NTFY_TOPIC_URL"],
+                content=message.encode('utf-8'),
+                headers={
+                    "Title": notification_title.encode('utf-8'),
+                    "Priority": "normal",
+                    "Tags": "rocket"
+                },
+                timeout=10,
+                proxies=proxies
             )
             return True
         except Exception as e:
@@ -186,19 +210,16 @@ class NtfyNotifier(BaseNotifier):
             if processed_count > 0 or recommended_count > 0:
                 message += f"\n\n本次运行共处理了 {processed_count} 个新商品，其中 {recommended_count} 个被AI推荐。"
             
-            await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: requests.post(
-                    config["NTFY_TOPIC_URL"],
-                    data=message.encode('utf-8'),
-                    headers={
-                        "Title": notification_title.encode('utf-8'),
-                        "Priority": "normal",
-                        "Tags": "check-circle,white_check_mark"
-                    },
-                    timeout=10,
-                    proxies=proxies
-                )
+            await self._http_post(
+                config["NTFY_TOPIC_URL"],
+                content=message.encode('utf-8'),
+                headers={
+                    "Title": notification_title.encode('utf-8'),
+                    "Priority": "normal",
+                    "Tags": "check-circle,white_check_mark"
+                },
+                timeout=10,
+                proxies=proxies
             )
             return True
         except Exception as e:
@@ -229,14 +250,11 @@ class GotifyNotifier(BaseNotifier):
             
             gotify_url_with_token = f"{config['GOTIFY_URL']}/message?token={config['GOTIFY_TOKEN']}"
             
-            await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: requests.post(
-                    gotify_url_with_token,
-                    files=payload,
-                    timeout=10,
-                    proxies=proxies
-                )
+            await self._http_post(
+                gotify_url_with_token,
+                files=payload,
+                timeout=10,
+                proxies=proxies
             )
             return True
         except Exception as e:
@@ -269,14 +287,11 @@ class GotifyNotifier(BaseNotifier):
             
             gotify_url_with_token = f"{config['GOTIFY_URL']}/message?token={config['GOTIFY_TOKEN']}"
             
-            await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: requests.post(
-                    gotify_url_with_token,
-                    files=payload,
-                    timeout=10,
-                    proxies=proxies
-                )
+            await self._http_post(
+                gotify_url_with_token,
+                files=payload,
+                timeout=10,
+                proxies=proxies
             )
             return True
         except Exception as e:
@@ -300,14 +315,11 @@ class GotifyNotifier(BaseNotifier):
             
             gotify_url_with_token = f"{config['GOTIFY_URL']}/message?token={config['GOTIFY_TOKEN']}"
             
-            await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: requests.post(
-                    gotify_url_with_token,
-                    files=payload,
-                    timeout=10,
-                    proxies=proxies
-                )
+            await self._http_post(
+                gotify_url_with_token,
+                files=payload,
+                timeout=10,
+                proxies=proxies
             )
             return True
         except Exception as e:
@@ -333,14 +345,11 @@ class GotifyNotifier(BaseNotifier):
             
             gotify_url_with_token = f"{config['GOTIFY_URL']}/message?token={config['GOTIFY_TOKEN']}"
             
-            await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: requests.post(
-                    gotify_url_with_token,
-                    files=payload,
-                    timeout=10,
-                    proxies=proxies
-                )
+            await self._http_post(
+                gotify_url_with_token,
+                files=payload,
+                timeout=10,
+                proxies=proxies
             )
             return True
         except Exception as e:
@@ -372,15 +381,12 @@ class BarkNotifier(BaseNotifier):
             
             headers = { "Content-Type": "application/json; charset=utf-8" }
             
-            await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: requests.post(
-                    config["BARK_URL"],
-                    json=bark_payload,
-                    headers=headers,
-                    timeout=10,
-                    proxies=proxies
-                )
+            await self._http_post(
+                config["BARK_URL"],
+                json=bark_payload,
+                headers=headers,
+                timeout=10,
+                proxies=proxies
             )
             return True
         except Exception as e:
@@ -422,15 +428,12 @@ class BarkNotifier(BaseNotifier):
             
             headers = { "Content-Type": "application/json; charset=utf-8" }
             
-            await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: requests.post(
-                    config["BARK_URL"],
-                    json=bark_payload,
-                    headers=headers,
-                    timeout=10,
-                    proxies=proxies
-                )
+            await self._http_post(
+                config["BARK_URL"],
+                json=bark_payload,
+                headers=headers,
+                timeout=10,
+                proxies=proxies
             )
             return True
         except Exception as e:
@@ -454,15 +457,12 @@ class BarkNotifier(BaseNotifier):
             
             headers = {"Content-Type": "application/json; charset=utf-8"}
             
-            await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: requests.post(
-                    config["BARK_URL"],
-                    json=bark_payload,
-                    headers=headers,
-                    timeout=10,
-                    proxies=proxies
-                )
+            await self._http_post(
+                config["BARK_URL"],
+                json=bark_payload,
+                headers=headers,
+                timeout=10,
+                proxies=proxies
             )
             return True
         except Exception as e:
@@ -488,15 +488,12 @@ class BarkNotifier(BaseNotifier):
             
             headers = {"Content-Type": "application/json; charset=utf-8"}
             
-            await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: requests.post(
-                    config["BARK_URL"],
-                    json=bark_payload,
-                    headers=headers,
-                    timeout=10,
-                    proxies=proxies
-                )
+            await self._http_post(
+                config["BARK_URL"],
+                json=bark_payload,
+                headers=headers,
+                timeout=10,
+                proxies=proxies
             )
             return True
         except Exception as e:
@@ -535,15 +532,12 @@ class WeChatBotNotifier(BaseNotifier):
             
             headers = { "Content-Type": "application/json" }
             
-            response = await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: requests.post(
-                    wx_bot_url,
-                    json=payload,
-                    headers=headers,
-                    timeout=10,
-                    proxies=proxies
-                )
+            response = await self._http_post(
+                wx_bot_url,
+                json=payload,
+                headers=headers,
+                timeout=10,
+                proxies=proxies
             )
             
             # 检查响应状态
@@ -584,15 +578,12 @@ class WeChatBotNotifier(BaseNotifier):
                 }
             }
             
-            response = await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: requests.post(
-                    wx_bot_url,
-                    json=text_payload,
-                    headers=headers,
-                    timeout=10,
-                    proxies=proxies
-                )
+            response = await self._http_post(
+                wx_bot_url,
+                json=text_payload,
+                headers=headers,
+                timeout=10,
+                proxies=proxies
             )
             
             # 检查文字消息发送状态
@@ -627,15 +618,12 @@ class WeChatBotNotifier(BaseNotifier):
                         }
                     }
                     
-                    img_response = await asyncio.get_running_loop().run_in_executor(
-                        None,
-                        lambda: requests.post(
-                            wx_bot_url,
-                            json=news_payload,
-                            headers=headers,
-                            timeout=10,
-                            proxies=proxies
-                        )
+                    img_response = await self._http_post(
+                        wx_bot_url,
+                        json=news_payload,
+                        headers=headers,
+                        timeout=10,
+                        proxies=proxies
                     )
                     
                     img_response.raise_for_status()
@@ -653,6 +641,45 @@ class WeChatBotNotifier(BaseNotifier):
             print(f"   -> 发送企业微信机器人通知失败: {e}")
             return False
     
+    async def send_product_digest_notification(self, items: List[Tuple[Dict[str, Any], str]]) -> bool:
+        # 直接从环境变量获取最新配置，避免单例模式的缓存问题
+        from src.config import WX_BOT_URL, get_bool_env_value
+        wx_bot_url = WX_BOT_URL()
+        wx_bot_enabled = get_bool_env_value("WX_BOT_ENABLED", False)
+        
+        if not wx_bot_url or not wx_bot_enabled:
+            return False
+        try:
+            proxies = _get_channel_proxies("PROXY_WX_BOT_ENABLED")
+            notification_title, message = self._format_digest_content(items)
+            
+            payload = {
+                "msgtype": "text",
+                "text": {
+                    "content": f"{notification_title}\n\n{message}"
+                }
+            }
+            
+            response = await self._http_post(
+                wx_bot_url,
+                json=payload,
+                headers={"Content-Type": "application/json"},
+                timeout=10,
+                proxies=proxies
+            )
+            
+            response.raise_for_status()
+            result = response.json()
+            
+            if result.get("errcode") != 0:
+                print(f"   -> 发送企业微信机器人汇总通知失败: {result.get('errmsg', '未知错误')}")
+                return False
+                
+            return True
+        except Exception as e:
+            print(f"   -> 发送企业微信机器人汇总通知失败: {e}")
+            return False
+    
     async def send_task_start_notification(self, task_name: str, reason: str) -> bool:
         # 直接从环境变量获取最新配置，避免单例模式的缓存问题
         from src.config import WX_BOT_URL, get_bool_env_value
@@ -675,15 +702,12 @@ class WeChatBotNotifier(BaseNotifier):
             
             headers = {"Content-Type": "application/json"}
             
-            response = await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: requests.post(
-                    wx_bot_url,
-                    json=payload,
-                    headers=headers,
-                    timeout=10,
-                    proxies=proxies
-                )
+            response = await self._http_post(
+                wx_bot_url,
+                json=payload,
+                headers=headers,
+                timeout=10,
+                proxies=proxies
             )
             
             # 检查响应状态
@@ -723,15 +747,12 @@ class WeChatBotNotifier(BaseNotifier):
             
             headers = {"Content-Type": "application/json"}
             
-            response = await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: requests.post(
-                    wx_bot_url,
-                    json=payload,
-                    headers=headers,
-                    timeout=10,
-                    proxies=proxies
-                )
+            response = await self._http_post(
+                wx_bot_url,
+                json=payload,
+                headers=headers,
+                timeout=10,
+                proxies=proxies
             )
             
             # 检查响应状态
@@ -784,7 +805,7 @@ class WeChatAppNotifier(BaseNotifier):
             
         try:
             # 获取访问令牌
-            access_token = self._get_wecom_access_token()
+            access_token = await self._get_wecom_access_token()
             if not access_token:
                 return False
             
@@ -853,10 +874,7 @@ AI推荐商品，查看详情了解更多...
                 "duplicate_check_interval": 60
             }
             
-            await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: self._send_wechat_request(access_token, message_data)
-            )
+            await self._send_wechat_request(access_token, message_data)
             return True
         except Exception as e:
             print(f"   -> 发送企业微信应用通知失败: {e}")
@@ -866,7 +884,7 @@ AI推荐商品，查看详情了解更多...
         if not config["WX_CORP_ID"] or not config["WX_AGENT_ID"] or not config["WX_SECRET"] or not config["WX_APP_ENABLED"]:
             return False
         try:
-            access_token = self._get_wecom_access_token()
+            access_token = await self._get_wecom_access_token()
             if not access_token:
                 return False
             
@@ -883,10 +901,7 @@ AI推荐商品，查看详情了解更多...
                 "duplicate_check_interval": 60
             }
             
-            await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: self._send_wechat_request(access_token, message_data)
-            )
+            await self._send_wechat_request(access_token, message_data)
             return True
         except Exception as e:
             print(f"   -> 发送企业微信应用任务开始通知失败: {e}")
@@ -896,7 +911,7 @@ AI推荐商品，查看详情了解更多...
         if not config["WX_CORP_ID"] or not config["WX_AGENT_ID"] or not config["WX_SECRET"] or not config["WX_APP_ENABLED"]:
             return False
         try:
-            access_token = self._get_wecom_access_token()
+            access_token = await self._get_wecom_access_token()
             if not access_token:
                 return False
             
@@ -915,72 +930,93 @@ AI推荐商品，查看详情了解更多...
                 "duplicate_check_interval": 60
             }
             
-            await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: self._send_wechat_request(access_token, message_data)
-            )
+            await self._send_wechat_request(access_token, message_data)
             return True
         except Exception as e:
             print(f"   -> 发送企业微信应用任务完成通知失败: {e}")
             return False
     
-    def _get_wecom_access_token(self) -> Optional[str]:
+    async def _get_wecom_access_token(self, stale_token: Optional[str] = None) -> Optional[str]:
         """
         获取企业微信API访问令牌
         
+        令牌按 (corp_id, secret) 缓存到过期前，并发请求只会触发一次 gettoken。
+        stale_token 为被接口判定失效的令牌，缓存中仍是它时强制刷新。
+        
         Returns:
             Optional[str]: 成功时返回访问令牌，失败返回None
         """
         if not all([config["WX_CORP_ID"], config["WX_SECRET"]]):
             print("错误：未在 .env 文件中完整设置 WX_CORP_ID 和 WX_SECRET")
             return None
-            
-        url = f"https://qyapi.weixin.qq.com/cgi-bin/gettoken?corpid={config['WX_CORP_ID']}&corpsecret={config['WX_SECRET']}"
         
-        try:
-            proxies = _get_channel_proxies("PROXY_WX_APP_ENABLED")
-            response = requests.get(url, proxies=proxies, timeout=15)
-            response.raise_for_status()
-            result = response.json()
-            
-            if result.get("errcode") != 0:
-                print(f"获取企业微信访问令牌失败: {result.get('errmsg', '未知错误')}")
-                return None
+        cache_key = (str(config["WX_CORP_ID"]), str(config["WX_SECRET"]))
+        cached = _wecom_token_cache.get(cache_key)
+        if cached and cached[0] != stale_token and cached[1] > time.monotonic():
+            return cached[0]
+        
+        lock = _wecom_token_locks.setdefault(cache_key, asyncio.Lock())
+        async with lock:
+            # 等锁期间可能已被其他请求刷新
+            cached = _wecom_token_cache.get(cache_key)
+            if cached and cached[0] != stale_token and cached[1] > time.monotonic():
+                return cached[0]
+            
+            url = f"https://qyapi.weixin.qq.com/cgi-bin/gettoken?corpid={config['WX_CORP_ID']}&corpsecret={config['WX_SECRET']}"
+            
+            try:
+                proxies = _get_channel_proxies("PROXY_WX_APP_ENABLED")
+                response = await self._http_get(url, proxies=proxies, timeout=15)
+                response.raise_for_status()
+                result = response.json()
                 
-            return result["access_token"]
-            
-        except requests.exceptions.RequestException as e:
-            print(f"请求企业微信API时发生错误: {e}")
-            return None
+                if result.get("errcode") != 0:
+                    print(f"获取企业微信访问令牌失败: {result.get('errmsg', '未知错误')}")
+                    return None
+                
+                access_token = result["access_token"]
+                expires_in = int(result.get("expires_in") or 7200)
+                _wecom_token_cache[cache_key] = (
+                    access_token,
+                    time.monotonic() + max(60, expires_in - _WECOM_TOKEN_REFRESH_MARGIN_SECONDS),
+                )
+                return access_token
+                
+            except httpx.HTTPError as e:
+                print(f"请求企业微信API时发生错误: {e}")
+                return None
     
-    def _send_wechat_request(self, access_token: str, message_data: dict) -> bool:
+    async def _send_wechat_request(self, access_token: str, message_data: dict) -> bool:
         """
-        发送企业微信API请求
+        发送企业微信API请求（令牌过期时刷新后重试一次）
         
         Returns:
             bool: 成功返回True，失败返回False
         """
-        url = f"https://qyapi.weixin.qq.com/cgi-bin/message/send?access_token={access_token}"
-        
         try:
             proxies = _get_channel_proxies("PROXY_WX_APP_ENABLED")
-            response = requests.post(
-                url,
-                data=json.dumps(message_data, ensure_ascii=False).encode('utf-8'),
-                proxies=proxies,
-                timeout=15
-            )
-            response.raise_for_status()
-            result = response.json()
-            
-            if result.get("errcode") != 0:
-                print(f"发送微信图文通知失败: {result.get('errmsg', '未知错误')}")
-                return False
+            payload = json.dumps(message_data, ensure_ascii=False).encode('utf-8')
+            for attempt in range(2):
+                url = f"https://qyapi.weixin.qq.com/cgi-bin/message/send?access_token={access_token}"
+                response = await self._http_post(url, content=payload, proxies=proxies, timeout=15)
+                response.raise_for_status()
+                result = response.json()
                 
-            print(f"微信图文通知已发送")
-            return True
+                if attempt == 0 and result.get("errcode") in _WECOM_TOKEN_EXPIRED_ERRCODES:
+                    access_token = await self._get_wecom_access_token(stale_token=access_token)
+                    if not access_token:
+                        return False
+                    continue
+                
+                if result.get("errcode") != 0:
+                    print(f"发送微信图文通知失败: {result.get('errmsg', '未知错误')}")
+                    return False
+                
+                print(f"微信图文通知已发送")
+                return True
+            return False
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"发送微信图文通知时发生错误: {e}")
             return False
 
@@ -1014,15 +1050,12 @@ class TelegramNotifier(BaseNotifier):
             
             headers = {"Content-Type": "application/json"}
             
-            await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: requests.post(
-                    telegram_api_url,
-                    json=telegram_payload,
-                    headers=headers,
-                    timeout=10,
-                    proxies=proxies
-                )
+            await self._http_post(
+                telegram_api_url,
+                json=telegram_payload,
+                headers=headers,
+                timeout=10,
+                proxies=proxies
             )
             return True
         except Exception as e:
@@ -1083,15 +1116,12 @@ class TelegramNotifier(BaseNotifier):
                 
                 headers = {"Content-Type": "application/json"}
                 
-                await asyncio.get_running_loop().run_in_executor(
-                    None,
-                    lambda: requests.post(
-                        telegram_api_url,
-                        json=telegram_payload,
-                        headers=headers,
-                        timeout=10,
-                        proxies=proxies
-                    )
+                await self._http_post(
+                    telegram_api_url,
+                    json=telegram_payload,
+                    headers=headers,
+                    timeout=10,
+                    proxies=proxies
                 )
             else:
                 # 如果没有商品图片，回退到原来的文本消息格式
@@ -1111,15 +1141,12 @@ class TelegramNotifier(BaseNotifier):
                     "disable_web_page_preview": False
                 }
                 
-                await asyncio.get_running_loop().run_in_executor(
-                    None,
-                    lambda: requests.post(
-                        f"https://api.telegram.org/bot{config['TELEGRAM_BOT_TOKEN']}/sendMessage",
-                        json=telegram_payload,
-                        headers=headers,
-                        timeout=10,
-                        proxies=proxies
-                    )
+                await self._http_post(
+                    f"https://api.telegram.org/bot{config['TELEGRAM_BOT_TOKEN']}/sendMessage",
+                    json=telegram_payload,
+                    headers=headers,
+                    timeout=10,
+                    proxies=proxies
                 )
             
             return True
@@ -1145,15 +1172,12 @@ class TelegramNotifier(BaseNotifier):
             
             headers = {"Content-Type": "application/json"}
             
-            await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: requests.post(
-                    telegram_api_url,
-                    json=telegram_payload,
-                    headers=headers,
-                    timeout=10,
-                    proxies=proxies
-                )
+            await self._http_post(
+                telegram_api_url,
+                json=telegram_payload,
+                headers=headers,
+                timeout=10,
+                proxies=proxies
             )
             return True
         except Exception as e:
@@ -1180,15 +1204,12 @@ class TelegramNotifier(BaseNotifier):
             
             headers = {"Content-Type": "application/json"}
             
-            await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: requests.post(
-                    telegram_api_url,
-                    json=telegram_payload,
-                    headers=headers,
-                    timeout=10,
-                    proxies=proxies
-                )
+            await self._http_post(
+                telegram_api_url,
+                json=telegram_payload,
+                headers=headers,
+                timeout=10,
+                proxies=proxies
             )
             return True
         except Exception as e:
@@ -1210,10 +1231,7 @@ class WebhookNotifier(BaseNotifier):
             test_title = "测试通知 - 闲鱼公开内容查看智能处理程序"
             test_message = "这是一个测试通知，用于验证Webhook配置是否正确。\n\n如果您收到这条消息，说明配置已经生效！"
             
-            await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: self._send_webhook_request(test_title, test_message)
-            )
+            await self._send_webhook_request(test_title, test_message)
             return True
         except Exception as e:
             print(f"   -> 发送 Webhook 测试通知失败: {e}")
@@ -1227,10 +1245,7 @@ class WebhookNotifier(BaseNotifier):
             product_info = self._get_product_info(product)
             notification_title, message = self._format_notification_content(product_info, reason)
             
-            await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: self._send_webhook_request(notification_title, message)
-            )
+            await self._send_webhook_request(notification_title, message)
             return True
         except Exception as e:
             print(f"   -> 发送 Webhook 通知失败: {e}")
@@ -1243,10 +1258,7 @@ class WebhookNotifier(BaseNotifier):
             notification_title = "🚀 任务开始"
             message = f"🤖咸鱼AI监控机器人启动 - 我开始了 '{task_name}' 任务 - {reason}"
             
-            await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: self._send_webhook_request(notification_title, message)
-            )
+            await self._send_webhook_request(notification_title, message)
             return True
         except Exception as e:
             print(f"   -> 发送 Webhook 任务开始通知失败: {e}")
@@ -1261,16 +1273,13 @@ class WebhookNotifier(BaseNotifier):
             if processed_count > 0 or recommended_count > 0:
                 message += f"\n\n本次运行共处理了 {processed_count} 个新商品，其中 {recommended_count} 个被AI推荐。"
             
-            await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: self._send_webhook_request(notification_title, message)
-            )
+            await self._send_webhook_request(notification_title, message)
             return True
         except Exception as e:
             print(f"   -> 发送 Webhook 任务完成通知失败: {e}")
             return False
     
-    def _send_webhook_request(self, title: str, content: str) -> None:
+    async def _send_webhook_request(self, title: str, content: str) -> None:
         """发送Webhook请求"""
         from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
         
@@ -1292,7 +1301,7 @@ class WebhookNotifier(BaseNotifier):
                 except json.JSONDecodeError:
                     print(f"   -> [警告] Webhook 查询参数格式错误，请检查 .env 中的 WEBHOOK_QUERY_PARAMETERS。")
             
-            requests.get(final_url, headers=headers, timeout=15, proxies=proxies)
+            await self._http_get(final_url, headers=headers, timeout=15, proxies=proxies)
         
         elif config["WEBHOOK_METHOD"] == "POST":
             data = None
@@ -1314,7 +1323,7 @@ class WebhookNotifier(BaseNotifier):
                 except json.JSONDecodeError:
                     print(f"   -> [警告] Webhook 请求体格式错误，请检查 .env 中的 WEBHOOK_BODY。")
             
-            requests.post(
+            await self._http_post(
                 final_url,
                 headers=headers,
                 json=json_payload,
@@ -1379,15 +1388,12 @@ class DingTalkNotifier(BaseNotifier):
             headers = {"Content-Type": "application/json; charset=utf-8"}
             url = self._get_signed_url()
             
-            response = await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: requests.post(
-                    url,
-                    json=payload,
-                    headers=headers,
-                    timeout=10,
-                    proxies=proxies
-                )
+            response = await self._http_post(
+                url,
+                json=payload,
+                headers=headers,
+                timeout=10,
+                proxies=proxies
             )
             
             result = response.json()
@@ -1448,15 +1454,12 @@ class DingTalkNotifier(BaseNotifier):
             headers = {"Content-Type": "application/json; charset=utf-8"}
             url = self._get_signed_url()
             
-            response = await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: requests.post(
-                    url,
-                    json=payload,
-                    headers=headers,
-                    timeout=10,
-                    proxies=proxies
-                )
+            response = await self._http_post(
+                url,
+                json=payload,
+                headers=headers,
+                timeout=10,
+                proxies=proxies
             )
             
             result = response.json()
@@ -1490,15 +1493,12 @@ class DingTalkNotifier(BaseNotifier):
             headers = {"Content-Type": "application/json; charset=utf-8"}
             url = self._get_signed_url()
             
-            response = await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: requests.post(
-                    url,
-                    json=payload,
-                    headers=headers,
-                    timeout=10,
-                    proxies=proxies
-                )
+            response = await self._http_post(
+                url,
+                json=payload,
+                headers=headers,
+                timeout=10,
+                proxies=proxies
             )
             
             result = response.json()
@@ -1534,15 +1534,12 @@ class DingTalkNotifier(BaseNotifier):
             headers = {"Content-Type": "application/json; charset=utf-8"}
             url = self._get_signed_url()
             
-            response = await asyncio.get_running_loop().run_in_executor(
-                None,
-                lambda: requests.post(
-                    url,
-                    json=payload,
-                    headers=headers,
-                    timeout=10,
-                    proxies=proxies
-                )
+            response = await self._http_post(
+                url,
+                json=payload,
+                headers=headers,
+                timeout=10,
+                proxies=proxies
             )
             
             result = response.json()
@@ -0,0 +1,69 @@
+"""
+通知渠道共享 HTTP 客户端
+
+所有渠道复用长连接的 httpx.AsyncClient（按代理地址区分，每个目标主机各自维护 keep-alive 连接），
+避免每条通知都重新进行 DNS 解析、TCP 与 TLS 握手。客户端绑定到创建它的事件循环。
+"""
+
+import asyncio
+from typing import Dict, Optional
+
+import httpx
+
+from src.config import NOTIFIER_HTTP_KEEPALIVE_SECONDS, NOTIFIER_HTTP_MAX_CONNECTIONS
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+_clients_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _proxy_url(proxies: Optional[Dict[str, str]]) -> str:
+    if not proxies:
+        return ""
+    return proxies.get("https") or proxies.get("http") or ""
+
+
+def get_http_client(proxies: Optional[Dict[str, str]] = None) -> httpx.AsyncClient:
+    """获取当前事件循环内与代理配置对应的共享客户端（proxies 为 _get_channel_proxies 的返回值）。"""
+    global _clients_loop
+    loop = asyncio.get_running_loop()
+    if _clients_loop is not loop:
+        _clients.clear()
+        _clients_loop = loop
+
+    proxy_url = _proxy_url(proxies)
+    client = _clients.get(proxy_url)
+    if client is None or client.is_closed:
+        max_connections = NOTIFIER_HTTP_MAX_CONNECTIONS()
+        client = httpx.AsyncClient(
+            proxy=proxy_url or None,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=NOTIFIER_HTTP_KEEPALIVE_SECONDS(),
+            ),
+        )
+        _clients[proxy_url] = client
+    return client
+
+
+async def http_request(
+    method: str,
+    url: str,
+    proxies: Optional[Dict[str, str]] = None,
+    timeout: float = 10,
+    **kwargs,
+) -> httpx.Response:
+    """通过共享客户端发送请求。"""
+    client = get_http_client(proxies)
+    return await client.request(method, url, timeout=timeout, **kwargs)
+
+
+async def close_http_clients() -> None:
+    """关闭当前事件循环内的共享客户端（应用退出时调用）。"""
+    global _clients_loop
+    clients = list(_clients.values())
+    _clients.clear()
+    _clients_loop = None
+    for client in clients:
+        await client.aclose()
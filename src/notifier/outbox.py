@@ -0,0 +1,408 @@
+"""
+通知发件箱
+
+采集流程只把推荐商品通知写入发件箱（每个通知目标一行，只记录渠道与配置ID，不落地密钥）后立即返回，
+抓取速度不再受通知渠道耗时影响。后台派发器领取到期事件，按渠道限制并发发送，
+失败按指数退避重试，超过最大次数标记为 dead（保留 NOTIFICATION_OUTBOX_DEAD_RETENTION_DAYS 天后清理）；支持汇总的渠道把收集窗口内的多个商品合并为一条消息。
+采集进程与 Web 进程各运行一个派发器，领取时加租约，同一事件不会被重复发送。
+"""
+
+import asyncio
+import math
+import random
+import time
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.config import (
+    NOTIFICATION_CHANNEL_CONCURRENCY,
+    NOTIFICATION_DIGEST_CHANNELS,
+    NOTIFICATION_DIGEST_SIZE,
+    NOTIFICATION_DIGEST_WINDOW_SECONDS,
+    NOTIFICATION_OUTBOX_DEAD_RETENTION_DAYS,
+    NOTIFICATION_OUTBOX_ENABLED,
+    NOTIFICATION_OUTBOX_MAX_ATTEMPTS,
+    NOTIFICATION_OUTBOX_RETRY_BASE_SECONDS,
+)
+from src.logging_config import get_logger
+from src.notifier import (
+    _notifier_build_local_targets,
+    _notifier_dispatch_targets,
+    _notifier_is_postgres_mode,
+    _notifier_load_user_targets,
+    _notifier_resolve_bound_task,
+    _notifier_resolve_owner_id,
+    notifier,
+)
+from src.notifier.config import config
+from src.storage.async_storage import get_async_storage, run_storage_call
+
+logger = get_logger(__name__, service="notifier")
+
+CLAIM_BATCH_SIZE = 50
+LEASE_SECONDS = 300
+POLL_INTERVAL_SECONDS = 5.0
+MAX_RETRY_DELAY_SECONDS = 1800
+PURGE_INTERVAL_SECONDS = 3600
+
+
+def _local_enabled_channels() -> Set[str]:
+    """本地模式下已配置且开启的渠道（会重新加载通知配置）。"""
+    return {
+        channel for channel in notifier.list_configured_channels()
+        if config.get(f"{channel.upper()}_ENABLED")
+    }
+
+
+def _resolve_product_targets(owner_id: Optional[str], bound_task: Optional[str]) -> List[Dict[str, Any]]:
+    if _notifier_is_postgres_mode():
+        if not owner_id:
+            logger.warning("多用户模式写入商品通知缺少owner_id", extra={"event": "notification_owner_missing"})
+            return []
+        return _notifier_load_user_targets(notifier, owner_id, event_type="product", bound_task=bound_task)
+
+    enabled_channels = _local_enabled_channels()
+    return [target for target in _notifier_build_local_targets(notifier) if target["channel"] in enabled_channels]
+
+
+def _digest_enabled(channel: str) -> bool:
+    return NOTIFICATION_DIGEST_SIZE() > 1 and channel in NOTIFICATION_DIGEST_CHANNELS()
+
+
+def _first_attempt_at(channel: str, now: datetime) -> datetime:
+    """汇总渠道的事件对齐到收集窗口结束时刻，同一窗口内的商品一起被领取。"""
+    if not _digest_enabled(channel):
+        return now
+    window = NOTIFICATION_DIGEST_WINDOW_SECONDS()
+    return datetime.fromtimestamp(math.ceil(now.timestamp() / window) * window, tz=timezone.utc)
+
+
+def _retry_delay_seconds(attempts: int) -> float:
+    """第 attempts 次失败后的退避时间（带 ±25% 抖动，避免同时重试）。"""
+    delay = min(MAX_RETRY_DELAY_SECONDS, NOTIFICATION_OUTBOX_RETRY_BASE_SECONDS() * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.75, 1.25)
+
+
+def _build_product_events(
+    product: Dict[str, Any],
+    reason: str,
+    owner_id: Optional[str],
+    bound_task: Optional[str],
+) -> List[Dict[str, Any]]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "owner_id": owner_id,
+            "task_name": bound_task,
+            "event_type": "product",
+            "channel": target["channel"],
+            "config_id": target.get("config_id") or None,
+            "payload": {"product": product, "reason": reason},
+            "next_attempt_at": _first_attempt_at(target["channel"], now),
+        }
+        for target in _resolve_product_targets(owner_id, bound_task)
+    ]
+
+
+async def submit_product_notification(
+    product: Dict[str, Any],
+    reason: str,
+    owner_id: Optional[str] = None,
+    bound_task: Optional[str] = None,
+    bound_account: Optional[str] = None,
+) -> int:
+    """
+    提交商品推荐通知：写入发件箱并唤醒派发器，返回写入的事件数。
+    发件箱关闭或写入失败时退回直接发送（返回 0）。
+    """
+    resolved_owner = _notifier_resolve_owner_id(owner_id)
+    resolved_task = _notifier_resolve_bound_task(bound_task, bound_account)
+    if NOTIFICATION_OUTBOX_ENABLED():
+        try:
+            events = await run_storage_call(_build_product_events, product, reason, resolved_owner, resolved_task)
+            count = await get_async_storage().enqueue_notifications(events)
+            dispatcher = _current_dispatcher()
+            if dispatcher is not None:
+                dispatcher.wake()
+            return count
+        except Exception as exc:
+            logger.error(
+                "写入通知发件箱失败，改为直接发送",
+                extra={"event": "notification_outbox_enqueue_failed", "task_name": resolved_task},
+                exc_info=exc,
+            )
+
+    await notifier.send_product_notification(
+        product,
+        reason,
+        owner_id=resolved_owner,
+        bound_task=resolved_task,
+    )
+    return 0
+
+
+class NotificationDispatcher:
+    """发件箱派发器：领取到期事件，按渠道限流发送，失败退避重试。"""
+
+    def __init__(self, owner_id: Optional[str] = None):
+        # 采集进程只派发本用户的事件；Web 进程不过滤，兜底派发所有遗留事件
+        self.owner_id = owner_id
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._wake_event = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._local_channels: Set[str] = set()
+        self._last_purge_at = 0.0
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    def wake(self) -> None:
+        self._wake_event.set()
+
+    async def stop(self, timeout: float = 0) -> None:
+        """停止后台循环；timeout > 0 时等待正在发送的批次完成，超时再取消。"""
+        self._stopping = True
+        self._wake_event.set()
+        task, self._task = self._task, None
+        if task is None:
+            return
+        if timeout > 0:
+            await asyncio.wait({task}, timeout=timeout)
+        if not task.done():
+            task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+    async def drain(self, timeout: float) -> bool:
+        """发送所有已到期事件（汇总窗口尚未结束的事件保留在发件箱），超时返回 False。"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return False
+                if await asyncio.wait_for(self.run_once(), timeout=remaining) == 0:
+                    return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _purge_dead_events(self) -> None:
+        """定期删除超过保留期的 dead 事件（每个派发器每小时最多一次）。"""
+        retention_days = NOTIFICATION_OUTBOX_DEAD_RETENTION_DAYS()
+        now = time.monotonic()
+        if retention_days <= 0 or (self._last_purge_at and now - self._last_purge_at < PURGE_INTERVAL_SECONDS):
+            return
+        self._last_purge_at = now
+        older_than = datetime.now(timezone.utc) - timedelta(days=retention_days)
+        try:
+            removed = await get_async_storage().purge_dead_notifications(older_than)
+        except Exception as exc:
+            logger.warning(
+                f"清理发件箱 dead 事件失败: {exc}",
+                extra={"event": "notification_outbox_purge_failed"},
+            )
+            return
+        if removed:
+            logger.info(
+                f"已清理 {removed} 条过期的发件箱 dead 事件",
+                extra={"event": "notification_outbox_purged", "count": removed},
+            )
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            await self._purge_dead_events()
+            try:
+                claimed = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.error(
+                    "通知发件箱派发失败",
+                    extra={"event": "notification_outbox_dispatch_failed"},
+                    exc_info=exc,
+                )
+                claimed = 0
+            if claimed:
+                continue
+            try:
+                await asyncio.wait_for(self._wake_event.wait(), timeout=POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake_event.clear()
+
+    async def run_once(self) -> int:
+        """领取一批到期事件并发送，返回领取数量。"""
+        events = await get_async_storage().claim_notifications(
+            CLAIM_BATCH_SIZE,
+            LEASE_SECONDS,
+            owner_id=self.owner_id,
+        )
+        if not events:
+            return 0
+        if not _notifier_is_postgres_mode():
+            self._local_channels = await run_storage_call(_local_enabled_channels)
+        await asyncio.gather(*[self._send_group(group) for group in self._group_events(events)])
+        return len(events)
+
+    def _group_events(self, events: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """汇总渠道按 (用户, 渠道, 配置) 合并商品事件，每组不超过 NOTIFICATION_DIGEST_SIZE 条；其余逐条发送。"""
+        digest_size = NOTIFICATION_DIGEST_SIZE()
+        groups: List[List[Dict[str, Any]]] = []
+        digests: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+        for event in events:
+            if event.get("event_type") == "product" and _digest_enabled(event["channel"]):
+                key = (str(event.get("owner_id") or ""), event["channel"], str(event.get("config_id") or ""))
+                digests.setdefault(key, []).append(event)
+            else:
+                groups.append([event])
+        for items in digests.values():
+            groups.extend(items[i:i + digest_size] for i in range(0, len(items), digest_size))
+        return groups
+
+    def _resolve_target(self, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """按渠道/配置ID重新解析通知目标；配置已删除、已关闭或不再订阅该事件类型时返回 None。"""
+        channel = event["channel"]
+        if _notifier_is_postgres_mode():
+            owner_id = event.get("owner_id")
+            if not owner_id:
+                return None
+            targets = _notifier_load_user_targets(
+                notifier,
+                owner_id,
+                event_type=event["event_type"],
+                channel=channel,
+                config_id=event.get("config_id"),
+                # 入队后配置可能已关闭或取消订阅该事件类型
+                require_enabled=True,
+            )
+        elif channel in self._local_channels:
+            targets = _notifier_build_local_targets(notifier, channel=channel)
+        else:
+            targets = []
+        return targets[0] if targets else None
+
+    def _semaphore(self, channel: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(channel)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(NOTIFICATION_CHANNEL_CONCURRENCY())
+            self._semaphores[channel] = semaphore
+        return semaphore
+
+    async def _send_group(self, events: List[Dict[str, Any]]) -> None:
+        first = events[0]
+        event_ids = [event["id"] for event in events]
+        extra = {
+            "channel": first["channel"],
+            "config_id": first.get("config_id"),
+            "task_name": first.get("task_name"),
+            "count": len(events),
+        }
+        if first.get("event_type") != "product":
+            await self._fail(events, f"未知的通知事件类型: {first.get('event_type')}", retry=False)
+            return
+
+        async with self._semaphore(first["channel"]):
+            try:
+                target = await run_storage_call(self._resolve_target, first)
+                if target is None:
+                    # 通知配置已删除、已关闭或不再订阅该事件类型：直接丢弃
+                    await get_async_storage().complete_notifications(event_ids)
+                    logger.info("通知目标已失效，丢弃发件箱事件", extra={"event": "notification_outbox_target_gone", **extra})
+                    return
+
+                items = [(event["payload"].get("product") or {}, event["payload"].get("reason") or "") for event in events]
+                if len(items) > 1:
+                    result = await _notifier_dispatch_targets(notifier, [target], "send_product_digest_notification", items)
+                else:
+                    result = await _notifier_dispatch_targets(notifier, [target], "send_product_notification", *items[0])
+                success = bool(result) and all(result.values())
+                error = "" if success else "渠道返回发送失败"
+            except Exception as exc:
+                success = False
+                error = str(exc) or exc.__class__.__name__
+
+        if success:
+            await get_async_storage().complete_notifications(event_ids)
+            logger.debug("发件箱通知已送达", extra={"event": "notification_outbox_delivered", **extra})
+        else:
+            await self._fail(events, error)
+
+    async def _fail(self, events: List[Dict[str, Any]], error: str, retry: bool = True) -> None:
+        storage = get_async_storage()
+        max_attempts = NOTIFICATION_OUTBOX_MAX_ATTEMPTS()
+        for event in events:
+            attempts = int(event.get("attempts") or 0) + 1
+            if retry and attempts < max_attempts:
+                next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=_retry_delay_seconds(attempts))
+            else:
+                next_attempt_at = None
+                logger.warning(
+                    f"通知发送多次失败，已放弃: {error}",
+                    extra={
+                        "event": "notification_outbox_dead",
+                        "channel": event["channel"],
+                        "config_id": event.get("config_id"),
+                        "task_name": event.get("task_name"),
+                        "attempts": attempts,
+                    },
+                )
+            await storage.retry_notification(event["id"], error, next_attempt_at)
+
+
+_dispatcher: Optional[NotificationDispatcher] = None
+_dispatcher_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _current_dispatcher() -> Optional[NotificationDispatcher]:
+    if _dispatcher is not None and _dispatcher_loop is asyncio.get_running_loop():
+        return _dispatcher
+    return None
+
+
+def start_notification_dispatcher(owner_id: Optional[str] = None) -> Optional[NotificationDispatcher]:
+    """在当前事件循环启动发件箱派发器（发件箱关闭时返回 None）。"""
+    global _dispatcher, _dispatcher_loop
+    if not NOTIFICATION_OUTBOX_ENABLED():
+        return None
+    dispatcher = _current_dispatcher()
+    if dispatcher is None:
+        dispatcher = NotificationDispatcher(owner_id=owner_id)
+        _dispatcher = dispatcher
+        _dispatcher_loop = asyncio.get_running_loop()
+    dispatcher.start()
+    return dispatcher
+
+
+async def stop_notification_dispatcher(drain_timeout: float = 0) -> None:
+    """停止当前事件循环的派发器；drain_timeout > 0 时先尽量发送完已到期事件。"""
+    global _dispatcher, _dispatcher_loop
+    dispatcher = _current_dispatcher()
+    if dispatcher is None:
+        return
+    if drain_timeout > 0:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + drain_timeout
+        try:
+            await dispatcher.stop(timeout=drain_timeout)
+            drained = await dispatcher.drain(max(0.0, deadline - loop.time()))
+        except Exception as exc:
+            drained = False
+            logger.error("发件箱发送收尾失败", extra={"event": "notification_outbox_drain_failed"}, exc_info=exc)
+        if not drained:
+            logger.warning(
+                "发件箱未在限定时间内发送完毕，剩余事件稍后由 Web 进程继续派发",
+                extra={"event": "notification_outbox_drain_timeout"},
+            )
+    await dispatcher.stop()
+    _dispatcher = None
+    _dispatcher_loop = None
+
+
+async def get_notification_outbox_stats() -> Dict[str, int]:
+    """发件箱各状态事件数量。"""
+    return await get_async_storage().get_notification_outbox_stats()
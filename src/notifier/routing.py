@@ -0,0 +1,95 @@
+"""
+通知路由表缓存
+
+多用户模式下每条通知都要读取并解密用户全部通知配置，再逐条规范化、筛选、分组。
+这里按 owner_id 缓存编译后的路由条目，并按 (事件类型, 绑定任务) 记忆最终的目标列表，
+发送通知只需一次字典查找。保存/删除通知配置后由存储层立即失效；
+采集子进程与 Web 进程不共享内存，由短 TTL（NOTIFICATION_ROUTING_CACHE_TTL_SECONDS）兜底。
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.config import NOTIFICATION_ROUTING_CACHE_TTL_SECONDS
+
+RouteKey = Tuple[str, str]
+
+
+class CompiledRoutes:
+    """单个用户编译后的路由条目，以及按 (事件类型, 绑定任务) 记忆的目标列表。"""
+
+    def __init__(self, entries: List[Dict[str, Any]], expires_at: float):
+        self.entries = entries
+        self.expires_at = expires_at
+        self._targets: Dict[RouteKey, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def targets_for(self, key: RouteKey, build: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        with self._lock:
+            targets = self._targets.get(key)
+        if targets is None:
+            targets = build()
+            with self._lock:
+                self._targets[key] = targets
+        return list(targets)
+
+
+class NotificationRoutingCache:
+    """按 owner_id 的路由表缓存，线程安全，带命中统计。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[str, CompiledRoutes] = {}
+        # 失效计数：编译期间发生失效时不写回缓存，避免存入旧配置
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get_routes(self, owner_id: str, compile_routes: Callable[[], List[Dict[str, Any]]]) -> CompiledRoutes:
+        """获取用户路由表，缺失或过期时调用 compile_routes 重新编译。"""
+        ttl = NOTIFICATION_ROUTING_CACHE_TTL_SECONDS()
+        key = str(owner_id)
+        with self._lock:
+            generation = self._generation
+            if ttl > 0:
+                routes = self._routes.get(key)
+                if routes is not None and routes.expires_at >= time.monotonic():
+                    self._hits += 1
+                    return routes
+                self._misses += 1
+
+        routes = CompiledRoutes(compile_routes(), time.monotonic() + ttl)
+        if ttl > 0:
+            with self._lock:
+                if generation == self._generation:
+                    self._routes[key] = routes
+        return routes
+
+    def invalidate(self, owner_id: Optional[str] = None) -> None:
+        """失效指定用户的路由表（None 表示全部）。"""
+        with self._lock:
+            self._generation += 1
+            if owner_id is None:
+                self._routes.clear()
+            else:
+                self._routes.pop(str(owner_id), None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "ttl_seconds": NOTIFICATION_ROUTING_CACHE_TTL_SECONDS(),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+                "cached_owners": len(self._routes),
+            }
+
+
+notification_routing_cache = NotificationRoutingCache()
+
+
+def invalidate_notification_routing(owner_id: Optional[str] = None) -> None:
+    """失效通知路由表缓存。"""
+    notification_routing_cache.invalidate(owner_id)
@@ -11,15 +11,169 @@ Version: 1.0.0
 Date: 2026-01-30
 """
 
+import hashlib
+import json
 import math
 import os
 import re
+import threading
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterable, Optional, List, Tuple
 from src.user_file_store import resolve_virtual_task_file
 from src.config import STORAGE_BACKEND
 
 
+FEEDBACK_SAMPLE_SOURCES = {"user", "user_feedback"}
+
+
+def _coerce_vector(vector: Any, dim: int) -> Optional[List[float]]:
+    """校验并标准化特征向量（长度不符或含非数值时返回 None）"""
+    if not isinstance(vector, list) or len(vector) != dim:
+        return None
+    normalized: List[float] = []
+    for value in vector:
+        if not isinstance(value, (int, float)):
+            return None
+        normalized.append(float(value))
+    return normalized
+
+
+class FeedbackGaussianModel:
+    """
+    反馈样本高斯模型
+
+    按类别维护样本数、逐维和与平方和，增删样本只需 O(dim) 更新，
+    均值/方差由累计量推出，评分开销不随样本数量增长。
+    """
+
+    def __init__(self, dim: int = 8, min_variance: float = 1e-3):
+        self.dim = dim
+        self.min_variance = min_variance
+        self.reason = "未加载"
+        # sample_key -> (label, vector)；label 1=可信, 0=不可信
+        self._samples: Dict[str, Tuple[int, List[float]]] = {}
+        self._counts = [0, 0]
+        self._sums = [[0.0] * dim, [0.0] * dim]
+        self._sumsqs = [[0.0] * dim, [0.0] * dim]
+        self._snapshot: Optional[Dict[str, Any]] = None
+
+    @staticmethod
+    def sample_key(sample: Dict[str, Any]) -> str:
+        """样本唯一键：优先样本ID，缺失时按内容摘要。"""
+        sample_id = str(sample.get("id") or sample.get("sample_id") or "").strip()
+        if sample_id:
+            return sample_id
+        payload = json.dumps(
+            [sample.get("label"), sample.get("item_id"), sample.get("vector")],
+            ensure_ascii=False, sort_keys=True, default=str
+        )
+        return "hash:" + hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def _accumulate(self, label: int, vector: List[float], sign: float) -> None:
+        sums = self._sums[label]
+        sumsqs = self._sumsqs[label]
+        for idx, value in enumerate(vector):
+            sums[idx] += sign * value
+            sumsqs[idx] += sign * value * value
+        self._counts[label] += 1 if sign > 0 else -1
+        self._snapshot = None
+
+    def add_sample(self, sample: Dict[str, Any]) -> bool:
+        """加入一条反馈样本（非用户反馈来源或向量无效时忽略）。"""
+        if not isinstance(sample, dict):
+            return False
+        source = str(sample.get("source") or "").strip().lower()
+        if source not in FEEDBACK_SAMPLE_SOURCES:
+            return False
+        vector = _coerce_vector(sample.get("vector"), self.dim)
+        if vector is None:
+            return False
+        key = self.sample_key(sample)
+        if key in self._samples:
+            return False
+        label = 1 if int(sample.get("label", 0)) == 1 else 0
+        self._samples[key] = (label, vector)
+        self._accumulate(label, vector, 1.0)
+        return True
+
+    def remove_sample(self, key: str) -> bool:
+        """按样本唯一键移除样本。"""
+        entry = self._samples.pop(key, None)
+        if entry is None:
+            return False
+        label, vector = entry
+        self._accumulate(label, vector, -1.0)
+        if self._counts[label] == 0:
+            # 清零累计量，避免浮点残差
+            self._sums[label] = [0.0] * self.dim
+            self._sumsqs[label] = [0.0] * self.dim
+        return True
+
+    def sync(self, samples: Iterable[Dict[str, Any]]) -> None:
+        """与最新样本集对齐：只对新增/移除的样本做增量更新。"""
+        current: Dict[str, Dict[str, Any]] = {}
+        for sample in samples or []:
+            if isinstance(sample, dict):
+                current[self.sample_key(sample)] = sample
+        for key in [key for key in self._samples if key not in current]:
+            self.remove_sample(key)
+        for key, sample in current.items():
+            if key not in self._samples:
+                self.add_sample(sample)
+        self.reason = "ok" if self._samples else "无可用样本"
+
+    def _mean_var(self, label: int) -> Tuple[List[float], List[float]]:
+        count = self._counts[label]
+        if count <= 0:
+            return [0.5] * self.dim, [max(self.min_variance, 0.05)] * self.dim
+        means = [value / count for value in self._sums[label]]
+        variances = [
+            max(sumsq / count - mean * mean, self.min_variance)
+            for sumsq, mean in zip(self._sumsqs[label], means)
+        ]
+        return means, variances
+
+    def to_model(self) -> Dict[str, Any]:
+        """导出与原反馈样本模型一致的字典结构（结果缓存到下次样本变化）。"""
+        if self._snapshot is not None:
+            return self._snapshot
+
+        untrusted_count, trusted_count = self._counts
+        total = trusted_count + untrusted_count
+        model = {
+            "enabled": False,
+            "reason": self.reason,
+            "trusted_count": trusted_count,
+            "untrusted_count": untrusted_count,
+            "total": total,
+            "dim": self.dim,
+            "priors": [0.5, 0.5],
+            "mean_trusted": [],
+            "var_trusted": [],
+            "mean_untrusted": [],
+            "var_untrusted": [],
+        }
+        if total == 0:
+            if model["reason"] == "ok":
+                model["reason"] = "无可用样本"
+        elif trusted_count == 0 or untrusted_count == 0:
+            model["reason"] = "样本类别不完整（需同时有可信/不可信）"
+        else:
+            mean_trusted, var_trusted = self._mean_var(1)
+            mean_untrusted, var_untrusted = self._mean_var(0)
+            model.update({
+                "enabled": True,
+                "reason": "ok",
+                "priors": [untrusted_count / total, trusted_count / total],
+                "mean_trusted": mean_trusted,
+                "var_trusted": var_trusted,
+                "mean_untrusted": mean_untrusted,
+                "var_untrusted": var_untrusted,
+            })
+        self._snapshot = model
+        return model
+
+
 class RecommendationScorer:
     """推荐度计算器 - 多维度商品推荐评分系统"""
     
@@ -37,13 +191,23 @@ class RecommendationScorer:
             owner_id: 当前用户ID（多用户模式用于样本隔离）
             bayes_profile: Bayes 配置版本名（如 bayes_v1）
         """
-        import json
-
         self.owner_id = str(owner_id).strip() if owner_id else None
         self.bayes_profile = self._normalize_profile_name(bayes_profile)
         self.config_path = self._resolve_config_path(config_path, self.bayes_profile)
         self.feedback_min_variance = 1e-3
-        
+        self._feedback_gaussian = FeedbackGaussianModel(dim=8, min_variance=self.feedback_min_variance)
+
+        self._load_fusion_config()
+        # 反馈样本模型（8维特征）用于在线增量修正贝叶斯分数
+        self.feedback_model = self._load_feedback_sample_model()
+
+    def refresh(self) -> None:
+        """配置或样本变化后刷新：重读融合权重，反馈样本按差量增量更新。"""
+        self._load_fusion_config()
+        self.feedback_model = self._load_feedback_sample_model()
+
+    def _load_fusion_config(self) -> None:
+        """读取融合权重配置（数据库优先，其次配置文件，最后默认值）"""
         # 默认权重（作为后备）
         default_fusion_config = {
             "weights": {"bayesian": 0.40, "visual": 0.35, "ai": 0.25},
@@ -95,8 +259,6 @@ class RecommendationScorer:
 
         # 贝叶斯评分规则
         self.scoring_rules = fusion_config.get('scoring_rules')
-        # 反馈样本模型（8维特征）用于在线增量修正贝叶斯分数
-        self.feedback_model = self._load_feedback_sample_model()
     
     
     def calculate(self, product_data: Dict[str, Any], ai_analysis: Dict[str, Any]) -> Dict[str, Any]:
@@ -115,8 +277,33 @@ class RecommendationScorer:
                 'fusion': {...}                # 融合详情
             }
         """
+        feedback_result = self._calculate_feedback_sample_score(product_data)
+        return self._calculate_with_feedback(product_data, ai_analysis, feedback_result)
+
+    def calculate_batch(self, items: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        批量计算综合推荐度（用于历史结果重算）
+
+        反馈样本模型的特征矩阵与高斯似然用 NumPy 一次算完，其余规则评分逐条计算；
+        输出与逐条调用 calculate 一致。
+
+        Args:
+            items: [(product_data, ai_analysis), ...]
+        """
+        feedback_results = self._batch_feedback_sample_scores([product_data for product_data, _ in items])
+        return [
+            self._calculate_with_feedback(product_data, ai_analysis, feedback_result)
+            for (product_data, ai_analysis), feedback_result in zip(items, feedback_results)
+        ]
+
+    def _calculate_with_feedback(
+        self,
+        product_data: Dict[str, Any],
+        ai_analysis: Dict[str, Any],
+        feedback_result: Tuple[Optional[float], Dict[str, Any]]
+    ) -> Dict[str, Any]:
         # 1. 计算贝叶斯推荐度
-        bayesian_result = self._calculate_bayesian_score(product_data, ai_analysis)
+        bayesian_result = self._calculate_bayesian_score(product_data, ai_analysis, feedback_result)
         
         # 2. 计算视觉AI推荐度
         visual_result = self._calculate_visual_ai_score(product_data, ai_analysis)
@@ -136,7 +323,8 @@ class RecommendationScorer:
         }
     
     def _calculate_bayesian_score(self, product_data: Dict[str, Any], 
-                                  ai_analysis: Dict[str, Any]) -> Dict[str, Any]:
+                                  ai_analysis: Dict[str, Any],
+                                  feedback_result: Tuple[Optional[float], Dict[str, Any]]) -> Dict[str, Any]:
         '''计算贝叶斯评分'''
         seller_info = product_data.get('卖家信息', {})
         product_info = product_data.get('商品信息', {})
@@ -194,7 +382,7 @@ class RecommendationScorer:
             rule_bayesian_score = self._adjust_by_seller_type(rule_bayesian_score, ai_analysis)
 
         # 使用反馈闭环样本对贝叶斯分数做在线修正（不影响原规则得分输出）
-        feedback_score, feedback_meta = self._calculate_feedback_sample_score(product_data)
+        feedback_score, feedback_meta = feedback_result
         bayesian_score = rule_bayesian_score
         feedback_weight = 0.0
 
@@ -833,37 +1021,6 @@ class RecommendationScorer:
             }
         }
 
-    def _coerce_vector(self, vector: Any, dim: int) -> Optional[List[float]]:
-        """校验并标准化样本向量"""
-        if not isinstance(vector, list) or len(vector) != dim:
-            return None
-        normalized: List[float] = []
-        for value in vector:
-            if not isinstance(value, (int, float)):
-                return None
-            normalized.append(float(value))
-        return normalized
-
-    def _calc_mean_var(self, vectors: List[List[float]], dim: int) -> (List[float], List[float]):
-        """计算每一维的均值与方差"""
-        if not vectors:
-            return [0.5] * dim, [max(self.feedback_min_variance, 0.05)] * dim
-
-        count = len(vectors)
-        means = [0.0] * dim
-        for vector in vectors:
-            for idx, value in enumerate(vector):
-                means[idx] += value
-        means = [value / count for value in means]
-
-        variances = [0.0] * dim
-        for vector in vectors:
-            for idx, value in enumerate(vector):
-                diff = value - means[idx]
-                variances[idx] += diff * diff
-        variances = [max(value / count, self.feedback_min_variance) for value in variances]
-        return means, variances
-
     def _gaussian_logpdf(self, value: float, mean: float, var: float) -> float:
         """高斯分布对数概率密度"""
         return -0.5 * (math.log(2 * math.pi * var) + ((value - mean) ** 2) / var)
@@ -871,22 +1028,9 @@ class RecommendationScorer:
     def _load_feedback_sample_model(self) -> Dict[str, Any]:
         """
         读取并构建反馈样本模型（8维）。
-        模型来源：存储层 bayes_samples，按 source=user/user_feedback 过滤。
+        模型来源：存储层 bayes_samples，按 source=user/user_feedback 过滤；
+        重复加载时只对新增/删除的样本做增量更新。
         """
-        model = {
-            "enabled": False,
-            "reason": "未加载",
-            "trusted_count": 0,
-            "untrusted_count": 0,
-            "total": 0,
-            "dim": 8,
-            "priors": [0.5, 0.5],
-            "mean_trusted": [],
-            "var_trusted": [],
-            "mean_untrusted": [],
-            "var_untrusted": [],
-        }
-
         try:
             from src.storage import get_storage
 
@@ -896,58 +1040,12 @@ class RecommendationScorer:
                 owner_id=self.owner_id,
                 include_system=False if self.owner_id else True
             )
-            if not isinstance(samples, list) or not samples:
-                model["reason"] = "无可用样本"
-                return model
-
-            dim = int(model["dim"])
-            trusted_vectors: List[List[float]] = []
-            untrusted_vectors: List[List[float]] = []
-
-            for sample in samples:
-                if not isinstance(sample, dict):
-                    continue
-                source = str(sample.get("source") or "").strip().lower()
-                if source not in {"user", "user_feedback"}:
-                    continue
-                vector = self._coerce_vector(sample.get("vector"), dim)
-                if vector is None:
-                    continue
-                label = int(sample.get("label", 0))
-                if label == 1:
-                    trusted_vectors.append(vector)
-                else:
-                    untrusted_vectors.append(vector)
-
-            trusted_count = len(trusted_vectors)
-            untrusted_count = len(untrusted_vectors)
-            total = trusted_count + untrusted_count
-
-            model["trusted_count"] = trusted_count
-            model["untrusted_count"] = untrusted_count
-            model["total"] = total
-
-            if trusted_count == 0 or untrusted_count == 0:
-                model["reason"] = "样本类别不完整（需同时有可信/不可信）"
-                return model
-
-            priors = [untrusted_count / total, trusted_count / total]
-            mean_trusted, var_trusted = self._calc_mean_var(trusted_vectors, dim)
-            mean_untrusted, var_untrusted = self._calc_mean_var(untrusted_vectors, dim)
-
-            model.update({
-                "enabled": True,
-                "reason": "ok",
-                "priors": priors,
-                "mean_trusted": mean_trusted,
-                "var_trusted": var_trusted,
-                "mean_untrusted": mean_untrusted,
-                "var_untrusted": var_untrusted,
-            })
-            return model
+            self._feedback_gaussian.sync(samples if isinstance(samples, list) else [])
+            return self._feedback_gaussian.to_model()
 
         except Exception as e:
-            model["reason"] = f"加载失败: {e}"
+            model = dict(self._feedback_gaussian.to_model())
+            model.update({"enabled": False, "reason": f"加载失败: {e}"})
             return model
 
     def _predict_feedback_trusted_probability(self, vector: List[float]) -> Optional[float]:
@@ -997,25 +1095,88 @@ class RecommendationScorer:
             return 0.28
         return 0.35
 
-    def _calculate_feedback_sample_score(self, product_data: Dict[str, Any]) -> (Optional[float], Dict[str, Any]):
-        """计算当前商品在反馈样本模型下的可信分数（0-1）"""
-        feedback_meta = {
+    def _build_feedback_meta(self) -> Dict[str, Any]:
+        return {
             "enabled": bool((self.feedback_model or {}).get("enabled")),
             "reason": (self.feedback_model or {}).get("reason", "未初始化"),
             "trusted_count": int((self.feedback_model or {}).get("trusted_count", 0)),
             "untrusted_count": int((self.feedback_model or {}).get("untrusted_count", 0)),
             "total": int((self.feedback_model or {}).get("total", 0)),
         }
+
+    def _extract_feedback_vector(self, product_data: Dict[str, Any]) -> Optional[List[float]]:
+        """提取反馈样本模型使用的 8 维特征，失败返回 None"""
+        from src.feedback import extract_features
+
+        payload = self._build_feedback_payload(product_data)
+        keyword = str(product_data.get("搜索关键字") or "").strip() if isinstance(product_data, dict) else ""
+        return _coerce_vector(extract_features(payload, keyword=keyword or None), 8)
+
+    def _batch_feedback_sample_scores(
+        self,
+        products: List[Dict[str, Any]]
+    ) -> List[Tuple[Optional[float], Dict[str, Any]]]:
+        """批量计算反馈样本模型下的可信分数，似然部分用 NumPy 矩阵运算"""
+        results: List[Tuple[Optional[float], Dict[str, Any]]] = [
+            (None, self._build_feedback_meta()) for _ in products
+        ]
+        model = self.feedback_model or {}
+        if not model.get("enabled") or not products:
+            return results
+
+        vectors: List[List[float]] = []
+        positions: List[int] = []
+        for pos, product_data in enumerate(products):
+            try:
+                vector = self._extract_feedback_vector(product_data)
+            except Exception as e:
+                results[pos][1]["reason"] = f"计算异常: {e}"
+                continue
+            if vector is None:
+                results[pos][1]["reason"] = "特征提取失败"
+                continue
+            vectors.append(vector)
+            positions.append(pos)
+
+        if not vectors:
+            return results
+
+        import numpy as np
+
+        matrix = np.asarray(vectors, dtype=float)
+        priors = model.get("priors") or [0.5, 0.5]
+        logp_untrusted = math.log(max(float(priors[0]), 1e-12)) + self._batch_gaussian_logpdf(
+            matrix, model["mean_untrusted"], model["var_untrusted"]
+        )
+        logp_trusted = math.log(max(float(priors[1]), 1e-12)) + self._batch_gaussian_logpdf(
+            matrix, model["mean_trusted"], model["var_trusted"]
+        )
+        probabilities = 1.0 / (1.0 + np.exp(np.minimum(logp_untrusted - logp_trusted, 700.0)))
+
+        for row_no, pos in enumerate(positions):
+            meta = results[pos][1]
+            meta["vector"] = [round(float(v), 4) for v in vectors[row_no]]
+            results[pos] = (float(probabilities[row_no]), meta)
+        return results
+
+    @staticmethod
+    def _batch_gaussian_logpdf(matrix, means: List[float], variances: List[float]):
+        """按行求和的高斯对数概率密度，matrix 形状为 (n, d)"""
+        import numpy as np
+
+        var = np.asarray(variances, dtype=float)
+        diff = matrix - np.asarray(means, dtype=float)
+        return (-0.5 * (np.log(2 * math.pi * var) + diff * diff / var)).sum(axis=1)
+
+    def _calculate_feedback_sample_score(self, product_data: Dict[str, Any]) -> (Optional[float], Dict[str, Any]):
+        """计算当前商品在反馈样本模型下的可信分数（0-1）"""
+        feedback_meta = self._build_feedback_meta()
         if not feedback_meta["enabled"]:
             return None, feedback_meta
 
         try:
-            from src.feedback import extract_features
-
-            payload = self._build_feedback_payload(product_data)
-            keyword = str(product_data.get("搜索关键字") or "").strip() if isinstance(product_data, dict) else ""
-            vector = extract_features(payload, keyword=keyword or None)
-            if not isinstance(vector, list) or len(vector) != 8:
+            vector = self._extract_feedback_vector(product_data)
+            if vector is None:
                 feedback_meta["reason"] = "特征提取失败"
                 return None, feedback_meta
 
@@ -1191,3 +1352,48 @@ class RecommendationScorer:
 
         return self._get_rule_score(rule, 'default_score')
 
+
+
+# ==================== 评分器复用 ====================
+
+# (owner, bayes_profile) -> (配置修订标识, 评分器)；一次采集运行内复用
+_scorer_registry: Dict[Tuple[str, str], Tuple[Optional[str], RecommendationScorer]] = {}
+_scorer_registry_lock = threading.Lock()
+
+
+def get_recommendation_scorer(
+    owner_id: Optional[str] = None,
+    bayes_profile: str = "bayes_v1"
+) -> RecommendationScorer:
+    """
+    获取按 (owner, bayes_profile) 复用的评分器。
+
+    每次获取只比对一次配置修订标识；配置或反馈样本变化时原地刷新，
+    反馈样本按差量增量更新，不再每个商品都重建评分器。
+    """
+    from src.bayes import get_bayes_profile_revision
+
+    normalized_owner = str(owner_id).strip() if owner_id else None
+    normalized_profile = str(bayes_profile or "bayes_v1").strip()
+    if normalized_profile.endswith(".json"):
+        normalized_profile = normalized_profile[:-5]
+    normalized_profile = normalized_profile or "bayes_v1"
+    cache_key = (normalized_owner or "", normalized_profile)
+
+    revision = get_bayes_profile_revision(normalized_profile, owner_id=normalized_owner)
+    with _scorer_registry_lock:
+        cached = _scorer_registry.get(cache_key)
+        if cached is None:
+            scorer = RecommendationScorer(owner_id=normalized_owner, bayes_profile=normalized_profile)
+        else:
+            cached_revision, scorer = cached
+            if cached_revision != revision:
+                scorer.refresh()
+        _scorer_registry[cache_key] = (revision, scorer)
+        return scorer
+
+
+def reset_recommendation_scorers() -> None:
+    """清空评分器缓存。"""
+    with _scorer_registry_lock:
+        _scorer_registry.clear()
@@ -0,0 +1,176 @@
+"""
+历史结果批量重算
+
+在 Bayes 配置/样本变化、回填 ml_precalc 或评估新权重时，顺序读取一遍任务结果
+（本地模式整文件读一次，PostgreSQL 按 (crawled_at, id) 键集分页），
+用 batch_build_bayes_precalc 与 RecommendationScorer.calculate_batch 一次算完一批，
+全部算完后一次写回存储层（本地模式整文件重写一次）。
+
+命令行用法:
+    python -m src.result_rescorer --task "任务名"
+    python -m src.result_rescorer --file jsonl/xxx_full_data.jsonl --bayes-profile bayes_v1
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.bayes import batch_build_bayes_precalc
+from src.logging_config import get_logger
+from src.recommendation_scorer import get_recommendation_scorer
+from src.utils import build_result_dedup_item_id
+
+logger = get_logger(__name__, service="system")
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def _get_scorable_ai_analysis(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """只有AI分析成功的记录才计算综合推荐度（与采集时口径一致）。"""
+    ai_analysis = record.get("ai_analysis") or record.get("AI分析")
+    if not isinstance(ai_analysis, dict) or ai_analysis.get("error"):
+        return None
+    if "recommendation_level" not in ai_analysis:
+        return None
+    return ai_analysis
+
+
+def rescore_records(
+    records: List[Dict[str, Any]],
+    bayes_profile: str = "bayes_v1",
+    owner_id: Optional[str] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """批量重算一批结果，返回 item_id -> {ml_precalc, recommendation_score_v2}。"""
+    if not records:
+        return {}
+
+    scores: Dict[str, Dict[str, Any]] = {}
+    item_ids = [build_result_dedup_item_id(record) for record in records]
+
+    precalcs = batch_build_bayes_precalc(records, bayes_profile, owner_id=owner_id)
+    for item_id, precalc in zip(item_ids, precalcs):
+        if item_id and precalc:
+            scores.setdefault(item_id, {})["ml_precalc"] = {"bayes": precalc}
+
+    scorable = []
+    for record, item_id in zip(records, item_ids):
+        ai_analysis = _get_scorable_ai_analysis(record)
+        if item_id and ai_analysis is not None:
+            scorable.append((item_id, record, ai_analysis))
+    if scorable:
+        scorer = get_recommendation_scorer(owner_id=owner_id, bayes_profile=bayes_profile)
+        results = scorer.calculate_batch([(record, ai_analysis) for _, record, ai_analysis in scorable])
+        for (item_id, _, _), result in zip(scorable, results):
+            scores.setdefault(item_id, {})["recommendation_score_v2"] = result
+
+    return scores
+
+
+def rescore_task_results(
+    task_name: str,
+    owner_id: Optional[str] = None,
+    bayes_profile: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """通过存储层重算整个任务的结果；未指定 bayes_profile 时使用任务配置。"""
+    from src.storage import get_storage
+
+    storage = get_storage()
+    if not bayes_profile:
+        task = storage.get_task_by_name(task_name, owner_id=owner_id) or {}
+        bayes_profile = task.get("bayes_profile") or "bayes_v1"
+
+    started_at = time.monotonic()
+    total = 0
+    # 按批计算、最后一次写回（本地模式每次写回都要整文件重写并重建索引）
+    scores: Dict[str, Dict[str, Any]] = {}
+    for records in storage.iter_result_batches(task_name, owner_id=owner_id, batch_size=batch_size):
+        scores.update(rescore_records(records, bayes_profile=bayes_profile, owner_id=owner_id))
+        total += len(records)
+    updated = storage.update_result_scores(task_name, scores, owner_id=owner_id) if scores else 0
+
+    stats = {
+        "task_name": task_name,
+        "bayes_profile": bayes_profile,
+        "total": total,
+        "updated": updated,
+        "elapsed_ms": int((time.monotonic() - started_at) * 1000),
+    }
+    logger.info(
+        f"任务结果重算完成: {task_name}，共 {total} 条，更新 {updated} 条",
+        extra={"event": "result_rescore_completed", "task_name": task_name, "owner_id": owner_id},
+    )
+    return stats
+
+
+def rescore_result_file(
+    result_file: str,
+    bayes_profile: str = "bayes_v1",
+    owner_id: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """直接重算一个本地结果文件（单用户模式结果按关键字分文件）。"""
+    from src.storage.local_adapter import iter_result_records, rewrite_result_scores
+
+    started_at = time.monotonic()
+    # 含已归档记录，写回时归档段同样会更新
+    records: List[Dict[str, Any]] = list(iter_result_records(Path(result_file)))
+
+    batch_size = max(1, int(batch_size))
+    scores: Dict[str, Dict[str, Any]] = {}
+    for start in range(0, len(records), batch_size):
+        scores.update(rescore_records(records[start:start + batch_size], bayes_profile=bayes_profile, owner_id=owner_id))
+
+    updated = rewrite_result_scores(Path(result_file), scores) if scores else 0
+    stats = {
+        "file": str(result_file),
+        "bayes_profile": bayes_profile,
+        "total": len(records),
+        "updated": updated,
+        "elapsed_ms": int((time.monotonic() - started_at) * 1000),
+    }
+    logger.info(
+        f"结果文件重算完成: {result_file}，共 {len(records)} 条，更新 {updated} 条",
+        extra={"event": "result_rescore_completed", "result_file_path": str(result_file)},
+    )
+    return stats
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="Rescore historical results with the current Bayes profile")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--task", help="Task name (read and write through the storage backend)")
+    target.add_argument("--file", help="Local result file, e.g. jsonl/xxx_full_data.jsonl")
+    parser.add_argument("--owner-id", default=None, help="Owner user ID (multi-user mode)")
+    parser.add_argument("--bayes-profile", default=None, help="Bayes profile version (default: task setting or bayes_v1)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Records per batch")
+    args = parser.parse_args()
+
+    if args.file:
+        if not Path(args.file).exists():
+            print(f"Error: result file not found: {args.file}")
+            sys.exit(1)
+        stats = rescore_result_file(
+            args.file,
+            bayes_profile=args.bayes_profile or "bayes_v1",
+            owner_id=args.owner_id,
+            batch_size=args.batch_size,
+        )
+    else:
+        stats = rescore_task_results(
+            args.task,
+            owner_id=args.owner_id,
+            bayes_profile=args.bayes_profile,
+            batch_size=args.batch_size,
+        )
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+结果缓冲写入器
+
+流水线模式（多个 AI 分析并发产出结果）下，采集进程内按 (owner_id, task_name, keyword)
+收集待保存结果，凑满一批或超过刷新间隔后一次性写入：PostgreSQL 为一条多行 INSERT ... ON CONFLICT DO NOTHING RETURNING，
+本地模式为一次追加写入。每条结果仍单独拿到自己的保存结果（saved/created/duplicate），
+调用方据此决定是否通知。
+串行模式同一时刻只有一条结果待保存，缓冲只会增加等待，直接逐条写入。
+"""
+
+import asyncio
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import (
+    RESULT_WRITE_BATCH_SIZE,
+    RESULT_WRITE_FLUSH_INTERVAL_MS,
+    SCRAPER_AI_CONCURRENCY,
+    SCRAPER_PIPELINE_ENABLED,
+)
+from src.logging_config import get_logger
+from src.storage.result_lock import result_file_lock
+from src.utils import build_result_dedup_item_id
+
+logger = get_logger(__name__, service="system")
+
+BufferKey = Tuple[str, str, str]
+
+
+def _new_meta() -> Dict[str, Any]:
+    return {
+        "saved": False,
+        "created": False,
+        "duplicate": False,
+        "backend": "none",
+    }
+
+
+def _write_storage_batch(owner_id: str, task_name: str, records: List[dict]) -> List[Dict[str, Any]]:
+    """通过存储层批量写入（多用户模式），异常向上抛出由调用方决定是否回退。"""
+    from src.config import DB_DEDUP_ENABLED
+    from src.storage import get_storage
+
+    storage = get_storage()
+    metas = [_new_meta() for _ in records]
+
+    if not DB_DEDUP_ENABLED():
+        for record, meta in zip(records, metas):
+            storage.save_result(task_name, record, owner_id=owner_id)
+            meta.update({"saved": True, "created": True, "backend": "storage"})
+        return metas
+
+    indexed_records = []
+    for index, record in enumerate(records):
+        if build_result_dedup_item_id(record):
+            indexed_records.append((index, record))
+            continue
+        logger.warning(
+            "结果缺少可用去重键，放弃写入",
+            extra={"event": "save_result_missing_dedup_key", "owner_id": owner_id, "task_name": task_name},
+        )
+        metas[index]["backend"] = "storage"
+
+    if indexed_records:
+        outcomes = storage.save_results_if_absent(
+            task_name,
+            [record for _, record in indexed_records],
+            owner_id=owner_id,
+        )
+        for (index, _), (_, created) in zip(indexed_records, outcomes):
+            metas[index].update({
+                "saved": True,
+                "created": bool(created),
+                "duplicate": not bool(created),
+                "backend": "storage",
+            })
+    return metas
+
+
+def _write_jsonl_batch(keyword: str, records: List[dict]) -> List[Dict[str, Any]]:
+    """批量追加写入本地结果文件（一次打开、一次写入）。"""
+    metas = [_new_meta() for _ in records]
+    output_dir = "jsonl"
+    os.makedirs(output_dir, exist_ok=True)
+    filename = os.path.join(output_dir, f"{keyword.replace(' ', '_')}_full_data.jsonl")
+    try:
+        payload = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        with result_file_lock(filename), open(filename, "a", encoding="utf-8") as f:
+            f.write(payload)
+        for meta in metas:
+            meta.update({"saved": True, "created": True, "backend": "jsonl"})
+    except IOError as e:
+        logger.error(
+            f"写入结果文件失败: {e}",
+            extra={"event": "result_file_write_failed", "result_file_path": filename},
+        )
+        for meta in metas:
+            meta["backend"] = "jsonl"
+    return metas
+
+
+def write_result_batch(owner_id: str, task_name: str, keyword: str, records: List[dict]) -> List[Dict[str, Any]]:
+    """同步写入一批结果，按输入顺序返回每条的保存元信息。"""
+    if not records:
+        return []
+
+    if owner_id:
+        try:
+            from src.web.auth import is_multi_user_mode
+            if is_multi_user_mode():
+                return _write_storage_batch(owner_id, task_name, records)
+        except Exception as e:
+            from src.config import JSONL_FALLBACK_ON_DB_ERROR
+            if not JSONL_FALLBACK_ON_DB_ERROR():
+                logger.error(
+                    f"多用户结果写入存储层失败且未启用jsonl回退: {e}",
+                    extra={"event": "save_result_storage_failed_no_fallback", "owner_id": owner_id, "task_name": task_name},
+                )
+                metas = [_new_meta() for _ in records]
+                for meta in metas:
+                    meta["backend"] = "storage"
+                return metas
+            logger.warning(
+                f"多用户结果写入存储层失败，降级写入jsonl: {e}",
+                extra={"event": "save_result_fallback", "owner_id": owner_id, "task_name": task_name},
+            )
+
+    return _write_jsonl_batch(keyword, records)
+
+
+class ResultWriter:
+    """按任务缓冲结果并批量落库，submit 在所属批次写完后返回该条结果的保存元信息。"""
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        buffered: Optional[bool] = None,
+    ):
+        # 只有流水线模式下多个 AI 分析并发产出结果时才有可合并的批次
+        self.buffered = (
+            buffered if buffered is not None else SCRAPER_PIPELINE_ENABLED() and SCRAPER_AI_CONCURRENCY() > 1
+        )
+        self.batch_size = batch_size or RESULT_WRITE_BATCH_SIZE()
+        self.flush_interval = (
+            flush_interval if flush_interval is not None else RESULT_WRITE_FLUSH_INTERVAL_MS() / 1000.0
+        )
+        self._buffers: Dict[BufferKey, List[Tuple[dict, asyncio.Future]]] = {}
+        self._timers: Dict[BufferKey, asyncio.Task] = {}
+        self._locks: Dict[BufferKey, asyncio.Lock] = {}
+
+    async def submit(self, record: dict, keyword: str) -> Dict[str, Any]:
+        """提交一条结果，等待所在批次写入完成。"""
+        owner_id = str(os.getenv("GOOFISH_OWNER_ID", "")).strip()
+        task_name = str(os.getenv("GOOFISH_TASK_NAME", "")).strip() or keyword
+        key: BufferKey = (owner_id, task_name, keyword)
+
+        if not self.buffered or self.batch_size <= 1:
+            metas = await asyncio.to_thread(write_result_batch, owner_id, task_name, keyword, [record])
+            return metas[0]
+
+        future = asyncio.get_running_loop().create_future()
+        buffer = self._buffers.setdefault(key, [])
+        buffer.append((record, future))
+
+        if len(buffer) >= self.batch_size:
+            await self._flush_key(key)
+        elif key not in self._timers:
+            self._timers[key] = asyncio.create_task(self._flush_later(key))
+        return await future
+
+    async def flush(self) -> None:
+        """立即写出所有缓冲中的结果。"""
+        for key in list(self._buffers.keys()):
+            await self._flush_key(key)
+
+    async def _flush_later(self, key: BufferKey) -> None:
+        try:
+            await asyncio.sleep(self.flush_interval)
+        except asyncio.CancelledError:
+            return
+        self._timers.pop(key, None)
+        await self._flush_key(key)
+
+    async def _flush_key(self, key: BufferKey) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None and timer is not asyncio.current_task():
+            timer.cancel()
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            batch = self._buffers.pop(key, [])
+            if not batch:
+                return
+            owner_id, task_name, keyword = key
+            records = [record for record, _ in batch]
+            try:
+                metas = await asyncio.to_thread(write_result_batch, owner_id, task_name, keyword, records)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            for (_, future), meta in zip(batch, metas):
+                if not future.done():
+                    future.set_result(meta)
+
+
+_writer: Optional[ResultWriter] = None
+_writer_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_result_writer() -> ResultWriter:
+    """获取当前事件循环内复用的结果写入器。"""
+    global _writer, _writer_loop
+    loop = asyncio.get_running_loop()
+    if _writer is None or _writer_loop is not loop:
+        _writer = ResultWriter()
+        _writer_loop = loop
+    return _writer
@@ -1,23 +1,25 @@
 ﻿import asyncio
+import copy
 import json
 import os
 import random
 import hashlib
 import re
+import time
+from collections import OrderedDict
 from datetime import datetime
 from urllib.parse import urlencode
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List, Set, Tuple
 
 from playwright.async_api import (
     Response,
     TimeoutError as PlaywrightTimeoutError,
-    async_playwright,
 )
 
 from src.bayes import build_bayes_precalc
+from src.browser_pool import open_browser_lease
 from src.ai_handler import (
     get_ai_analysis,
-    send_all_notifications,
     cleanup_task_images,
     AICallFailureException,
 )
@@ -26,12 +28,15 @@ from src.config import (
     API_URL_PATTERN,
     DB_DEDUP_ENABLED,
     DETAIL_API_URL_PATTERN,
-    LOGIN_IS_EDGE,
-    RUN_HEADLESS,
-    RUNNING_IN_DOCKER,
+    RESULT_ARCHIVE_AFTER_DAYS,
+    SCRAPER_AI_CONCURRENCY,
+    SCRAPER_DETAIL_CONCURRENCY,
+    SCRAPER_PIPELINE_ENABLED,
+    SELLER_PROFILE_CACHE_TTL_SECONDS,
     SKIP_AI_ANALYSIS,
     STORAGE_BACKEND,
 )
+from src.notifier.outbox import submit_product_notification
 from src.parsers import (
     _parse_search_results_json,
     _parse_user_items_data,
@@ -39,6 +44,8 @@ from src.parsers import (
     parse_ratings_data,
     parse_user_head_data,
 )
+from src.storage.result_archive import compact_result_file
+from src.storage.result_index import get_result_index
 from src.utils import (
     build_result_dedup_item_id,
     format_registration_days,
@@ -61,6 +68,51 @@ class PriceSortApplyError(Exception):
         self.code = code
 
 
+class ScrapeStopSignal(Exception):
+    """采集终止信号：风控或AI连续失败时由处理阶段抛出，由编排层统一收尾。"""
+
+    def __init__(self, end_reason: str, completion_reason: Optional[str] = None):
+        super().__init__(end_reason)
+        self.end_reason = end_reason
+        # 非空时需要向用户发送任务终止通知
+        self.completion_reason = completion_reason
+
+
+def _remove_downloaded_images(image_paths: List[str]) -> None:
+    """删除AI分析使用的临时图片文件。"""
+    for img_path in image_paths:
+        try:
+            if os.path.exists(img_path):
+                os.remove(img_path)
+                print(f"   [图片] 已删除临时图片文件: {img_path}")
+        except Exception as e:
+            print(f"   [图片] 删除图片文件时出错: {e}")
+
+
+async def _cancel_tasks(tasks: List[asyncio.Task]) -> None:
+    """取消并回收仍在运行的协程任务。"""
+    pending = [task for task in tasks if not task.done()]
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def _wait_tasks_until_stop(tasks: List[asyncio.Task], stop_event: asyncio.Event) -> None:
+    """等待任务全部完成；stop_event 被置位时立即取消剩余任务。"""
+    pending = {task for task in tasks if not task.done()}
+    if not pending:
+        return
+    stop_waiter = asyncio.create_task(stop_event.wait())
+    try:
+        while pending and not stop_event.is_set():
+            _, pending = await asyncio.wait(pending | {stop_waiter}, return_when=asyncio.FIRST_COMPLETED)
+            pending.discard(stop_waiter)
+    finally:
+        stop_waiter.cancel()
+        await _cancel_tasks(list(pending))
+
+
 def _parse_price_to_number(price_text: Any) -> Optional[float]:
     """将价格文本解析为数值，无法解析或不可比较价格返回 None。"""
     if price_text is None:
@@ -739,6 +791,110 @@ async def fetch_user_profile(context, user_id: str) -> dict:
     return profile_data
 
 
+# 进程内卖家信息缓存：seller_id -> (采集时间戳, 解析后的卖家信息)，按最近使用淘汰，常驻 worker 不会无限增长
+SELLER_PROFILE_MEMORY_MAX_ENTRIES = 1000
+_seller_profile_memory: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+# 同一卖家的并发请求锁，最后一个使用者释放后移除
+_seller_profile_locks: Dict[str, asyncio.Lock] = {}
+_seller_profile_lock_users: Dict[str, int] = {}
+# 持久化缓存的过期条目只在读取时被忽略，写入时顺带清理，每个进程最多每小时一次
+SELLER_PROFILE_PURGE_INTERVAL_SECONDS = 3600
+_seller_profile_last_purge_at = 0.0
+
+
+def _get_memory_seller_profile(seller_id: str, ttl_seconds: int) -> Optional[dict]:
+    cached = _seller_profile_memory.get(seller_id)
+    if cached is None:
+        return None
+    if time.time() - cached[0] > ttl_seconds:
+        del _seller_profile_memory[seller_id]
+        return None
+    _seller_profile_memory.move_to_end(seller_id)
+    return cached[1]
+
+
+async def _purge_expired_seller_profiles(storage, ttl_seconds: int) -> None:
+    global _seller_profile_last_purge_at
+    now = time.monotonic()
+    if _seller_profile_last_purge_at and now - _seller_profile_last_purge_at < SELLER_PROFILE_PURGE_INTERVAL_SECONDS:
+        return
+    _seller_profile_last_purge_at = now
+    try:
+        removed = await asyncio.to_thread(storage.purge_seller_profile_cache, ttl_seconds)
+    except Exception as e:
+        print(f"   [警告] 清理过期卖家信息缓存失败: {e}")
+        return
+    if removed:
+        print(f"   -> 已清理 {removed} 条过期卖家信息缓存。")
+
+
+def _put_memory_seller_profile(seller_id: str, fetched_at: float, profile: dict) -> None:
+    _seller_profile_memory[seller_id] = (fetched_at, profile)
+    _seller_profile_memory.move_to_end(seller_id)
+    while len(_seller_profile_memory) > SELLER_PROFILE_MEMORY_MAX_ENTRIES:
+        _seller_profile_memory.popitem(last=False)
+
+
+def _is_cacheable_seller_profile(profile_data: dict) -> bool:
+    """仅缓存头部信息与商品列表均采集成功的卖家信息，避免把半截结果固化。"""
+    return bool(profile_data) and "卖家昵称" in profile_data and "卖家发布的商品列表" in profile_data
+
+
+async def fetch_user_profile_cached(context, user_id: str, storage=None) -> dict:
+    """
+    带TTL缓存的卖家信息采集：先查进程内缓存，再查存储层（本地文件/数据库），
+    均未命中时才打开卖家主页采集，并回写缓存。返回副本，调用方可自由修改。
+    """
+    ttl_seconds = SELLER_PROFILE_CACHE_TTL_SECONDS()
+    if ttl_seconds <= 0:
+        return await fetch_user_profile(context, user_id)
+
+    seller_id = str(user_id)
+    lock = _seller_profile_locks.get(seller_id)
+    if lock is None:
+        lock = _seller_profile_locks[seller_id] = asyncio.Lock()
+    _seller_profile_lock_users[seller_id] = _seller_profile_lock_users.get(seller_id, 0) + 1
+    try:
+        # 同一卖家的并发请求串行化，后到者直接命中前者写入的缓存
+        async with lock:
+            cached_profile = _get_memory_seller_profile(seller_id, ttl_seconds)
+            if cached_profile is not None:
+                print(f"   -> 卖家 {seller_id} 命中进程内缓存，跳过主页采集。")
+                return copy.deepcopy(cached_profile)
+
+            if storage is not None:
+                try:
+                    stored = storage.get_seller_profile_cache(seller_id, ttl_seconds)
+                except Exception as e:
+                    print(f"   [警告] 读取卖家信息缓存失败，将重新采集: {e}")
+                    stored = None
+                if stored:
+                    # 沿用持久化缓存的采集时间，过期时间不因再次读取而顺延
+                    fetched_at, stored_profile = stored
+                    print(f"   -> 卖家 {seller_id} 命中持久化缓存，跳过主页采集。")
+                    _put_memory_seller_profile(seller_id, fetched_at, stored_profile)
+                    return copy.deepcopy(stored_profile)
+
+            profile_data = await fetch_user_profile(context, seller_id)
+            if _is_cacheable_seller_profile(profile_data):
+                _put_memory_seller_profile(seller_id, time.time(), copy.deepcopy(profile_data))
+                if storage is not None:
+                    try:
+                        storage.save_seller_profile_cache(seller_id, profile_data)
+                    except Exception as e:
+                        print(f"   [警告] 写入卖家信息缓存失败: {e}")
+                    else:
+                        await _purge_expired_seller_profiles(storage, ttl_seconds)
+            return profile_data
+    finally:
+        remaining = _seller_profile_lock_users[seller_id] - 1
+        if remaining:
+            _seller_profile_lock_users[seller_id] = remaining
+        else:
+            del _seller_profile_lock_users[seller_id]
+            _seller_profile_locks.pop(seller_id, None)
+
+
 async def _detect_passport_page_state(page) -> str:
     """识别 passport 页面状态：quick_entry/full_login/none/passport_unknown。"""
     current_url = page.url or ""
@@ -869,6 +1025,13 @@ async def fetch_xianyu(task_config: dict, debug_limit: int = 0, bound_account: s
     raw_price_sort_order = str(task_config.get("price_sort_order") or "").strip().lower()
     price_sort_order = "asc" if raw_price_sort_order == "asc" else "desc"
     region_filter = (task_config.get('region') or '').strip()
+    # 当前任务使用的Bayes版本，供预计算与推荐度融合统一使用
+    bayes_profile = task_config.get("bayes_profile", "bayes_v1")
+    # 流水线模式：详情页与AI分析分阶段并发，关闭时保持逐个串行处理
+    pipeline_enabled = SCRAPER_PIPELINE_ENABLED()
+    detail_concurrency = SCRAPER_DETAIL_CONCURRENCY()
+    ai_concurrency = SCRAPER_AI_CONCURRENCY()
+    ai_workers: List[asyncio.Task] = []
 
     processed_item_count = 0
     recommended_item_count = 0
@@ -881,42 +1044,18 @@ async def fetch_xianyu(task_config: dict, debug_limit: int = 0, bound_account: s
     if db_dedup_enabled:
         print("LOG: 已启用数据库去重主路径，启动阶段跳过jsonl历史预加载。")
     elif os.path.exists(output_filename):
-        print(f"LOG: 发现已存在文件 {output_filename}，正在加载历史记录以去重...")
+        print(f"LOG: 发现已存在文件 {output_filename}，正在加载去重索引...")
         try:
-            with open(output_filename, 'r', encoding='utf-8') as f:
-                for line in f:
-                    try:
-                        record = json.loads(line)
-                        link = record.get('商品信息', {}).get('商品链接', '')
-                        if link:
-                            processed_links.add(get_link_unique_key(link))
-                    except json.JSONDecodeError:
-                        print(f"   [警告] 文件中有一行无法解析为JSON，已跳过。")
+            # 旁路索引仅在历史文件被改写时全量重建，常规启动只读取键列表
+            processed_links = get_result_index(output_filename).snapshot_link_keys()
             print(f"LOG: 加载完成，已记录 {len(processed_links)} 个已处理过的商品。")
         except IOError as e:
-            print(f"   [警告] 读取历史文件时发生错误: {e}")
+            print(f"   [警告] 读取历史去重索引时发生错误: {e}")
     else:
         print(f"LOG: 输出文件 {output_filename} 不存在，将创建新文件。")
 
-    async with async_playwright() as p:
-        # 访问策略适配启动参数
-        launch_args = [
-            '--disable-blink-features=AutomationControlled',
-            '--disable-dev-shm-usage',
-            '--no-sandbox',
-            '--disable-setuid-sandbox',
-            '--disable-web-security',
-            '--disable-features=IsolateOrigins,site-per-process'
-        ]
-
-        if LOGIN_IS_EDGE():
-            browser = await p.chromium.launch(headless=RUN_HEADLESS(), channel="msedge", args=launch_args)
-        else:
-            if RUNNING_IN_DOCKER():
-                browser = await p.chromium.launch(headless=RUN_HEADLESS(), args=launch_args)
-            else:
-                browser = await p.chromium.launch(headless=RUN_HEADLESS(), channel="chrome", args=launch_args)
-
+    # 常驻采集进程复用浏览器与账号上下文，单次运行时独占启动一个浏览器
+    async with open_browser_lease() as browser:
         # 确定要使用的账号快照（多用户模式优先走存储层，本地模式走 state 文件）
         state_file_path: Optional[str] = None
         snapshot_data = None
@@ -931,6 +1070,13 @@ async def fetch_xianyu(task_config: dict, debug_limit: int = 0, bound_account: s
             except Exception as e:
                 print(f"LOG: 初始化存储层失败，将回退本地 state 文件: {e}")
         use_storage_dedup = bool(db_dedup_enabled and owner_storage is not None)
+        profile_cache_storage = owner_storage
+        if profile_cache_storage is None and SELLER_PROFILE_CACHE_TTL_SECONDS() > 0:
+            try:
+                from src.storage import get_storage
+                profile_cache_storage = get_storage()
+            except Exception as e:
+                print(f"LOG: 卖家信息缓存存储不可用，仅使用进程内缓存: {e}")
         if db_dedup_enabled and not use_storage_dedup:
             print("LOG: 数据库去重已开启但存储层不可用，后续将依赖写入阶段处理。")
 
@@ -1113,41 +1259,48 @@ async def fetch_xianyu(task_config: dict, debug_limit: int = 0, bound_account: s
                 storage_state_arg = snapshot_data
 
         context_kwargs = _clean_kwargs(context_kwargs)
-        context = await browser.new_context(storage_state=storage_state_arg, **context_kwargs)
 
         # 增强访问策略适配脚本（移动端优先，按快照补充）
         init_script = _build_mobile_init_script(snapshot_data if isinstance(snapshot_data, dict) else None)
-        await context.add_init_script(init_script)
+        context, context_warm = await browser.open_account_context(
+            f"{owner_id or ''}:{current_account_name or ''}",
+            storage_state_arg,
+            context_kwargs,
+            init_script,
+        )
         page = await context.new_page()
         desktop_context_retry_used = False
 
         try:
-            # 步骤 0 - 模拟真实用户：先访问首页（重要的访问策略适配措施）
-            log_time("步骤 0 - 模拟真实用户访问首页...", task_name=task_name)
-            await page.goto("https://www.goofish.com/", wait_until="domcontentloaded", timeout=30000)
-            # 手动导入Cookie可能进入passport，区分“快速进入确认页”和“完整登录页”
-            passport_result = await _try_passport_quick_entry(page, task_name)
-            if passport_result == "full_login" and not desktop_context_retry_used:
-                context, page = await _switch_to_desktop_context_once(
-                    browser,
-                    context,
-                    page,
-                    snapshot_data,
-                    state_file_path,
-                    task_name,
-                )
-                desktop_context_retry_used = True
+            if context_warm:
+                log_time("步骤 0 - 复用近期预热过的账号上下文，跳过首页访问。", task_name=task_name)
+            else:
+                # 步骤 0 - 模拟真实用户：先访问首页（重要的访问策略适配措施）
+                log_time("步骤 0 - 模拟真实用户访问首页...", task_name=task_name)
                 await page.goto("https://www.goofish.com/", wait_until="domcontentloaded", timeout=30000)
+                # 手动导入Cookie可能进入passport，区分“快速进入确认页”和“完整登录页”
                 passport_result = await _try_passport_quick_entry(page, task_name)
-            if passport_result == "full_login":
-                log_time("当前页面为完整登录页，后续将按现有流程继续并等待导航结果。", task_name=task_name)
+                if passport_result == "full_login" and not desktop_context_retry_used:
+                    context, page = await _switch_to_desktop_context_once(
+                        browser,
+                        context,
+                        page,
+                        snapshot_data,
+                        state_file_path,
+                        task_name,
+                    )
+                    desktop_context_retry_used = True
+                    await page.goto("https://www.goofish.com/", wait_until="domcontentloaded", timeout=30000)
+                    passport_result = await _try_passport_quick_entry(page, task_name)
+                if passport_result == "full_login":
+                    log_time("当前页面为完整登录页，后续将按现有流程继续并等待导航结果。", task_name=task_name)
 
-            log_time("[请求间隔优化] 在首页停留，模拟浏览...", task_name=task_name)
-            await random_sleep(3, 6)
+                log_time("[请求间隔优化] 在首页停留，模拟浏览...", task_name=task_name)
+                await random_sleep(3, 6)
 
-            # 模拟随机滚动（移动设备的触摸滚动）
-            await page.evaluate("window.scrollBy(0, Math.random() * 500 + 200)")
-            await random_sleep(1, 2)
+                # 模拟随机滚动（移动设备的触摸滚动）
+                await page.evaluate("window.scrollBy(0, Math.random() * 500 + 200)")
+                await random_sleep(1, 2)
 
             log_time("步骤 1 - 导航到搜索结果页...", task_name=task_name)
             # 使用 'q' 参数构建正确的搜索URL，并进行URL编码
@@ -1209,7 +1362,7 @@ async def fetch_xianyu(task_config: dict, debug_limit: int = 0, bound_account: s
                 print("==================================================")
                 end_reason = "RISK_CONTROL:BAXIA_DIALOG"
                 record_risk_control(current_account_name, "BAXIA_DIALOG", task_name)
-                await browser.close()
+                await browser.close(reuse_context=False)
                 return processed_item_count, recommended_item_count, end_reason
             except PlaywrightTimeoutError:
                 # 2秒内弹窗未出现，这是正常情况，继续执行
@@ -1224,7 +1377,7 @@ async def fetch_xianyu(task_config: dict, debug_limit: int = 0, bound_account: s
                 print("==================================================")
                 end_reason = "RISK_CONTROL:MIDDLEWARE_WIDGET"
                 record_risk_control(current_account_name, "MIDDLEWARE_WIDGET", task_name)
-                await browser.close()
+                await browser.close(reuse_context=False)
                 return processed_item_count, recommended_item_count, end_reason
             except PlaywrightTimeoutError:
                 # 2秒内弹窗未出现，这是正常情况，继续执行
@@ -2186,8 +2339,352 @@ async def fetch_xianyu(task_config: dict, debug_limit: int = 0, bound_account: s
             log_time("所有筛选已完成，开始处理商品列表...", task_name=task_name)
 
             current_response = final_response if final_response and final_response.ok else initial_response
+
+            # ---------- 单商品处理阶段（串行与流水线模式共用） ----------
+
+            async def _fetch_item_detail(item_data: dict, progress_text: str) -> Optional[dict]:
+                """详情阶段：打开详情页、采集卖家信息并构建基础记录；触发风控时抛出 ScrapeStopSignal。"""
+                log_time(f"{progress_text} 发现新商品，获取详情: {item_data['商品标题'][:30]}...", task_name=task_name)
+                # --- 修改: 访问详情页前的等待时间，模拟用户在列表页上看了一会儿 ---
+                await random_sleep(3, 6) # 原来是 (2, 4)
+
+                final_record = None
+                detail_page = await context.new_page()
+                try:
+                    async with detail_page.expect_response(lambda r: DETAIL_API_URL_PATTERN in r.url, timeout=25000) as detail_info:
+                        await detail_page.goto(item_data["商品链接"], wait_until="domcontentloaded", timeout=25000)
+
+                    detail_response = await detail_info.value
+                    if detail_response.ok:
+                        detail_json = await detail_response.json()
+
+                        ret_string = str(await safe_get(detail_json, 'ret', default=[]))
+                        if "FAIL_SYS_USER_VALIDATE" in ret_string:
+                            print("\n==================== 风控触发 ====================")
+                            print("检测到系统验证请求 (FAIL_SYS_USER_VALIDATE)")
+                            print("触发风控保护机制，任务将立即终止。")
+                            print("==================================================")
+                            record_risk_control(current_account_name, "FAIL_SYS_USER_VALIDATE", task_name)
+                            raise ScrapeStopSignal("RISK_CONTROL:FAIL_SYS_USER_VALIDATE")
+
+                        # 解析商品详情数据并更新 item_data
+                        item_do = await safe_get(detail_json, 'data', 'itemDO', default={})
+                        seller_do = await safe_get(detail_json, 'data', 'sellerDO', default={})
+
+                        reg_days_raw = await safe_get(seller_do, 'userRegDay', default=0)
+                        registration_duration_text = format_registration_days(reg_days_raw)
+
+                        # --- START: 新增代码块 ---
+
+                        # 1. 提取该商品的完整图片列表
+                        image_infos = await safe_get(item_do, 'imageInfos', default=[])
+                        if image_infos:
+                            # 使用列表推导式获取所有有效的图片URL
+                            all_image_urls = [img.get('url') for img in image_infos if img.get('url')]
+                            if all_image_urls:
+                                # 用新的字段存储图片列表，替换掉旧的单个链接
+                                item_data['商品图片列表'] = all_image_urls
+                                # (可选) 仍然保留主图链接，以防万一
+                                item_data['商品主图链接'] = all_image_urls[0]
+
+                        # 2. 提取“已用年限”（优先结构化字段，兜底标签拼接）
+                        used_years = ""
+                        cpv_labels = await safe_get(item_do, 'cpvLabels', default=[])
+                        if isinstance(cpv_labels, list):
+                            for label in cpv_labels:
+                                if not isinstance(label, dict):
+                                    continue
+                                if label.get('propertyName') == "已用年限":
+                                    used_years = (label.get('valueName') or '').strip()
+                                    break
+                        if not used_years:
+                            item_label_ext_list = await safe_get(item_do, 'itemLabelExtList', default=[])
+                            if isinstance(item_label_ext_list, list):
+                                for label in item_label_ext_list:
+                                    if not isinstance(label, dict):
+                                        continue
+                                    props = str(label.get('properties') or '')
+                                    if "已用年限:" in props:
+                                        used_years = props.split("已用年限:", 1)[1].split("##", 1)[0].strip()
+                                        break
+                        if used_years:
+                            item_data['已用年限'] = used_years
+
+                        # --- END: 新增代码块 ---
+                        item_data['“想要”人数'] = await safe_get(item_do, 'wantCnt', default=item_data.get('“想要”人数', 'NaN'))
+                        item_data['浏览量'] = await safe_get(item_do, 'browseCnt', default='-')
+                        # ...[此处可添加更多从详情页解析出的商品信息]...
+
+                        # 调用核心函数采集卖家信息
+                        user_profile_data = {}
+                        user_id = await safe_get(seller_do, 'sellerId')
+                        if user_id:
+                            # 同一卖家在缓存有效期内复用已采集信息，不再重复打开主页
+                            user_profile_data = await fetch_user_profile_cached(context, str(user_id), profile_cache_storage)
+                        else:
+                            print("   [警告] 未能从详情API中获取到卖家ID。")
+                        seller_credit_level_text = user_profile_data.get('卖家信用等级')
+                        if not seller_credit_level_text:
+                            seller_credit_level_text = await safe_get(seller_do, 'zhimaLevelInfo', 'levelName')
+                            if seller_credit_level_text:
+                                user_profile_data['卖家信用等级'] = seller_credit_level_text
+                        user_profile_data['卖家注册时长'] = registration_duration_text
+
+                        # 构建基础记录，包含任务元数据
+                        final_record = {
+                            "公开信息浏览时间": datetime.now().isoformat(),
+                            "搜索关键字": keyword,
+                            "任务名称": task_config.get('task_name', 'Untitled Task'),
+                            "AI标准": task_config.get('ai_prompt_criteria_file', 'N/A'),
+                            "personal_only": personal_only,
+                            "free_shipping": free_shipping,
+                            "inspection_service": inspection_service,
+                            "account_assurance": account_assurance,
+                            "super_shop": super_shop,
+                            "brand_new": brand_new,
+                            "strict_selected": strict_selected,
+                            "resale": resale,
+                            "new_publish_option": new_publish_option or None,
+                            "price_sort_order": price_sort_order,
+                            "region": region_filter or None,
+                            "商品信息": item_data,
+                            "卖家信息": user_profile_data
+                        }
+
+                        # Bayes先验预计算，供后续AI分析使用（失败不影响主流程）
+                        try:
+                            bayes_precalc = build_bayes_precalc(
+                                final_record,
+                                bayes_profile,
+                                owner_id=owner_id,
+                            )
+                            if bayes_precalc:
+                                final_record["ml_precalc"] = {"bayes": bayes_precalc}
+                        except Exception as e:
+                            log_time(f"Bayes预计算失败: {e}", task_name=task_name)
+                    else:
+                        print(f"   错误: 获取商品详情API响应失败，状态码: {detail_response.status}")
+                        if AI_DEBUG_MODE:
+                            print(f"--- [DETAIL DEBUG] FAILED RESPONSE from {item_data['商品链接']} ---")
+                            try:
+                                print(await detail_response.text())
+                            except Exception as e:
+                                print(f"无法读取响应内容: {e}")
+                            print("----------------------------------------------------")
+
+                except ScrapeStopSignal:
+                    raise
+                except PlaywrightTimeoutError:
+                    print(f"   错误: 访问商品详情页或等待API响应超时。")
+                except Exception as e:
+                    print(f"   错误: 处理商品详情时发生未知错误: {e}")
+                finally:
+                    await detail_page.close()
+
+                # --- 修改: 增加关闭页面后的短暂整理时间 ---
+                await random_sleep(2, 4) # 原来是 (1, 2.5)
+                return final_record
+
+            async def _analyze_and_save(final_record: dict, unique_key: str) -> bool:
+                """分析阶段：AI分析、幂等保存与通知；返回是否计为新处理商品，AI连续失败时抛出 ScrapeStopSignal。"""
+                nonlocal processed_item_count, recommended_item_count
+                item_data = final_record["商品信息"]
+
+                # --- START: 实时AI分析和通知 ---
+                should_notify = False
+                notify_item_data = item_data
+                notify_reason = "无"
+                ai_analysis_result = None
+
+                # 检查是否跳过AI分析
+                if SKIP_AI_ANALYSIS():
+                    log_time("环境变量 SKIP_AI_ANALYSIS 已设置，跳过AI分析。", task_name=task_name)
+                    should_notify = True
+                    notify_reason = "商品已跳过AI分析，直接通知"
+                else:
+                    current_item_id = item_data.get("商品ID", "未知ID")
+                    log_time(f"开始对商品 #{current_item_id} 进行实时AI分析...", task_name=task_name)
+
+                    # 方案2：不再注入image_url/base64，避免为多模态下载冗余图片
+                    downloaded_image_paths = []
+
+                    # 2. 获取AI分析
+                    if ai_prompt_text:
+                        try:
+                            # 注意：这里我们将整个记录传给AI，让它拥有最全的上下文
+                            ai_analysis_result = await get_ai_analysis(
+                                final_record,
+                                downloaded_image_paths,
+                                prompt_text=ai_prompt_text,
+                                owner_id=owner_id,
+                                bayes_profile=bayes_profile,
+                            )
+                            if ai_analysis_result:
+                                final_record['ai_analysis'] = ai_analysis_result
+                                level = ai_analysis_result.get("recommendation_level", "未知")
+                                score = ai_analysis_result.get("confidence_score")
+                                score_text = f"{float(score):.2f}" if isinstance(score, (int, float)) else "未知"
+                                recommended_flag = _is_ai_recommended(ai_analysis_result)
+                                log_time(
+                                    f"AI分析完成。推荐等级: {level}，置信度: {score_text}，是否推荐: {recommended_flag}",
+                                    task_name=task_name,
+                                )
+                            else:
+                                final_record['ai_analysis'] = {'error': 'AI分析经过多次重试后返回None。'}
+                        except AICallFailureException as e:
+                            print(f"\n==================== AI调用失败 ====================")
+                            print(f"AI调用连续失败，任务 '{task_name}' 将停止。")
+                            print(f"失败原因: {e}")
+                            print("==================================================")
+                            _remove_downloaded_images(downloaded_image_paths)
+                            raise ScrapeStopSignal(
+                                f"AI_CALL_FAILURE:{e}",
+                                completion_reason=f"AI调用失败-结束原因：{e}",
+                            )
+                        except Exception as e:
+                            print(f"   -> AI分析过程中发生严重错误: {e}")
+                            final_record['ai_analysis'] = {'error': str(e)}
+                    else:
+                        print("   -> 任务未配置AI prompt，跳过分析。")
+
+                    # 删除下载的图片文件，节省空间
+                    _remove_downloaded_images(downloaded_image_paths)
+
+                    # 3. 标记推荐商品，后续仅在落库成功时通知
+                    if _is_ai_recommended(ai_analysis_result):
+                        should_notify = True
+                        item_data_with_analysis = item_data.copy()
+                        item_data_with_analysis['ai_analysis'] = ai_analysis_result
+                        notify_item_data = item_data_with_analysis
+                        notify_reason = ai_analysis_result.get("reason", "无")
+                # --- END: 实时AI分析和通知 ---
+
+                # 4. 先幂等保存，保存成功且首次创建才允许通知
+                save_meta = await save_to_jsonl(final_record, keyword, return_meta=True)
+                if not save_meta.get("saved"):
+                    log_time("结果保存失败，跳过通知并继续后续流程。", task_name=task_name, level="warning")
+                    return False
+
+                if not save_meta.get("created"):
+                    processed_links.add(unique_key)
+                    log_time("结果命中去重（并发或历史数据），本次不通知。", task_name=task_name)
+                    return False
+
+                if should_notify:
+                    log_time("结果首次入库且满足通知条件，提交通知。", task_name=task_name)
+                    await submit_product_notification(
+                        notify_item_data,
+                        notify_reason,
+                        owner_id=owner_id,
+                        bound_task=task_name,
+                        bound_account=bound_account,
+                    )
+
+                processed_links.add(unique_key)
+                processed_item_count += 1
+                # 首次入库且满足推荐/跳过AI直推时才增加推荐计数
+                if should_notify:
+                    recommended_item_count += 1
+                log_time(f"商品处理流程完毕。累计处理 {processed_item_count} 个新商品，其中 {recommended_item_count} 个被推荐。", task_name=task_name)
+
+                # 保存任务统计数据
+                save_task_stats(task_name, processed_item_count, recommended_item_count)
+                return True
+
+            async def _after_item_browse() -> None:
+                """浏览节奏阶段：刷新Cookie并执行商品间的主要随机延迟。"""
+                nonlocal cookie_fingerprint
+                # 每处理一个商品尝试刷新Cookie，保持运行期状态最新
+                if current_account_name and state_file_path:
+                    cookie_fingerprint = await refresh_account_cookies(
+                        context,
+                        state_file_path,
+                        cookie_fingerprint,
+                        current_account_name,
+                        task_name,
+                    )
+
+                # --- 修改: 增加单个商品处理后的主要延迟 ---
+                log_time("[请求间隔优化] 执行一次主要的随机延迟以模拟用户浏览间隔...", task_name=task_name)
+                await random_sleep(15, 30) # 原来是 (8, 15)，这是最重要的修改之一
+
+            async def _finish_on_stop(stop: ScrapeStopSignal):
+                """风控/AI失败统一收尾：停止流水线、发送终止通知并关闭浏览器。"""
+                nonlocal stop_scraping, end_reason
+                stop_scraping = True
+                end_reason = stop.end_reason
+                await _cancel_tasks(ai_workers)
+                if stop.completion_reason:
+                    # 发送任务终止通知
+                    from src.notifier import notifier
+                    await notifier.send_task_completion_notification(
+                        task_name,
+                        stop.completion_reason,
+                        processed_item_count,
+                        recommended_item_count,
+                        owner_id=owner_id,
+                        bound_task=task_name,
+                        bound_account=bound_account,
+                    )
+                await browser.close(reuse_context=not str(end_reason).startswith("RISK_CONTROL"))
+                return processed_item_count, recommended_item_count, end_reason
+
+            # ---------- 流水线模式：详情页与AI分析分阶段并发 ----------
+
+            ai_queue: Optional[asyncio.Queue] = None
+            pipeline_stop_event = asyncio.Event()
+            pipeline_stops: List[ScrapeStopSignal] = []
+
+            def _signal_pipeline_stop(stop: ScrapeStopSignal) -> None:
+                if not pipeline_stops:
+                    pipeline_stops.append(stop)
+                pipeline_stop_event.set()
+
+            async def _ai_worker() -> None:
+                while True:
+                    queued = await ai_queue.get()
+                    try:
+                        if queued is None:
+                            return
+                        if pipeline_stop_event.is_set():
+                            continue
+                        await _analyze_and_save(*queued)
+                    except ScrapeStopSignal as stop:
+                        _signal_pipeline_stop(stop)
+                    except Exception as e:
+                        print(f"   错误: 流水线分析阶段发生未知错误: {e}")
+                    finally:
+                        ai_queue.task_done()
+
+            async def _detail_worker(item_data: dict, unique_key: str, progress_text: str) -> None:
+                async with detail_semaphore:
+                    if pipeline_stop_event.is_set():
+                        return
+                    try:
+                        final_record = await _fetch_item_detail(item_data, progress_text)
+                        if final_record is None or pipeline_stop_event.is_set():
+                            return
+                        # AI积压达到上限时在此等待，形成背压
+                        await ai_queue.put((final_record, unique_key))
+                        await _after_item_browse()
+                    except ScrapeStopSignal as stop:
+                        _signal_pipeline_stop(stop)
+
+            if pipeline_enabled:
+                ai_queue = asyncio.Queue(maxsize=ai_concurrency * 2)
+                detail_semaphore = asyncio.Semaphore(detail_concurrency)
+                dispatched_links: set = set()
+                ai_workers.extend(asyncio.create_task(_ai_worker()) for _ in range(ai_concurrency))
+                log_time(
+                    f"已启用并发流水线：详情页并发 {detail_concurrency}，AI分析并发 {ai_concurrency}。",
+                    task_name=task_name,
+                )
+
+            dispatched_item_count = 0
             for page_num in range(1, max_pages + 1):
                 if stop_scraping: break
+                if pipeline_stops:
+                    return await _finish_on_stop(pipeline_stops[0])
                 log_time(f"开始处理第 {page_num}/{max_pages} 页 ...", task_name=task_name)
 
                 if page_num > 1:
@@ -2215,15 +2712,36 @@ async def fetch_xianyu(task_config: dict, debug_limit: int = 0, bound_account: s
                 if not basic_items: break
 
                 total_items_on_page = len(basic_items)
+                detail_tasks: List[asyncio.Task] = []
+
+                # 整页批量预去重：一次查询得到本页已入库的商品
+                existing_item_ids: Set[str] = set()
+                if use_storage_dedup:
+                    page_item_ids = [
+                        build_result_dedup_item_id({"商品信息": item})
+                        for item in basic_items
+                        if get_link_unique_key(item["商品链接"]) not in processed_links
+                    ]
+                    try:
+                        existing_item_ids = await asyncio.to_thread(
+                            owner_storage.filter_existing_item_ids,
+                            page_item_ids,
+                            owner_id=owner_id,
+                            task_name=task_name,
+                        )
+                    except Exception as e:
+                        log_time(f"数据库预去重检查失败，继续处理详情: {e}", task_name=task_name, level="warning")
+
                 for i, item_data in enumerate(basic_items, 1):
-                    if debug_limit > 0 and processed_item_count >= debug_limit:
+                    counted_items = dispatched_item_count if pipeline_enabled else processed_item_count
+                    if debug_limit > 0 and counted_items >= debug_limit:
                         log_time(f"已达到调试上限 ({debug_limit})，停止获取新商品。", task_name=task_name)
                         stop_scraping = True
                         end_reason = f"操作终止-结束原因：已达到调试上限 ({debug_limit})"
                         break
 
                     unique_key = get_link_unique_key(item_data["商品链接"])
-                    if unique_key in processed_links:
+                    if unique_key in processed_links or (pipeline_enabled and unique_key in dispatched_links):
                         log_time(f"[页内进度 {i}/{total_items_on_page}] 商品 '{item_data['商品标题'][:20]}...' 已存在，跳过。", task_name=task_name)
                         continue
 
@@ -2236,308 +2754,51 @@ async def fetch_xianyu(task_config: dict, debug_limit: int = 0, bound_account: s
                                 level="warning",
                             )
                             continue
-                        try:
-                            if owner_storage.result_exists(dedup_item_id, owner_id=owner_id, task_name=task_name):
-                                processed_links.add(unique_key)
-                                log_time(
-                                    f"[页内进度 {i}/{total_items_on_page}] 商品命中数据库去重，跳过：{item_data['商品标题'][:20]}...",
-                                    task_name=task_name,
-                                )
-                                continue
-                        except Exception as e:
-                            log_time(f"数据库预去重检查失败，继续处理详情: {e}", task_name=task_name, level="warning")
+                        if dedup_item_id in existing_item_ids:
+                            processed_links.add(unique_key)
+                            log_time(
+                                f"[页内进度 {i}/{total_items_on_page}] 商品命中数据库去重，跳过：{item_data['商品标题'][:20]}...",
+                                task_name=task_name,
+                            )
+                            continue
 
-                    log_time(f"[页内进度 {i}/{total_items_on_page}] 发现新商品，获取详情: {item_data['商品标题'][:30]}...", task_name=task_name)
-                    # --- 修改: 访问详情页前的等待时间，模拟用户在列表页上看了一会儿 ---
-                    await random_sleep(3, 6) # 原来是 (2, 4)
+                    progress_text = f"[页内进度 {i}/{total_items_on_page}]"
+                    if pipeline_enabled:
+                        if pipeline_stop_event.is_set():
+                            break
+                        dispatched_links.add(unique_key)
+                        dispatched_item_count += 1
+                        detail_tasks.append(asyncio.create_task(_detail_worker(item_data, unique_key, progress_text)))
+                        continue
 
-                    detail_page = await context.new_page()
                     try:
-                        async with detail_page.expect_response(lambda r: DETAIL_API_URL_PATTERN in r.url, timeout=25000) as detail_info:
-                            await detail_page.goto(item_data["商品链接"], wait_until="domcontentloaded", timeout=25000)
-
-                        detail_response = await detail_info.value
-                        if detail_response.ok:
-                            detail_json = await detail_response.json()
-
-                            ret_string = str(await safe_get(detail_json, 'ret', default=[]))
-                            if "FAIL_SYS_USER_VALIDATE" in ret_string:
-                                print("\n==================== 风控触发 ====================")
-                                print("检测到系统验证请求 (FAIL_SYS_USER_VALIDATE)")
-                                print("触发风控保护机制，任务将立即终止。")
-                                print("==================================================")
-                                stop_scraping = True
-                                end_reason = "RISK_CONTROL:FAIL_SYS_USER_VALIDATE"
-                                record_risk_control(current_account_name, "FAIL_SYS_USER_VALIDATE", task_name)
-                                await detail_page.close()
-                                await browser.close()
-                                return processed_item_count, recommended_item_count, end_reason
-
-
-                            # 解析商品详情数据并更新 item_data
-                            item_do = await safe_get(detail_json, 'data', 'itemDO', default={})
-                            seller_do = await safe_get(detail_json, 'data', 'sellerDO', default={})
-
-                            reg_days_raw = await safe_get(seller_do, 'userRegDay', default=0)
-                            registration_duration_text = format_registration_days(reg_days_raw)
-
-                            # --- START: 新增代码块 ---
-
-                            # 1. 提取该商品的完整图片列表
-                            image_infos = await safe_get(item_do, 'imageInfos', default=[])
-                            if image_infos:
-                                # 使用列表推导式获取所有有效的图片URL
-                                all_image_urls = [img.get('url') for img in image_infos if img.get('url')]
-                                if all_image_urls:
-                                    # 用新的字段存储图片列表，替换掉旧的单个链接
-                                    item_data['商品图片列表'] = all_image_urls
-                                    # (可选) 仍然保留主图链接，以防万一
-                                    item_data['商品主图链接'] = all_image_urls[0]
-
-                            # 2. 提取“已用年限”（优先结构化字段，兜底标签拼接）
-                            used_years = ""
-                            cpv_labels = await safe_get(item_do, 'cpvLabels', default=[])
-                            if isinstance(cpv_labels, list):
-                                for label in cpv_labels:
-                                    if not isinstance(label, dict):
-                                        continue
-                                    if label.get('propertyName') == "已用年限":
-                                        used_years = (label.get('valueName') or '').strip()
-                                        break
-                            if not used_years:
-                                item_label_ext_list = await safe_get(item_do, 'itemLabelExtList', default=[])
-                                if isinstance(item_label_ext_list, list):
-                                    for label in item_label_ext_list:
-                                        if not isinstance(label, dict):
-                                            continue
-                                        props = str(label.get('properties') or '')
-                                        if "已用年限:" in props:
-                                            used_years = props.split("已用年限:", 1)[1].split("##", 1)[0].strip()
-                                            break
-                            if used_years:
-                                item_data['已用年限'] = used_years
-
-                            # --- END: 新增代码块 ---
-                            item_data['“想要”人数'] = await safe_get(item_do, 'wantCnt', default=item_data.get('“想要”人数', 'NaN'))
-                            item_data['浏览量'] = await safe_get(item_do, 'browseCnt', default='-')
-                            # ...[此处可添加更多从详情页解析出的商品信息]...
-
-                            # 调用核心函数采集卖家信息
-                            user_profile_data = {}
-                            user_id = await safe_get(seller_do, 'sellerId')
-                            if user_id:
-                                # 新的、高效的调用方式:
-                                user_profile_data = await fetch_user_profile(context, str(user_id))
-                            else:
-                                print("   [警告] 未能从详情API中获取到卖家ID。")
-                            seller_credit_level_text = user_profile_data.get('卖家信用等级')
-                            if not seller_credit_level_text:
-                                seller_credit_level_text = await safe_get(seller_do, 'zhimaLevelInfo', 'levelName')
-                                if seller_credit_level_text:
-                                    user_profile_data['卖家信用等级'] = seller_credit_level_text
-                            user_profile_data['卖家注册时长'] = registration_duration_text
-
-                            # 构建基础记录，包含任务元数据
-                            final_record = {
-                                "公开信息浏览时间": datetime.now().isoformat(),
-                                "搜索关键字": keyword,
-                                "任务名称": task_config.get('task_name', 'Untitled Task'),
-                                "AI标准": task_config.get('ai_prompt_criteria_file', 'N/A'),
-                                "personal_only": personal_only,
-                                "free_shipping": free_shipping,
-                                "inspection_service": inspection_service,
-                                "account_assurance": account_assurance,
-                                "super_shop": super_shop,
-                                "brand_new": brand_new,
-                                "strict_selected": strict_selected,
-                                "resale": resale,
-                                "new_publish_option": new_publish_option or None,
-                                "price_sort_order": price_sort_order,
-                                "region": region_filter or None,
-                                "商品信息": item_data,
-                                "卖家信息": user_profile_data
-                            }
-
-                            # 当前任务使用的Bayes版本，供预计算与推荐度融合统一使用
-                            bayes_profile = task_config.get("bayes_profile", "bayes_v1")
-
-                            # Bayes先验预计算，供后续AI分析使用（失败不影响主流程）
-                            try:
-                                bayes_precalc = build_bayes_precalc(
-                                    final_record,
-                                    bayes_profile,
-                                    owner_id=owner_id,
-                                )
-                                if bayes_precalc:
-                                    final_record["ml_precalc"] = {"bayes": bayes_precalc}
-                            except Exception as e:
-                                log_time(f"Bayes预计算失败: {e}", task_name=task_name)
-
-                            # --- START: 实时AI分析和通知 ---
-                            should_notify = False
-                            notify_item_data = item_data
-                            notify_reason = "无"
-                            ai_analysis_result = None
-
-                            # 检查是否跳过AI分析
-                            if SKIP_AI_ANALYSIS():
-                                log_time("环境变量 SKIP_AI_ANALYSIS 已设置，跳过AI分析。", task_name=task_name)
-                                # 跳过AI分析时不需要下载图片，避免无意义的IO开销
-                                downloaded_image_paths = []
-                                should_notify = True
-                                notify_reason = "商品已跳过AI分析，直接通知"
-                            else:
-                                current_item_id = item_data.get("商品ID", "未知ID")
-                                log_time(f"开始对商品 #{current_item_id} 进行实时AI分析...", task_name=task_name)
-                                
-                                # 方案2：不再注入image_url/base64，避免为多模态下载冗余图片
-                                downloaded_image_paths = []
-
-                                # 2. 获取AI分析
-                                if ai_prompt_text:
-                                    try:
-                                        # 注意：这里我们将整个记录传给AI，让它拥有最全的上下文
-                                        ai_analysis_result = await get_ai_analysis(
-                                            final_record,
-                                            downloaded_image_paths,
-                                            prompt_text=ai_prompt_text,
-                                            owner_id=owner_id,
-                                            bayes_profile=bayes_profile,
-                                        )
-                                        if ai_analysis_result:
-                                            final_record['ai_analysis'] = ai_analysis_result
-                                            level = ai_analysis_result.get("recommendation_level", "未知")
-                                            score = ai_analysis_result.get("confidence_score")
-                                            score_text = f"{float(score):.2f}" if isinstance(score, (int, float)) else "未知"
-                                            recommended_flag = _is_ai_recommended(ai_analysis_result)
-                                            log_time(
-                                                f"AI分析完成。推荐等级: {level}，置信度: {score_text}，是否推荐: {recommended_flag}",
-                                                task_name=task_name,
-                                            )
-                                        else:
-                                            final_record['ai_analysis'] = {'error': 'AI分析经过多次重试后返回None。'}
-                                    except AICallFailureException as e:
-                                        print(f"\n==================== AI调用失败 ====================")
-                                        print(f"AI调用连续失败，任务 '{task_name}' 将停止。")
-                                        print(f"失败原因: {e}")
-                                        print("==================================================")
-                                        # 删除下载的图片文件
-                                        for img_path in downloaded_image_paths:
-                                            try:
-                                                if os.path.exists(img_path):
-                                                    os.remove(img_path)
-                                                    print(f"   [图片] 已删除临时图片文件: {img_path}")
-                                            except Exception as ex:
-                                                print(f"   [图片] 删除图片文件时出错: {ex}")
-                                        # 发送任务终止通知
-                                        from src.notifier import notifier
-                                        await notifier.send_task_completion_notification(
-                                            task_name,
-                                            f"AI调用失败-结束原因：{e}",
-                                            processed_item_count,
-                                            recommended_item_count,
-                                            owner_id=owner_id,
-                                            bound_task=task_name,
-                                            bound_account=bound_account,
-                                        )
-                                        # 停止任务
-                                        stop_scraping = True
-                                        end_reason = f"AI_CALL_FAILURE:{e}"
-                                        await detail_page.close()
-                                        await browser.close()
-                                        return processed_item_count, recommended_item_count, end_reason
-                                    except Exception as e:
-                                        print(f"   -> AI分析过程中发生严重错误: {e}")
-                                        final_record['ai_analysis'] = {'error': str(e)}
-                                else:
-                                    print("   -> 任务未配置AI prompt，跳过分析。")
-
-                                # 删除下载的图片文件，节省空间
-                                for img_path in downloaded_image_paths:
-                                    try:
-                                        if os.path.exists(img_path):
-                                            os.remove(img_path)
-                                            print(f"   [图片] 已删除临时图片文件: {img_path}")
-                                    except Exception as e:
-                                        print(f"   [图片] 删除图片文件时出错: {e}")
-
-                                # 3. 标记推荐商品，后续仅在落库成功时通知
-                                if _is_ai_recommended(ai_analysis_result):
-                                    should_notify = True
-                                    item_data_with_analysis = item_data.copy()
-                                    item_data_with_analysis['ai_analysis'] = ai_analysis_result
-                                    notify_item_data = item_data_with_analysis
-                                    notify_reason = ai_analysis_result.get("reason", "无")
-                            # --- END: 实时AI分析和通知 ---
-
-                            # 4. 先幂等保存，保存成功且首次创建才允许通知
-                            save_meta = await save_to_jsonl(final_record, keyword, return_meta=True)
-                            if not save_meta.get("saved"):
-                                log_time("结果保存失败，跳过通知并继续后续流程。", task_name=task_name, level="warning")
-                                continue
-
-                            if not save_meta.get("created"):
-                                processed_links.add(unique_key)
-                                log_time("结果命中去重（并发或历史数据），本次不通知。", task_name=task_name)
-                                continue
-
-                            if should_notify:
-                                log_time("结果首次入库且满足通知条件，开始发送通知。", task_name=task_name)
-                                await send_all_notifications(
-                                    notify_item_data,
-                                    notify_reason,
-                                    owner_id=owner_id,
-                                    bound_task=task_name,
-                                    bound_account=bound_account,
-                                )
-
-                            processed_links.add(unique_key)
-                            processed_item_count += 1
-                            # 首次入库且满足推荐/跳过AI直推时才增加推荐计数
-                            if should_notify:
-                                recommended_item_count += 1
-                            log_time(f"商品处理流程完毕。累计处理 {processed_item_count} 个新商品，其中 {recommended_item_count} 个被推荐。", task_name=task_name)
-                            
-                            # 保存任务统计数据
-                            save_task_stats(task_name, processed_item_count, recommended_item_count)
-
-                            # 每处理一个商品尝试刷新Cookie，保持运行期状态最新
-                            if current_account_name and state_file_path:
-                                cookie_fingerprint = await refresh_account_cookies(
-                                    context,
-                                    state_file_path,
-                                    cookie_fingerprint,
-                                    current_account_name,
-                                    task_name,
-                                )
-
-                            # --- 修改: 增加单个商品处理后的主要延迟 ---
-                            log_time("[请求间隔优化] 执行一次主要的随机延迟以模拟用户浏览间隔...", task_name=task_name)
-                            await random_sleep(15, 30) # 原来是 (8, 15)，这是最重要的修改之一
-                        else:
-                            print(f"   错误: 获取商品详情API响应失败，状态码: {detail_response.status}")
-                            if AI_DEBUG_MODE:
-                                print(f"--- [DETAIL DEBUG] FAILED RESPONSE from {item_data['商品链接']} ---")
-                                try:
-                                    print(await detail_response.text())
-                                except Exception as e:
-                                    print(f"无法读取响应内容: {e}")
-                                print("----------------------------------------------------")
+                        final_record = await _fetch_item_detail(item_data, progress_text)
+                        if final_record is None:
+                            continue
+                        if await _analyze_and_save(final_record, unique_key):
+                            await _after_item_browse()
+                    except ScrapeStopSignal as stop:
+                        return await _finish_on_stop(stop)
 
-                    except PlaywrightTimeoutError:
-                        print(f"   错误: 访问商品详情页或等待API响应超时。")
-                    except Exception as e:
-                        print(f"   错误: 处理商品详情时发生未知错误: {e}")
-                    finally:
-                        await detail_page.close()
-                        # --- 修改: 增加关闭页面后的短暂整理时间 ---
-                        await random_sleep(2, 4) # 原来是 (1, 2.5)
+                if pipeline_enabled:
+                    # 本页详情阶段全部结束后再翻页；AI分析阶段跨页持续运行
+                    await _wait_tasks_until_stop(detail_tasks, pipeline_stop_event)
+                    if pipeline_stops:
+                        return await _finish_on_stop(pipeline_stops[0])
 
                 # --- 新增: 在处理完一页所有商品后，翻页前，增加一个更长的"休息"时间 ---
                 if not stop_scraping and page_num < max_pages:
                     print(f"--- 第 {page_num} 页处理完毕，准备翻页。执行一次页面间的长时休息... ---")
                     await random_sleep(25, 50)
 
+            if pipeline_enabled:
+                # 所有页面派发完毕，等待AI分析阶段清空队列
+                for _ in ai_workers:
+                    await ai_queue.put(None)
+                await _wait_tasks_until_stop(ai_workers, pipeline_stop_event)
+                if pipeline_stops:
+                    return await _finish_on_stop(pipeline_stops[0])
+
         except PriceSortApplyError as e:
             print(f"\n价格排序严格校验失败: {e.code} - {e}")
             end_reason = f"操作终止-结束原因：{e.code}:{e}"
@@ -2548,11 +2809,13 @@ async def fetch_xianyu(task_config: dict, debug_limit: int = 0, bound_account: s
             print(f"\n公开信息浏览过程中发生未知错误: {e}")
             end_reason = f"操作终止-结束原因：公开信息浏览过程中发生未知错误: {e}"
         finally:
+            await _cancel_tasks(ai_workers)
             log_time("任务执行完毕，浏览器将在5秒后自动关闭...", task_name=task_name)
             await asyncio.sleep(5)
             if debug_limit:
                 input("按回车键关闭浏览器...")
-            await browser.close()
+            # 出错或触发风控的账号上下文不再复用
+            await browser.close(reuse_context=not str(end_reason).startswith(("RISK_CONTROL", "操作终止")))
 
     # 保存最终的任务统计数据（无论是否处理了商品）
     save_task_stats(task_name, processed_item_count, recommended_item_count)
@@ -2560,6 +2823,15 @@ async def fetch_xianyu(task_config: dict, debug_limit: int = 0, bound_account: s
     # 清理任务图片目录
     cleanup_task_images(task_config.get('task_name', 'default'))
 
+    # 本地结果文件：把超过保留天数的旧记录归档为压缩段文件
+    if RESULT_ARCHIVE_AFTER_DAYS() > 0 and os.path.exists(output_filename):
+        try:
+            archived = await asyncio.to_thread(compact_result_file, output_filename)
+            if archived:
+                print(f"LOG: 已归档 {archived} 条早于 {RESULT_ARCHIVE_AFTER_DAYS()} 天的结果记录。")
+        except Exception as e:
+            print(f"   [警告] 归档历史结果时发生错误: {e}")
+
     return processed_item_count, recommended_item_count, end_reason
 
 
@@ -93,10 +93,25 @@ def get_storage() -> "StorageInterface":
     return _storage_instance
 
 
+def run_result_index_migration() -> None:
+    """一次性补建结果查询索引（仅 PostgreSQL；Web 启动时在后台线程调用，失败只记录日志）。"""
+    try:
+        ensure_result_indexes = getattr(get_storage(), "ensure_result_indexes", None)
+        if ensure_result_indexes is not None:
+            ensure_result_indexes()
+    except Exception as e:
+        logger.warning(
+            f"结果索引迁移失败: {e}",
+            extra={"event": "result_index_migration_failed"},
+        )
+
+
 def reset_storage():
     """重置存储实例（用于测试）"""
     global _storage_instance
     _storage_instance = None
 
 
-__all__ = ['get_storage', 'reset_storage']
+from .async_storage import AsyncStorage, get_async_storage, get_storage_metrics  # noqa: E402
+
+__all__ = ['get_storage', 'reset_storage', 'run_result_index_migration', 'AsyncStorage', 'get_async_storage', 'get_storage_metrics']
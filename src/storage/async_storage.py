@@ -0,0 +1,205 @@
+"""
+Async Storage - 存储层异步门面
+
+存储适配器（PostgreSQL/本地文件）均为同步实现。async 路由直接调用会阻塞事件循环，
+一个慢查询会拖住所有请求（包括日志轮询）。这里把调用转到专用、可配置大小的线程池执行，
+并统计线程池排队/执行耗时与数据库连接池等待/占用耗时。
+
+用法:
+    storage = get_async_storage()
+    tasks = await storage.get_tasks(owner_id=owner_id)
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from src.config import STORAGE_THREAD_POOL_SIZE
+
+
+class _TimingStats:
+    """耗时统计（次数/累计/最大/最近），线程安全。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.last = seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            avg = self.total / self.count if self.count else 0.0
+            return {
+                "count": self.count,
+                "avg_ms": round(avg * 1000, 3),
+                "max_ms": round(self.max * 1000, 3),
+                "last_ms": round(self.last * 1000, 3),
+            }
+
+
+class StorageMetrics:
+    """存储访问指标：线程池排队/执行、连接池等待/占用。"""
+
+    def __init__(self):
+        self.executor_wait = _TimingStats()
+        self.executor_run = _TimingStats()
+        self.pool_wait = _TimingStats()
+        self.pool_checkout = _TimingStats()
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._errors = 0
+        self._engine = None
+
+    def call_started(self) -> None:
+        with self._lock:
+            self._inflight += 1
+
+    def call_finished(self, failed: bool) -> None:
+        with self._lock:
+            self._inflight -= 1
+            if failed:
+                self._errors += 1
+
+    def instrument_engine(self, engine) -> None:
+        """挂载连接池 checkout/checkin 事件，统计连接占用时长。"""
+        from sqlalchemy import event
+
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            connection_record.info["checkout_started_at"] = time.perf_counter()
+
+        def on_checkin(dbapi_connection, connection_record):
+            started_at = connection_record.info.pop("checkout_started_at", None)
+            if started_at is not None:
+                self.pool_checkout.record(time.perf_counter() - started_at)
+
+        event.listen(engine, "checkout", on_checkout)
+        event.listen(engine, "checkin", on_checkin)
+        self._engine = engine
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            inflight = self._inflight
+            errors = self._errors
+        data: Dict[str, Any] = {
+            "executor": {
+                "max_workers": STORAGE_THREAD_POOL_SIZE(),
+                "inflight": inflight,
+                "errors": errors,
+                "queue_wait": self.executor_wait.snapshot(),
+                "run": self.executor_run.snapshot(),
+            },
+            "pool": None,
+        }
+        if self._engine is not None:
+            pool = self._engine.pool
+            data["pool"] = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "wait": self.pool_wait.snapshot(),
+                "checkout": self.pool_checkout.snapshot(),
+            }
+        return data
+
+
+storage_metrics = StorageMetrics()
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=STORAGE_THREAD_POOL_SIZE(),
+                    thread_name_prefix="storage",
+                )
+    return _executor
+
+
+async def run_storage_call(func: Callable, *args, **kwargs) -> Any:
+    """在存储线程池中执行同步调用，并记录排队与执行耗时。"""
+    submitted_at = time.perf_counter()
+
+    def runner():
+        started_at = time.perf_counter()
+        storage_metrics.executor_wait.record(started_at - submitted_at)
+        storage_metrics.call_started()
+        failed = True
+        try:
+            result = func(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            storage_metrics.call_finished(failed)
+            storage_metrics.executor_run.record(time.perf_counter() - started_at)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), runner)
+
+
+class AsyncStorage:
+    """同步存储适配器的异步代理：方法调用变为可 await 的线程池调用。"""
+
+    def __init__(self, storage):
+        self._storage = storage
+
+    @property
+    def sync_storage(self):
+        """底层同步适配器（供需要在同一线程内连续调用的场景使用）。"""
+        return self._storage
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._storage, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            return await run_storage_call(attr, *args, **kwargs)
+
+        return call
+
+
+_async_storage: Optional[AsyncStorage] = None
+
+
+def get_async_storage() -> AsyncStorage:
+    """获取异步存储门面（随 get_storage 单例复用）。"""
+    global _async_storage
+    from . import get_storage
+
+    storage = get_storage()
+    if _async_storage is None or _async_storage.sync_storage is not storage:
+        _async_storage = AsyncStorage(storage)
+    return _async_storage
+
+
+def get_storage_metrics() -> Dict[str, Any]:
+    """返回存储访问指标快照。"""
+    return storage_metrics.snapshot()
+
+
+def shutdown_storage_executor() -> None:
+    """关闭存储线程池（应用退出时调用）。"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
@@ -0,0 +1,114 @@
+"""
+Auth Cache - 会话/权限短期缓存
+
+多用户模式下每个请求（含静态资源、日志轮询）都会在 verify_session_token 中查询用户，
+require_category 还会再查用户组与权限。这里按 user_id 缓存（是否启用、角色）与
+（用户组、权限类别），有效期很短（AUTH_CACHE_TTL_SECONDS）。
+用户、用户组、组权限变更时由存储层在提交后主动失效。
+"""
+
+import copy
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from src.config import AUTH_CACHE_TTL_SECONDS
+
+_MISSING = object()
+
+
+class AuthCache:
+    """按 user_id 的 TTL 缓存，线程安全，带命中统计。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users: Dict[str, Tuple[float, Optional[Dict[str, Any]]]] = {}
+        self._groups: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._hits = 0
+        self._misses = 0
+
+    def _lookup(self, table: Dict[str, Tuple[float, Any]], user_id: str) -> Any:
+        entry = table.get(user_id)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            table.pop(user_id, None)
+            return _MISSING
+        return value
+
+    def _get_or_load(self, table: Dict[str, Tuple[float, Any]], user_id: str, loader: Callable[[], Any]) -> Any:
+        ttl = AUTH_CACHE_TTL_SECONDS()
+        if ttl <= 0:
+            return loader()
+
+        with self._lock:
+            value = self._lookup(table, user_id)
+            if value is not _MISSING:
+                self._hits += 1
+                return value
+            self._misses += 1
+
+        value = loader()
+        with self._lock:
+            table[user_id] = (time.monotonic() + ttl, value)
+        return value
+
+    def get_user_state(self, user_id: str, loader: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """获取用户状态快照 {is_active, role}，用户不存在时为 None。"""
+        def load():
+            user = loader()
+            if not user:
+                return None
+            return {"is_active": bool(user.get("is_active", True)), "role": user.get("role")}
+
+        return self._get_or_load(self._users, str(user_id), load)
+
+    def get_user_groups(self, user_id: str, loader: Callable[[], list]) -> list:
+        """获取用户所属组（返回副本，调用方可自由修改）。"""
+        entry = self._get_or_load(self._groups, str(user_id), lambda: {"groups": loader(), "categories": None})
+        return copy.deepcopy(entry["groups"])
+
+    def get_user_categories(self, user_id: str, loader: Callable[[], list], build: Callable[[list], Set[str]]) -> Set[str]:
+        """获取用户权限类别集合（基于缓存的用户组计算一次）。"""
+        entry = self._get_or_load(self._groups, str(user_id), lambda: {"groups": loader(), "categories": None})
+        categories = entry.get("categories")
+        if categories is None:
+            categories = frozenset(build(entry["groups"]))
+            entry["categories"] = categories
+        return set(categories)
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """失效指定用户（None 表示全部，例如组权限变更影响所有成员）。"""
+        with self._lock:
+            if user_id is None:
+                self._users.clear()
+                self._groups.clear()
+            else:
+                self._users.pop(str(user_id), None)
+                self._groups.pop(str(user_id), None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "ttl_seconds": AUTH_CACHE_TTL_SECONDS(),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+                "cached_users": len(self._users),
+                "cached_groups": len(self._groups),
+            }
+
+
+auth_cache = AuthCache()
+
+
+def invalidate_auth_cache(user_id: Optional[str] = None) -> None:
+    """失效会话/权限缓存。"""
+    auth_cache.invalidate(user_id)
+
+
+def get_auth_cache_stats() -> Dict[str, Any]:
+    """返回会话/权限缓存命中统计。"""
+    return auth_cache.stats()
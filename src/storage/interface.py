@@ -5,7 +5,7 @@ Storage Interface - 存储抽象接口
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Iterator, Set, Tuple
 from datetime import datetime
 
 
@@ -163,12 +163,50 @@ class StorageInterface(ABC):
     ) -> List[Dict[str, Any]]:
         """获取监控结果列表"""
         pass
+
+    @abstractmethod
+    def query_results(
+        self,
+        task_names: List[str],
+        owner_id: Optional[str] = None,
+        recommended_only: bool = False,
+        manual_keyword: Optional[str] = None,
+        sort_by: str = "crawl_time",
+        sort_order: str = "desc",
+        limit: int = 20,
+        offset: int = 0
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """跨任务筛选、排序并分页查询结果，返回(当前页结果, 筛选后总数)；sort_by="relevance" 按与手动关键词的相关度排序"""
+        pass
+
+    @abstractmethod
+    def query_results_keyset(
+        self,
+        task_names: List[str],
+        owner_id: Optional[str] = None,
+        recommended_only: bool = False,
+        manual_keyword: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """按抓取时间倒序游标分页，返回(当前页结果, 下一页游标)；游标无效时抛出 ValueError，末页的下一页游标为 None"""
+        pass
     
     @abstractmethod
     def get_result_by_item_id(self, item_id: str, owner_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """根据商品ID获取结果"""
         pass
 
+    @abstractmethod
+    def filter_existing_item_ids(
+        self,
+        item_ids: List[str],
+        owner_id: Optional[str] = None,
+        task_name: Optional[str] = None
+    ) -> Set[str]:
+        """批量判重，返回已存在的去重键集合"""
+        pass
+
     @abstractmethod
     def result_exists(
         self,
@@ -188,6 +226,16 @@ class StorageInterface(ABC):
     ) -> Tuple[Optional[Dict[str, Any]], bool]:
         """幂等保存结果，返回(结果数据, 是否新建)"""
         pass
+
+    @abstractmethod
+    def save_results_if_absent(
+        self,
+        task_name: str,
+        results: List[Dict[str, Any]],
+        owner_id: Optional[str] = None
+    ) -> List[Tuple[Optional[Dict[str, Any]], bool]]:
+        """批量幂等保存结果，按输入顺序返回(结果数据, 是否新建)"""
+        pass
     
     @abstractmethod
     def delete_results(
@@ -198,6 +246,26 @@ class StorageInterface(ABC):
     ) -> int:
         """删除监控结果，返回删除数量"""
         pass
+
+    @abstractmethod
+    def update_result_scores(
+        self,
+        task_name: str,
+        scores: Dict[str, Dict[str, Any]],
+        owner_id: Optional[str] = None
+    ) -> int:
+        """批量回写重算后的评分（item_id -> {ml_precalc, recommendation_score_v2}），返回更新数量"""
+        pass
+
+    @abstractmethod
+    def iter_result_batches(
+        self,
+        task_name: str,
+        owner_id: Optional[str] = None,
+        batch_size: int = 500
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """按批遍历任务的全部结果（批量重算用），整个遍历只顺序读取一遍"""
+        pass
     
     # ============== 贝叶斯配置管理 ==============
     
@@ -205,6 +273,11 @@ class StorageInterface(ABC):
     def get_bayes_profile(self, version: str, owner_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """获取贝叶斯配置"""
         pass
+
+    @abstractmethod
+    def get_bayes_profile_revision(self, version: str, owner_id: Optional[str] = None) -> Optional[str]:
+        """获取贝叶斯配置修订标识（配置或样本变化时改变，用于模型缓存失效）"""
+        pass
     
     @abstractmethod
     def save_bayes_profile(self, profile: Dict[str, Any], owner_id: Optional[str] = None) -> Dict[str, Any]:
@@ -264,6 +337,11 @@ class StorageInterface(ABC):
     def add_bayes_sample(self, sample: Dict[str, Any], owner_id: Optional[str] = None) -> Dict[str, Any]:
         """添加贝叶斯样本"""
         pass
+
+    @abstractmethod
+    def add_bayes_samples(self, samples: List[Dict[str, Any]], owner_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """批量添加贝叶斯样本（每个配置版本只写入一次），按输入顺序返回"""
+        pass
     
     @abstractmethod
     def delete_bayes_sample(self, sample_id: str, owner_id: Optional[str] = None) -> bool:
@@ -385,6 +463,90 @@ class StorageInterface(ABC):
         """更新平台账号Cookie"""
         pass
     
+    # ============== 卖家信息缓存 ==============
+
+    @abstractmethod
+    def get_seller_profile_cache(self, seller_id: str, max_age_seconds: int) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """获取未过期的卖家信息缓存，返回 (采集时间戳, 卖家信息)，不存在或已过期返回None"""
+        pass
+
+    @abstractmethod
+    def save_seller_profile_cache(self, seller_id: str, profile: Dict[str, Any]) -> bool:
+        """写入（覆盖）卖家信息缓存"""
+        pass
+
+    @abstractmethod
+    def purge_seller_profile_cache(self, max_age_seconds: int) -> int:
+        """删除超过有效期的卖家信息缓存，返回删除条数"""
+        pass
+    
+    # ============== AI 分析结果缓存 ==============
+
+    @abstractmethod
+    def get_ai_analysis_cache(self, cache_key: str, max_age_seconds: int) -> Optional[Dict[str, Any]]:
+        """获取未过期的 AI 分析结果并累计命中/未命中次数，不存在或已过期返回None"""
+        pass
+
+    @abstractmethod
+    def save_ai_analysis_cache(
+        self,
+        cache_key: str,
+        analysis: Dict[str, Any],
+        model_name: str,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0
+    ) -> bool:
+        """写入（覆盖）AI 分析结果缓存"""
+        pass
+
+    @abstractmethod
+    def purge_ai_analysis_cache(self, max_age_seconds: int) -> int:
+        """删除超过有效期的 AI 分析结果缓存条目，返回删除条数"""
+        pass
+
+    @abstractmethod
+    def get_ai_analysis_cache_stats(self) -> Dict[str, int]:
+        """统计缓存条目数、命中/未命中次数与命中节省的 token 数"""
+        pass
+    
+    # ============== 通知发件箱 ==============
+    
+    @abstractmethod
+    def enqueue_notifications(self, events: List[Dict[str, Any]]) -> int:
+        """写入待发送的通知事件（owner_id/task_name/event_type/channel/config_id/payload/next_attempt_at），返回写入数量"""
+        pass
+    
+    @abstractmethod
+    def claim_notifications(
+        self,
+        limit: int,
+        lease_seconds: int,
+        owner_id: Optional[str] = None,
+        task_name: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """领取到期的通知事件并加租约（租约过期未确认的事件可被重新领取）"""
+        pass
+    
+    @abstractmethod
+    def complete_notifications(self, event_ids: List[str]) -> int:
+        """确认通知已送达，从发件箱移除，返回移除数量"""
+        pass
+    
+    @abstractmethod
+    def retry_notification(self, event_id: str, error: str, next_attempt_at: Optional[datetime]) -> None:
+        """记录一次发送失败；next_attempt_at 为空表示不再重试（标记为 dead）"""
+        pass
+    
+    @abstractmethod
+    def purge_dead_notifications(self, older_than: datetime) -> int:
+        """删除创建时间早于 older_than 的 dead 事件，返回删除数量"""
+        pass
+    
+    @abstractmethod
+    def get_notification_outbox_stats(self) -> Dict[str, int]:
+        """按状态统计发件箱事件数量"""
+        pass
+    
     # ============== 审计日志 ==============
     
     @abstractmethod
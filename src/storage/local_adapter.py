@@ -9,14 +9,86 @@ import os
 import json
 import uuid
 import hashlib
+import time
 from pathlib import Path
 from datetime import datetime
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Iterator, Set, Tuple
 from filelock import FileLock
 
 from .interface import StorageInterface
+from .local_ai_cache import LocalAIAnalysisCache
+from .local_outbox import LocalNotificationOutbox
+from .result_archive import get_result_archive
+from .result_index import get_result_index
+from .result_lock import result_file_lock
+from .result_query import ResultFilters, get_record_ai_analysis, query_result_files, query_result_files_after
+from .result_search import refresh_result_search_index
 from .utils import hash_password, verify_password, hash_token, generate_uuid
 from src.config import get_env_value, get_bool_env_value, DB_DEDUP_SCOPE
+from src.bayes import invalidate_bayes_model_cache
+from src.utils import build_result_dedup_item_id
+
+
+def _apply_result_score(record: Dict[str, Any], scores: Dict[str, Dict[str, Any]]) -> bool:
+    """把重算后的评分写入记录（原地修改），返回是否有对应评分。"""
+    score = scores.get(build_result_dedup_item_id(record)) if isinstance(record, dict) else None
+    if not score:
+        return False
+    if "ml_precalc" in score:
+        record["ml_precalc"] = score["ml_precalc"]
+    # 兼容只有 AI分析 字段的旧记录
+    ai_analysis = get_record_ai_analysis(record)
+    if isinstance(score.get("recommendation_score_v2"), dict) and ai_analysis:
+        ai_analysis["recommendation_score_v2"] = score["recommendation_score_v2"]
+    return True
+
+
+def iter_result_records(result_file: Path) -> Iterator[Dict[str, Any]]:
+    """顺序读取结果文件的全部记录：已归档的旧记录在前，与原文件顺序一致。"""
+    result_file = Path(result_file)
+    if not result_file.exists():
+        return
+    yield from get_result_archive(result_file).iter_records()
+    with open(result_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict):
+                yield record
+
+
+def rewrite_result_scores(result_file: Path, scores: Dict[str, Dict[str, Any]]) -> int:
+    """按去重键把重算后的评分写回结果文件及其归档（持有结果文件写锁，临时文件原子替换），返回更新条数。"""
+    result_file = Path(result_file)
+    updated = 0
+    tmp_path = result_file.with_suffix(result_file.suffix + ".tmp")
+    with result_file_lock(result_file):
+        with open(result_file, 'r', encoding='utf-8') as src, open(tmp_path, 'w', encoding='utf-8') as dst:
+            for line in src:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    dst.write(line)
+                    continue
+                if not _apply_result_score(record, scores):
+                    dst.write(line)
+                    continue
+                dst.write(json.dumps(record, ensure_ascii=False) + '\n')
+                updated += 1
+        os.replace(tmp_path, result_file)
+    get_result_index(result_file).rebuild()
+    refresh_result_search_index(result_file, rebuild=True)
+    updated += get_result_archive(result_file).update_records(
+        lambda record: _apply_result_score(record, scores), item_ids=set(scores)
+    )
+    return updated
+
 
 class LocalStorageAdapter(StorageInterface):
     """
@@ -48,6 +120,10 @@ class LocalStorageAdapter(StorageInterface):
         
         self.prompts_dir = self.base_path / "prompts"
         self.bayes_dir = self.prompts_dir / "bayes"
+
+        self.seller_cache_dir = self.base_path / "cache" / "seller_profiles"
+        self.ai_analysis_cache = LocalAIAnalysisCache(self.base_path / "cache" / "ai_analysis_cache.db")
+        self.notification_outbox = LocalNotificationOutbox(self.state_dir / "notification_outbox.db")
     
     def _get_config_path(self) -> Path:
         """获取任务配置文件路径"""
@@ -314,8 +390,11 @@ class LocalStorageAdapter(StorageInterface):
         item_id = self._extract_result_item_id(result)
         result_to_save = self._normalize_result_item_id(result, item_id) if item_id else result
         
-        with open(result_file, 'a', encoding='utf-8') as f:
+        with result_file_lock(result_file), open(result_file, 'a', encoding='utf-8') as f:
             f.write(json.dumps(result_to_save, ensure_ascii=False) + '\n')
+        # 追加后立即增量同步去重索引与检索索引
+        get_result_index(result_file).sync()
+        refresh_result_search_index(result_file)
         
         return result_to_save
     
@@ -334,33 +413,66 @@ class LocalStorageAdapter(StorageInterface):
         if not result_file.exists():
             return []
         
-        results = []
-        with open(result_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                if line.strip():
-                    try:
-                        result = json.loads(line)
-                        
-                        # 筛选推荐
-                        if recommended_only and not result.get("is_recommended", False):
-                            continue
-                        
-                        # 关键词筛选
-                        if keyword:
-                            title = result.get("商品信息", {}).get("商品标题", "")
-                            if keyword.lower() not in title.lower():
-                                continue
-                        
-                        results.append(result)
-                    except json.JSONDecodeError:
-                        continue
+        def matches(result: Dict[str, Any]) -> bool:
+            # 筛选推荐
+            if recommended_only and not result.get("is_recommended", False):
+                return False
+            # 关键词筛选
+            if keyword:
+                title = result.get("商品信息", {}).get("商品标题", "")
+                if keyword.lower() not in title.lower():
+                    return False
+            return True
+
+        results = [result for result in iter_result_records(result_file) if matches(result)]
         
         # 分页
         return results[offset:offset + limit]
+
+    def query_results(
+        self,
+        task_names: List[str],
+        owner_id: Optional[str] = None,
+        recommended_only: bool = False,
+        manual_keyword: Optional[str] = None,
+        sort_by: str = "crawl_time",
+        sort_order: str = "desc",
+        limit: int = 20,
+        offset: int = 0
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """分页查询结果（基于结果文件查询索引，只解析当前页记录）"""
+        result_files = [self._get_result_file(task_name) for task_name in task_names]
+        filters = ResultFilters(recommended_only=recommended_only, manual_keyword=manual_keyword)
+        return query_result_files(
+            result_files,
+            filters=filters,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            offset=offset,
+            limit=limit,
+            ignore_errors=True,
+        )
+
+    def query_results_keyset(
+        self,
+        task_names: List[str],
+        owner_id: Optional[str] = None,
+        recommended_only: bool = False,
+        manual_keyword: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """按抓取时间倒序游标分页（在结果文件查询索引上二分定位起点）"""
+        result_files = [self._get_result_file(task_name) for task_name in task_names]
+        filters = ResultFilters(recommended_only=recommended_only, manual_keyword=manual_keyword)
+        return query_result_files_after(result_files, filters=filters, cursor=cursor, limit=limit, ignore_errors=True)
     
     def get_result_by_item_id(self, item_id: str, owner_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """根据商品ID获取结果（需要遍历所有文件）"""
         for result_file in self.jsonl_dir.glob("*_full_data.jsonl"):
+            # 先查去重索引，只解析确实包含该商品的文件
+            if not get_result_index(result_file).contains_item(item_id):
+                continue
             with open(result_file, 'r', encoding='utf-8') as f:
                 for line in f:
                     if line.strip():
@@ -370,6 +482,12 @@ class LocalStorageAdapter(StorageInterface):
                                 return result
                         except json.JSONDecodeError:
                             continue
+            # 源文件中没有时查归档：按 summary 列组定位后只解压所在块
+            archive = get_result_archive(result_file)
+            _, summaries = archive.snapshot()
+            for offset, summary in summaries:
+                if self._extract_result_item_id(summary) == item_id:
+                    return archive.read_records([offset]).get(offset)
         return None
 
     def result_exists(
@@ -391,18 +509,37 @@ class LocalStorageAdapter(StorageInterface):
         for result_file in result_files:
             if not result_file.exists():
                 continue
-            with open(result_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    if not line.strip():
-                        continue
-                    try:
-                        result = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
-                    if self._extract_result_item_id(result) == normalized_item_id:
-                        return True
+            if get_result_index(result_file).contains_item(normalized_item_id):
+                return True
         return False
 
+    def filter_existing_item_ids(
+        self,
+        item_ids: List[str],
+        owner_id: Optional[str] = None,
+        task_name: Optional[str] = None
+    ) -> Set[str]:
+        """批量判重（每个结果文件的去重索引只同步一次）。"""
+        pending = {str(item_id or "").strip() for item_id in item_ids} - {""}
+        if not pending:
+            return set()
+
+        if DB_DEDUP_SCOPE() == "task" and task_name:
+            result_files = [self._get_result_file(task_name)]
+        else:
+            result_files = list(self.jsonl_dir.glob("*_full_data.jsonl"))
+
+        existing: Set[str] = set()
+        for result_file in result_files:
+            if not pending:
+                break
+            if not result_file.exists():
+                continue
+            found = get_result_index(result_file).existing_items(pending)
+            existing |= found
+            pending -= found
+        return existing
+
     def save_result_if_absent(
         self,
         task_name: str,
@@ -419,6 +556,39 @@ class LocalStorageAdapter(StorageInterface):
 
         saved = self.save_result(task_name, result_data, owner_id=owner_id)
         return saved, True
+
+    def save_results_if_absent(
+        self,
+        task_name: str,
+        results: List[Dict[str, Any]],
+        owner_id: Optional[str] = None
+    ) -> List[Tuple[Optional[Dict[str, Any]], bool]]:
+        """批量幂等保存结果（一次判重 + 一次追加写入 + 一次索引同步）。"""
+        outcomes: List[Tuple[Optional[Dict[str, Any]], bool]] = [(None, False)] * len(results)
+        item_ids = [self._extract_result_item_id(result_data) for result_data in results]
+        existing = self.filter_existing_item_ids(item_ids, owner_id=owner_id, task_name=task_name)
+
+        to_write: List[Tuple[int, Dict[str, Any]]] = []
+        seen_item_ids = set(existing)
+        for index, (result_data, item_id) in enumerate(zip(results, item_ids)):
+            if not item_id or item_id in seen_item_ids:
+                continue
+            seen_item_ids.add(item_id)
+            to_write.append((index, self._normalize_result_item_id(result_data, item_id)))
+
+        if not to_write:
+            return outcomes
+
+        result_file = self._get_result_file(task_name)
+        payload = "".join(json.dumps(record, ensure_ascii=False) + '\n' for _, record in to_write)
+        with result_file_lock(result_file), open(result_file, 'a', encoding='utf-8') as f:
+            f.write(payload)
+        get_result_index(result_file).sync()
+        refresh_result_search_index(result_file)
+
+        for index, record in to_write:
+            outcomes[index] = (record, True)
+        return outcomes
     
     def delete_results(
         self, 
@@ -433,32 +603,73 @@ class LocalStorageAdapter(StorageInterface):
             return 0
         
         if item_ids is None:
-            # 删除所有
-            result_file.unlink()
+            # 删除所有（含归档）
+            with result_file_lock(result_file):
+                result_file.unlink()
+                get_result_archive(result_file).delete()
+            get_result_index(result_file).sync()
+            refresh_result_search_index(result_file)
             return -1  # 表示删除了文件
         
         # 筛选保留的结果
         kept = []
         deleted = 0
         
-        with open(result_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                if line.strip():
-                    try:
-                        result = json.loads(line)
-                        result_item_id = result.get("商品信息", {}).get("商品ID")
-                        if result_item_id in item_ids:
-                            deleted += 1
-                        else:
+        with result_file_lock(result_file):
+            with open(result_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        try:
+                            result = json.loads(line)
+                            result_item_id = result.get("商品信息", {}).get("商品ID")
+                            if result_item_id in item_ids:
+                                deleted += 1
+                            else:
+                                kept.append(line)
+                        except json.JSONDecodeError:
                             kept.append(line)
-                    except json.JSONDecodeError:
-                        kept.append(line)
-        
-        # 重写文件
-        with open(result_file, 'w', encoding='utf-8') as f:
-            f.writelines(kept)
+            
+            # 重写文件
+            tmp_path = result_file.with_suffix(result_file.suffix + ".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.writelines(kept)
+            os.replace(tmp_path, result_file)
+            deleted += get_result_archive(result_file).remove_records(
+                lambda summary: summary.get("商品信息", {}).get("商品ID") in item_ids
+            )
+        get_result_index(result_file).rebuild()
+        refresh_result_search_index(result_file, rebuild=True)
         
         return deleted
+
+    def update_result_scores(
+        self,
+        task_name: str,
+        scores: Dict[str, Dict[str, Any]],
+        owner_id: Optional[str] = None
+    ) -> int:
+        """批量回写重算后的评分（整文件重写一次）"""
+        result_file = self._get_result_file(task_name)
+        if not scores or not result_file.exists():
+            return 0
+        return rewrite_result_scores(result_file, scores)
+
+    def iter_result_batches(
+        self,
+        task_name: str,
+        owner_id: Optional[str] = None,
+        batch_size: int = 500
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """按批遍历结果文件（含归档），整个遍历只读取一遍文件"""
+        batch_size = max(1, int(batch_size))
+        batch: List[Dict[str, Any]] = []
+        for record in iter_result_records(self._get_result_file(task_name)):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
     
     # ============== 贝叶斯配置管理 ==============
     
@@ -486,6 +697,15 @@ class LocalStorageAdapter(StorageInterface):
             with open(bayes_file, 'r', encoding='utf-8') as f:
                 return json.load(f)
         return None
+
+    def get_bayes_profile_revision(self, version: str, owner_id: Optional[str] = None) -> Optional[str]:
+        """获取贝叶斯配置修订标识（样本随配置文件保存，取文件 mtime 与大小）"""
+        bayes_file = self._get_bayes_file(str(version or "").replace(".json", ""))
+        try:
+            stat = bayes_file.stat()
+        except OSError:
+            return None
+        return f"{stat.st_mtime_ns}:{stat.st_size}"
     
     def save_bayes_profile(self, profile: Dict[str, Any], owner_id: Optional[str] = None) -> Dict[str, Any]:
         """保存贝叶斯配置"""
@@ -494,6 +714,7 @@ class LocalStorageAdapter(StorageInterface):
         
         with open(bayes_file, 'w', encoding='utf-8') as f:
             json.dump(profile, f, ensure_ascii=False, indent=2)
+        invalidate_bayes_model_cache(version)
         
         return profile
     
@@ -518,6 +739,7 @@ class LocalStorageAdapter(StorageInterface):
         if not bayes_file.exists():
             return False
         bayes_file.unlink()
+        invalidate_bayes_model_cache(bayes_file.stem)
         return True
 
     # ============== Prompt 模板管理 ==============
@@ -632,34 +854,48 @@ class LocalStorageAdapter(StorageInterface):
     
     def add_bayes_sample(self, sample: Dict[str, Any], owner_id: Optional[str] = None) -> Dict[str, Any]:
         """添加贝叶斯样本"""
-        profile_version = sample.get("profile_version", "bayes_v1")
-        profile = self.get_bayes_profile(profile_version) or {"version": profile_version, "_samples": {"可信": [], "不可信": []}}
-        
-        if "_samples" not in profile:
-            profile["_samples"] = {"可信": [], "不可信": []}
-        
-        label = sample.get("label", 1)
-        category = "可信" if label == 1 else "不可信"
-        
-        if category not in profile["_samples"]:
-            profile["_samples"][category] = []
-        
-        # 添加样本
-        new_sample = {
-            "id": sample.get("id") or generate_uuid(),
-            "name": sample.get("name", "用户反馈样本"),
-            "vector": sample.get("vector", []),
-            "label": label,
-            "source": sample.get("source", "user"),
-            "item_id": sample.get("item_id"),
-            "note": sample.get("note"),
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        profile["_samples"][category].append(new_sample)
-        self.save_bayes_profile(profile)
-        
-        return new_sample
+        return self.add_bayes_samples([sample], owner_id=owner_id)[0]
+
+    def add_bayes_samples(self, samples: List[Dict[str, Any]], owner_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """批量添加贝叶斯样本：按配置版本分组，每个配置文件只读写一次"""
+        created: List[Dict[str, Any]] = []
+        profiles: Dict[str, Dict[str, Any]] = {}
+        timestamp = datetime.now().isoformat()
+
+        for sample in samples:
+            profile_version = sample.get("profile_version", "bayes_v1")
+            profile = profiles.get(profile_version)
+            if profile is None:
+                profile = self.get_bayes_profile(profile_version) or {"version": profile_version, "_samples": {"可信": [], "不可信": []}}
+                if "_samples" not in profile:
+                    profile["_samples"] = {"可信": [], "不可信": []}
+                profiles[profile_version] = profile
+
+            label = sample.get("label", 1)
+            category = "可信" if label == 1 else "不可信"
+
+            if category not in profile["_samples"]:
+                profile["_samples"][category] = []
+
+            # 添加样本
+            new_sample = {
+                "id": sample.get("id") or generate_uuid(),
+                "name": sample.get("name", "用户反馈样本"),
+                "vector": sample.get("vector", []),
+                "label": label,
+                "source": sample.get("source", "user"),
+                "item_id": sample.get("item_id"),
+                "note": sample.get("note"),
+                "timestamp": timestamp
+            }
+
+            profile["_samples"][category].append(new_sample)
+            created.append(new_sample)
+
+        for profile in profiles.values():
+            self.save_bayes_profile(profile)
+
+        return created
     
     def delete_bayes_sample(self, sample_id: str, owner_id: Optional[str] = None) -> bool:
         """删除贝叶斯样本（本地模式按 id 或 item_id 删除）"""
@@ -688,6 +924,7 @@ class LocalStorageAdapter(StorageInterface):
                 if modified:
                     with open(bayes_file, 'w', encoding='utf-8') as f:
                         json.dump(profile, f, ensure_ascii=False, indent=2)
+                    invalidate_bayes_model_cache(profile.get("version", bayes_file.stem))
                     return True
             except (json.JSONDecodeError, IOError):
                 continue
@@ -769,6 +1006,7 @@ class LocalStorageAdapter(StorageInterface):
                 if modified:
                     with open(bayes_file, 'w', encoding='utf-8') as f:
                         json.dump(profile, f, ensure_ascii=False, indent=2)
+                    invalidate_bayes_model_cache(profile.get("version", bayes_file.stem))
                     return True
             except (json.JSONDecodeError, IOError):
                 continue
@@ -1014,6 +1252,121 @@ class LocalStorageAdapter(StorageInterface):
         
         return True
     
+    # ============== 卖家信息缓存 ==============
+
+    def _get_seller_cache_file(self, seller_id: str) -> Optional[Path]:
+        """获取卖家缓存文件路径，非法ID返回None"""
+        safe_id = "".join(c for c in str(seller_id or "").strip() if c.isalnum() or c in "_-")
+        if not safe_id:
+            return None
+        return self.seller_cache_dir / f"{safe_id}.json"
+
+    def get_seller_profile_cache(self, seller_id: str, max_age_seconds: int) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """获取未过期的卖家信息缓存（本地模式按文件存储）"""
+        cache_file = self._get_seller_cache_file(seller_id)
+        if cache_file is None or max_age_seconds <= 0 or not cache_file.exists():
+            return None
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            fetched_at = datetime.fromisoformat(str(cached.get("fetched_at")))
+        except (json.JSONDecodeError, IOError, ValueError, TypeError, AttributeError):
+            return None
+        if (datetime.now() - fetched_at).total_seconds() > max_age_seconds:
+            return None
+        profile = cached.get("profile")
+        return (fetched_at.timestamp(), profile) if isinstance(profile, dict) else None
+
+    def save_seller_profile_cache(self, seller_id: str, profile: Dict[str, Any]) -> bool:
+        """写入卖家信息缓存（先写临时文件再替换，避免并发任务读到半截内容）"""
+        cache_file = self._get_seller_cache_file(seller_id)
+        if cache_file is None or not isinstance(profile, dict):
+            return False
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(
+                {"seller_id": str(seller_id), "fetched_at": datetime.now().isoformat(), "profile": profile},
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_file, cache_file)
+        return True
+
+    def purge_seller_profile_cache(self, max_age_seconds: int) -> int:
+        """删除过期的卖家信息缓存文件（按文件修改时间，即写入时间；含中断残留的临时文件）"""
+        if max_age_seconds <= 0 or not self.seller_cache_dir.exists():
+            return 0
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for cache_file in self.seller_cache_dir.iterdir():
+            if cache_file.suffix not in (".json", ".tmp"):
+                continue
+            try:
+                if cache_file.stat().st_mtime < cutoff:
+                    cache_file.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+    
+    # ============== AI 分析结果缓存 ==============
+
+    def get_ai_analysis_cache(self, cache_key: str, max_age_seconds: int) -> Optional[Dict[str, Any]]:
+        """获取未过期的 AI 分析结果（本地模式存储在 cache/ai_analysis_cache.db）"""
+        return self.ai_analysis_cache.get(cache_key, max_age_seconds)
+
+    def save_ai_analysis_cache(
+        self,
+        cache_key: str,
+        analysis: Dict[str, Any],
+        model_name: str,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0
+    ) -> bool:
+        """写入 AI 分析结果缓存"""
+        return self.ai_analysis_cache.save(cache_key, analysis, model_name, prompt_tokens, completion_tokens)
+
+    def purge_ai_analysis_cache(self, max_age_seconds: int) -> int:
+        """清理过期的 AI 分析结果缓存"""
+        return self.ai_analysis_cache.purge(max_age_seconds)
+
+    def get_ai_analysis_cache_stats(self) -> Dict[str, int]:
+        """统计 AI 分析结果缓存"""
+        return self.ai_analysis_cache.stats()
+    
+    # ============== 通知发件箱 ==============
+    
+    def enqueue_notifications(self, events: List[Dict[str, Any]]) -> int:
+        """写入待发送的通知事件（本地模式存储在 state/notification_outbox.db）"""
+        return self.notification_outbox.enqueue(events)
+    
+    def claim_notifications(
+        self,
+        limit: int,
+        lease_seconds: int,
+        owner_id: Optional[str] = None,
+        task_name: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """领取到期的通知事件并加租约"""
+        return self.notification_outbox.claim(limit, lease_seconds, owner_id=owner_id, task_name=task_name)
+    
+    def complete_notifications(self, event_ids: List[str]) -> int:
+        """确认通知已送达"""
+        return self.notification_outbox.complete(event_ids)
+    
+    def retry_notification(self, event_id: str, error: str, next_attempt_at: Optional[datetime]) -> None:
+        """记录一次发送失败"""
+        self.notification_outbox.retry(event_id, error, next_attempt_at)
+
+    def purge_dead_notifications(self, older_than: datetime) -> int:
+        """清理过期的 dead 通知事件"""
+        return self.notification_outbox.purge_dead(older_than)
+    
+    def get_notification_outbox_stats(self) -> Dict[str, int]:
+        """按状态统计发件箱事件数量"""
+        return self.notification_outbox.stats()
+    
     # ============== 审计日志 ==============
     
     def log_audit(
@@ -0,0 +1,141 @@
+"""
+Local AI Analysis Cache - 本地模式 AI 分析结果缓存
+
+基于 SQLite（cache/ai_analysis_cache.db），采集子进程写入/命中，Web 进程读取统计。
+命中/未命中次数与命中节省的 token 在读取时累计到 ai_analysis_cache_stats，
+过期条目被清理后统计仍然保留。
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ai_analysis_cache (
+    cache_key TEXT PRIMARY KEY,
+    model_name TEXT,
+    analysis TEXT NOT NULL,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ai_cache_created ON ai_analysis_cache (created_at);
+CREATE TABLE IF NOT EXISTS ai_analysis_cache_stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+_STAT_NAMES = ("hits", "misses", "saved_tokens")
+
+
+class LocalAIAnalysisCache:
+    """SQLite AI 分析结果缓存。"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        if not self._initialized:
+            with self._lock:
+                if not self._initialized:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(_SCHEMA)
+                    self._initialized = True
+        return conn
+
+    def get(self, cache_key: str, max_age_seconds: int) -> Optional[Dict[str, Any]]:
+        if not cache_key or max_age_seconds <= 0:
+            return None
+        min_created_at = time.time() - max_age_seconds
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT analysis, prompt_tokens + completion_tokens AS tokens "
+                "FROM ai_analysis_cache WHERE cache_key = ? AND created_at >= ?",
+                (cache_key, min_created_at),
+            ).fetchone()
+            if row is None:
+                self._bump(conn, misses=1)
+                return None
+            self._bump(conn, hits=1, saved_tokens=int(row["tokens"] or 0))
+        finally:
+            conn.close()
+        try:
+            analysis = json.loads(row["analysis"])
+        except (TypeError, ValueError):
+            return None
+        return analysis if isinstance(analysis, dict) else None
+
+    def save(
+        self,
+        cache_key: str,
+        analysis: Dict[str, Any],
+        model_name: str,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+    ) -> bool:
+        if not cache_key or not isinstance(analysis, dict):
+            return False
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT INTO ai_analysis_cache "
+                "(cache_key, model_name, analysis, prompt_tokens, completion_tokens, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(cache_key) DO UPDATE SET model_name = excluded.model_name, "
+                "analysis = excluded.analysis, prompt_tokens = excluded.prompt_tokens, "
+                "completion_tokens = excluded.completion_tokens, created_at = excluded.created_at",
+                (
+                    cache_key,
+                    model_name,
+                    json.dumps(analysis, ensure_ascii=False),
+                    int(prompt_tokens or 0),
+                    int(completion_tokens or 0),
+                    time.time(),
+                ),
+            )
+        finally:
+            conn.close()
+        return True
+
+    def purge(self, max_age_seconds: int) -> int:
+        """删除超过有效期的条目，返回删除条数。"""
+        if max_age_seconds <= 0:
+            return 0
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "DELETE FROM ai_analysis_cache WHERE created_at < ?", (time.time() - max_age_seconds,)
+            )
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        conn = self._connect()
+        try:
+            entries = conn.execute("SELECT COUNT(*) FROM ai_analysis_cache").fetchone()[0]
+            counters = dict(conn.execute("SELECT name, value FROM ai_analysis_cache_stats").fetchall())
+        finally:
+            conn.close()
+        stats = {name: int(counters.get(name, 0)) for name in _STAT_NAMES}
+        stats["entries"] = int(entries)
+        return stats
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, **deltas: int) -> None:
+        conn.executemany(
+            "INSERT INTO ai_analysis_cache_stats (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            [(name, delta) for name, delta in deltas.items() if delta],
+        )
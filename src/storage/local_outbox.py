@@ -0,0 +1,199 @@
+"""
+Local Notification Outbox - 本地模式通知发件箱
+
+基于 SQLite（state/notification_outbox.db），采集子进程与 Web 进程可同时读写：
+领取事件在 BEGIN IMMEDIATE 事务内完成并加租约，避免同一事件被重复发送。
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notification_outbox (
+    id TEXT PRIMARY KEY,
+    owner_id TEXT NOT NULL DEFAULT '',
+    task_name TEXT,
+    event_type TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    config_id TEXT,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    next_attempt_at REAL NOT NULL,
+    locked_until REAL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON notification_outbox (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_outbox_owner_task ON notification_outbox (owner_id, task_name);
+"""
+
+
+def _to_timestamp(value: Any) -> float:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    return time.time()
+
+
+def _from_timestamp(value: Optional[float]) -> Optional[str]:
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value, tz=timezone.utc).isoformat()
+
+
+class LocalNotificationOutbox:
+    """SQLite 通知发件箱。"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        if not self._initialized:
+            with self._lock:
+                if not self._initialized:
+                    self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(_SCHEMA)
+                    self._initialized = True
+        return conn
+
+    def _row_to_event(self, row: sqlite3.Row) -> Dict[str, Any]:
+        event = dict(row)
+        event["payload"] = json.loads(event["payload"])
+        for key in ("next_attempt_at", "locked_until", "created_at"):
+            event[key] = _from_timestamp(event.get(key))
+        return event
+
+    def enqueue(self, events: List[Dict[str, Any]]) -> int:
+        if not events:
+            return 0
+        now = time.time()
+        rows = [
+            (
+                str(uuid.uuid4()),
+                str(event.get("owner_id") or ""),
+                event.get("task_name"),
+                event["event_type"],
+                event["channel"],
+                event.get("config_id") or None,
+                json.dumps(event.get("payload") or {}, ensure_ascii=False),
+                _to_timestamp(event.get("next_attempt_at")) if event.get("next_attempt_at") else now,
+                now,
+            )
+            for event in events
+        ]
+        conn = self._connect()
+        try:
+            conn.executemany(
+                "INSERT INTO notification_outbox "
+                "(id, owner_id, task_name, event_type, channel, config_id, payload, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        finally:
+            conn.close()
+        return len(rows)
+
+    def claim(
+        self,
+        limit: int,
+        lease_seconds: int,
+        owner_id: Optional[str] = None,
+        task_name: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        now = time.time()
+        sql = (
+            "SELECT * FROM notification_outbox WHERE "
+            "((status = 'pending' AND next_attempt_at <= ?) OR (status = 'processing' AND locked_until < ?))"
+        )
+        params: List[Any] = [now, now]
+        if owner_id is not None:
+            sql += " AND owner_id = ?"
+            params.append(str(owner_id))
+        if task_name is not None:
+            sql += " AND task_name = ?"
+            params.append(task_name)
+        sql += " ORDER BY next_attempt_at LIMIT ?"
+        params.append(max(1, int(limit)))
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(sql, params).fetchall()
+                if rows:
+                    conn.executemany(
+                        "UPDATE notification_outbox SET status = 'processing', locked_until = ? WHERE id = ?",
+                        [(now + lease_seconds, row["id"]) for row in rows],
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+        return [self._row_to_event(row) for row in rows]
+
+    def complete(self, event_ids: List[str]) -> int:
+        if not event_ids:
+            return 0
+        conn = self._connect()
+        try:
+            cursor = conn.executemany(
+                "DELETE FROM notification_outbox WHERE id = ?",
+                [(str(event_id),) for event_id in event_ids],
+            )
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    def retry(self, event_id: str, error: str, next_attempt_at: Optional[datetime]) -> None:
+        conn = self._connect()
+        try:
+            if next_attempt_at is None:
+                conn.execute(
+                    "UPDATE notification_outbox SET status = 'dead', attempts = attempts + 1, "
+                    "last_error = ?, locked_until = NULL WHERE id = ?",
+                    (error, str(event_id)),
+                )
+            else:
+                conn.execute(
+                    "UPDATE notification_outbox SET status = 'pending', attempts = attempts + 1, "
+                    "last_error = ?, next_attempt_at = ?, locked_until = NULL WHERE id = ?",
+                    (error, _to_timestamp(next_attempt_at), str(event_id)),
+                )
+        finally:
+            conn.close()
+
+    def purge_dead(self, older_than: datetime) -> int:
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "DELETE FROM notification_outbox WHERE status = 'dead' AND created_at < ?",
+                (_to_timestamp(older_than),),
+            )
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT status, COUNT(*) AS count FROM notification_outbox GROUP BY status").fetchall()
+        finally:
+            conn.close()
+        return {row["status"]: int(row["count"]) for row in rows}
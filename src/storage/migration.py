@@ -20,6 +20,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from src.storage import get_storage, reset_storage
 from src.storage.local_adapter import LocalStorageAdapter
 from src.storage.postgres_adapter import PostgresAdapter
+from src.storage.result_archive import get_result_archive
 from src.storage.utils import hash_password, generate_uuid
 from src.config import get_env_value, WEB_USERNAME, WEB_PASSWORD
 
@@ -224,6 +225,7 @@ class DataMigrator:
         self.log("Creating database tables...")
         if not self.dry_run:
             self.postgres.create_tables()
+            self.postgres.ensure_result_indexes()
         self.log("Database tables created successfully.")
     
     def create_migration_owner(self, username: str = None, password: str = None) -> Optional[str]:
@@ -332,27 +334,30 @@ class DataMigrator:
                 )
                 continue
 
+            def _iter_file_results():
+                # 已归档的旧记录在前，再读源文件
+                yield from get_result_archive(result_file).iter_records()
+                with open(result_file, "r", encoding="utf-8", errors="ignore") as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            yield json.loads(line)
+                        except json.JSONDecodeError:
+                            self.stats["results"]["errors"] += 1
+
             file_results = 0
-            with open(result_file, "r", encoding="utf-8", errors="ignore") as f:
-                for line in f:
-                    if not line.strip():
-                        continue
-                    try:
-                        result = json.loads(line)
-                    except json.JSONDecodeError:
-                        self.stats["results"]["errors"] += 1
-                        continue
-
-                    try:
-                        if not self.dry_run:
-                            self.postgres.save_result(target_task_name, result, owner_id)
-                        self.stats["results"]["migrated"] += 1
-                        total_results += 1
-                        file_results += 1
-                    except Exception as e:
-                        item_id = result.get("商品信息", {}).get("商品ID", "unknown")
-                        self.log_verbose(f"Error migrating result {item_id}: {e}")
-                        self.stats["results"]["errors"] += 1
+            for result in _iter_file_results():
+                try:
+                    if not self.dry_run:
+                        self.postgres.save_result(target_task_name, result, owner_id)
+                    self.stats["results"]["migrated"] += 1
+                    total_results += 1
+                    file_results += 1
+                except Exception as e:
+                    item_id = result.get("商品信息", {}).get("商品ID", "unknown")
+                    self.log_verbose(f"Error migrating result {item_id}: {e}")
+                    self.stats["results"]["errors"] += 1
 
             self.log(f"  Migrated {file_results} results from {result_file.name}")
 
@@ -9,7 +9,7 @@ from datetime import datetime
 from typing import List, Optional
 
 from sqlalchemy import (
-    Column, String, Text, Boolean, Float, Integer, 
+    Column, String, Text, Boolean, Float, Integer, BigInteger,
     ForeignKey, Index, UniqueConstraint, event
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY, TIMESTAMP
@@ -187,6 +187,13 @@ class MonitoringResult(Base):
         UniqueConstraint('owner_id', 'item_id', name='uq_result_owner_item'),
         Index('idx_result_owner', 'owner_id'),
         Index('idx_result_task', 'task_id'),
+        # 结果列表按抓取时间倒序分页（item_id 作为游标分页的次序键）；已有库由 PostgresAdapter 启动时补建
+        Index('idx_result_owner_task_crawled', owner_id, task_id, crawled_at.desc(), item_id.desc()),
+        Index(
+            'idx_result_recommended',
+            owner_id, task_id, crawled_at.desc(), item_id.desc(),
+            postgresql_where=is_recommended,
+        ),
     )
 
 
@@ -380,6 +387,73 @@ class UserPlatformAccount(Base):
     )
 
 
+# ============== 卖家信息缓存 ==============
+
+class SellerProfileCache(Base):
+    """卖家信息缓存表（公开数据，跨用户共享）"""
+    __tablename__ = 'seller_profile_cache'
+
+    seller_id = Column(String(64), primary_key=True)
+    profile = Column(JSONB, nullable=False)
+    fetched_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index('idx_seller_profile_fetched', 'fetched_at'),
+    )
+
+
+# ============== AI 分析结果缓存 ==============
+
+class AIAnalysisCache(Base):
+    """AI 分析结果缓存表（键为商品内容、提示词、模型与多模态开关的哈希，跨用户共享）"""
+    __tablename__ = 'ai_analysis_cache'
+
+    cache_key = Column(String(64), primary_key=True)
+    model_name = Column(String(255), nullable=True)
+    analysis = Column(JSONB, nullable=False)
+    prompt_tokens = Column(Integer, default=0, nullable=False)
+    completion_tokens = Column(Integer, default=0, nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index('idx_ai_cache_created', 'created_at'),
+    )
+
+
+class AIAnalysisCacheStat(Base):
+    """AI 分析结果缓存累计统计（hits / misses / saved_tokens，清理过期条目后仍保留）"""
+    __tablename__ = 'ai_analysis_cache_stats'
+
+    name = Column(String(32), primary_key=True)
+    value = Column(BigInteger, default=0, nullable=False)
+
+
+# ============== 通知发件箱 ==============
+
+class NotificationOutbox(Base):
+    """通知发件箱表（每行是一条待发送到某个通知目标的事件，发送成功后删除）"""
+    __tablename__ = 'notification_outbox'
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    owner_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=True)
+    task_name = Column(String(255), nullable=True)
+    event_type = Column(String(50), nullable=False)  # 'product' | 'task_completion'
+    channel = Column(String(50), nullable=False)
+    config_id = Column(String(64), nullable=True)  # 用户通知配置ID（重发时按ID重新解析目标，不落地密钥）
+    payload = Column(JSONB, nullable=False)
+    status = Column(String(20), nullable=False, default='pending')  # 'pending' | 'processing' | 'dead'
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+    locked_until = Column(TIMESTAMP(timezone=True), nullable=True)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index('idx_outbox_due', 'status', 'next_attempt_at'),
+        Index('idx_outbox_owner_task', 'owner_id', 'task_name'),
+    )
+
+
 # ============== 审计日志 ==============
 
 class AuditLog(Base):
@@ -6,14 +6,15 @@ PostgreSQL Storage Adapter - PostgreSQL 数据库存储适配器
 
 import hashlib
 import json
+import time
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Iterator, Set, Tuple
 from contextlib import contextmanager
 from pathlib import Path
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from sqlalchemy import create_engine, and_, or_
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import create_engine, and_, or_, any_, bindparam, case, cast, func, text, tuple_, update, Float, String
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.orm import sessionmaker, Session as DBSession
 
 from .interface import StorageInterface
@@ -21,13 +22,28 @@ from .models import (
     Base, User, Session, Task, MonitoringResult,
     BayesProfile, BayesSample, UserFeedback, AiCriteria, PromptTemplate,
     UserApiConfig, UserNotificationConfig, UserPlatformAccount, AuditLog,
-    UserGroup, UserGroupMember, GroupPermission
+    UserGroup, UserGroupMember, GroupPermission, SellerProfileCache, AIAnalysisCache, AIAnalysisCacheStat,
+    NotificationOutbox
 )
 from .utils import (
     hash_password, verify_password, hash_token, generate_uuid,
     encrypt_sensitive, decrypt_sensitive
 )
-from src.config import WEB_USERNAME, WEB_PASSWORD
+from .async_storage import storage_metrics
+from .result_index_migration import RESULT_SEARCH_FUNCTION_SIGNATURE, migrate_result_indexes
+from .result_query import decode_result_cursor, encode_result_cursor
+from src.config import (
+    WEB_USERNAME, WEB_PASSWORD,
+    STORAGE_DB_POOL_SIZE, STORAGE_DB_MAX_OVERFLOW, STORAGE_DB_POOL_TIMEOUT,
+)
+from src.bayes import invalidate_bayes_model_cache
+from src.logging_config import get_logger
+from .auth_cache import invalidate_auth_cache
+
+logger = get_logger(__name__, service="system")
+
+# 重新检测 pg_trgm / 检索函数是否可用的间隔（秒）；Web 启动时的索引迁移完成后立即重新检测
+RESULT_SEARCH_SUPPORT_TTL_SECONDS = 300
 
 
 class PostgresAdapter(StorageInterface):
@@ -94,14 +110,19 @@ class PostgresAdapter(StorageInterface):
         """
         self.engine = create_engine(
             database_url,
-            pool_size=5,
-            max_overflow=10,
-            pool_timeout=30,
+            pool_size=STORAGE_DB_POOL_SIZE(),
+            max_overflow=STORAGE_DB_MAX_OVERFLOW(),
+            pool_timeout=STORAGE_DB_POOL_TIMEOUT(),
             pool_recycle=1800,
             echo=echo
         )
+        storage_metrics.instrument_engine(self.engine)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         self.project_root = Path(__file__).resolve().parent.parent.parent
+        # 检索函数存在时关键词筛选走 idx_result_search_trgm，pg_trgm 可用时支持按相关度排序（由 _refresh_result_search_support 检测）
+        self._search_function_available = False
+        self._trgm_available = False
+        self._search_support_checked_at: Optional[float] = None
     
     def create_tables(self):
         """创建所有数据库表"""
@@ -112,6 +133,32 @@ class PostgresAdapter(StorageInterface):
             self._ensure_system_ai_criteria(session)
             self._ensure_system_bayes_profiles(session)
             self._ensure_default_super_admin(session)
+
+    def ensure_result_indexes(self) -> bool:
+        """一次性补建结果查询索引（Web 启动或手动迁移时调用，采集进程不调用）。"""
+        migrated = migrate_result_indexes(self.engine)
+        self._search_support_checked_at = None
+        return migrated
+
+    def _refresh_result_search_support(self) -> None:
+        """检测检索函数与 pg_trgm 是否可用，按间隔重新检测。"""
+        now = time.monotonic()
+        checked_at = self._search_support_checked_at
+        if checked_at is not None and now - checked_at < RESULT_SEARCH_SUPPORT_TTL_SECONDS:
+            return
+        try:
+            with self.engine.connect() as conn:
+                row = conn.execute(
+                    text(
+                        "SELECT to_regprocedure(:signature) IS NOT NULL, "
+                        "EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')"
+                    ),
+                    {"signature": RESULT_SEARCH_FUNCTION_SIGNATURE},
+                ).first()
+            self._search_function_available, self._trgm_available = bool(row[0]), bool(row[1])
+        except Exception:
+            self._search_function_available, self._trgm_available = False, False
+        self._search_support_checked_at = now
     
     def drop_tables(self):
         """删除所有数据库表（危险操作，仅用于测试）"""
@@ -122,6 +169,10 @@ class PostgresAdapter(StorageInterface):
         """获取数据库会话的上下文管理器"""
         session = self.SessionLocal()
         try:
+            # 预先取连接以统计连接池等待耗时
+            wait_started_at = time.perf_counter()
+            session.connection()
+            storage_metrics.pool_wait.record(time.perf_counter() - wait_started_at)
             yield session
             session.commit()
         except Exception:
@@ -578,7 +629,9 @@ class PostgresAdapter(StorageInterface):
                     setattr(user, key, value)
             
             session.flush()
-            return self._to_dict(user, exclude=['password_hash'])
+            updated = self._to_dict(user, exclude=['password_hash'])
+        invalidate_auth_cache(user_id)
+        return updated
     
     def list_users(self, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
         """获取用户列表"""
@@ -590,10 +643,11 @@ class PostgresAdapter(StorageInterface):
         """删除用户"""
         with self.get_session() as session:
             user = session.query(User).filter(User.id == user_id).first()
-            if user:
-                session.delete(user)
-                return True
-            return False
+            if not user:
+                return False
+            session.delete(user)
+        invalidate_auth_cache(user_id)
+        return True
 
     # ============== 用户组管理 ==============
 
@@ -703,7 +757,9 @@ class PostgresAdapter(StorageInterface):
 
             session.flush()
             permissions = session.query(GroupPermission).filter(GroupPermission.group_id == group.id).all()
-            return self._build_group_payload(group, permissions)
+            updated = self._build_group_payload(group, permissions)
+        invalidate_auth_cache()
+        return updated
 
     def delete_user_group(self, group_id: str) -> bool:
         """删除用户组"""
@@ -714,7 +770,8 @@ class PostgresAdapter(StorageInterface):
             if group.is_system:
                 raise ValueError("系统预置组不可删除")
             session.delete(group)
-            return True
+        invalidate_auth_cache()
+        return True
 
     def get_user_groups(self, user_id: str) -> List[Dict[str, Any]]:
         """获取用户所属用户组"""
@@ -760,7 +817,8 @@ class PostgresAdapter(StorageInterface):
             session.query(UserGroupMember).filter(UserGroupMember.user_id == user_id).delete()
             for group_id in normalized_group_ids:
                 session.add(UserGroupMember(user_id=user_id, group_id=group_id))
-            return True
+        invalidate_auth_cache(user_id)
+        return True
 
     def get_group_permissions(self, group_id: str) -> List[Dict[str, Any]]:
         """获取用户组权限"""
@@ -794,7 +852,8 @@ class PostgresAdapter(StorageInterface):
                 row = permission_map.get(category)
                 if row:
                     row.enabled = bool(categories.get(category))
-            return True
+        invalidate_auth_cache()
+        return True
     
     # ============== 会话管理 ==============
     
@@ -953,7 +1012,15 @@ class PostgresAdapter(StorageInterface):
     ) -> Dict[str, Any]:
         """构造监控结果入库载荷。"""
         task = self._get_task_by_name(session, task_name, owner_id)
-        task_id = task.id if task else None
+        return self._build_result_payload_for_task(task.id if task else None, result_data, owner_id)
+
+    def _build_result_payload_for_task(
+        self,
+        task_id: Optional[int],
+        result_data: Dict[str, Any],
+        owner_id: Optional[str],
+    ) -> Dict[str, Any]:
+        """按已解析的任务ID构造入库载荷（批量写入时任务只查一次）。"""
         item_id = self._extract_result_item_id(result_data)
 
         ai_analysis = result_data.get("ai_analysis") or result_data.get("AI分析") or {}
@@ -1052,6 +1119,163 @@ class PostgresAdapter(StorageInterface):
             
             results = query.order_by(MonitoringResult.crawled_at.desc()).offset(offset).limit(limit).all()
             return [self._result_to_legacy_format(r) for r in results]
+
+    @staticmethod
+    def _escape_like(value: str) -> str:
+        return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+    def _result_sort_expression(self, sort_by: str):
+        """结果排序表达式，口径与本地模式一致（价格去掉￥和千分位，无法解析按0处理）。"""
+        if sort_by == "publish_time":
+            return func.coalesce(MonitoringResult.product_info["发布时间"].astext, "0000-00-00 00:00")
+        if sort_by == "price":
+            price_text = func.trim(
+                func.replace(func.replace(MonitoringResult.product_info["当前售价"].astext, "￥", ""), ",", "")
+            )
+            return case(
+                (price_text.op("~")(r"^[0-9]+(\.[0-9]+)?$"), cast(price_text, Float)),
+                else_=0.0,
+            )
+        return MonitoringResult.crawled_at
+
+    def _filtered_results_query(
+        self,
+        session: DBSession,
+        task_ids: List[Any],
+        owner_id: Optional[str],
+        recommended_only: bool,
+        manual_keyword: Optional[str],
+    ):
+        query = session.query(MonitoringResult).filter(MonitoringResult.task_id.in_(task_ids))
+        if owner_id:
+            query = query.filter(MonitoringResult.owner_id == owner_id)
+        if recommended_only:
+            query = query.filter(MonitoringResult.is_recommended == True)
+        if manual_keyword:
+            pattern = f"%{self._escape_like(manual_keyword.lower())}%"
+            self._refresh_result_search_support()
+            if self._search_function_available:
+                query = query.filter(self._result_search_expression().like(pattern, escape="\\"))
+            else:
+                query = query.filter(self._inline_search_text().ilike(pattern, escape="\\"))
+        return query
+
+    def _result_search_expression(self):
+        """结果检索文本（已转小写），函数存在时与 idx_result_search_trgm 的索引表达式一致。"""
+        if self._search_function_available:
+            return func.result_search_text(MonitoringResult.product_info, MonitoringResult.ai_analysis)
+        return func.lower(self._inline_search_text())
+
+    @staticmethod
+    def _inline_search_text():
+        """检索函数缺失时的内联检索文本（未转小写，用 ILIKE 匹配，无法使用索引）。"""
+        fields = [
+            MonitoringResult.product_info[key].astext
+            for key in ("商品标题", "商品描述", "卖家昵称", "当前售价")
+        ]
+        fields.append(MonitoringResult.ai_analysis["reason"].astext)
+        return func.concat_ws("\n", *[func.coalesce(field, "") for field in fields])
+
+    def query_results(
+        self,
+        task_names: List[str],
+        owner_id: Optional[str] = None,
+        recommended_only: bool = False,
+        manual_keyword: Optional[str] = None,
+        sort_by: str = "crawl_time",
+        sort_order: str = "desc",
+        limit: int = 20,
+        offset: int = 0
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """分页查询结果（筛选/排序/分页下推到 SQL）"""
+        if not task_names:
+            return [], 0
+
+        with self.get_session() as session:
+            task_query = session.query(Task.id, Task.task_name).filter(Task.task_name.in_(task_names))
+            if owner_id:
+                task_query = task_query.filter(Task.owner_id == owner_id)
+            task_name_by_id = {row.id: row.task_name for row in task_query.all()}
+            if not task_name_by_id:
+                return [], 0
+
+            query = self._filtered_results_query(
+                session, list(task_name_by_id.keys()), owner_id, recommended_only, manual_keyword
+            )
+            total = query.count()
+            if total == 0 or offset >= total:
+                return [], total
+
+            if sort_by == "relevance" and manual_keyword and self._trgm_available:
+                sort_expr = func.word_similarity(manual_keyword.lower(), self._result_search_expression())
+            else:
+                sort_expr = self._result_sort_expression(sort_by)
+            descending = sort_order == "desc"
+            query = query.order_by(
+                sort_expr.desc() if descending else sort_expr.asc(),
+                MonitoringResult.crawled_at.desc(),
+                MonitoringResult.id,
+            )
+            rows = query.offset(max(0, offset)).limit(max(1, limit)).all()
+
+            items = []
+            for row in rows:
+                item = self._result_to_legacy_format(row)
+                item["任务名称"] = task_name_by_id.get(row.task_id)
+                items.append(item)
+            return items, total
+
+    def query_results_keyset(
+        self,
+        task_names: List[str],
+        owner_id: Optional[str] = None,
+        recommended_only: bool = False,
+        manual_keyword: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """按 (crawled_at, item_id) 倒序游标分页，沿 idx_result_owner_task_crawled 索引顺序读取，不使用 OFFSET。"""
+        after = None
+        if cursor:
+            crawled_at_text, item_id = decode_result_cursor(cursor, 2)
+            try:
+                after = (datetime.fromisoformat(str(crawled_at_text)), str(item_id))
+            except ValueError as e:
+                raise ValueError("无效的分页游标") from e
+        if not task_names:
+            return [], None
+        limit = max(1, limit)
+
+        with self.get_session() as session:
+            task_query = session.query(Task.id, Task.task_name).filter(Task.task_name.in_(task_names))
+            if owner_id:
+                task_query = task_query.filter(Task.owner_id == owner_id)
+            task_name_by_id = {row.id: row.task_name for row in task_query.all()}
+            if not task_name_by_id:
+                return [], None
+
+            query = self._filtered_results_query(
+                session, list(task_name_by_id.keys()), owner_id, recommended_only, manual_keyword
+            )
+            query = query.filter(MonitoringResult.crawled_at.isnot(None))
+            if after is not None:
+                query = query.filter(tuple_(MonitoringResult.crawled_at, MonitoringResult.item_id) < after)
+            rows = query.order_by(
+                MonitoringResult.crawled_at.desc(),
+                MonitoringResult.item_id.desc(),
+            ).limit(limit + 1).all()
+
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                last = rows[-1]
+                next_cursor = encode_result_cursor([last.crawled_at.isoformat(), last.item_id])
+            items = []
+            for row in rows:
+                item = self._result_to_legacy_format(row)
+                item["任务名称"] = task_name_by_id.get(row.task_id)
+                items.append(item)
+            return items, next_cursor
     
     def _result_to_legacy_format(self, result: MonitoringResult) -> Dict[str, Any]:
         """将结果转换为旧格式（保持兼容性）"""
@@ -1097,6 +1321,29 @@ class PostgresAdapter(StorageInterface):
 
             return query.first() is not None
 
+    def filter_existing_item_ids(
+        self,
+        item_ids: List[str],
+        owner_id: Optional[str] = None,
+        task_name: Optional[str] = None
+    ) -> Set[str]:
+        """批量判重：单条 item_id = ANY(:item_ids) 查询，判重范围与 result_exists 一致（按owner）。"""
+        normalized_ids = sorted({str(item_id or "").strip() for item_id in item_ids} - {""})
+        if not normalized_ids:
+            return set()
+
+        with self.get_session() as session:
+            query = session.query(MonitoringResult.item_id).filter(
+                MonitoringResult.item_id == any_(
+                    bindparam("item_ids", normalized_ids, type_=ARRAY(String))
+                )
+            )
+            if owner_id:
+                query = query.filter(MonitoringResult.owner_id == owner_id)
+            else:
+                query = query.filter(MonitoringResult.owner_id.is_(None))
+            return {row.item_id for row in query.all()}
+
     def save_result_if_absent(
         self,
         task_name: str,
@@ -1123,6 +1370,51 @@ class PostgresAdapter(StorageInterface):
             if not created:
                 return None, False
             return self._result_to_legacy_format(created), True
+
+    def save_results_if_absent(
+        self,
+        task_name: str,
+        results: List[Dict[str, Any]],
+        owner_id: Optional[str] = None
+    ) -> List[Tuple[Optional[Dict[str, Any]], bool]]:
+        """批量幂等保存：一条多行 INSERT ... ON CONFLICT DO NOTHING RETURNING，按输入顺序返回(结果, 是否新建)。"""
+        outcomes: List[Tuple[Optional[Dict[str, Any]], bool]] = [(None, False)] * len(results)
+        if not results:
+            return outcomes
+
+        with self.get_session() as session:
+            task = self._get_task_by_name(session, task_name, owner_id)
+            task_id = task.id if task else None
+
+            payloads: List[Dict[str, Any]] = []
+            index_by_item_id: Dict[str, int] = {}
+            for index, result_data in enumerate(results):
+                payload = self._build_result_payload_for_task(task_id, result_data, owner_id)
+                item_id = payload.get("item_id")
+                # 同批内重复的商品只保留第一条
+                if not item_id or item_id in index_by_item_id:
+                    continue
+                index_by_item_id[item_id] = index
+                payloads.append(payload)
+            if not payloads:
+                return outcomes
+
+            insert_stmt = (
+                insert(MonitoringResult)
+                .values(payloads)
+                .on_conflict_do_nothing(index_elements=["owner_id", "item_id"])
+                .returning(MonitoringResult.id)
+            )
+            inserted_ids = [row[0] for row in session.execute(insert_stmt).all()]
+            if not inserted_ids:
+                return outcomes
+
+            created_rows = session.query(MonitoringResult).filter(MonitoringResult.id.in_(inserted_ids)).all()
+            for row in created_rows:
+                index = index_by_item_id.get(row.item_id)
+                if index is not None:
+                    outcomes[index] = (self._result_to_legacy_format(row), True)
+            return outcomes
     
     def delete_results(
         self, 
@@ -1150,6 +1442,89 @@ class PostgresAdapter(StorageInterface):
             
             count = query.delete(synchronize_session=False)
             return count
+
+    def update_result_scores(
+        self,
+        task_name: str,
+        scores: Dict[str, Dict[str, Any]],
+        owner_id: Optional[str] = None
+    ) -> int:
+        """批量回写重算后的评分（按主键批量 UPDATE）"""
+        if not scores:
+            return 0
+
+        with self.get_session() as session:
+            task_query = session.query(Task).filter(Task.task_name == task_name)
+            if owner_id:
+                task_query = task_query.filter(Task.owner_id == owner_id)
+            task = task_query.first()
+            if not task:
+                return 0
+
+            query = session.query(
+                MonitoringResult.id, MonitoringResult.item_id, MonitoringResult.ai_analysis
+            ).filter(
+                MonitoringResult.task_id == task.id,
+                MonitoringResult.item_id.in_(list(scores.keys()))
+            )
+            if owner_id:
+                query = query.filter(MonitoringResult.owner_id == owner_id)
+
+            params = []
+            for row in query.all():
+                score = scores.get(row.item_id) or {}
+                values: Dict[str, Any] = {"id": row.id}
+                if "ml_precalc" in score:
+                    values["ml_precalc"] = score["ml_precalc"]
+                score_v2 = score.get("recommendation_score_v2")
+                if isinstance(score_v2, dict) and isinstance(row.ai_analysis, dict):
+                    ai_analysis = dict(row.ai_analysis)
+                    ai_analysis["recommendation_score_v2"] = score_v2
+                    values["ai_analysis"] = ai_analysis
+                    raw_score = score_v2.get("recommendation_score")
+                    if isinstance(raw_score, (int, float)):
+                        values["recommendation_score"] = float(raw_score)
+                if len(values) > 1:
+                    params.append(values)
+
+            if params:
+                session.execute(update(MonitoringResult), params)
+            return len(params)
+
+    def iter_result_batches(
+        self,
+        task_name: str,
+        owner_id: Optional[str] = None,
+        batch_size: int = 500
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """按 (crawled_at, id) 键集分页遍历任务结果，遍历期间新写入的记录不会导致跳过或重复"""
+        batch_size = max(1, int(batch_size))
+        with self.get_session() as session:
+            task_query = session.query(Task.id).filter(Task.task_name == task_name)
+            if owner_id:
+                task_query = task_query.filter(Task.owner_id == owner_id)
+            task_id = task_query.scalar()
+        if task_id is None:
+            return
+
+        after = None
+        while True:
+            with self.get_session() as session:
+                query = session.query(MonitoringResult).filter(MonitoringResult.task_id == task_id)
+                if owner_id:
+                    query = query.filter(MonitoringResult.owner_id == owner_id)
+                if after is not None:
+                    query = query.filter(tuple_(MonitoringResult.crawled_at, MonitoringResult.id) > after)
+                rows = query.order_by(
+                    MonitoringResult.crawled_at.asc(), MonitoringResult.id.asc()
+                ).limit(batch_size).all()
+                if not rows:
+                    return
+                after = tuple_(rows[-1].crawled_at, rows[-1].id)
+                batch = [self._result_to_legacy_format(row) for row in rows]
+            yield batch
+            if len(rows) < batch_size:
+                return
     
     # ============== 贝叶斯配置管理 ==============
     
@@ -1247,6 +1622,37 @@ class PostgresAdapter(StorageInterface):
             profile_dict.setdefault("_stats_mode", "auto_from_samples")
             profile_dict.setdefault("_min_variance", 1e-4)
             return profile_dict
+
+    def get_bayes_profile_revision(self, version: str, owner_id: Optional[str] = None) -> Optional[str]:
+        """获取贝叶斯配置修订标识（配置 updated_at + 样本数量与最新时间，单次轻量查询）。"""
+        normalized_version = str(version or "").replace(".json", "").strip()
+        if not normalized_version:
+            return None
+
+        with self.get_session() as session:
+            effective_profile = self._find_effective_bayes_profile(session, normalized_version, owner_id=owner_id)
+            if not effective_profile:
+                return None
+
+            sample_owner_conditions = []
+            if owner_id:
+                sample_owner_conditions.append(BayesSample.owner_id == owner_id)
+            sample_owner_conditions.append(BayesSample.owner_id == None)
+            sample_count, latest_sample_at = session.query(
+                func.count(BayesSample.id),
+                func.max(BayesSample.created_at)
+            ).filter(
+                BayesSample.profile_version == normalized_version,
+                or_(*sample_owner_conditions)
+            ).one()
+
+            updated_at = effective_profile.updated_at
+            return ":".join([
+                str(effective_profile.id),
+                updated_at.isoformat() if updated_at else "",
+                str(sample_count or 0),
+                latest_sample_at.isoformat() if latest_sample_at else "",
+            ])
     
     def save_bayes_profile(self, profile_data: Dict[str, Any], owner_id: Optional[str] = None) -> Dict[str, Any]:
         """保存贝叶斯配置，并在提供 _samples 时同步样本。"""
@@ -1321,7 +1727,8 @@ class PostgresAdapter(StorageInterface):
             response_profile.setdefault("_priors_mode", "auto_from_samples")
             response_profile.setdefault("_stats_mode", "auto_from_samples")
             response_profile.setdefault("_min_variance", 1e-4)
-            return response_profile
+        invalidate_bayes_model_cache(normalized_version, owner_id=normalized_owner)
+        return response_profile
     
     def list_bayes_profiles(self, owner_id: Optional[str] = None, include_system: bool = True) -> List[Dict[str, Any]]:
         """获取贝叶斯配置列表。"""
@@ -1365,7 +1772,8 @@ class PostgresAdapter(StorageInterface):
             ).delete(synchronize_session=False)
             session.delete(profile)
             session.flush()
-            return True
+        invalidate_bayes_model_cache(normalized_version, owner_id=normalized_owner)
+        return True
 
     # ============== Prompt 模板管理 ==============
 
@@ -1509,7 +1917,39 @@ class PostgresAdapter(StorageInterface):
             sample = BayesSample(**sample_data)
             session.add(sample)
             session.flush()
-            return self._to_dict(sample)
+            created = self._to_dict(sample)
+        invalidate_bayes_model_cache(sample_data.get("profile_version"), owner_id=owner_id)
+        return created
+
+    def add_bayes_samples(self, samples: List[Dict[str, Any]], owner_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """批量添加贝叶斯样本：一条多行 INSERT ... RETURNING，按输入顺序返回"""
+        if not samples:
+            return []
+
+        payloads = [
+            {
+                "id": sample.get("id") or uuid4(),
+                "owner_id": owner_id or sample.get("owner_id"),
+                "profile_id": sample.get("profile_id"),
+                "profile_version": sample.get("profile_version"),
+                "name": sample.get("name"),
+                "vector": sample.get("vector"),
+                "label": sample.get("label"),
+                "source": sample.get("source", "user"),
+                "item_id": sample.get("item_id"),
+                "note": sample.get("note"),
+            }
+            for sample in samples
+        ]
+        with self.get_session() as session:
+            # RETURNING 整行 ORM 实体，插入与读取在同一次往返内完成
+            rows = session.scalars(insert(BayesSample).values(payloads).returning(BayesSample)).all()
+            created_by_id = {str(row.id): self._to_dict(row) for row in rows}
+        created = [created_by_id[str(payload["id"])] for payload in payloads if str(payload["id"]) in created_by_id]
+
+        for profile_version in {payload["profile_version"] for payload in payloads}:
+            invalidate_bayes_model_cache(profile_version, owner_id=owner_id)
+        return created
     
     def delete_bayes_sample(self, sample_id: str, owner_id: Optional[str] = None) -> bool:
         """删除贝叶斯样本"""
@@ -1518,7 +1958,9 @@ class PostgresAdapter(StorageInterface):
             if owner_id:
                 query = query.filter(BayesSample.owner_id == owner_id)
             count = query.delete()
-            return count > 0
+        if count > 0:
+            invalidate_bayes_model_cache(owner_id=owner_id)
+        return count > 0
     
     # ============== 用户反馈管理 ==============
     
@@ -1820,6 +2262,13 @@ class PostgresAdapter(StorageInterface):
     
     def save_user_notification_config(self, user_id: str, config_data: Dict[str, Any]) -> Dict[str, Any]:
         """保存用户通知配置"""
+        saved = self._save_user_notification_config(user_id, config_data)
+        # 提交后再失效，避免并发读取把旧配置重新编译进路由表
+        from src.notifier.routing import invalidate_notification_routing
+        invalidate_notification_routing(user_id)
+        return saved
+    
+    def _save_user_notification_config(self, user_id: str, config_data: Dict[str, Any]) -> Dict[str, Any]:
         with self.get_session() as session:
             config_data['user_id'] = user_id
             
@@ -1870,7 +2319,9 @@ class PostgresAdapter(StorageInterface):
                 UserNotificationConfig.id == config_id,
                 UserNotificationConfig.user_id == user_id
             ).delete()
-            return count > 0
+        from src.notifier.routing import invalidate_notification_routing
+        invalidate_notification_routing(user_id)
+        return count > 0
     
     # ============== 用户平台账号管理 ==============
     
@@ -1962,6 +2413,231 @@ class PostgresAdapter(StorageInterface):
                 return True
             return False
     
+    # ============== 卖家信息缓存 ==============
+
+    def get_seller_profile_cache(self, seller_id: str, max_age_seconds: int) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """获取未过期的卖家信息缓存"""
+        normalized_id = str(seller_id or "").strip()
+        if not normalized_id or max_age_seconds <= 0:
+            return None
+        with self.get_session() as session:
+            cached = session.query(SellerProfileCache).filter(
+                SellerProfileCache.seller_id == normalized_id,
+                SellerProfileCache.fetched_at >= datetime.now().astimezone() - timedelta(seconds=max_age_seconds),
+            ).first()
+            if cached is None or not isinstance(cached.profile, dict):
+                return None
+            return cached.fetched_at.timestamp(), dict(cached.profile)
+
+    def save_seller_profile_cache(self, seller_id: str, profile: Dict[str, Any]) -> bool:
+        """写入卖家信息缓存（按 seller_id 覆盖）"""
+        normalized_id = str(seller_id or "").strip()
+        if not normalized_id or not isinstance(profile, dict):
+            return False
+        now = datetime.now().astimezone()
+        with self.get_session() as session:
+            upsert_stmt = (
+                insert(SellerProfileCache)
+                .values(seller_id=normalized_id, profile=profile, fetched_at=now)
+                .on_conflict_do_update(
+                    index_elements=["seller_id"],
+                    set_={"profile": profile, "fetched_at": now},
+                )
+            )
+            session.execute(upsert_stmt)
+        return True
+
+    def purge_seller_profile_cache(self, max_age_seconds: int) -> int:
+        """删除超过有效期的卖家信息缓存"""
+        if max_age_seconds <= 0:
+            return 0
+        cutoff = datetime.now().astimezone() - timedelta(seconds=max_age_seconds)
+        with self.get_session() as session:
+            return session.query(SellerProfileCache).filter(
+                SellerProfileCache.fetched_at < cutoff
+            ).delete(synchronize_session=False)
+    
+    # ============== AI 分析结果缓存 ==============
+
+    def get_ai_analysis_cache(self, cache_key: str, max_age_seconds: int) -> Optional[Dict[str, Any]]:
+        """获取未过期的 AI 分析结果并累计命中/未命中次数"""
+        if not cache_key or max_age_seconds <= 0:
+            return None
+        with self.get_session() as session:
+            row = session.query(
+                AIAnalysisCache.analysis,
+                AIAnalysisCache.prompt_tokens + AIAnalysisCache.completion_tokens,
+            ).filter(
+                AIAnalysisCache.cache_key == cache_key,
+                AIAnalysisCache.created_at >= datetime.now().astimezone() - timedelta(seconds=max_age_seconds),
+            ).first()
+            if row is None:
+                self._bump_ai_cache_stats(session, misses=1)
+                return None
+            analysis, tokens = row
+            self._bump_ai_cache_stats(session, hits=1, saved_tokens=int(tokens or 0))
+            return dict(analysis) if isinstance(analysis, dict) else None
+
+    @staticmethod
+    def _bump_ai_cache_stats(session: DBSession, **deltas: int) -> None:
+        rows = [{"name": name, "value": delta} for name, delta in sorted(deltas.items()) if delta]
+        if not rows:
+            return
+        stmt = insert(AIAnalysisCacheStat).values(rows)
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["name"],
+                set_={"value": AIAnalysisCacheStat.value + stmt.excluded.value},
+            )
+        )
+
+    def save_ai_analysis_cache(
+        self,
+        cache_key: str,
+        analysis: Dict[str, Any],
+        model_name: str,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0
+    ) -> bool:
+        """写入 AI 分析结果缓存（按 cache_key 覆盖）"""
+        if not cache_key or not isinstance(analysis, dict):
+            return False
+        values = {
+            "model_name": model_name,
+            "analysis": analysis,
+            "prompt_tokens": int(prompt_tokens or 0),
+            "completion_tokens": int(completion_tokens or 0),
+            "created_at": datetime.now().astimezone(),
+        }
+        with self.get_session() as session:
+            upsert_stmt = (
+                insert(AIAnalysisCache)
+                .values(cache_key=cache_key, **values)
+                .on_conflict_do_update(index_elements=["cache_key"], set_=values)
+            )
+            session.execute(upsert_stmt)
+        return True
+
+    def purge_ai_analysis_cache(self, max_age_seconds: int) -> int:
+        """删除超过有效期的 AI 分析结果缓存条目"""
+        if max_age_seconds <= 0:
+            return 0
+        cutoff = datetime.now().astimezone() - timedelta(seconds=max_age_seconds)
+        with self.get_session() as session:
+            return session.query(AIAnalysisCache).filter(
+                AIAnalysisCache.created_at < cutoff
+            ).delete(synchronize_session=False)
+
+    def get_ai_analysis_cache_stats(self) -> Dict[str, int]:
+        """统计 AI 分析结果缓存"""
+        with self.get_session() as session:
+            entries = session.query(func.count(AIAnalysisCache.cache_key)).scalar()
+            counters = dict(session.query(AIAnalysisCacheStat.name, AIAnalysisCacheStat.value).all())
+            return {
+                "entries": int(entries or 0),
+                "hits": int(counters.get("hits") or 0),
+                "misses": int(counters.get("misses") or 0),
+                "saved_tokens": int(counters.get("saved_tokens") or 0),
+            }
+    
+    # ============== 通知发件箱 ==============
+    
+    def enqueue_notifications(self, events: List[Dict[str, Any]]) -> int:
+        """写入待发送的通知事件"""
+        if not events:
+            return 0
+        now = datetime.now().astimezone()
+        rows = [
+            {
+                "owner_id": event.get("owner_id") or None,
+                "task_name": event.get("task_name"),
+                "event_type": event["event_type"],
+                "channel": event["channel"],
+                "config_id": event.get("config_id") or None,
+                "payload": event.get("payload") or {},
+                "next_attempt_at": event.get("next_attempt_at") or now,
+            }
+            for event in events
+        ]
+        with self.get_session() as session:
+            session.execute(insert(NotificationOutbox), rows)
+        return len(rows)
+    
+    def claim_notifications(
+        self,
+        limit: int,
+        lease_seconds: int,
+        owner_id: Optional[str] = None,
+        task_name: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """领取到期的通知事件并加租约（SKIP LOCKED，多进程并发领取互不阻塞）"""
+        now = datetime.now().astimezone()
+        with self.get_session() as session:
+            query = session.query(NotificationOutbox).filter(
+                or_(
+                    and_(NotificationOutbox.status == 'pending', NotificationOutbox.next_attempt_at <= now),
+                    and_(NotificationOutbox.status == 'processing', NotificationOutbox.locked_until < now),
+                )
+            )
+            if owner_id is not None:
+                query = query.filter(NotificationOutbox.owner_id == owner_id)
+            if task_name is not None:
+                query = query.filter(NotificationOutbox.task_name == task_name)
+            events = (
+                query.order_by(NotificationOutbox.next_attempt_at)
+                .limit(max(1, int(limit)))
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            locked_until = now + timedelta(seconds=lease_seconds)
+            for event in events:
+                event.status = 'processing'
+                event.locked_until = locked_until
+            session.flush()
+            return [self._to_dict(event) for event in events]
+    
+    def complete_notifications(self, event_ids: List[str]) -> int:
+        """确认通知已送达，删除对应事件"""
+        if not event_ids:
+            return 0
+        with self.get_session() as session:
+            return session.query(NotificationOutbox).filter(
+                NotificationOutbox.id.in_(list(event_ids))
+            ).delete(synchronize_session=False)
+    
+    def retry_notification(self, event_id: str, error: str, next_attempt_at: Optional[datetime]) -> None:
+        """记录一次发送失败"""
+        values: Dict[str, Any] = {
+            "attempts": NotificationOutbox.attempts + 1,
+            "last_error": error,
+            "locked_until": None,
+        }
+        if next_attempt_at is None:
+            values["status"] = 'dead'
+        else:
+            values["status"] = 'pending'
+            values["next_attempt_at"] = next_attempt_at
+        with self.get_session() as session:
+            session.execute(
+                update(NotificationOutbox).where(NotificationOutbox.id == event_id).values(**values)
+            )
+    
+    def purge_dead_notifications(self, older_than: datetime) -> int:
+        """删除过期的 dead 通知事件"""
+        with self.get_session() as session:
+            return session.query(NotificationOutbox).filter(
+                NotificationOutbox.status == 'dead',
+                NotificationOutbox.created_at < older_than,
+            ).delete(synchronize_session=False)
+    
+    def get_notification_outbox_stats(self) -> Dict[str, int]:
+        """按状态统计发件箱事件数量"""
+        with self.get_session() as session:
+            rows = session.query(
+                NotificationOutbox.status, func.count(NotificationOutbox.id)
+            ).group_by(NotificationOutbox.status).all()
+            return {status: int(count) for status, count in rows}
+    
     # ============== 审计日志 ==============
     
     def log_audit(
@@ -0,0 +1,559 @@
+"""
+Result Archive - 本地结果文件归档层
+
+jsonl/*_full_data.jsonl 中抓取时间早于 RESULT_ARCHIVE_AFTER_DAYS 天的记录会被移入
+jsonl/.archive/<文件名>/ 下的压缩段文件（*.seg），源文件只保留近期记录。
+
+段文件按列组存储，每 BLOCK_RECORDS 条为一块，每块的每个列组单独 zlib 压缩：
+- summary：筛选/排序/去重/检索用到的字段（任务名、关键字、时间、价格、标题、卖家、AI结论等），
+  结构与原记录一致，可直接交给原有的筛选与排序函数；
+- record：完整记录。
+文件末尾是 footer（各块位置与条数）：[块数据...][footer JSON][footer 长度，4 字节大端][MAGIC]。
+合并生成的段在 footer 的 replaces 中记录被取代的段，加载时忽略仍残留的旧段（合并后删除旧段前中断也不会重复）。
+去重索引、查询索引与检索索引只解压 summary 列组，翻页时只解压当前页所在块的 record 列组。
+
+归档记录在各索引中使用负数虚拟偏移（ARCHIVE_OFFSET_BASE + 归档序号），与源文件字节偏移互不冲突。
+归档只随源文件可见：删除源文件时一并删除归档。归档改写通过 FileLock 串行化；
+改写源文件（归档、删除）时还持有 result_lock 的结果文件写锁，与追加写入互斥。
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import struct
+import sys
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
+
+from filelock import FileLock
+
+from src.config import RESULT_ARCHIVE_AFTER_DAYS
+from src.logging_config import get_logger
+from src.utils import build_result_dedup_item_id
+
+from .result_lock import result_file_lock
+
+logger = get_logger(__name__, service="system")
+
+ARCHIVE_DIR_NAME = ".archive"
+SEGMENT_SUFFIX = ".seg"
+SEGMENT_MAGIC = b"GFA1"
+SEGMENT_VERSION = 1
+BLOCK_RECORDS = 500
+# 分层合并：最新的若干段合计不小于前一段的 1/MERGE_RATIO 时并入前一段，
+# 段大小自旧到新按倍数递减，段数量为对数级，每条记录只被重写对数次
+MERGE_RATIO = 4
+MERGED_NAME_MARKER = "-m"
+ARCHIVE_OFFSET_BASE = -(2 ** 53)
+
+CRAWL_TIME_KEY = "公开信息浏览时间"
+_SUMMARY_FIELDS = ("任务名称", "搜索关键字", "AI标准", CRAWL_TIME_KEY)
+_SUMMARY_PRODUCT_FIELDS = ("商品ID", "商品链接", "商品标题", "商品描述", "卖家昵称", "当前售价", "发布时间")
+_SUMMARY_AI_FIELDS = ("recommendation_level", "is_recommended", "reason")
+
+
+def project_summary(record: Dict[str, Any]) -> Dict[str, Any]:
+    """提取 summary 列组字段。"""
+    summary = {key: record[key] for key in _SUMMARY_FIELDS if key in record}
+    product_info = record.get("商品信息")
+    if isinstance(product_info, dict):
+        summary["商品信息"] = {key: product_info[key] for key in _SUMMARY_PRODUCT_FIELDS if key in product_info}
+    ai_analysis = record.get("ai_analysis") or record.get("AI分析")
+    if isinstance(ai_analysis, dict):
+        summary["ai_analysis"] = {key: ai_analysis[key] for key in _SUMMARY_AI_FIELDS if key in ai_analysis}
+    return summary
+
+
+def _encode_column(values: Sequence[Any]) -> bytes:
+    payload = "".join(json.dumps(value, ensure_ascii=False) + "\n" for value in values)
+    return zlib.compress(payload.encode("utf-8"), 6)
+
+
+def _write_segment(path: Path, records: Iterable[Dict[str, Any]], replaces: Sequence[str] = ()) -> int:
+    """流式写出段文件，返回记录数；replaces 为该段取代的段文件名。"""
+    blocks: List[Dict[str, Any]] = []
+    total = 0
+    min_crawl_time: Optional[str] = None
+    max_crawl_time: Optional[str] = None
+
+    def flush(f, chunk: List[Dict[str, Any]]) -> None:
+        block: Dict[str, Any] = {"records": len(chunk)}
+        for group, values in (("summary", [project_summary(record) for record in chunk]), ("record", chunk)):
+            data = _encode_column(values)
+            block[group] = [f.tell(), len(data)]
+            f.write(data)
+        blocks.append(block)
+
+    with open(path, "wb") as f:
+        chunk: List[Dict[str, Any]] = []
+        for record in records:
+            crawl_time = str(record.get(CRAWL_TIME_KEY) or "")
+            if crawl_time:
+                min_crawl_time = crawl_time if min_crawl_time is None else min(min_crawl_time, crawl_time)
+                max_crawl_time = crawl_time if max_crawl_time is None else max(max_crawl_time, crawl_time)
+            chunk.append(record)
+            total += 1
+            if len(chunk) >= BLOCK_RECORDS:
+                flush(f, chunk)
+                chunk = []
+        if chunk:
+            flush(f, chunk)
+        footer = json.dumps({
+            "version": SEGMENT_VERSION,
+            "records": total,
+            "min_crawl_time": min_crawl_time,
+            "max_crawl_time": max_crawl_time,
+            "blocks": blocks,
+            "replaces": list(replaces),
+        }).encode("utf-8")
+        f.write(footer + struct.pack(">I", len(footer)) + SEGMENT_MAGIC)
+        f.flush()
+        os.fsync(f.fileno())
+    return total
+
+
+def _read_footer(path: Path) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size < 8:
+            raise ValueError("段文件不完整")
+        f.seek(size - 8)
+        tail = f.read(8)
+        if tail[4:] != SEGMENT_MAGIC:
+            raise ValueError("段文件格式无效")
+        length = struct.unpack(">I", tail[:4])[0]
+        f.seek(size - 8 - length)
+        footer = json.loads(f.read(length))
+    if not isinstance(footer, dict) or footer.get("version") != SEGMENT_VERSION:
+        raise ValueError("段文件版本不支持")
+    return footer
+
+
+def _read_column(path: Path, block: Dict[str, Any], group: str) -> List[Any]:
+    offset, length = block[group]
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read(length)
+    return [json.loads(line) for line in zlib.decompress(data).decode("utf-8").splitlines() if line]
+
+
+class _Segment(NamedTuple):
+    path: Path
+    first_offset: int
+    records: int
+    blocks: List[Dict[str, Any]]
+
+
+class ResultArchive:
+    """单个结果文件的归档段集合。"""
+
+    def __init__(self, result_file: Union[str, Path]):
+        self.result_file = Path(result_file)
+        archive_root = self.result_file.parent / ARCHIVE_DIR_NAME
+        self.archive_dir = archive_root / self.result_file.stem
+        self._lock_path = archive_root / f"{self.result_file.stem}.lock"
+        self._thread_lock = threading.RLock()
+        self._dir_stamp: Optional[int] = None
+        self._segments: List[_Segment] = []
+        self._summaries: Optional[List[Tuple[int, Dict[str, Any]]]] = None
+        self._replaced_paths: List[Path] = []
+        self.generation = ""
+
+    # ---------- 读取 ----------
+
+    def refresh(self) -> str:
+        """同步段文件列表（目录未变化时仅一次 stat），返回归档版本标识（无归档时为空串）。"""
+        stamp = self._stat_dir()
+        if stamp == self._dir_stamp:
+            return self.generation
+        with self._thread_lock:
+            self._load_segments()
+            self._dir_stamp = stamp
+            return self.generation
+
+    def snapshot(self) -> Tuple[str, List[Tuple[int, Dict[str, Any]]]]:
+        """返回 (版本标识, [(虚拟偏移, summary)])，按归档顺序排列；只解压 summary 列组。"""
+        self.refresh()
+        with self._thread_lock:
+            if self._summaries is None:
+                summaries: List[Tuple[int, Dict[str, Any]]] = []
+                for segment in self._segments:
+                    for block_offset, block in self._iter_blocks(segment):
+                        try:
+                            values = _read_column(segment.path, block, "summary")
+                        except (OSError, ValueError, zlib.error) as e:
+                            self._warn_unreadable(segment.path, e)
+                            continue
+                        summaries.extend((block_offset + pos, value) for pos, value in enumerate(values))
+                self._summaries = summaries
+            return self.generation, self._summaries
+
+    def read_records(self, offsets: Sequence[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        """按虚拟偏移读取完整记录（同一块只解压一次），找不到的偏移对应 None。"""
+        with self._thread_lock:
+            segments = list(self._segments)
+        records: Dict[int, Optional[Dict[str, Any]]] = {}
+        blocks: Dict[Tuple[str, int], List[Any]] = {}
+        for offset in sorted(set(offsets)):
+            records[offset] = None
+            for segment in segments:
+                if not segment.first_offset <= offset < segment.first_offset + segment.records:
+                    continue
+                for block_offset, block in self._iter_blocks(segment):
+                    if offset >= block_offset + block["records"]:
+                        continue
+                    key = (segment.path.name, block_offset)
+                    if key not in blocks:
+                        try:
+                            blocks[key] = _read_column(segment.path, block, "record")
+                        except (OSError, ValueError, zlib.error):
+                            blocks[key] = []
+                    values = blocks[key]
+                    if offset - block_offset < len(values):
+                        records[offset] = values[offset - block_offset]
+                    break
+                break
+        return records
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """按归档顺序逐块解压全部完整记录。"""
+        self.refresh()
+        with self._thread_lock:
+            segments = list(self._segments)
+        for segment in segments:
+            yield from self._iter_segment_records(segment)
+
+    # ---------- 改写 ----------
+
+    def compact(self, older_than_days: int) -> int:
+        """把抓取时间早于 N 天的记录移入新段文件，源文件只保留其余记录，返回归档条数。"""
+        if older_than_days <= 0 or not self.result_file.exists():
+            return 0
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).isoformat()
+        if not self._head_is_archivable(cutoff):
+            return 0
+
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        # 持有结果文件写锁：追加写入在改写完成前等待，不会写进被替换掉的旧文件
+        with result_file_lock(self.result_file), self._thread_lock, FileLock(str(self._lock_path)):
+            self._load_segments()
+            self._remove_replaced_segments()
+            _, summaries = self.snapshot()
+            archived_ids = {build_result_dedup_item_id(summary) for _, summary in summaries} - {""}
+
+            kept: List[bytes] = []
+            moved: List[bytes] = []
+            dropped = 0
+            consumed = 0
+            with open(self.result_file, "rb") as f:
+                for raw_line in f:
+                    if not raw_line.endswith(b"\n"):
+                        break
+                    consumed += len(raw_line)
+                    if not raw_line.strip():
+                        continue
+                    try:
+                        record = json.loads(raw_line)
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        kept.append(raw_line)
+                        continue
+                    crawl_time = str(record.get(CRAWL_TIME_KEY) or "") if isinstance(record, dict) else ""
+                    if not crawl_time or crawl_time >= cutoff:
+                        kept.append(raw_line)
+                    elif build_result_dedup_item_id(record) in archived_ids:
+                        # 上次归档写完段文件后未来得及改写源文件，已归档的记录直接移除
+                        dropped += 1
+                    else:
+                        moved.append(raw_line)
+            if not moved and not dropped:
+                return 0
+
+            if moved:
+                # 段按文件名排序即归档顺序，时间精确到微秒，同一秒内多次归档也不会乱序
+                segment_path = self.archive_dir / f"{datetime.now():%Y%m%d%H%M%S%f}-{uuid.uuid4().hex[:8]}{SEGMENT_SUFFIX}"
+                tmp_path = segment_path.with_name(segment_path.name + ".tmp")
+                _write_segment(tmp_path, (json.loads(raw_line) for raw_line in moved))
+                os.replace(tmp_path, segment_path)
+
+            # 改写源文件：保留的记录 + 未写完整的尾部（持锁期间不会再有新追加）
+            tmp_path = self.result_file.with_name(self.result_file.name + ".archive.tmp")
+            with open(tmp_path, "wb") as dst:
+                dst.writelines(kept)
+                with open(self.result_file, "rb") as src:
+                    src.seek(consumed)
+                    shutil.copyfileobj(src, dst)
+            os.replace(tmp_path, self.result_file)
+
+            self._merge_segments()
+            self._mark_changed()
+
+        logger.info(
+            f"结果归档完成: {self.result_file.name}，归档 {len(moved)} 条，源文件保留 {len(kept)} 条",
+            extra={"event": "result_archive_compacted", "result_file_path": str(self.result_file)},
+        )
+        return len(moved)
+
+    def remove_records(self, predicate: Callable[[Dict[str, Any]], bool]) -> int:
+        """删除 predicate(summary) 为真的归档记录（只改写包含命中记录的段），返回删除条数。"""
+        if self.refresh() == "":
+            return 0
+        removed = 0
+        with self._thread_lock, FileLock(str(self._lock_path)):
+            self._load_segments()
+            self._remove_replaced_segments()
+            _, summaries = self.snapshot()
+            for segment in self._segments:
+                end = segment.first_offset + segment.records
+                drop = {
+                    offset - segment.first_offset
+                    for offset, summary in summaries
+                    if segment.first_offset <= offset < end and predicate(summary)
+                }
+                if not drop:
+                    continue
+                kept = (
+                    record for pos, record in enumerate(self._iter_segment_records(segment))
+                    if pos not in drop
+                )
+                self._replace_segment(segment.path, kept)
+                removed += len(drop)
+            if removed:
+                self._mark_changed()
+        return removed
+
+    def update_records(
+        self, updater: Callable[[Dict[str, Any]], bool], item_ids: Optional[Set[str]] = None
+    ) -> int:
+        """对每条归档记录调用 updater（原地修改，返回是否修改），只改写有变化的段，返回修改条数。
+
+        指定 item_ids（去重键）时先按 summary 筛出包含这些记录的段，其余段不解压也不重写。
+        """
+        if self.refresh() == "":
+            return 0
+        updated = 0
+        with self._thread_lock, FileLock(str(self._lock_path)):
+            self._load_segments()
+            self._remove_replaced_segments()
+            segments = list(self._segments)
+            if item_ids is not None:
+                _, summaries = self.snapshot()
+                matched = [offset for offset, summary in summaries if build_result_dedup_item_id(summary) in item_ids]
+                segments = [
+                    segment for segment in segments
+                    if any(segment.first_offset <= offset < segment.first_offset + segment.records for offset in matched)
+                ]
+            for segment in segments:
+                changed = 0
+
+                def apply(segment=segment):
+                    nonlocal changed
+                    for record in self._iter_segment_records(segment):
+                        if updater(record):
+                            changed += 1
+                        yield record
+
+                tmp_path = segment.path.with_name(segment.path.name + ".tmp")
+                _write_segment(tmp_path, apply())
+                if changed:
+                    os.replace(tmp_path, segment.path)
+                    updated += changed
+                else:
+                    os.remove(tmp_path)
+            if updated:
+                self._mark_changed()
+        return updated
+
+    def delete(self) -> None:
+        """删除全部归档（源文件被删除时调用）。"""
+        with self._thread_lock:
+            if self.archive_dir.exists():
+                with FileLock(str(self._lock_path)):
+                    shutil.rmtree(self.archive_dir, ignore_errors=True)
+            self._load_segments()
+            self._dir_stamp = None
+
+    # ---------- 内部实现 ----------
+
+    def _stat_dir(self) -> Optional[int]:
+        try:
+            return os.stat(self.archive_dir).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _segment_paths(self) -> List[Path]:
+        if not self.archive_dir.is_dir():
+            return []
+        return sorted(self.archive_dir.glob(f"*{SEGMENT_SUFFIX}"))
+
+    def _load_segments(self) -> None:
+        segments: List[_Segment] = []
+        signature: List[str] = []
+        next_offset = ARCHIVE_OFFSET_BASE
+        loaded: List[Tuple[Path, Dict[str, Any], os.stat_result]] = []
+        replaced: Set[str] = set()
+        for path in self._segment_paths():
+            try:
+                footer = _read_footer(path)
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError) as e:
+                self._warn_unreadable(path, e)
+                continue
+            loaded.append((path, footer, stat))
+            replaced.update(footer.get("replaces") or ())
+        self._replaced_paths = [path for path, _, _ in loaded if path.name in replaced]
+        for path, footer, stat in loaded:
+            if path.name in replaced:
+                continue
+            segments.append(_Segment(path, next_offset, int(footer["records"]), footer["blocks"]))
+            next_offset += int(footer["records"])
+            signature.append(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}")
+        self._segments = segments
+        self._summaries = None
+        self.generation = hashlib.sha1("\n".join(signature).encode("utf-8")).hexdigest() if signature else ""
+
+    def _mark_changed(self) -> None:
+        """改写后推进目录 mtime（避免粗粒度时间戳下其他进程漏判变化）并重新加载。"""
+        stamp = self._stat_dir()
+        if stamp is not None:
+            now = max(time.time_ns(), stamp + 1)
+            os.utime(self.archive_dir, ns=(now, now))
+        self._dir_stamp = self._stat_dir()
+        self._load_segments()
+
+    @staticmethod
+    def _iter_blocks(segment: _Segment) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        block_offset = segment.first_offset
+        for block in segment.blocks:
+            yield block_offset, block
+            block_offset += int(block["records"])
+
+    def _iter_segment_records(self, segment: _Segment) -> Iterator[Dict[str, Any]]:
+        for _, block in self._iter_blocks(segment):
+            try:
+                values = _read_column(segment.path, block, "record")
+            except FileNotFoundError:
+                return
+            except (OSError, ValueError, zlib.error) as e:
+                self._warn_unreadable(segment.path, e)
+                continue
+            yield from values
+
+    def _replace_segment(self, path: Path, records: Iterable[Dict[str, Any]]) -> None:
+        tmp_path = path.with_name(path.name + ".tmp")
+        if _write_segment(tmp_path, records):
+            os.replace(tmp_path, path)
+        else:
+            os.remove(tmp_path)
+            os.remove(path)
+
+    def _remove_replaced_segments(self) -> None:
+        """删除已被合并段取代、但上次合并后未来得及删除的旧段（需持有归档锁）。"""
+        for path in self._replaced_paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._replaced_paths = []
+
+    def _merge_segments(self) -> None:
+        """分层合并最新的段：写出新段（记录取代的段）后再删除旧段，中断时不会产生重复记录。"""
+        self._load_segments()
+        segments = list(self._segments)
+        if len(segments) < 2:
+            return
+        run = [segments.pop()]
+        run_records = run[0].records
+        while segments and segments[-1].records <= run_records * MERGE_RATIO:
+            segment = segments.pop()
+            run.insert(0, segment)
+            run_records += segment.records
+        if len(run) < 2:
+            return
+
+        # 合并段按名称排在被取代的第一段的位置，保持归档顺序
+        base = run[0].path.stem.split(MERGED_NAME_MARKER)[0]
+        merged_path = self.archive_dir / f"{base}{MERGED_NAME_MARKER}{uuid.uuid4().hex[:8]}{SEGMENT_SUFFIX}"
+        tmp_path = merged_path.with_name(merged_path.name + ".tmp")
+        merged = (record for segment in run for record in self._iter_segment_records(segment))
+        _write_segment(tmp_path, merged, replaces=[segment.path.name for segment in run])
+        os.replace(tmp_path, merged_path)
+        self._load_segments()
+        self._remove_replaced_segments()
+
+    def _head_is_archivable(self, cutoff: str) -> bool:
+        """记录按抓取顺序追加，首条记录不早于截止时间时无需扫描全文件。"""
+        with open(self.result_file, "rb") as f:
+            for raw_line in f:
+                if not raw_line.strip():
+                    continue
+                try:
+                    record = json.loads(raw_line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    return True
+                crawl_time = str(record.get(CRAWL_TIME_KEY) or "") if isinstance(record, dict) else ""
+                return not crawl_time or crawl_time < cutoff
+        return False
+
+    def _warn_unreadable(self, path: Path, error: Exception) -> None:
+        logger.warning(
+            f"读取结果归档段失败: {path.name}, 错误: {error}",
+            extra={"event": "result_archive_read_failed", "result_file_path": str(self.result_file)},
+        )
+
+
+_archives: Dict[str, ResultArchive] = {}
+_archives_lock = threading.Lock()
+
+
+def get_result_archive(result_file: Union[str, Path]) -> ResultArchive:
+    """获取（进程内复用的）结果文件归档实例。"""
+    key = os.path.abspath(str(result_file))
+    with _archives_lock:
+        archive = _archives.get(key)
+        if archive is None:
+            archive = ResultArchive(key)
+            _archives[key] = archive
+        return archive
+
+
+def compact_result_file(result_file: Union[str, Path], older_than_days: Optional[int] = None) -> int:
+    """按 RESULT_ARCHIVE_AFTER_DAYS（或指定天数）归档结果文件中的旧记录，返回归档条数。"""
+    days = RESULT_ARCHIVE_AFTER_DAYS() if older_than_days is None else older_than_days
+    return get_result_archive(result_file).compact(days)
+
+
+def delete_result_archive(result_file: Union[str, Path]) -> None:
+    """删除结果文件的全部归档。"""
+    get_result_archive(result_file).delete()
+
+
+def main():
+    """命令行入口：python -m src.storage.result_archive [--file jsonl/xxx_full_data.jsonl] [--days 30]"""
+    parser = argparse.ArgumentParser(description="归档本地结果文件中的旧记录")
+    parser.add_argument("--file", help="只处理指定结果文件（默认 jsonl/*_full_data.jsonl）")
+    parser.add_argument("--days", type=int, default=None, help="归档早于 N 天的记录（默认 RESULT_ARCHIVE_AFTER_DAYS）")
+    args = parser.parse_args()
+
+    days = RESULT_ARCHIVE_AFTER_DAYS() if args.days is None else args.days
+    if days <= 0:
+        print("未指定归档天数（--days 或 RESULT_ARCHIVE_AFTER_DAYS），不执行归档。")
+        return 1
+    result_files = [Path(args.file)] if args.file else sorted(Path("jsonl").glob("*_full_data.jsonl"))
+    for result_file in result_files:
+        archived = compact_result_file(result_file, days)
+        print(f"{result_file.name}: 归档 {archived} 条")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
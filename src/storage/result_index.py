@@ -0,0 +1,352 @@
+"""
+Result Index - 本地结果文件去重索引
+
+为 jsonl/*_full_data.jsonl 维护旁路索引（jsonl/.index/ 下的 .keys + .meta.json），
+记录已写入结果的去重键（商品ID 与链接唯一键），让判重变为内存集合查找。
+
+索引是否过期按"已索引字节数 + 尾部指纹"判断：
+- 源文件仅追加：只解析新增部分并追加到索引；
+- 源文件被改写/截断：整体重建一次。
+已归档记录（见 result_archive）的键从段文件的 summary 列组加载，归档变化时重新加载。
+多进程（Web 与各采集子进程）通过 FileLock 串行化索引写入。
+"""
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Tuple, Union
+
+from filelock import FileLock
+
+from src.logging_config import get_logger
+from src.utils import build_result_dedup_item_id, get_link_unique_key
+
+from .result_archive import get_result_archive
+
+logger = get_logger(__name__, service="system")
+
+INDEX_DIR_NAME = ".index"
+INDEX_FORMAT_VERSION = 1
+# 尾部指纹窗口：用于确认已索引部分未被改写
+TAIL_FINGERPRINT_BYTES = 256
+
+_ITEM_PREFIX = "i"
+_LINK_PREFIX = "l"
+
+
+def extract_result_keys(record: Dict) -> Tuple[str, str]:
+    """提取结果记录的 (去重键, 链接唯一键)，缺失时返回空串。"""
+    if not isinstance(record, dict):
+        return "", ""
+    item_id = build_result_dedup_item_id(record)
+    product_info = record.get("商品信息")
+    link = ""
+    if isinstance(product_info, dict):
+        link = str(product_info.get("商品链接") or "").strip()
+    return item_id, (get_link_unique_key(link) if link else "")
+
+
+class ResultFileIndex:
+    """单个结果文件的去重索引。"""
+
+    def __init__(self, result_file: Union[str, Path]):
+        self.result_file = Path(result_file)
+        self.index_dir = self.result_file.parent / INDEX_DIR_NAME
+        stem = self.result_file.stem
+        self.keys_file = self.index_dir / f"{stem}.keys"
+        self.meta_file = self.index_dir / f"{stem}.meta.json"
+        self._file_lock = FileLock(str(self.index_dir / f"{stem}.lock"))
+        self._thread_lock = threading.RLock()
+
+        self.item_ids: Set[str] = set()
+        self.link_keys: Set[str] = set()
+        self._generation = ""
+        self._indexed_bytes = 0
+        self._tail_hash = ""
+        self._keys_bytes = 0
+        self._source_stat: Optional[Tuple[int, int]] = None
+
+        self.archived_item_ids: Set[str] = set()
+        self.archived_link_keys: Set[str] = set()
+        self._archive_generation = ""
+
+    # ---------- 公共接口 ----------
+
+    def contains_item(self, item_id: str) -> bool:
+        """判断去重键是否已存在。"""
+        normalized = str(item_id or "").strip()
+        if not normalized:
+            return False
+        self.sync()
+        return normalized in self.item_ids or normalized in self.archived_item_ids
+
+    def contains_link(self, link_key: str) -> bool:
+        """判断链接唯一键是否已存在。"""
+        if not link_key:
+            return False
+        self.sync()
+        return link_key in self.link_keys or link_key in self.archived_link_keys
+
+    def existing_items(self, item_ids: Set[str]) -> Set[str]:
+        """返回 item_ids 中已存在（含已归档）的去重键。"""
+        self.sync()
+        with self._thread_lock:
+            return (item_ids & self.item_ids) | (item_ids & self.archived_item_ids)
+
+    def snapshot_link_keys(self) -> Set[str]:
+        """返回链接唯一键集合副本（供采集启动时预加载）。"""
+        self.sync()
+        with self._thread_lock:
+            return self.link_keys | self.archived_link_keys
+
+    def sync(self) -> None:
+        """确保索引覆盖源文件当前内容；源文件未变化时仅一次 stat。"""
+        try:
+            stat = self.result_file.stat()
+        except FileNotFoundError:
+            self._reset_for_missing_source()
+            return
+
+        self._sync_archive()
+        current_stat = (stat.st_size, stat.st_mtime_ns)
+        if current_stat == self._source_stat:
+            return
+
+        with self._thread_lock:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            with self._file_lock:
+                self._load_from_disk()
+                self._catch_up(stat.st_size)
+            self._source_stat = current_stat
+
+    def rebuild(self) -> None:
+        """丢弃现有索引并从源文件全量重建（源文件被改写后调用）。"""
+        with self._thread_lock:
+            if not self.result_file.exists():
+                self._reset_for_missing_source()
+                return
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            with self._file_lock:
+                self._rebuild_locked()
+            try:
+                stat = self.result_file.stat()
+                self._source_stat = (stat.st_size, stat.st_mtime_ns)
+            except FileNotFoundError:
+                self._source_stat = None
+
+    # ---------- 内部实现 ----------
+
+    def _sync_archive(self) -> None:
+        archive = get_result_archive(self.result_file)
+        if archive.refresh() == self._archive_generation:
+            return
+        generation, summaries = archive.snapshot()
+        item_ids: Set[str] = set()
+        link_keys: Set[str] = set()
+        for _, summary in summaries:
+            item_id, link_key = extract_result_keys(summary)
+            if item_id:
+                item_ids.add(item_id)
+            if link_key:
+                link_keys.add(link_key)
+        with self._thread_lock:
+            self.archived_item_ids = item_ids
+            self.archived_link_keys = link_keys
+            self._archive_generation = generation
+
+    def _reset_memory(self) -> None:
+        self.item_ids = set()
+        self.link_keys = set()
+        self._generation = ""
+        self._indexed_bytes = 0
+        self._tail_hash = ""
+        self._keys_bytes = 0
+
+    def _reset_for_missing_source(self) -> None:
+        """源文件不存在时清空内存状态并移除旁路索引。"""
+        with self._thread_lock:
+            self.archived_item_ids = set()
+            self.archived_link_keys = set()
+            self._archive_generation = ""
+            if self._source_stat is None and not self.item_ids and not self.meta_file.exists():
+                return
+            self._reset_memory()
+            self._source_stat = None
+            for path in (self.keys_file, self.meta_file):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.warning(
+                        f"清理结果索引文件失败: {path}, 错误: {e}",
+                        extra={"event": "result_index_cleanup_failed"},
+                    )
+
+    def _read_meta(self) -> Optional[Dict]:
+        try:
+            with open(self.meta_file, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, OSError):
+            return None
+        if not isinstance(meta, dict) or meta.get("version") != INDEX_FORMAT_VERSION:
+            return None
+        return meta
+
+    def _write_meta(self) -> None:
+        meta = {
+            "version": INDEX_FORMAT_VERSION,
+            "generation": self._generation,
+            "indexed_bytes": self._indexed_bytes,
+            "tail_hash": self._tail_hash,
+            "keys_bytes": self._keys_bytes,
+        }
+        tmp_path = self.meta_file.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.meta_file)
+
+    def _apply_key_lines(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            prefix, _, key = line.rstrip("\n").partition("\t")
+            if not key:
+                continue
+            if prefix == _ITEM_PREFIX:
+                self.item_ids.add(key)
+            elif prefix == _LINK_PREFIX:
+                self.link_keys.add(key)
+
+    def _load_from_disk(self) -> None:
+        """把其他进程写入的索引增量同步到内存。"""
+        meta = self._read_meta()
+        if meta is None:
+            if self._generation:
+                self._reset_memory()
+            return
+
+        disk_generation = str(meta.get("generation") or "")
+        disk_keys_bytes = int(meta.get("keys_bytes") or 0)
+        if disk_generation != self._generation or disk_keys_bytes < self._keys_bytes:
+            self._reset_memory()
+            self._generation = disk_generation
+
+        if disk_keys_bytes > self._keys_bytes:
+            try:
+                with open(self.keys_file, "rb") as f:
+                    f.seek(self._keys_bytes)
+                    chunk = f.read(disk_keys_bytes - self._keys_bytes)
+            except OSError:
+                self._reset_memory()
+                return
+            self._apply_key_lines(chunk.decode("utf-8", errors="ignore").splitlines())
+            self._keys_bytes = disk_keys_bytes
+
+        self._indexed_bytes = int(meta.get("indexed_bytes") or 0)
+        self._tail_hash = str(meta.get("tail_hash") or "")
+
+    def _fingerprint(self, f, end: int) -> str:
+        start = max(0, end - TAIL_FINGERPRINT_BYTES)
+        f.seek(start)
+        return hashlib.sha1(f.read(end - start)).hexdigest()
+
+    def _catch_up(self, source_size: int) -> None:
+        """增量解析源文件新增部分；检测到改写时整体重建。"""
+        if not self._generation:
+            self._rebuild_locked()
+            return
+        if source_size < self._indexed_bytes:
+            self._rebuild_locked()
+            return
+
+        with open(self.result_file, "rb") as f:
+            if self._fingerprint(f, self._indexed_bytes) != self._tail_hash:
+                self._rebuild_locked()
+                return
+            if source_size == self._indexed_bytes:
+                return
+            f.seek(self._indexed_bytes)
+            new_lines, consumed = self._parse_complete_lines(f)
+
+        if not consumed:
+            return
+        self._append_keys(new_lines, self._indexed_bytes + consumed)
+
+    def _parse_complete_lines(self, f) -> Tuple[list, int]:
+        """读取当前位置起的完整行，返回(索引行, 消耗字节数)；末尾半行留待下次。"""
+        key_lines = []
+        consumed = 0
+        for raw_line in f:
+            if not raw_line.endswith(b"\n"):
+                break
+            consumed += len(raw_line)
+            if not raw_line.strip():
+                continue
+            try:
+                record = json.loads(raw_line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            item_id, link_key = extract_result_keys(record)
+            if item_id:
+                key_lines.append(f"{_ITEM_PREFIX}\t{item_id}\n")
+            if link_key:
+                key_lines.append(f"{_LINK_PREFIX}\t{link_key}\n")
+        return key_lines, consumed
+
+    def _append_keys(self, key_lines: list, indexed_bytes: int) -> None:
+        payload = "".join(key_lines).encode("utf-8")
+        if payload:
+            with open(self.keys_file, "ab") as f:
+                f.write(payload)
+        self._apply_key_lines(key_lines)
+        self._keys_bytes += len(payload)
+        self._indexed_bytes = indexed_bytes
+        with open(self.result_file, "rb") as f:
+            self._tail_hash = self._fingerprint(f, indexed_bytes)
+        self._write_meta()
+
+    def _rebuild_locked(self) -> None:
+        self._reset_memory()
+        self._generation = uuid.uuid4().hex
+        try:
+            with open(self.result_file, "rb") as f:
+                key_lines, consumed = self._parse_complete_lines(f)
+        except FileNotFoundError:
+            key_lines, consumed = [], 0
+
+        tmp_path = self.keys_file.with_suffix(".tmp")
+        payload = "".join(key_lines).encode("utf-8")
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, self.keys_file)
+
+        self._apply_key_lines(key_lines)
+        self._keys_bytes = len(payload)
+        self._indexed_bytes = consumed
+        if consumed:
+            with open(self.result_file, "rb") as f:
+                self._tail_hash = self._fingerprint(f, consumed)
+        else:
+            self._tail_hash = hashlib.sha1(b"").hexdigest()
+        self._write_meta()
+        logger.info(
+            f"结果去重索引已重建: {self.result_file.name}（{len(self.item_ids)} 条）",
+            extra={"event": "result_index_rebuilt", "result_file_path": str(self.result_file)},
+        )
+
+
+_indexes: Dict[str, ResultFileIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_result_index(result_file: Union[str, Path]) -> ResultFileIndex:
+    """获取（进程内复用的）结果文件索引实例。"""
+    key = os.path.abspath(str(result_file))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = ResultFileIndex(key)
+            _indexes[key] = index
+        return index
@@ -0,0 +1,212 @@
+"""
+Result Index Migration - monitoring_results 查询索引的一次性迁移
+
+create_all 不会给已有表补建索引，这里按名称检查并 CONCURRENTLY 补建，不阻塞采集写入。
+只在 Web 服务启动（后台线程）或手动执行时运行，采集进程不运行：
+
+    python -m src.storage.result_index_migration
+
+多个进程同时运行时由 PostgreSQL advisory lock 串行化，拿不到锁的直接跳过；
+其他会话仍在创建中的索引（pg_stat_progress_create_index）不会被当作中断残留删除。
+"""
+
+import argparse
+import sys
+
+from sqlalchemy import create_engine, text
+
+from src.config import get_env_value, normalize_database_url
+from src.logging_config import get_logger
+
+logger = get_logger(__name__, service="system")
+
+# 结果页手动关键词的检索文本（标题/描述/卖家/价格/AI理由，与本地模式 build_search_text 口径一致）。
+# 中文不分词，tsvector 无法做子串检索，因此对该表达式建 pg_trgm 三元组索引，ILIKE 与 word_similarity 都能使用。
+# 函数缺失时（无建函数权限或迁移尚未执行）适配器回退为内联表达式 + ILIKE。
+RESULT_SEARCH_FUNCTION_SIGNATURE = "result_search_text(jsonb, jsonb)"
+RESULT_SEARCH_FUNCTION_BODY = (
+    " SELECT lower("
+    "coalesce(product_info ->> '商品标题', '') || E'\\n' || "
+    "coalesce(product_info ->> '商品描述', '') || E'\\n' || "
+    "coalesce(product_info ->> '卖家昵称', '') || E'\\n' || "
+    "coalesce(product_info ->> '当前售价', '') || E'\\n' || "
+    "coalesce(ai_analysis ->> 'reason', '')) "
+)
+RESULT_SEARCH_FUNCTION_DDL = (
+    "CREATE OR REPLACE FUNCTION result_search_text(product_info jsonb, ai_analysis jsonb) "
+    f"RETURNS text LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $${RESULT_SEARCH_FUNCTION_BODY}$$"
+)
+
+# 与 models 中的定义一致，检索三元组索引依赖 pg_trgm 扩展，只在这里创建
+RESULT_INDEX_DDL = (
+    (
+        "idx_result_owner_task_crawled",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_result_owner_task_crawled "
+        "ON monitoring_results (owner_id, task_id, crawled_at DESC, item_id DESC)",
+    ),
+    (
+        "idx_result_recommended",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_result_recommended "
+        "ON monitoring_results (owner_id, task_id, crawled_at DESC, item_id DESC) WHERE is_recommended",
+    ),
+    (
+        "idx_result_search_trgm",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_result_search_trgm "
+        "ON monitoring_results USING gin (result_search_text(product_info, ai_analysis) gin_trgm_ops)",
+    ),
+)
+# 已被 idx_result_search_trgm 取代的索引
+OBSOLETE_RESULT_INDEXES = ("idx_result_title_trgm",)
+
+# advisory lock 键（任意固定值，仅用于本迁移）
+MIGRATION_LOCK_KEY = 724851003
+
+
+def _index_state(conn, index_name: str):
+    """返回索引是否有效：True/False，不存在时为 None。"""
+    return conn.execute(
+        text(
+            "SELECT i.indisvalid FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+        ),
+        {"name": index_name},
+    ).scalar()
+
+
+def _index_build_in_progress(conn, index_name: str) -> bool:
+    """其他会话是否正在创建该索引（PostgreSQL 12+ 才有进度视图，更早版本视为未在创建）。"""
+    try:
+        return bool(
+            conn.execute(
+                text(
+                    "SELECT 1 FROM pg_stat_progress_create_index p "
+                    "JOIN pg_class c ON c.oid = p.index_relid WHERE c.relname = :name"
+                ),
+                {"name": index_name},
+            ).first()
+        )
+    except Exception:
+        return False
+
+
+def _extension_installed(conn, name: str) -> bool:
+    return bool(conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = :name"), {"name": name}).first())
+
+
+def _ensure_search_function(conn) -> bool:
+    """确保检索函数存在且为当前定义；已是相同定义时不重复替换。返回函数是否可用。"""
+    current_body = conn.execute(
+        text("SELECT prosrc FROM pg_proc WHERE oid = to_regprocedure(:signature)"),
+        {"signature": RESULT_SEARCH_FUNCTION_SIGNATURE},
+    ).scalar()
+    if current_body == RESULT_SEARCH_FUNCTION_BODY:
+        return True
+    try:
+        conn.execute(text(RESULT_SEARCH_FUNCTION_DDL))
+        return True
+    except Exception as e:
+        logger.warning(
+            f"无法创建结果检索函数，关键词筛选回退为 ILIKE: {e}",
+            extra={"event": "result_search_function_unavailable"},
+        )
+        # 旧定义仍可使用
+        return current_body is not None
+
+
+def _ensure_trgm(conn) -> bool:
+    if _extension_installed(conn, "pg_trgm"):
+        return True
+    try:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        return True
+    except Exception as e:
+        logger.warning(
+            f"无法启用 pg_trgm 扩展，跳过结果检索索引: {e}",
+            extra={"event": "result_index_trgm_unavailable"},
+        )
+        return False
+
+
+def _ensure_index(conn, index_name: str, ddl: str) -> None:
+    valid = _index_state(conn, index_name)
+    if valid:
+        return
+    if valid is False:
+        if _index_build_in_progress(conn, index_name):
+            logger.info(
+                f"结果索引 {index_name} 正在由其他会话创建，跳过",
+                extra={"event": "result_index_build_in_progress"},
+            )
+            return
+        # 上次 CONCURRENTLY 创建中断会留下无效索引，IF NOT EXISTS 会跳过它，需先删除
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
+    logger.info(
+        f"正在创建结果索引 {index_name}（数据量大时需要几分钟）",
+        extra={"event": "result_index_creating"},
+    )
+    conn.execute(text(ddl))
+
+
+def migrate_result_indexes(engine) -> bool:
+    """补建结果查询索引；单个步骤失败只记录日志。返回是否实际执行（拿到迁移锁）。"""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if not conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY}).scalar():
+            logger.info(
+                "结果索引迁移正由其他进程执行，跳过",
+                extra={"event": "result_index_migration_skipped"},
+            )
+            return False
+        try:
+            # 检索函数不依赖 pg_trgm，三元组索引依赖两者
+            function_available = _ensure_search_function(conn)
+            trgm_available = _ensure_trgm(conn)
+
+            for index_name in OBSOLETE_RESULT_INDEXES:
+                if _index_state(conn, index_name) is None:
+                    continue
+                try:
+                    conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
+                except Exception as e:
+                    logger.warning(
+                        f"删除旧结果索引 {index_name} 失败: {e}",
+                        extra={"event": "result_index_drop_failed"},
+                    )
+
+            for index_name, ddl in RESULT_INDEX_DDL:
+                if index_name == "idx_result_search_trgm" and not (function_available and trgm_available):
+                    continue
+                try:
+                    _ensure_index(conn, index_name, ddl)
+                except Exception as e:
+                    logger.warning(
+                        f"创建结果索引 {index_name} 失败: {e}",
+                        extra={"event": "result_index_create_failed"},
+                    )
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+    return True
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="补建 monitoring_results 查询索引")
+    parser.add_argument(
+        "--database-url",
+        default=get_env_value("DATABASE_URL", ""),
+        help="PostgreSQL 连接地址（默认读取 DATABASE_URL）",
+    )
+    args = parser.parse_args()
+    if not args.database_url:
+        print("Error: DATABASE_URL is required. Set via --database-url or DATABASE_URL env var.")
+        sys.exit(1)
+
+    engine = create_engine(normalize_database_url(args.database_url))
+    try:
+        migrated = migrate_result_indexes(engine)
+    finally:
+        engine.dispose()
+    print("Result indexes migrated." if migrated else "Another process is migrating result indexes, skipped.")
+
+
+if __name__ == "__main__":
+    main()
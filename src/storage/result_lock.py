@@ -0,0 +1,34 @@
+"""
+Result Lock - 本地结果文件写锁
+
+追加写入（save_result / save_results_if_absent / 采集批量写入）与整文件改写
+（删除、重算评分、归档）都持有同一把按结果文件区分的 FileLock（jsonl/.locks/<文件名>.lock），
+避免改写期间追加的记录被临时文件替换覆盖。
+锁实例在进程内复用：同一线程可重入，不同线程与不同进程之间互斥。
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Union
+
+from filelock import FileLock
+
+LOCK_DIR_NAME = ".locks"
+
+_locks: Dict[str, FileLock] = {}
+_locks_lock = threading.Lock()
+
+
+def result_file_lock(result_file: Union[str, Path]) -> FileLock:
+    """获取结果文件的写锁（改写整文件前必须持有，追加写入时也需持有）。"""
+    path = Path(os.path.abspath(str(result_file)))
+    key = str(path)
+    with _locks_lock:
+        lock = _locks.get(key)
+        if lock is None:
+            lock_dir = path.parent / LOCK_DIR_NAME
+            lock_dir.mkdir(parents=True, exist_ok=True)
+            lock = FileLock(str(lock_dir / f"{path.stem}.lock"))
+            _locks[key] = lock
+        return lock
@@ -0,0 +1,567 @@
+"""
+Result Query - 本地结果文件分页查询引擎
+
+为 jsonl/*.jsonl 维护进程内的轻量查询索引：每条记录只保留
+(行偏移, 行长度, 筛选字段, 排序键)，筛选/排序/分页全部在索引上完成，
+最后只按偏移读取并解析当前页的记录。
+
+索引是否过期按"已索引字节数 + 尾部指纹"判断：
+- 源文件仅追加：只解析新增部分，已缓存的排序序列失效后按需重排；
+- 源文件被改写/截断：整体重建一次。
+已归档记录（见 result_archive）由段文件的 summary 列组生成索引行（负数虚拟偏移），与源文件记录一起筛选排序。
+
+除页码分页外，还支持按抓取时间倒序的游标（keyset）分页，游标编码方法与 PostgreSQL 后端共用。
+手动关键词优先走全文检索索引（见 result_search），只处理命中的记录，并支持按相关度排序。
+"""
+
+import base64
+import hashlib
+import heapq
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from src.logging_config import get_logger
+
+from .result_archive import get_result_archive
+from .result_search import search_enabled_for, search_result_file
+
+logger = get_logger(__name__, service="system")
+
+TASK_NAME_KEY = "任务名称"
+KEYWORD_KEY = "搜索关键字"
+CRITERIA_KEY = "AI标准"
+PRODUCT_KEY = "商品信息"
+TITLE_KEY = "商品标题"
+DESC_KEY = "商品描述"
+SELLER_NAME_KEY = "卖家昵称"
+PRICE_KEY = "当前售价"
+PUBLISH_TIME_KEY = "发布时间"
+CRAWL_TIME_KEY = "公开信息浏览时间"
+
+RECOMMENDED_LEVELS = {"STRONG_BUY", "CAUTIOUS_BUY", "CONDITIONAL_BUY"}
+SORT_FIELDS = ("crawl_time", "publish_time", "price")
+# 按手动关键词相关度排序；未输入关键词时等同 crawl_time
+RELEVANCE_SORT = "relevance"
+
+# 尾部指纹窗口：用于确认已索引部分未被改写
+TAIL_FINGERPRINT_BYTES = 256
+
+
+def is_ai_recommended(ai_analysis: Any) -> bool:
+    """按 AI 分析结果判断是否推荐（推荐等级优先，兼容旧的 is_recommended 字段）。"""
+    if not isinstance(ai_analysis, dict):
+        return False
+    level = ai_analysis.get("recommendation_level")
+    if isinstance(level, str):
+        return level in RECOMMENDED_LEVELS
+    return ai_analysis.get("is_recommended") is True
+
+
+def get_record_ai_analysis(record: Dict[str, Any]) -> Dict[str, Any]:
+    ai_analysis = record.get("ai_analysis") or record.get("AI分析") or {}
+    return ai_analysis if isinstance(ai_analysis, dict) else {}
+
+
+def build_search_text(record: Dict[str, Any]) -> str:
+    """拼接手动关键词可命中的字段（标题/描述/卖家/价格/AI理由），统一小写。"""
+    item_info = record.get(PRODUCT_KEY, {})
+    if not isinstance(item_info, dict):
+        item_info = {}
+    ai_analysis = get_record_ai_analysis(record)
+    parts = (
+        item_info.get(TITLE_KEY, ""),
+        item_info.get(DESC_KEY, ""),
+        item_info.get(SELLER_NAME_KEY, ""),
+        item_info.get(PRICE_KEY, ""),
+        ai_analysis.get("reason", ""),
+    )
+    # 用换行分隔，避免关键词跨字段拼接误命中
+    return "\n".join(str(part).lower() for part in parts)
+
+
+def matches_manual_keyword(record: Dict[str, Any], manual_keyword: Optional[str]) -> bool:
+    if not manual_keyword:
+        return True
+    return manual_keyword.lower() in build_search_text(record)
+
+
+def parse_price(value: Any) -> float:
+    price_str = str(value).replace("￥", "").replace(",", "").strip()
+    try:
+        return float(price_str)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def encode_result_cursor(values: Sequence[Any]) -> str:
+    """把上一页最后一条记录的排序位置编码为不透明的分页游标。"""
+    raw = json.dumps(list(values), ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_result_cursor(cursor: str, size: int) -> List[Any]:
+    """解析分页游标，格式不符时抛出 ValueError。"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError("无效的分页游标") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("无效的分页游标")
+    return values
+
+
+def result_sort_key(record: Dict[str, Any], sort_by: str):
+    """结果排序键：publish_time / price / crawl_time（默认）。"""
+    info = record.get(PRODUCT_KEY, {})
+    if not isinstance(info, dict):
+        info = {}
+    if sort_by == "publish_time":
+        return str(info.get(PUBLISH_TIME_KEY, "0000-00-00 00:00"))
+    if sort_by == "price":
+        return parse_price(info.get(PRICE_KEY, "0"))
+    return str(record.get(CRAWL_TIME_KEY, ""))
+
+
+class _IndexRow(NamedTuple):
+    offset: int
+    length: int
+    recommended: bool
+    task_name: Any
+    keyword: Any
+    criteria: Any
+    search_text: str
+    crawl_time: str
+    publish_time: str
+    price: float
+
+
+class ResultFilters(NamedTuple):
+    """结果筛选条件（取值 None/"all" 表示不限）。"""
+    recommended_only: bool = False
+    task_name: Optional[str] = None
+    keyword: Optional[str] = None
+    ai_criteria: Optional[str] = None
+    manual_keyword: Optional[str] = None
+
+    def matches(self, row: _IndexRow) -> bool:
+        if self.recommended_only and not row.recommended:
+            return False
+        if self.task_name and self.task_name != "all" and row.task_name != self.task_name:
+            return False
+        if self.keyword and self.keyword != "all" and row.keyword != self.keyword:
+            return False
+        if self.ai_criteria and self.ai_criteria != "all" and row.criteria != self.ai_criteria:
+            return False
+        if self.manual_keyword and self.manual_keyword.lower() not in row.search_text:
+            return False
+        return True
+
+
+def _build_row(record: Dict[str, Any], offset: int, length: int) -> _IndexRow:
+    return _IndexRow(
+        offset=offset,
+        length=length,
+        recommended=is_ai_recommended(get_record_ai_analysis(record)),
+        task_name=record.get(TASK_NAME_KEY),
+        keyword=record.get(KEYWORD_KEY),
+        criteria=record.get(CRITERIA_KEY),
+        search_text=build_search_text(record),
+        crawl_time=result_sort_key(record, "crawl_time"),
+        publish_time=result_sort_key(record, "publish_time"),
+        price=result_sort_key(record, "price"),
+    )
+
+
+def _row_sort_attr(sort_by: str) -> str:
+    return sort_by if sort_by in SORT_FIELDS else "crawl_time"
+
+
+class ResultQueryIndex:
+    """单个结果文件的查询索引（进程内缓存）。"""
+
+    def __init__(self, result_file: Union[str, Path]):
+        self.result_file = Path(result_file)
+        self._lock = threading.RLock()
+        self._rows: List[_IndexRow] = []
+        self._indexed_bytes = 0
+        self._tail_hash = ""
+        self._source_stat: Optional[Tuple[int, int]] = None
+        # (sort_by, descending) -> 行号序列
+        self._orders: Dict[Tuple[str, bool], List[int]] = {}
+        self._by_offset: Optional[Dict[int, _IndexRow]] = None
+        self._archived_rows: List[_IndexRow] = []
+        self._archive_generation = ""
+        self._all_rows: Optional[List[_IndexRow]] = None
+
+    def sync(self) -> None:
+        """确保索引覆盖源文件当前内容；源文件未变化时仅一次 stat。"""
+        try:
+            stat = self.result_file.stat()
+        except FileNotFoundError:
+            with self._lock:
+                self._reset()
+                self._archived_rows = []
+                self._archive_generation = ""
+                self._source_stat = None
+            return
+
+        self._sync_archive()
+        current_stat = (stat.st_size, stat.st_mtime_ns)
+        if current_stat == self._source_stat:
+            return
+
+        with self._lock:
+            self._catch_up(stat.st_size)
+            self._source_stat = current_stat
+
+    def sorted_rows(self, sort_by: str, descending: bool) -> List[_IndexRow]:
+        """返回按排序键排好的行（相同键保持文件原始顺序），结果按需缓存。"""
+        with self._lock:
+            attr = _row_sort_attr(sort_by)
+            cache_key = (attr, descending)
+            order = self._orders.get(cache_key)
+            if order is None:
+                rows = self._combined_rows()
+                order = sorted(
+                    range(len(rows)),
+                    key=lambda i: getattr(rows[i], attr),
+                    reverse=descending,
+                )
+                self._orders[cache_key] = order
+            rows = self._combined_rows()
+            return [rows[i] for i in order]
+
+    def rows_by_offset(self) -> Dict[int, _IndexRow]:
+        """按行偏移查找索引行（供全文检索命中结果回查），结果按需缓存。"""
+        with self._lock:
+            if self._by_offset is None:
+                self._by_offset = {row.offset: row for row in self._combined_rows()}
+            return self._by_offset
+
+    def read_rows(self, rows: Sequence[_IndexRow]) -> List[Optional[Dict[str, Any]]]:
+        """按偏移读取并解析指定行；读取期间文件被改写导致解析失败的行返回 None。"""
+        records: List[Optional[Dict[str, Any]]] = []
+        if not rows:
+            return records
+        archived_offsets = [row.offset for row in rows if row.offset < 0]
+        archived = get_result_archive(self.result_file).read_records(archived_offsets) if archived_offsets else {}
+        if len(archived_offsets) == len(rows):
+            return [archived.get(row.offset) for row in rows]
+        with open(self.result_file, "rb") as f:
+            for row in rows:
+                if row.offset < 0:
+                    records.append(archived.get(row.offset))
+                    continue
+                f.seek(row.offset)
+                raw_line = f.read(row.length)
+                try:
+                    records.append(json.loads(raw_line))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    records.append(None)
+        return records
+
+    def _combined_rows(self) -> List[_IndexRow]:
+        """已归档记录在前、源文件记录在后（与写入顺序一致）。"""
+        if self._all_rows is None:
+            self._all_rows = self._archived_rows + self._rows if self._archived_rows else self._rows
+        return self._all_rows
+
+    def _invalidate(self) -> None:
+        self._orders = {}
+        self._by_offset = None
+        self._all_rows = None
+
+    def _reset(self) -> None:
+        self._rows = []
+        self._indexed_bytes = 0
+        self._tail_hash = ""
+        self._invalidate()
+
+    def _sync_archive(self) -> None:
+        """归档段变化时重新生成归档记录的索引行（只解压 summary 列组）。"""
+        archive = get_result_archive(self.result_file)
+        if archive.refresh() == self._archive_generation:
+            return
+        generation, summaries = archive.snapshot()
+        rows = [_build_row(summary, offset, 0) for offset, summary in summaries]
+        with self._lock:
+            self._archived_rows = rows
+            self._archive_generation = generation
+            self._invalidate()
+
+    def _fingerprint(self, f, end: int) -> str:
+        start = max(0, end - TAIL_FINGERPRINT_BYTES)
+        f.seek(start)
+        return hashlib.sha1(f.read(end - start)).hexdigest()
+
+    def _catch_up(self, source_size: int) -> None:
+        with open(self.result_file, "rb") as f:
+            rebuild = (
+                source_size < self._indexed_bytes
+                or self._fingerprint(f, self._indexed_bytes) != self._tail_hash
+            )
+            if rebuild:
+                self._reset()
+            elif source_size == self._indexed_bytes:
+                return
+
+            f.seek(self._indexed_bytes)
+            new_rows, consumed = self._parse_complete_lines(f, self._indexed_bytes)
+            if not consumed:
+                if rebuild:
+                    self._tail_hash = self._fingerprint(f, 0)
+                return
+            self._rows.extend(new_rows)
+            self._indexed_bytes += consumed
+            self._tail_hash = self._fingerprint(f, self._indexed_bytes)
+            self._invalidate()
+
+        if rebuild:
+            logger.info(
+                f"结果查询索引已重建: {self.result_file.name}（{len(self._rows)} 条）",
+                extra={"event": "result_query_index_rebuilt", "result_file_path": str(self.result_file)},
+            )
+
+    def _parse_complete_lines(self, f, start: int) -> Tuple[List[_IndexRow], int]:
+        """读取当前位置起的完整行，返回(索引行, 消耗字节数)；末尾半行留待下次。"""
+        rows: List[_IndexRow] = []
+        consumed = 0
+        for raw_line in f:
+            if not raw_line.endswith(b"\n"):
+                break
+            offset = start + consumed
+            consumed += len(raw_line)
+            if not raw_line.strip():
+                continue
+            try:
+                record = json.loads(raw_line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if not isinstance(record, dict):
+                continue
+            rows.append(_build_row(record, offset, len(raw_line)))
+        return rows, consumed
+
+
+_indexes: Dict[str, ResultQueryIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_result_query_index(result_file: Union[str, Path]) -> ResultQueryIndex:
+    """获取（进程内复用的）结果文件查询索引实例。"""
+    key = os.path.abspath(str(result_file))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = ResultQueryIndex(key)
+            _indexes[key] = index
+        return index
+
+
+def query_result_files(
+    result_files: Sequence[Union[str, Path]],
+    filters: Optional[ResultFilters] = None,
+    sort_by: str = "crawl_time",
+    sort_order: str = "desc",
+    offset: int = 0,
+    limit: int = 20,
+    ignore_errors: bool = False,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    在一个或多个结果文件上分页查询，返回(当前页记录, 筛选后总数)。
+
+    多文件时按文件顺序拼接后排序（相同键保持拼接顺序），与逐条加载后
+    list.sort 的结果一致；只有落在当前页的记录会被读取解析。
+    手动关键词走全文检索索引时只对命中记录排序；sort_by="relevance" 按相关度排序。
+    """
+    filters = filters or ResultFilters()
+    descending = sort_order == "desc"
+    attr = _row_sort_attr(sort_by)
+    offset = max(0, offset)
+    limit = max(1, limit)
+
+    sources = _load_sources(result_files, attr, descending, ignore_errors)
+    keyword_hits = _keyword_hits(sources, filters.manual_keyword)
+    if keyword_hits is not None:
+        entries = _hit_entries(sources, keyword_hits, filters._replace(manual_keyword=None))
+        if sort_by == RELEVANCE_SORT:
+            # 相关度相同时按抓取时间倒序
+            entries.sort(key=lambda entry: entry[1].crawl_time, reverse=True)
+            entries.sort(key=lambda entry: keyword_hits[entry[0]][entry[1].offset], reverse=descending)
+        else:
+            # 命中记录已按(文件序号, 行偏移)排列，稳定排序后与拼接排序的结果一致
+            entries.sort(key=lambda entry: getattr(entry[1], attr), reverse=descending)
+        return _read_page(sources, entries[offset:offset + limit]), len(entries)
+
+    if len(sources) == 1:
+        merged = ((0, row) for row in sources[0][2])
+    else:
+        # heapq.merge 在键相同时保持输入顺序，等价于拼接后稳定排序
+        merged = heapq.merge(
+            *[[(source_no, row) for row in rows] for source_no, _, rows in sources],
+            key=lambda entry: getattr(entry[1], attr),
+            reverse=descending,
+        )
+
+    total = 0
+    page_entries: List[Tuple[int, _IndexRow]] = []
+    for entry in merged:
+        if not filters.matches(entry[1]):
+            continue
+        if offset <= total < offset + limit:
+            page_entries.append(entry)
+        total += 1
+
+    return _read_page(sources, page_entries), total
+
+
+def query_result_files_after(
+    result_files: Sequence[Union[str, Path]],
+    filters: Optional[ResultFilters] = None,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    ignore_errors: bool = False,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    按抓取时间倒序做游标分页，返回(当前页记录, 下一页游标)；cursor 为空表示第一页，下一页游标为 None 表示已到末页。
+
+    游标记录上一页最后一条的(抓取时间, 文件序号, 行偏移)。每个文件在排好序的索引上二分定位起点，
+    只向后扫描到凑满一页为止且不统计总数，翻页开销与页码无关。顺序与 query_result_files 的 crawl_time 倒序一致。
+    """
+    filters = filters or ResultFilters()
+    limit = max(1, limit)
+    sources = _load_sources(result_files, "crawl_time", True, ignore_errors)
+    keyword_hits = _keyword_hits(sources, filters.manual_keyword)
+    if keyword_hits is not None:
+        filters = filters._replace(manual_keyword=None)
+
+    starts = [0] * len(sources)
+    if cursor:
+        crawl_time, cursor_source, cursor_offset = decode_result_cursor(cursor, 3)
+        if not isinstance(crawl_time, str) or not isinstance(cursor_source, int) or not isinstance(cursor_offset, int):
+            raise ValueError("无效的分页游标")
+        for pos, (source_no, _, rows) in enumerate(sources):
+            if source_no < cursor_source:
+                is_after = lambda row: row.crawl_time < crawl_time
+            elif source_no == cursor_source:
+                is_after = lambda row: row.crawl_time < crawl_time or (
+                    row.crawl_time == crawl_time and row.offset > cursor_offset
+                )
+            else:
+                is_after = lambda row: row.crawl_time <= crawl_time
+            starts[pos] = _first_matching(rows, is_after)
+
+    merged = heapq.merge(
+        *[_iter_rows_from(source_no, rows, start) for (source_no, _, rows), start in zip(sources, starts)],
+        key=lambda entry: entry[1].crawl_time,
+        reverse=True,
+    )
+    page_entries: List[Tuple[int, _IndexRow]] = []
+    for entry in merged:
+        if not filters.matches(entry[1]):
+            continue
+        if keyword_hits is not None and entry[1].offset not in keyword_hits[entry[0]]:
+            continue
+        page_entries.append(entry)
+        if len(page_entries) > limit:
+            break
+
+    next_cursor = None
+    if len(page_entries) > limit:
+        page_entries = page_entries[:limit]
+        source_no, row = page_entries[-1]
+        next_cursor = encode_result_cursor([row.crawl_time, source_no, row.offset])
+    return _read_page(sources, page_entries), next_cursor
+
+
+def _load_sources(
+    result_files: Sequence[Union[str, Path]],
+    attr: str,
+    descending: bool,
+    ignore_errors: bool,
+) -> List[Tuple[int, ResultQueryIndex, List[_IndexRow]]]:
+    sources: List[Tuple[int, ResultQueryIndex, List[_IndexRow]]] = []
+    for source_no, result_file in enumerate(result_files):
+        index = get_result_query_index(result_file)
+        try:
+            index.sync()
+            rows = index.sorted_rows(attr, descending)
+        except OSError as e:
+            if not ignore_errors:
+                raise
+            logger.warning(
+                f"读取文件失败: {Path(result_file).name}, 错误: {e}",
+                extra={"event": "result_file_load_failed"},
+            )
+            continue
+        sources.append((source_no, index, rows))
+    return sources
+
+
+def _keyword_hits(
+    sources: List[Tuple[int, ResultQueryIndex, List[_IndexRow]]],
+    keyword: Optional[str],
+) -> Optional[Dict[int, Dict[int, float]]]:
+    """手动关键词走全文检索索引，返回 {文件序号: {行偏移: 相关度}}；不适用或索引不可用时返回 None（回退为子串匹配）。"""
+    if not search_enabled_for(keyword):
+        return None
+    hits: Dict[int, Dict[int, float]] = {}
+    for source_no, index, _ in sources:
+        file_hits = search_result_file(index.result_file, keyword)
+        if file_hits is None:
+            return None
+        hits[source_no] = file_hits
+    return hits
+
+
+def _hit_entries(
+    sources: List[Tuple[int, ResultQueryIndex, List[_IndexRow]]],
+    keyword_hits: Dict[int, Dict[int, float]],
+    filters: ResultFilters,
+) -> List[Tuple[int, _IndexRow]]:
+    """按(文件序号, 行偏移)顺序列出命中且满足其余筛选条件的索引行。"""
+    entries: List[Tuple[int, _IndexRow]] = []
+    for source_no, index, _ in sources:
+        rows_by_offset = index.rows_by_offset()
+        for offset in sorted(keyword_hits.get(source_no, ())):
+            row = rows_by_offset.get(offset)
+            if row is not None and filters.matches(row):
+                entries.append((source_no, row))
+    return entries
+
+
+def _iter_rows_from(source_no: int, rows: Sequence[_IndexRow], start: int):
+    for i in range(start, len(rows)):
+        yield source_no, rows[i]
+
+
+def _first_matching(rows: Sequence[_IndexRow], predicate) -> int:
+    """rows 中 predicate 先 False 后 True，二分返回第一个为 True 的位置。"""
+    low, high = 0, len(rows)
+    while low < high:
+        middle = (low + high) // 2
+        if predicate(rows[middle]):
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+def _read_page(
+    sources: List[Tuple[int, ResultQueryIndex, List[_IndexRow]]],
+    page_entries: List[Tuple[int, _IndexRow]],
+) -> List[Dict[str, Any]]:
+    """按文件分组读取当前页，再按页内顺序还原。"""
+    page_records: List[Optional[Dict[str, Any]]] = [None] * len(page_entries)
+    for source_no, index, _ in sources:
+        positions = [pos for pos, entry in enumerate(page_entries) if entry[0] == source_no]
+        if not positions:
+            continue
+        loaded = index.read_rows([page_entries[pos][1] for pos in positions])
+        for pos, record in zip(positions, loaded):
+            page_records[pos] = record
+    return [record for record in page_records if record is not None]
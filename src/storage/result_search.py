@@ -0,0 +1,266 @@
+"""
+Result Search - 本地结果文件全文检索索引
+
+为 jsonl/*.jsonl 维护 SQLite FTS5 旁路索引（jsonl/.index/<文件名>.search.db），
+索引内容与 build_search_text 一致（标题/描述/卖家/价格/AI理由），以记录在源文件中的字节偏移作为 rowid，
+查询时返回命中记录的偏移与 bm25 相关度，供 result_query 过滤和按相关度排序。
+
+使用 trigram 分词：中文不需要分词即可做子串匹配，语义与原来的子串扫描一致；
+关键词少于 3 个字符时无法用 trigram 检索，由调用方回退为子串扫描。
+索引是否过期与去重索引相同，按"已索引字节数 + 尾部指纹"判断：
+- 源文件仅追加（save_result）：只索引新增行；
+- 源文件被改写/截断（delete_results、重算评分）：整体重建一次。
+已归档记录（见 result_archive）以负数虚拟偏移作为 rowid，归档变化时只替换这一部分。
+多进程写入由 SQLite 的 IMMEDIATE 事务串行化。
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from src.config import RESULT_SEARCH_INDEX_ENABLED
+from src.logging_config import get_logger
+
+from .result_archive import get_result_archive
+from .result_index import INDEX_DIR_NAME
+
+logger = get_logger(__name__, service="system")
+
+MIN_KEYWORD_LENGTH = 3
+# 尾部指纹窗口：用于确认已索引部分未被改写
+TAIL_FINGERPRINT_BYTES = 256
+
+_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS result_search USING fts5(body, tokenize='trigram');
+CREATE TABLE IF NOT EXISTS search_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+# 运行环境的 SQLite 不支持 FTS5 trigram（需 3.34+）时整体停用
+_fts_unavailable = False
+
+
+def _fingerprint(f, end: int) -> str:
+    start = max(0, end - TAIL_FINGERPRINT_BYTES)
+    f.seek(start)
+    return hashlib.sha1(f.read(end - start)).hexdigest()
+
+
+class ResultSearchIndex:
+    """单个结果文件的全文检索索引。"""
+
+    def __init__(self, result_file: Union[str, Path]):
+        self.result_file = Path(result_file)
+        self.db_path = self.result_file.parent / INDEX_DIR_NAME / f"{self.result_file.stem}.search.db"
+        self._lock = threading.Lock()
+        self._initialized = False
+        self._source_stat: Optional[Tuple[int, int, str]] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._initialized = True
+        return conn
+
+    def sync(self) -> None:
+        """确保索引覆盖源文件当前内容；源文件未变化时仅一次 stat。"""
+        self._update(force_rebuild=False)
+
+    def rebuild(self) -> None:
+        """丢弃现有索引并从源文件全量重建（源文件被改写后调用）。"""
+        self._update(force_rebuild=True)
+
+    def search(self, keyword: str) -> Dict[int, float]:
+        """返回命中记录的 {行偏移: 相关度}，相关度越大越相关。"""
+        self.sync()
+        if not self.db_path.exists():
+            return {}
+        # 整个关键词作为一个短语：trigram 分词下等价于子串匹配（不区分大小写）
+        query = '"' + keyword.replace('"', '""') + '"'
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT rowid, bm25(result_search) FROM result_search WHERE result_search MATCH ?",
+                (query,),
+            ).fetchall()
+        finally:
+            conn.close()
+        # bm25 越小越相关
+        return {rowid: -score for rowid, score in rows}
+
+    def _update(self, force_rebuild: bool) -> None:
+        try:
+            stat = self.result_file.stat()
+        except FileNotFoundError:
+            with self._lock:
+                self._drop()
+            return
+
+        current_stat = (stat.st_size, stat.st_mtime_ns, get_result_archive(self.result_file).refresh())
+        if current_stat == self._source_stat and not force_rebuild:
+            return
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._catch_up(conn, stat.st_size, force_rebuild)
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            finally:
+                conn.close()
+            self._source_stat = current_stat
+
+    def _catch_up(self, conn: sqlite3.Connection, source_size: int, force_rebuild: bool) -> None:
+        meta = dict(conn.execute("SELECT key, value FROM search_meta").fetchall())
+        self._catch_up_source(conn, meta, source_size, force_rebuild)
+        self._catch_up_archive(conn, meta)
+
+    def _catch_up_source(
+        self, conn: sqlite3.Connection, meta: Dict[str, str], source_size: int, force_rebuild: bool
+    ) -> None:
+        indexed_bytes = int(meta.get("indexed_bytes", 0))
+        with open(self.result_file, "rb") as f:
+            rebuild = (
+                force_rebuild
+                or source_size < indexed_bytes
+                or _fingerprint(f, indexed_bytes) != meta.get("tail_hash", _fingerprint(f, 0))
+            )
+            if rebuild:
+                conn.execute("DELETE FROM result_search WHERE rowid >= 0")
+                indexed_bytes = 0
+            elif source_size == indexed_bytes:
+                return
+
+            # 延迟导入，避免与 result_query 循环引用
+            from .result_query import build_search_text
+
+            f.seek(indexed_bytes)
+            rows = []
+            consumed = 0
+            for raw_line in f:
+                if not raw_line.endswith(b"\n"):
+                    break
+                offset = indexed_bytes + consumed
+                consumed += len(raw_line)
+                if not raw_line.strip():
+                    continue
+                try:
+                    record = json.loads(raw_line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+                if isinstance(record, dict):
+                    rows.append((offset, build_search_text(record)))
+            indexed_bytes += consumed
+            tail_hash = _fingerprint(f, indexed_bytes)
+
+        conn.executemany("INSERT INTO result_search (rowid, body) VALUES (?, ?)", rows)
+        conn.executemany(
+            "INSERT OR REPLACE INTO search_meta (key, value) VALUES (?, ?)",
+            [("indexed_bytes", str(indexed_bytes)), ("tail_hash", tail_hash)],
+        )
+        if rebuild:
+            logger.info(
+                f"结果检索索引已重建: {self.result_file.name}（{len(rows)} 条）",
+                extra={"event": "result_search_index_rebuilt", "result_file_path": str(self.result_file)},
+            )
+
+    def _catch_up_archive(self, conn: sqlite3.Connection, meta: Dict[str, str]) -> None:
+        archive = get_result_archive(self.result_file)
+        if archive.refresh() == meta.get("archive_generation", ""):
+            return
+        from .result_query import build_search_text
+
+        generation, summaries = archive.snapshot()
+        conn.execute("DELETE FROM result_search WHERE rowid < 0")
+        conn.executemany(
+            "INSERT INTO result_search (rowid, body) VALUES (?, ?)",
+            [(offset, build_search_text(summary)) for offset, summary in summaries],
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO search_meta (key, value) VALUES (?, ?)",
+            ("archive_generation", generation),
+        )
+
+    def _drop(self) -> None:
+        """源文件已删除：一并删除索引文件。"""
+        self._source_stat = None
+        self._initialized = False
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(f"{self.db_path}{suffix}")
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(
+                    f"删除结果检索索引失败: {e}",
+                    extra={"event": "result_search_index_drop_failed", "result_file_path": str(self.result_file)},
+                )
+
+
+_indexes: Dict[str, ResultSearchIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_result_search_index(result_file: Union[str, Path]) -> ResultSearchIndex:
+    """获取（进程内复用的）结果文件检索索引实例。"""
+    key = os.path.abspath(str(result_file))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = ResultSearchIndex(key)
+            _indexes[key] = index
+        return index
+
+
+def search_enabled_for(keyword: Optional[str]) -> bool:
+    """关键词能否走全文检索索引（开关、关键词长度与 SQLite 能力）。"""
+    return bool(
+        keyword
+        and len(keyword) >= MIN_KEYWORD_LENGTH
+        and not _fts_unavailable
+        and RESULT_SEARCH_INDEX_ENABLED()
+    )
+
+
+def refresh_result_search_index(result_file: Union[str, Path], rebuild: bool = False) -> None:
+    """结果文件写入/改写后同步检索索引；失败只记录日志，不影响结果保存。"""
+    if _fts_unavailable or not RESULT_SEARCH_INDEX_ENABLED():
+        return
+    index = get_result_search_index(result_file)
+    try:
+        if rebuild:
+            index.rebuild()
+        else:
+            index.sync()
+    except sqlite3.Error as e:
+        _handle_sqlite_error(e, result_file)
+
+
+def search_result_file(result_file: Union[str, Path], keyword: str) -> Optional[Dict[int, float]]:
+    """在单个结果文件中检索关键词，返回 {行偏移: 相关度}；索引不可用时返回 None（由调用方回退为子串扫描）。"""
+    try:
+        return get_result_search_index(result_file).search(keyword.lower())
+    except sqlite3.Error as e:
+        _handle_sqlite_error(e, result_file)
+        return None
+
+
+def _handle_sqlite_error(error: sqlite3.Error, result_file: Union[str, Path]) -> None:
+    global _fts_unavailable
+    if "trigram" in str(error) or "fts5" in str(error):
+        _fts_unavailable = True
+    logger.warning(
+        f"结果检索索引不可用，回退为逐条匹配: {error}",
+        extra={"event": "result_search_index_failed", "result_file_path": str(result_file)},
+    )
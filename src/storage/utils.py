@@ -7,7 +7,9 @@ Storage Utilities - 加密和辅助工具
 import os
 import hashlib
 import base64
-from typing import Optional
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
@@ -28,6 +30,26 @@ def get_master_key() -> bytes:
     return hashlib.sha256(key.encode()).digest()
 
 
+# 用户密钥/加密器缓存：PBKDF2 每次派生约数十毫秒，按 (主密钥指纹, user_id) 复用
+USER_CIPHER_CACHE_SIZE = 256
+_cipher_cache: "OrderedDict[Tuple[str, str], Fernet]" = OrderedDict()
+_cipher_cache_lock = threading.Lock()
+_cipher_cache_fingerprint = ""
+
+
+def _master_key_fingerprint(master_key: bytes) -> str:
+    """主密钥指纹（不保留密钥本身），用于识别密钥轮换。"""
+    return hashlib.sha256(b"cipher-cache:" + master_key).hexdigest()[:16]
+
+
+def clear_user_cipher_cache() -> None:
+    """清空用户密钥缓存（主密钥轮换或配置重载后调用）。"""
+    global _cipher_cache_fingerprint
+    with _cipher_cache_lock:
+        _cipher_cache.clear()
+        _cipher_cache_fingerprint = ""
+
+
 def derive_user_key(user_id: str) -> bytes:
     """
     为用户派生独立的加密密钥
@@ -55,7 +77,7 @@ def derive_user_key(user_id: str) -> bytes:
 
 def get_user_cipher(user_id: str) -> Fernet:
     """
-    获取用户专属的加密器
+    获取用户专属的加密器（按主密钥指纹与用户ID缓存，LRU 有界）
     
     Args:
         user_id: 用户ID
@@ -63,8 +85,27 @@ def get_user_cipher(user_id: str) -> Fernet:
     Returns:
         Fernet: 加密器实例
     """
-    user_key = derive_user_key(user_id)
-    return Fernet(user_key)
+    global _cipher_cache_fingerprint
+    fingerprint = _master_key_fingerprint(get_master_key())
+    cache_key = (fingerprint, str(user_id))
+    with _cipher_cache_lock:
+        if fingerprint != _cipher_cache_fingerprint:
+            # 主密钥已轮换：旧密钥派生的加密器全部作废
+            _cipher_cache.clear()
+            _cipher_cache_fingerprint = fingerprint
+        cipher = _cipher_cache.get(cache_key)
+        if cipher is not None:
+            _cipher_cache.move_to_end(cache_key)
+            return cipher
+
+    cipher = Fernet(derive_user_key(user_id))
+    with _cipher_cache_lock:
+        if fingerprint == _cipher_cache_fingerprint:
+            _cipher_cache[cache_key] = cipher
+            _cipher_cache.move_to_end(cache_key)
+            while len(_cipher_cache) > USER_CIPHER_CACHE_SIZE:
+                _cipher_cache.popitem(last=False)
+    return cipher
 
 
 def encrypt_sensitive(user_id: str, data: str) -> str:
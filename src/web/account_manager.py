@@ -11,7 +11,7 @@ from typing import List, Optional, Dict, Any, Tuple
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 
-from src.storage import get_storage
+from src.storage import get_async_storage
 from src.web.auth import get_current_user, is_multi_user_mode
 from src.logging_config import get_logger
 
@@ -313,11 +313,11 @@ def _find_storage_account(accounts: List[Dict[str, Any]], account_id: str) -> Op
 
 
 async def _set_storage_active_account(user_id: str, target_account_id: str):
-    storage = get_storage()
-    accounts = storage.get_user_platform_accounts(user_id)
+    storage = get_async_storage()
+    accounts = await storage.get_user_platform_accounts(user_id)
     for account in accounts:
         account["is_active"] = str(account.get("id")) == str(target_account_id)
-        storage.save_user_platform_account(user_id, account)
+        await storage.save_user_platform_account(user_id, account)
 
 
 def get_account_file_path(name: str) -> str:
@@ -377,8 +377,8 @@ async def list_accounts(request: Request) -> List[AccountInfo]:
     """获取账号列表"""
     user_id = _get_current_user_id(request)
     if user_id:
-        storage = get_storage()
-        accounts = storage.get_user_platform_accounts(user_id)
+        storage = get_async_storage()
+        accounts = await storage.get_user_platform_accounts(user_id)
         accounts.sort(key=lambda item: item.get("created_at") or "", reverse=True)
         return [_map_storage_account_to_info(account, idx) for idx, account in enumerate(accounts)]
 
@@ -425,8 +425,8 @@ async def reorder_accounts(payload: AccountOrderUpdate, request: Request):
     user_id = _get_current_user_id(request)
     if user_id:
         # 多用户模式下账户存储在数据库，当前仅做接口兼容和参数校验。
-        storage = get_storage()
-        existing = storage.get_user_platform_accounts(user_id)
+        storage = get_async_storage()
+        existing = await storage.get_user_platform_accounts(user_id)
         existing_ids = {str(item.get("id")) for item in existing}
         ordered_ids = [str(name) for name in payload.ordered_names]
         if len(existing_ids) != len(ordered_ids):
@@ -467,8 +467,8 @@ async def cleanup_expired_accounts(request: Request):
     """批量清理失效账号"""
     user_id = _get_current_user_id(request)
     if user_id:
-        storage = get_storage()
-        accounts = storage.get_user_platform_accounts(user_id)
+        storage = get_async_storage()
+        accounts = await storage.get_user_platform_accounts(user_id)
         deleted_names: List[str] = []
         import time
         current_time = time.time()
@@ -477,7 +477,7 @@ async def cleanup_expired_accounts(request: Request):
             cookies = _parse_cookies(account.get("cookies"))
             if _is_account_expired(cookies, current_time):
                 account_id = str(account.get("id"))
-                storage.delete_user_platform_account(account_id, user_id)
+                await storage.delete_user_platform_account(account_id, user_id)
                 deleted_names.append(account.get("display_name") or account_id)
 
         if not deleted_names:
@@ -539,8 +539,8 @@ async def create_account(account: AccountCreate, request: Request):
     state_payload, state_payload_json = _extract_state_payload_from_state_content(account.state_content)
 
     if user_id:
-        storage = get_storage()
-        created = storage.save_user_platform_account(user_id, {
+        storage = get_async_storage()
+        created = await storage.save_user_platform_account(user_id, {
             "platform": "goofish",
             "display_name": account.display_name or account.name,
             "cookies": state_payload_json,
@@ -552,7 +552,7 @@ async def create_account(account: AccountCreate, request: Request):
             "risk_control_history": [],
             "is_active": False,
         })
-        accounts = storage.get_user_platform_accounts(user_id)
+        accounts = await storage.get_user_platform_accounts(user_id)
         if len(accounts) == 1:
             await _set_storage_active_account(user_id, str(created.get("id")))
         return {"message": f"账号 '{account.display_name or account.name}' 创建成功"}
@@ -599,8 +599,8 @@ async def get_account(name: str, request: Request):
     """获取账号详情"""
     user_id = _get_current_user_id(request)
     if user_id:
-        storage = get_storage()
-        accounts = storage.get_user_platform_accounts(user_id)
+        storage = get_async_storage()
+        accounts = await storage.get_user_platform_accounts(user_id)
         account = _find_storage_account(accounts, name)
         if not account:
             raise HTTPException(status_code=404, detail="账号不存在")
@@ -638,8 +638,8 @@ async def test_account_cookie(name: str, request: Request):
     user_id = _get_current_user_id(request)
 
     if user_id:
-        storage = get_storage()
-        accounts = storage.get_user_platform_accounts(user_id)
+        storage = get_async_storage()
+        accounts = await storage.get_user_platform_accounts(user_id)
         account = _find_storage_account(accounts, name)
         if not account:
             raise HTTPException(status_code=404, detail="账号不存在")
@@ -697,8 +697,8 @@ async def duplicate_account(name: str, request: Request, payload: DuplicateAccou
     user_id = _get_current_user_id(request)
 
     if user_id:
-        storage = get_storage()
-        accounts = storage.get_user_platform_accounts(user_id)
+        storage = get_async_storage()
+        accounts = await storage.get_user_platform_accounts(user_id)
         source = _find_storage_account(accounts, name)
         if not source:
             raise HTTPException(status_code=404, detail="源账号不存在")
@@ -721,7 +721,7 @@ async def duplicate_account(name: str, request: Request, payload: DuplicateAccou
         copied["risk_control_count"] = 0
         copied["risk_control_history"] = []
         copied["is_active"] = False
-        storage.save_user_platform_account(user_id, copied)
+        await storage.save_user_platform_account(user_id, copied)
         return {"message": f"账号 '{name}' 已成功复制为 '{target_name}'", "new_name": target_name}
 
     source_data = await read_account_file(name)
@@ -751,8 +751,8 @@ async def update_account(name: str, update: AccountUpdate, request: Request):
     user_id = _get_current_user_id(request)
 
     if user_id:
-        storage = get_storage()
-        accounts = storage.get_user_platform_accounts(user_id)
+        storage = get_async_storage()
+        accounts = await storage.get_user_platform_accounts(user_id)
         account = _find_storage_account(accounts, name)
         if not account:
             raise HTTPException(status_code=404, detail="账号不存在")
@@ -769,7 +769,7 @@ async def update_account(name: str, update: AccountUpdate, request: Request):
 
         merged = dict(account)
         merged.update(payload)
-        storage.save_user_platform_account(user_id, merged)
+        await storage.save_user_platform_account(user_id, merged)
         return {"message": f"账号 '{name}' 更新成功"}
 
     data = await read_account_file(name)
@@ -791,8 +791,8 @@ async def delete_account(name: str, request: Request):
     user_id = _get_current_user_id(request)
 
     if user_id:
-        storage = get_storage()
-        deleted = storage.delete_user_platform_account(name, user_id)
+        storage = get_async_storage()
+        deleted = await storage.delete_user_platform_account(name, user_id)
         if not deleted:
             raise HTTPException(status_code=404, detail="账号不存在")
         return {"message": f"账号 '{name}' 已删除"}
@@ -814,8 +814,8 @@ async def activate_account(name: str, request: Request):
     """激活账号"""
     user_id = _get_current_user_id(request)
     if user_id:
-        storage = get_storage()
-        accounts = storage.get_user_platform_accounts(user_id)
+        storage = get_async_storage()
+        accounts = await storage.get_user_platform_accounts(user_id)
         account = _find_storage_account(accounts, name)
         if not account:
             raise HTTPException(status_code=404, detail="账号不存在")
@@ -836,8 +836,8 @@ async def record_risk_control(name: str, request: Request, reason: str = "未知
     user_id = _get_current_user_id(request)
 
     if user_id:
-        storage = get_storage()
-        accounts = storage.get_user_platform_accounts(user_id)
+        storage = get_async_storage()
+        accounts = await storage.get_user_platform_accounts(user_id)
         account = _find_storage_account(accounts, name)
         if not account:
             raise HTTPException(status_code=404, detail="账号不存在")
@@ -847,7 +847,7 @@ async def record_risk_control(name: str, request: Request, reason: str = "未知
         history = history[-50:]
         account["risk_control_count"] = int(account.get("risk_control_count") or 0) + 1
         account["risk_control_history"] = history
-        storage.save_user_platform_account(user_id, account)
+        await storage.save_user_platform_account(user_id, account)
         return {"message": "风控记录已保存"}
 
     data = await read_account_file(name)
@@ -871,13 +871,13 @@ async def update_last_used(name: str, request: Request):
     user_id = _get_current_user_id(request)
 
     if user_id:
-        storage = get_storage()
-        accounts = storage.get_user_platform_accounts(user_id)
+        storage = get_async_storage()
+        accounts = await storage.get_user_platform_accounts(user_id)
         account = _find_storage_account(accounts, name)
         if not account:
             raise HTTPException(status_code=404, detail="账号不存在")
         account["last_used_at"] = datetime.now().isoformat()
-        storage.save_user_platform_account(user_id, account)
+        await storage.save_user_platform_account(user_id, account)
         return {"message": "使用时间已更新"}
 
     data = await read_account_file(name)
@@ -889,14 +889,14 @@ async def update_last_used(name: str, request: Request):
 async def get_account_state_for_scraper(name: str, user_id: Optional[str] = None) -> dict:
     """获取账号状态供采集器使用"""
     if user_id and is_multi_user_mode():
-        storage = get_storage()
-        accounts = storage.get_user_platform_accounts(user_id)
+        storage = get_async_storage()
+        accounts = await storage.get_user_platform_accounts(user_id)
         account = _find_storage_account(accounts, name)
         if not account:
             raise HTTPException(status_code=404, detail=f"账号 '{name}' 不存在")
 
         account["last_used_at"] = datetime.now().isoformat()
-        storage.save_user_platform_account(user_id, account)
+        await storage.save_user_platform_account(user_id, account)
         state_payload = _extract_state_payload_from_storage_account(account)
         return {
             "cookies": state_payload.get("cookies", []),
@@ -921,8 +921,8 @@ async def get_account_state_for_scraper(name: str, user_id: Optional[str] = None
 async def get_next_available_account(current_account: str, user_id: Optional[str] = None) -> Optional[str]:
     """获取下一个可用账号"""
     if user_id and is_multi_user_mode():
-        storage = get_storage()
-        accounts = storage.get_user_platform_accounts(user_id)
+        storage = get_async_storage()
+        accounts = await storage.get_user_platform_accounts(user_id)
         available = [item for item in accounts if str(item.get("id")) != str(current_account)]
         if not available:
             return None
@@ -21,6 +21,7 @@ from fastapi.responses import RedirectResponse
 from fastapi.staticfiles import StaticFiles
 
 from src.storage import get_storage
+from src.storage.auth_cache import auth_cache
 from src.storage.utils import verify_password, hash_token
 from src.logging_config import get_logger
 from src.config import STORAGE_BACKEND, WEB_USERNAME, WEB_PASSWORD
@@ -290,7 +291,18 @@ def get_user_groups(user: Optional[dict]) -> List[Dict]:
         return []
 
     storage = get_storage()
-    return storage.get_user_groups(str(user_id))
+    return auth_cache.get_user_groups(str(user_id), lambda: storage.get_user_groups(str(user_id)))
+
+
+def _collect_group_categories(groups: List[Dict]) -> Set[str]:
+    """从用户组权限聚合出启用的权限类别。"""
+    categories: Set[str] = set()
+    for group in groups:
+        for permission in group.get("permissions", []):
+            category = permission.get("category")
+            if permission.get("enabled") and category in PERMISSION_CATEGORIES:
+                categories.add(category)
+    return categories
 
 
 def get_user_categories(user: Optional[dict]) -> Set[str]:
@@ -302,16 +314,16 @@ def get_user_categories(user: Optional[dict]) -> Set[str]:
         return set()
 
     try:
-        groups = get_user_groups(user)
-        if not groups:
-            return set()
-        categories: Set[str] = set()
-        for group in groups:
-            for permission in group.get("permissions", []):
-                category = permission.get("category")
-                if permission.get("enabled") and category in PERMISSION_CATEGORIES:
-                    categories.add(category)
-        return categories
+        user_id = user.get("user_id") or user.get("id")
+        if not is_multi_user_mode() or not user_id:
+            return _collect_group_categories(get_user_groups(user))
+
+        storage = get_storage()
+        return auth_cache.get_user_categories(
+            str(user_id),
+            lambda: storage.get_user_groups(str(user_id)),
+            _collect_group_categories,
+        )
     except Exception as e:
         logger.warning(
             "获取用户组权限失败",
@@ -462,8 +474,9 @@ def verify_session_token(token: str) -> Optional[dict]:
         # 多用户模式：验证用户是否仍然有效
         if is_multi_user_mode():
             storage = get_storage()
-            user = storage.get_user_by_id(session_data.get('user_id'))
-            if not user or not user.get('is_active', True):
+            user_id = session_data.get('user_id')
+            user_state = auth_cache.get_user_state(user_id, lambda: storage.get_user_by_id(user_id))
+            if not user_state or not user_state.get('is_active', True):
                 return None
         
         return session_data
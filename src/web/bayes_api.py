@@ -17,6 +17,7 @@ import re
 # v1.0.0: 存储层和反馈模块集成
 from src.web.auth import get_current_user, is_multi_user_mode
 from src.logging_config import get_logger
+from src.storage.async_storage import run_storage_call
 from src.user_file_store import list_scoped_files, resolve_virtual_task_file
 
 router = APIRouter(prefix="/api/system/bayes", tags=["bayes"])
@@ -236,9 +237,9 @@ async def get_bayes_config(request: Request, version: str = 'bayes_v1'):
     """获取贝叶斯配置"""
     owner_id = _require_config_owner_id(request)
     normalized_version = _normalize_profile_version(version)
-    config = _load_bayes_profile_db_first(normalized_version, owner_id=owner_id)
+    config = await run_storage_call(_load_bayes_profile_db_first, normalized_version, owner_id=owner_id)
     if isinstance(config, dict):
-        _merge_runtime_feedback_samples(config=config, version=normalized_version, owner_id=owner_id)
+        await run_storage_call(_merge_runtime_feedback_samples, config=config, version=normalized_version, owner_id=owner_id)
         return JSONResponse(content=config)
 
     config_file = resolve_virtual_task_file(
@@ -254,7 +255,7 @@ async def get_bayes_config(request: Request, version: str = 'bayes_v1'):
         with open(str(config_file), 'r', encoding='utf-8') as f:
             config = json.load(f)
 
-        _merge_runtime_feedback_samples(config=config, version=normalized_version, owner_id=owner_id)
+        await run_storage_call(_merge_runtime_feedback_samples, config=config, version=normalized_version, owner_id=owner_id)
         
         return JSONResponse(content=config)
     except Exception as e:
@@ -276,7 +277,7 @@ async def save_bayes_config(request: Request, data: dict):
         if errors:
             raise HTTPException(status_code=400, detail={'errors': errors})
 
-        db_saved = _save_bayes_profile_db_first(version, data, owner_id=owner_id)
+        db_saved = await run_storage_call(_save_bayes_profile_db_first, version, data, owner_id=owner_id)
         if db_saved:
             return {'success': True, 'message': '配置保存成功'}
         
@@ -312,7 +313,7 @@ async def delete_bayes_config(request: Request, version: str = 'bayes_v1'):
     normalized_version = _normalize_profile_version(version)
     owner_id = _require_config_owner_id(request)
 
-    if _delete_bayes_profile_db_first(normalized_version, owner_id=owner_id):
+    if await run_storage_call(_delete_bayes_profile_db_first, normalized_version, owner_id=owner_id):
         return {'success': True, 'message': '配置删除成功'}
 
     if owner_id:
@@ -369,10 +370,10 @@ async def get_versions(request: Request):
         owner_id = _require_config_owner_id(request)
         if is_multi_user_mode():
             try:
-                from src.storage import get_storage
+                from src.storage import get_async_storage
 
-                storage = get_storage()
-                profiles = storage.list_bayes_profiles(owner_id=owner_id, include_system=True)
+                storage = get_async_storage()
+                profiles = await storage.list_bayes_profiles(owner_id=owner_id, include_system=True)
                 versions = sorted(
                     {
                         _normalize_profile_version(str(item.get("version") or ""))
@@ -416,7 +417,8 @@ async def submit_feedback(request: Request, data: FeedbackRequest):
         owner_id = _require_feedback_owner_id(request)
         sample_manager = get_sample_manager(owner_id)
         
-        result = sample_manager.add_feedback(
+        result = await run_storage_call(
+            sample_manager.add_feedback,
             result_id=data.result_id,
             feedback_type=feedback_type,
             product_data=data.product_data,
@@ -459,7 +461,7 @@ async def cancel_feedback(request: Request, result_id: str):
         owner_id = _require_feedback_owner_id(request)
         sample_manager = get_sample_manager(owner_id)
 
-        success = sample_manager.cancel_feedback(result_id=result_id)
+        success = await run_storage_call(sample_manager.cancel_feedback, result_id=result_id)
 
         if success:
             return {
@@ -512,7 +514,7 @@ async def submit_batch_feedback(request: Request, data: BatchFeedbackRequest):
                 detail=f"第 {invalid_feedbacks[0]} 条反馈的 feedback_type 非法，仅支持 trusted/untrusted"
             )
         
-        stats = sample_manager.batch_add_feedback(feedbacks, keyword=data.keyword)
+        stats = await run_storage_call(sample_manager.batch_add_feedback, feedbacks, keyword=data.keyword)
         
         return {
             'success': True,
@@ -543,7 +545,7 @@ async def get_sample_stats(request: Request):
         owner_id = _require_feedback_owner_id(request)
         sample_manager = get_sample_manager(owner_id)
         
-        stats = sample_manager.get_sample_stats()
+        stats = await run_storage_call(sample_manager.get_sample_stats)
         return stats
     except ImportError:
         return {
@@ -570,7 +572,7 @@ async def clear_user_samples(request: Request):
         owner_id = _require_feedback_owner_id(request)
         sample_manager = get_sample_manager(owner_id)
         
-        count = sample_manager.clear_user_samples()
+        count = await run_storage_call(sample_manager.clear_user_samples)
         
         return {
             'success': True,
@@ -596,7 +598,7 @@ async def reset_to_preset(request: Request):
         owner_id = _require_feedback_owner_id(request)
         sample_manager = get_sample_manager(owner_id)
         
-        result = sample_manager.reset_to_preset()
+        result = await run_storage_call(sample_manager.reset_to_preset)
         
         return {
             'success': True,
@@ -1,21 +1,21 @@
 import os
 import json
-import re
+import asyncio
 import aiofiles
 from datetime import datetime
 from typing import Optional, List
 from pathlib import Path
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 
+from src.config import LOG_INDEX_ENABLED, LOG_STREAM_HEARTBEAT_SECONDS
 from src.logging_config import get_logger
+from src.web.log_reader import read_log_tail
+from src.web.log_stream import get_log_stream_hub
 
 # 获取logger
 logger = get_logger(__name__, service="web")
 
-# ANSI 转义序列匹配（用于清理控制台颜色码）
-_ANSI_ESCAPE_RE = re.compile(r'\x1B\[[0-?]*[ -/]*[@-~]')
-
 # 日志目录配置
 LOG_DIR = os.path.join("logs")
 LEGACY_LOG_FILE = os.path.join(LOG_DIR, "fetcher.log")
@@ -33,14 +33,15 @@ def sys_log(message: str, level: str = "INFO"):
     log_func(message, extra={"event": "sys_log"})
 
 
-def _strip_ansi(text: str) -> str:
-    """移除日志中的ANSI颜色码，避免Web端出现乱码样式"""
-    if not text:
-        return text
-    return _ANSI_ESCAPE_RE.sub('', text)
+router = APIRouter()
 
 
-router = APIRouter()
+def _resolve_log_file(file: str) -> str:
+    if file == "system":
+        return SYSTEM_LOG_FILE
+    if file == "error":
+        return ERROR_LOG_FILE
+    return LEGACY_LOG_FILE
 
 
 @router.get("/api/logs")
@@ -62,63 +63,23 @@ async def get_logs(
         file: 日志文件类型 (fetcher/system/error)
         level: 日志等级筛选
     """
-    # 选择日志文件
-    if file == "system":
-        log_file_path = SYSTEM_LOG_FILE
-    elif file == "error":
-        log_file_path = ERROR_LOG_FILE
-    else:
-        log_file_path = LEGACY_LOG_FILE
+    log_file_path = _resolve_log_file(file)
     
     if not os.path.exists(log_file_path):
         return JSONResponse(content={"new_content": "日志文件不存在或尚未创建。", "new_pos": 0})
 
     try:
-        async with aiofiles.open(log_file_path, 'rb') as f:
-            await f.seek(0, os.SEEK_END)
-            file_size = await f.tell()
-
-            if from_pos >= file_size:
-                return {"new_content": "", "new_pos": file_size}
-
-            await f.seek(from_pos)
-            new_bytes = await f.read()
-
-        new_content = new_bytes.decode('utf-8', errors='replace')
-        new_content = _strip_ansi(new_content)
-        
-        # 按行分割
-        lines = [line for line in new_content.split('\n') if line.strip()]
-
-        # 任务名称筛选
-        if task_name and task_name.strip():
-            filtered_lines = []
-            for line in lines:
-                if task_name == '系统':
-                    if '[系统]' in line or '"service": "system"' in line or '"service": "web"' in line:
-                        filtered_lines.append(line)
-                else:
-                    if task_name in line or task_name.lower() in line.lower():
-                        filtered_lines.append(line)
-            lines = filtered_lines
-        
-        # 等级筛选
-        if level and level.strip():
-            level_upper = level.upper()
-            filtered_lines = []
-            for line in lines:
-                # 支持传统格式 [INFO] 和 JSON格式 "level": "INFO"
-                if f'[{level_upper}]' in line or f'"level": "{level_upper}"' in line:
-                    filtered_lines.append(line)
-            lines = filtered_lines
-        
-        # 限制返回的行数，保留最新的N条
-        if limit > 0 and len(lines) > limit:
-            lines = lines[-limit:]
-        
-        new_content = '\n'.join(lines)
-
-        return {"new_content": new_content, "new_pos": file_size}
+        # 从文件末尾向前读取，只解析最后 limit 条匹配行（ANSI颜色码在读取时清理）
+        lines, file_size = await asyncio.to_thread(
+            read_log_tail,
+            log_file_path,
+            from_pos=from_pos,
+            task_name=task_name,
+            level=level,
+            limit=limit,
+            use_index=LOG_INDEX_ENABLED(),
+        )
+        return {"new_content": '\n'.join(lines), "new_pos": file_size}
 
     except Exception as e:
         logger.error(f"读取日志文件时出错: {e}", extra={"event": "log_read_error", "file": file})
@@ -128,6 +89,81 @@ async def get_logs(
         )
 
 
+@router.get("/api/logs/stream")
+async def stream_logs(
+    request: Request,
+    from_pos: int = -1,
+    task_name: str = None,
+    limit: int = 100,
+    file: str = Query("fetcher", description="日志文件: fetcher/system/error"),
+    level: str = Query(None, description="日志等级筛选: DEBUG/INFO/WARNING/ERROR/CRITICAL")
+):
+    """
+    日志实时推送（Server-Sent Events）。
+    同一日志文件由一个共享协程读取新增行，按订阅者的任务名/等级筛选后推送，替代 from_pos 轮询。
+
+    Args:
+        from_pos: 客户端已读到的位置（通常为 /api/logs 返回的 new_pos），会先补发此后的内容
+        limit: 补发内容的行数限制
+    事件:
+        message: {"new_content": "...", "new_pos": N}
+        reset: 日志文件被清空/轮转，客户端应整体刷新
+    """
+    log_file_path = _resolve_log_file(file)
+    hub = get_log_stream_hub()
+    subscription, start_pos = hub.subscribe(log_file_path, task_name=task_name, level=level, from_pos=from_pos)
+
+    def format_event(payload: dict, event: str = None) -> str:
+        prefix = f"event: {event}\n" if event else ""
+        return f"{prefix}data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+    async def event_source():
+        heartbeat = LOG_STREAM_HEARTBEAT_SECONDS()
+        try:
+            # 补发 [from_pos, start_pos)，之后的内容由共享协程推送
+            if 0 <= from_pos < start_pos:
+                lines, _ = await asyncio.to_thread(
+                    read_log_tail,
+                    log_file_path,
+                    from_pos=from_pos,
+                    task_name=task_name,
+                    level=level,
+                    limit=limit,
+                    use_index=LOG_INDEX_ENABLED(),
+                    end_pos=start_pos,
+                )
+                if lines:
+                    yield format_event({"new_content": '\n'.join(lines), "new_pos": start_pos})
+
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                lines = []
+                while True:
+                    if event.reset:
+                        lines = []
+                        yield format_event({"new_pos": event.pos}, event="reset")
+                    else:
+                        lines.extend(event.lines)
+                    if subscription.queue.empty():
+                        break
+                    event = subscription.queue.get_nowait()
+                if lines:
+                    yield format_event({"new_content": '\n'.join(lines), "new_pos": event.pos})
+        finally:
+            hub.unsubscribe(log_file_path, subscription)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/api/logs/files")
 async def list_log_files():
     """列出所有可用的日志文件"""
@@ -210,12 +246,7 @@ async def cleanup_logs(retention_days: int = Query(7, description="保留天数"
 @router.delete("/api/logs")
 async def clear_logs(file: str = Query("fetcher", description="要清空的日志文件")):
     """清空指定的日志文件内容。"""
-    if file == "system":
-        log_file_path = SYSTEM_LOG_FILE
-    elif file == "error":
-        log_file_path = ERROR_LOG_FILE
-    else:
-        log_file_path = LEGACY_LOG_FILE
+    log_file_path = _resolve_log_file(file)
     
     if not os.path.exists(log_file_path):
         return {"message": "日志文件不存在，无需清空。"}
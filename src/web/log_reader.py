@@ -0,0 +1,285 @@
+"""
+Log Reader - 日志尾部读取与等级旁路索引
+
+/api/logs 只需要最近 N 条匹配行，这里从文件末尾按块向前读取，凑够 N 条即停止，
+不再把整个日志读入内存。
+
+可选的旁路索引（logs/.index/ 下的 <stem>.<LEVEL>.off + <stem>.meta.json）
+按等级记录行起始偏移，只增量解析新写入部分；文件轮转/清空后自动重建。
+带等级筛选的尾部查询与 from_pos 增量读取只需读取候选行。
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.logging_config import get_logger
+
+logger = get_logger(__name__, service="web")
+
+_ANSI_ESCAPE_RE = re.compile(r'\x1B\[[0-?]*[ -/]*[@-~]')
+
+READ_BLOCK_SIZE = 64 * 1024
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+INDEX_DIR_NAME = ".index"
+INDEX_FORMAT_VERSION = 1
+TAIL_FINGERPRINT_BYTES = 256
+_LEVEL_NAMES = "|".join(LOG_LEVELS)
+_LEVEL_MARKER_RE = re.compile(rf'\[({_LEVEL_NAMES})\]|"level": "({_LEVEL_NAMES})"'.encode())
+
+
+def strip_ansi(text: str) -> str:
+    """移除日志中的ANSI颜色码"""
+    if not text:
+        return text
+    return _ANSI_ESCAPE_RE.sub('', text)
+
+
+def decode_line(raw: bytes) -> str:
+    """解码一行原始日志并去除颜色码。"""
+    return strip_ansi(raw.decode('utf-8', errors='replace'))
+
+
+def _line_has_level(line: str, level_upper: str) -> bool:
+    # 支持传统格式 [INFO] 和 JSON格式 "level": "INFO"
+    return f'[{level_upper}]' in line or f'"level": "{level_upper}"' in line
+
+
+def line_matches(line: str, task_name: Optional[str], level: Optional[str]) -> bool:
+    """判断日志行是否满足任务名/等级筛选（空行不匹配）。"""
+    if not line.strip():
+        return False
+    if task_name and task_name.strip():
+        if task_name == '系统':
+            if not ('[系统]' in line or '"service": "system"' in line or '"service": "web"' in line):
+                return False
+        elif not (task_name in line or task_name.lower() in line.lower()):
+            return False
+    if level and level.strip() and not _line_has_level(line, level.upper()):
+        return False
+    return True
+
+
+def iter_lines_backward(f, start: int, end: int, block_size: int = READ_BLOCK_SIZE) -> Iterator[bytes]:
+    """从 end 向前按块读取，逆序产出 [start, end) 区间内的各行（不含换行符）。"""
+    pos = end
+    carry = b""
+    while pos > start:
+        read_start = max(start, pos - block_size)
+        f.seek(read_start)
+        chunk = f.read(pos - read_start)
+        pos = read_start
+        parts = (chunk + carry).split(b"\n")
+        carry = parts[0]
+        for part in reversed(parts[1:]):
+            yield part
+    yield carry
+
+
+class LogLevelIndex:
+    """单个日志文件的等级旁路索引：每个等级一份行起始偏移数组。"""
+
+    def __init__(self, log_file: str):
+        self.log_file = Path(log_file)
+        self.index_dir = self.log_file.parent / INDEX_DIR_NAME
+        stem = self.log_file.stem
+        self.meta_file = self.index_dir / f"{stem}.meta.json"
+        self.offset_files = {level: self.index_dir / f"{stem}.{level}.off" for level in LOG_LEVELS}
+        self._lock = threading.Lock()
+        self._offsets: Dict[str, array] = {}
+        self._indexed_bytes = 0
+        self._tail_hash = ""
+        self._loaded = False
+
+    @property
+    def indexed_bytes(self) -> int:
+        return self._indexed_bytes
+
+    def offsets(self, level: str) -> array:
+        return self._offsets.get(level.upper(), array("Q"))
+
+    def sync(self) -> None:
+        """追上日志文件当前内容（仅解析新增的完整行）。"""
+        with self._lock:
+            try:
+                size = self.log_file.stat().st_size
+            except FileNotFoundError:
+                self._reset()
+                return
+            if not self._loaded:
+                self._load()
+            with open(self.log_file, "rb") as f:
+                if size < self._indexed_bytes or self._fingerprint(f, self._indexed_bytes) != self._tail_hash:
+                    self._reset()
+                if size > self._indexed_bytes:
+                    self._catch_up(f, size)
+
+    def _fingerprint(self, f, end: int) -> str:
+        start = max(0, end - TAIL_FINGERPRINT_BYTES)
+        f.seek(start)
+        return hashlib.sha1(f.read(end - start)).hexdigest()
+
+    def _reset(self) -> None:
+        self._offsets = {level: array("Q") for level in LOG_LEVELS}
+        self._indexed_bytes = 0
+        self._tail_hash = hashlib.sha1(b"").hexdigest()
+        self._loaded = True
+        for path in self.offset_files.values():
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        try:
+            self.meta_file.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            with open(self.meta_file, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != INDEX_FORMAT_VERSION:
+                raise ValueError("index version mismatch")
+            offsets = {}
+            for level, path in self.offset_files.items():
+                values = array("Q")
+                if path.exists():
+                    with open(path, "rb") as f:
+                        values.frombytes(f.read())
+                # 只保留元数据确认过的部分，截掉上次中断时多写的尾部
+                count = int(meta.get("counts", {}).get(level, 0))
+                if len(values) < count:
+                    raise ValueError("index offsets truncated")
+                if len(values) > count:
+                    with open(path, "r+b") as f:
+                        f.truncate(count * values.itemsize)
+                    del values[count:]
+                offsets[level] = values
+            self._offsets = offsets
+            self._indexed_bytes = int(meta.get("indexed_bytes") or 0)
+            self._tail_hash = str(meta.get("tail_hash") or "")
+        except (FileNotFoundError, ValueError, json.JSONDecodeError, OSError):
+            self._offsets = {level: array("Q") for level in LOG_LEVELS}
+            self._indexed_bytes = 0
+            self._tail_hash = hashlib.sha1(b"").hexdigest()
+
+    def _catch_up(self, f, size: int) -> None:
+        f.seek(self._indexed_bytes)
+        offset = self._indexed_bytes
+        new_offsets: Dict[str, array] = {level: array("Q") for level in LOG_LEVELS}
+        for raw_line in f:
+            if not raw_line.endswith(b"\n"):
+                break
+            if b"\x1b" in raw_line:
+                line = decode_line(raw_line)
+                for level in LOG_LEVELS:
+                    if _line_has_level(line, level):
+                        new_offsets[level].append(offset)
+            else:
+                # 无颜色码时等级标记是纯 ASCII，直接在字节上匹配
+                levels = {(m.group(1) or m.group(2)).decode() for m in _LEVEL_MARKER_RE.finditer(raw_line)}
+                for level in levels:
+                    new_offsets[level].append(offset)
+            offset += len(raw_line)
+        if offset == self._indexed_bytes:
+            return
+
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        for level, values in new_offsets.items():
+            self._offsets.setdefault(level, array("Q")).extend(values)
+            if values:
+                with open(self.offset_files[level], "ab") as out:
+                    values.tofile(out)
+        self._indexed_bytes = offset
+        self._tail_hash = self._fingerprint(f, offset)
+        meta = {
+            "version": INDEX_FORMAT_VERSION,
+            "indexed_bytes": self._indexed_bytes,
+            "tail_hash": self._tail_hash,
+            "counts": {level: len(values) for level, values in self._offsets.items()},
+        }
+        tmp_path = self.meta_file.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            json.dump(meta, out)
+        os.replace(tmp_path, self.meta_file)
+
+
+_indexes: Dict[str, LogLevelIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_log_level_index(log_file: str) -> LogLevelIndex:
+    """获取（进程内复用的）日志等级索引。"""
+    key = os.path.abspath(log_file)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = LogLevelIndex(key)
+            _indexes[key] = index
+        return index
+
+
+def _collect_backward(f, start: int, end: int, task_name, level, limit: int, out: List[str]) -> None:
+    for raw in iter_lines_backward(f, start, end):
+        line = decode_line(raw)
+        if line_matches(line, task_name, level):
+            out.append(line)
+            if 0 < limit <= len(out):
+                return
+
+
+def read_log_tail(
+    log_file: str,
+    from_pos: int = 0,
+    task_name: Optional[str] = None,
+    level: Optional[str] = None,
+    limit: int = 100,
+    use_index: bool = False,
+    end_pos: Optional[int] = None,
+) -> Tuple[List[str], int]:
+    """读取 [from_pos, end_pos 或 EOF) 内最后 limit 条匹配行（按时间顺序），返回(行列表, 结束位置)。"""
+    file_size = os.path.getsize(log_file)
+    if end_pos is not None:
+        file_size = min(file_size, max(0, end_pos))
+    from_pos = max(0, from_pos)
+    if from_pos >= file_size:
+        return [], file_size
+
+    matched: List[str] = []
+    level_upper = level.upper() if level and level.strip() else None
+    with open(log_file, "rb") as f:
+        if not (use_index and level_upper in LOG_LEVELS):
+            _collect_backward(f, from_pos, file_size, task_name, level, limit, matched)
+            matched.reverse()
+            return matched, file_size
+
+        index = get_log_level_index(log_file)
+        index.sync()
+        indexed_bytes = min(index.indexed_bytes, file_size)
+
+        # 索引尚未覆盖的尾部（通常是正在写入的半行）直接扫描
+        if indexed_bytes < file_size:
+            _collect_backward(f, max(from_pos, indexed_bytes), file_size, task_name, level, limit, matched)
+
+        offsets = index.offsets(level_upper)
+        first = bisect_left(offsets, from_pos)
+        position = len(offsets)
+        while position > first and not (0 < limit <= len(matched)):
+            position -= 1
+            offset = offsets[position]
+            if offset >= indexed_bytes:
+                continue
+            f.seek(offset)
+            line = decode_line(f.readline().rstrip(b"\n"))
+            if line_matches(line, task_name, level):
+                matched.append(line)
+
+    matched.reverse()
+    return matched, file_size
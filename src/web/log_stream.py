@@ -0,0 +1,187 @@
+"""
+Log Stream - 日志实时推送
+
+每个日志文件只有一个共享的 tail 协程：定期检查文件大小，读取新增的完整行，
+再按各订阅者自己的任务名/等级筛选条件分发到其队列。没有订阅者时协程自动退出。
+文件被清空或轮转（变小）时通知订阅者重新加载。
+"""
+
+import asyncio
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.config import LOG_STREAM_POLL_INTERVAL_MS
+from src.logging_config import get_logger
+from src.web.log_reader import decode_line, line_matches
+
+logger = get_logger(__name__, service="web")
+
+MAX_READ_BYTES_PER_TICK = 1024 * 1024
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# (行结束位置, 行内容)
+LogLine = Tuple[int, str]
+
+
+@dataclass
+class LogStreamEvent:
+    """推送给订阅者的一批日志（reset=True 表示文件已被清空/轮转，需要整体刷新）。"""
+    lines: List[str] = field(default_factory=list)
+    pos: int = 0
+    reset: bool = False
+
+
+class LogSubscription:
+    """单个订阅者：筛选条件 + 有界队列，消费过慢时只保留一个 reset 事件。"""
+
+    def __init__(self, task_name: Optional[str], level: Optional[str], skip_until: int = 0):
+        self.task_name = task_name
+        self.level = level
+        # 客户端已读到的位置，此前结束的行不再推送
+        self.skip_until = skip_until
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def publish(self, lines: List[LogLine], pos: int) -> None:
+        matched = [
+            line for end, line in lines
+            if end > self.skip_until and line_matches(line, self.task_name, self.level)
+        ]
+        if matched:
+            self._put(LogStreamEvent(lines=matched, pos=pos))
+
+    def publish_reset(self, pos: int) -> None:
+        self.skip_until = 0
+        self._put(LogStreamEvent(pos=pos, reset=True))
+
+    def _put(self, event: LogStreamEvent) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # 客户端跟不上：丢弃积压内容，让其整体刷新
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(LogStreamEvent(pos=event.pos, reset=True))
+
+
+class LogTailer:
+    """单个日志文件的共享 tail 协程。"""
+
+    def __init__(self, log_file: str):
+        self.log_file = log_file
+        self.subscribers: Set[LogSubscription] = set()
+        self.pos = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def _file_size(self) -> int:
+        try:
+            return os.path.getsize(self.log_file)
+        except OSError:
+            return 0
+
+    def _last_line_end(self) -> int:
+        """当前文件最后一个完整行的结束位置（避免从半行开始推送）。"""
+        size = self._file_size()
+        if size == 0:
+            return 0
+        start = max(0, size - MAX_READ_BYTES_PER_TICK)
+        with open(self.log_file, "rb") as f:
+            f.seek(start)
+            chunk = f.read(size - start)
+        newline = chunk.rfind(b"\n")
+        return start + newline + 1 if newline >= 0 else start
+
+    def add(self, subscription: LogSubscription) -> int:
+        """注册订阅者，返回共享协程接下来推送的起始位置。"""
+        if self._task is None or self._task.done():
+            self.pos = self._last_line_end()
+            self._task = asyncio.create_task(self._run())
+        self.subscribers.add(subscription)
+        return self.pos
+
+    def remove(self, subscription: LogSubscription) -> None:
+        self.subscribers.discard(subscription)
+
+    def _read_new_lines(self, start: int, size: int) -> Tuple[List[LogLine], int]:
+        end = min(size, start + MAX_READ_BYTES_PER_TICK)
+        with open(self.log_file, "rb") as f:
+            f.seek(start)
+            chunk = f.read(end - start)
+        complete = chunk.rfind(b"\n") + 1
+        if complete == 0:
+            if len(chunk) < MAX_READ_BYTES_PER_TICK:
+                return [], start
+            # 超长单行：按块切开推送，避免卡住
+            complete = len(chunk)
+        lines: List[LogLine] = []
+        offset = start
+        for raw in chunk[:complete].split(b"\n"):
+            offset += len(raw) + 1
+            if raw:
+                lines.append((min(offset, start + complete), decode_line(raw)))
+        return lines, start + complete
+
+    async def _run(self) -> None:
+        while self.subscribers:
+            try:
+                size = self._file_size()
+                if size < self.pos:
+                    self.pos = 0
+                    for subscription in list(self.subscribers):
+                        subscription.publish_reset(0)
+                if size > self.pos:
+                    lines, new_pos = await asyncio.to_thread(self._read_new_lines, self.pos, size)
+                    if new_pos > self.pos:
+                        self.pos = new_pos
+                        for subscription in list(self.subscribers):
+                            subscription.publish(lines, new_pos)
+                        if new_pos < size:
+                            continue
+            except Exception as e:
+                logger.warning(
+                    f"日志推送读取失败: {e}",
+                    extra={"event": "log_stream_read_failed", "log_file": self.log_file},
+                )
+            await asyncio.sleep(LOG_STREAM_POLL_INTERVAL_MS() / 1000.0)
+
+
+class LogStreamHub:
+    """按文件复用 LogTailer。"""
+
+    def __init__(self):
+        self._tailers: Dict[str, LogTailer] = {}
+
+    def subscribe(
+        self,
+        log_file: str,
+        task_name: Optional[str] = None,
+        level: Optional[str] = None,
+        from_pos: int = 0,
+    ) -> Tuple[LogSubscription, int]:
+        """订阅日志文件，返回 (订阅, 共享协程推送起始位置)。"""
+        key = os.path.abspath(log_file)
+        tailer = self._tailers.get(key)
+        if tailer is None:
+            tailer = LogTailer(key)
+            self._tailers[key] = tailer
+        subscription = LogSubscription(task_name, level, skip_until=max(0, from_pos))
+        return subscription, tailer.add(subscription)
+
+    def unsubscribe(self, log_file: str, subscription: LogSubscription) -> None:
+        tailer = self._tailers.get(os.path.abspath(log_file))
+        if tailer is not None:
+            tailer.remove(subscription)
+
+
+_hub: Optional[LogStreamHub] = None
+_hub_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_log_stream_hub() -> LogStreamHub:
+    """获取当前事件循环内复用的日志推送中心。"""
+    global _hub, _hub_loop
+    loop = asyncio.get_running_loop()
+    if _hub is None or _hub_loop is not loop:
+        _hub = LogStreamHub()
+        _hub_loop = loop
+    return _hub
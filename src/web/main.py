@@ -2,6 +2,7 @@ import uvicorn
 import os
 import sys
 import asyncio
+import threading
 from datetime import datetime
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Depends, Form
@@ -93,8 +94,17 @@ async def lifespan(app: FastAPI):
     else:
         await _ensure_scheduler_started(reason="startup")
 
+    from src.notifier.outbox import start_notification_dispatcher, stop_notification_dispatcher
+    start_notification_dispatcher()
+
+    # 结果索引补建可能耗时数分钟，放到后台线程，不阻塞启动
+    from src.storage import run_result_index_migration
+    threading.Thread(target=run_result_index_migration, name="result-index-migration", daemon=True).start()
+
     yield
 
+    await stop_notification_dispatcher()
+
     if scheduler.running:
         logger.info("正在关闭调度器...", extra={"event": "scheduler_shutdown"})
         scheduler.shutdown()
@@ -105,8 +115,17 @@ async def lifespan(app: FastAPI):
         await asyncio.gather(*stop_tasks)
         logger.info("所有数据收集脚本进程已终止。", extra={"event": "tasks_shutdown_complete"})
 
+    from src.web.scraper_pool import shutdown_scraper_worker_pool
+    await shutdown_scraper_worker_pool()
+
     await _set_all_tasks_stopped_in_config()
 
+    from src.storage.async_storage import shutdown_storage_executor
+    shutdown_storage_executor()
+
+    from src.notifier.http_client import close_http_clients
+    await close_http_clients()
+
 
 async def stop_task_process(task_id: int):
     """停止任务进程的辅助函数"""
@@ -1,13 +1,24 @@
 ﻿import os
 import re
 import json
+import asyncio
 import aiofiles
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 from fastapi import APIRouter, HTTPException, Request
 
 from src.web.models import DeleteResultItemRequest, DeleteResultsBatchRequest
-from src.storage import get_storage
+from src.storage import get_async_storage, get_storage
+from src.storage.async_storage import run_storage_call
+from src.storage.result_archive import delete_result_archive, get_result_archive
+from src.storage.result_lock import result_file_lock
+from src.storage.result_query import (
+    ResultFilters,
+    is_ai_recommended,
+    matches_manual_keyword,
+    query_result_files,
+    query_result_files_after,
+)
 from src.web.auth import get_current_user, is_multi_user_mode
 from src.logging_config import get_logger
 
@@ -20,14 +31,7 @@ KEYWORD_KEY = "搜索关键字"
 CRITERIA_KEY = "AI标准"
 PRODUCT_KEY = "商品信息"
 LINK_KEY = "商品链接"
-TITLE_KEY = "商品标题"
-DESC_KEY = "商品描述"
-SELLER_NAME_KEY = "卖家昵称"
-PRICE_KEY = "当前售价"
-PUBLISH_TIME_KEY = "发布时间"
-CRAWL_TIME_KEY = "公开信息浏览时间"
-
-RECOMMENDED_LEVELS = {"STRONG_BUY", "CAUTIOUS_BUY", "CONDITIONAL_BUY"}
+
 USER_FEEDBACK_SOURCES = {"user", "user_feedback"}
 FEEDBACK_STATUS_BY_LABEL = {1: "trusted", 0: "untrusted"}
 
@@ -47,15 +51,6 @@ def _safe_task_filename(task_name: str) -> str:
     return f"{safe}_full_data.jsonl"
 
 
-def _is_ai_recommended(ai_analysis: dict) -> bool:
-    if not isinstance(ai_analysis, dict):
-        return False
-    level = ai_analysis.get("recommendation_level")
-    if isinstance(level, str):
-        return level in RECOMMENDED_LEVELS
-    return ai_analysis.get("is_recommended") is True
-
-
 def _extract_item_id(item: Dict[str, Any]) -> str:
     info = item.get(PRODUCT_KEY, {}) if isinstance(item, dict) else {}
     link = str(info.get(LINK_KEY, ""))
@@ -80,7 +75,7 @@ def _matches_filters(record: Dict[str, Any], filters) -> bool:
         return True
 
     ai_analysis = record.get("ai_analysis") or record.get("AI分析") or {}
-    if filters.recommended_only and not _is_ai_recommended(ai_analysis):
+    if filters.recommended_only and not is_ai_recommended(ai_analysis):
         return False
 
     if filters.task_name and filters.task_name != "all":
@@ -95,55 +90,77 @@ def _matches_filters(record: Dict[str, Any], filters) -> bool:
         if record.get(CRITERIA_KEY) != filters.ai_criteria:
             return False
 
-    if filters.manual_keyword:
-        manual_keyword_lower = filters.manual_keyword.lower()
-        item_info = record.get(PRODUCT_KEY, {})
-        product_title = str(item_info.get(TITLE_KEY, "")).lower()
-        product_desc = str(item_info.get(DESC_KEY, "")).lower()
-        seller_name = str(item_info.get(SELLER_NAME_KEY, "")).lower()
-        current_price = str(item_info.get(PRICE_KEY, "")).lower()
-        ai_reason = str(ai_analysis.get("reason", "")).lower()
-
-        if (
-            manual_keyword_lower not in product_title
-            and manual_keyword_lower not in product_desc
-            and manual_keyword_lower not in seller_name
-            and manual_keyword_lower not in current_price
-            and manual_keyword_lower not in ai_reason
-        ):
-            return False
+    if not matches_manual_keyword(record, filters.manual_keyword):
+        return False
 
     return True
 
 
-async def _load_records(filepath: str) -> List[Dict[str, Any]]:
+def _task_matches_filters(task: Dict[str, Any], filters: ResultFilters) -> bool:
+    """多用户模式下任务名/关键字/AI标准取自任务本身，可在查询前按任务预筛。"""
+    decorated = _decorate_record({}, task)
+    task_only_filters = ResultFilters(
+        task_name=filters.task_name,
+        keyword=filters.keyword,
+        ai_criteria=filters.ai_criteria,
+    )
+    return _matches_filters(decorated, task_only_filters)
+
+
+def _rewrite_records(filepath: str, should_delete) -> int:
+    """改写源文件，删除 should_delete 为真的记录，返回删除条数（调用方需持有结果文件写锁）。"""
     records: List[Dict[str, Any]] = []
-    async with aiofiles.open(filepath, "r", encoding="utf-8") as f:
-        async for line in f:
+    with open(filepath, "r", encoding="utf-8") as f:
+        for line in f:
             try:
                 records.append(json.loads(line))
             except json.JSONDecodeError:
                 continue
-    return records
+    kept = [record for record in records if not should_delete(record)]
+    deleted_count = len(records) - len(kept)
+    if deleted_count:
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in kept:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, filepath)
+    return deleted_count
 
 
-async def _write_records(filepath: str, records: List[Dict[str, Any]]) -> None:
-    async with aiofiles.open(filepath, "w", encoding="utf-8") as f:
-        for record in records:
-            await f.write(json.dumps(record, ensure_ascii=False) + "\n")
+def _delete_records_locked(filepath: str, should_delete) -> int:
+    with result_file_lock(filepath):
+        deleted_count = _rewrite_records(filepath, should_delete)
+        # 归档记录的 summary 列组包含筛选所需字段，无需解压完整记录即可判断
+        deleted_count += get_result_archive(filepath).remove_records(should_delete)
+        return deleted_count
 
 
 async def _delete_records_in_file(filepath: str, filters, item_ids: List[str]) -> int:
-    records = await _load_records(filepath)
-    initial_count = len(records)
     if item_ids:
-        records = [record for record in records if _extract_item_id(record) not in item_ids]
+        should_delete = lambda record: _extract_item_id(record) in item_ids
     else:
-        records = [record for record in records if not _matches_filters(record, filters)]
-    deleted_count = initial_count - len(records)
-    if deleted_count:
-        await _write_records(filepath, records)
-    return deleted_count
+        should_delete = lambda record: _matches_filters(record, filters)
+    return await asyncio.to_thread(_delete_records_locked, filepath, should_delete)
+
+
+def _delete_item_locked(filepath: str, item_id: str) -> bool:
+    should_delete = lambda record: _extract_item_id(record) == item_id
+    with result_file_lock(filepath):
+        if _rewrite_records(filepath, should_delete):
+            return True
+        return get_result_archive(filepath).remove_records(should_delete) > 0
+
+
+async def _delete_item_in_file(filepath: str, item_id: str) -> bool:
+    """删除结果文件（含归档）中的单条记录，返回是否找到。"""
+    return await asyncio.to_thread(_delete_item_locked, filepath, item_id)
+
+
+def _delete_result_file(filepath: str) -> None:
+    """删除结果文件及其归档（持有结果文件写锁）。"""
+    with result_file_lock(filepath):
+        os.remove(filepath)
+        delete_result_archive(filepath)
 
 
 def _resolve_task_by_filename(filename: str, tasks: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
@@ -155,22 +172,6 @@ def _resolve_task_by_filename(filename: str, tasks: List[Dict[str, Any]]) -> Opt
     return None
 
 
-def _sort_results(records: List[Dict[str, Any]], sort_by: str, sort_order: str) -> List[Dict[str, Any]]:
-    def get_sort_key(item: Dict[str, Any]):
-        info = item.get(PRODUCT_KEY, {})
-        if sort_by == "publish_time":
-            return info.get(PUBLISH_TIME_KEY, "0000-00-00 00:00")
-        if sort_by == "price":
-            price_str = str(info.get(PRICE_KEY, "0")).replace("￥", "").replace(",", "").strip()
-            try:
-                return float(price_str)
-            except (ValueError, TypeError):
-                return 0.0
-        return item.get(CRAWL_TIME_KEY, "")
-
-    records.sort(key=get_sort_key, reverse=(sort_order == "desc"))
-    return records
-
 
 
 def _parse_iso_datetime(value: Any) -> Optional[datetime]:
@@ -258,8 +259,8 @@ async def list_result_files(request: Request):
     """列出结果文件列表"""
     owner_id = _get_owner_id(request)
     if owner_id:
-        storage = get_storage()
-        tasks = storage.get_tasks(owner_id=owner_id)
+        storage = get_async_storage()
+        tasks = await storage.get_tasks(owner_id=owner_id)
         files = [_safe_task_filename(task.get("task_name")) for task in tasks]
         return {"files": files}
 
@@ -275,8 +276,8 @@ async def delete_result_file(filename: str, request: Request):
     """删除结果文件"""
     owner_id = _get_owner_id(request)
     if owner_id:
-        storage = get_storage()
-        tasks = storage.get_tasks(owner_id=owner_id)
+        storage = get_async_storage()
+        tasks = await storage.get_tasks(owner_id=owner_id)
         target_tasks = tasks if filename == "all" else []
         if filename != "all":
             matched_task = _resolve_task_by_filename(filename, tasks)
@@ -286,7 +287,7 @@ async def delete_result_file(filename: str, request: Request):
 
         deleted_count = 0
         for task in target_tasks:
-            deleted = storage.delete_results(task.get("task_name"), owner_id=owner_id)
+            deleted = await storage.delete_results(task.get("task_name"), owner_id=owner_id)
             if deleted != 0:
                 deleted_count += 1
         return {"message": f"已删除 {deleted_count} 个任务结果。"}
@@ -303,7 +304,7 @@ async def delete_result_file(filename: str, request: Request):
         deleted_count = 0
         for file in files:
             try:
-                os.remove(os.path.join(jsonl_dir, file))
+                _delete_result_file(os.path.join(jsonl_dir, file))
                 deleted_count += 1
             except Exception as e:
                 logger.warning(f"删除文件失败: {file}, 错误: {e}", extra={"event": "result_file_delete_failed"})
@@ -317,7 +318,7 @@ async def delete_result_file(filename: str, request: Request):
         raise HTTPException(status_code=404, detail="结果文件未找到。")
 
     try:
-        os.remove(filepath)
+        _delete_result_file(filepath)
         return {"message": f"结果文件 '{filename}' 已成功删除。"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"删除结果文件时出错: {e}")
@@ -332,8 +333,8 @@ async def delete_result_item(payload: DeleteResultItemRequest, request: Request)
         raise HTTPException(status_code=400, detail="未识别到要删除的商品ID。")
 
     if owner_id:
-        storage = get_storage()
-        tasks = storage.get_tasks(owner_id=owner_id)
+        storage = get_async_storage()
+        tasks = await storage.get_tasks(owner_id=owner_id)
         target_tasks = tasks if payload.filename == "all" else []
         if payload.filename != "all":
             matched_task = _resolve_task_by_filename(payload.filename, tasks)
@@ -342,7 +343,7 @@ async def delete_result_item(payload: DeleteResultItemRequest, request: Request)
             target_tasks = [matched_task]
 
         for task in target_tasks:
-            deleted_count = storage.delete_results(task.get("task_name"), owner_id=owner_id, item_ids=[item_id_to_delete])
+            deleted_count = await storage.delete_results(task.get("task_name"), owner_id=owner_id, item_ids=[item_id_to_delete])
             if deleted_count > 0:
                 return {"message": "商品记录已成功删除。", "file": _safe_task_filename(task.get("task_name"))}
         raise HTTPException(status_code=404, detail="商品记录未找到。")
@@ -359,10 +360,7 @@ async def delete_result_item(payload: DeleteResultItemRequest, request: Request)
 
         for file in files:
             filepath = os.path.join(jsonl_dir, file)
-            records = await _load_records(filepath)
-            filtered = [record for record in records if _extract_item_id(record) != item_id_to_delete]
-            if len(filtered) < len(records):
-                await _write_records(filepath, filtered)
+            if await _delete_item_in_file(filepath, item_id_to_delete):
                 return {"message": "商品记录已成功删除。", "file": file}
         raise HTTPException(status_code=404, detail="商品记录未找到。")
 
@@ -373,12 +371,8 @@ async def delete_result_item(payload: DeleteResultItemRequest, request: Request)
     if not os.path.exists(filepath):
         raise HTTPException(status_code=404, detail="结果文件未找到。")
 
-    records = await _load_records(filepath)
-    filtered = [record for record in records if _extract_item_id(record) != item_id_to_delete]
-    if len(filtered) == len(records):
+    if not await _delete_item_in_file(filepath, item_id_to_delete):
         raise HTTPException(status_code=404, detail="商品记录未找到。")
-
-    await _write_records(filepath, filtered)
     return {"message": "商品记录已成功删除。"}
 
 
@@ -391,8 +385,8 @@ async def delete_results_batch(payload: DeleteResultsBatchRequest, request: Requ
     item_ids = [item_id for item_id in (payload.item_ids or []) if item_id]
 
     if owner_id:
-        storage = get_storage()
-        tasks = storage.get_tasks(owner_id=owner_id)
+        storage = get_async_storage()
+        tasks = await storage.get_tasks(owner_id=owner_id)
         target_tasks = tasks if filename == "all" else []
         if filename != "all":
             matched_task = _resolve_task_by_filename(filename, tasks)
@@ -406,16 +400,16 @@ async def delete_results_batch(payload: DeleteResultsBatchRequest, request: Requ
         for task in target_tasks:
             task_name = task.get("task_name")
             if item_ids:
-                deleted_count = storage.delete_results(task_name, owner_id=owner_id, item_ids=item_ids)
+                deleted_count = await storage.delete_results(task_name, owner_id=owner_id, item_ids=item_ids)
             else:
-                records = storage.get_results(task_name, owner_id=owner_id, limit=50000, offset=0)
+                records = await storage.get_results(task_name, owner_id=owner_id, limit=50000, offset=0)
                 records = [_decorate_record(record, task) for record in records]
                 matched_ids = [
                     _extract_item_id(record)
                     for record in records
                     if _extract_item_id(record) and _matches_filters(record, filters)
                 ]
-                deleted_count = storage.delete_results(task_name, owner_id=owner_id, item_ids=matched_ids) if matched_ids else 0
+                deleted_count = await storage.delete_results(task_name, owner_id=owner_id, item_ids=matched_ids) if matched_ids else 0
 
             if deleted_count > 0:
                 total_deleted += deleted_count
@@ -466,6 +460,54 @@ async def delete_results_batch(payload: DeleteResultsBatchRequest, request: Requ
     }
 
 
+@router.post("/api/results/{filename}/rescore")
+async def rescore_result_file_api(filename: str, request: Request, bayes_profile: Optional[str] = None):
+    """按当前 Bayes 配置批量重算结果文件的 ml_precalc 与综合推荐度"""
+    from src.result_rescorer import rescore_result_file, rescore_task_results
+
+    owner_id = _get_owner_id(request)
+    if filename == "all":
+        raise HTTPException(status_code=400, detail="请选择单个结果文件进行重算。")
+
+    if owner_id:
+        storage = get_async_storage()
+        tasks = await storage.get_tasks(owner_id=owner_id)
+        matched_task = _resolve_task_by_filename(filename, tasks)
+        if not matched_task:
+            raise HTTPException(status_code=404, detail="结果文件未找到。")
+        stats = await asyncio.to_thread(
+            rescore_task_results,
+            matched_task.get("task_name"),
+            owner_id=owner_id,
+            bayes_profile=bayes_profile or matched_task.get("bayes_profile"),
+        )
+    else:
+        if not filename.endswith(".jsonl") or "/" in filename or ".." in filename:
+            raise HTTPException(status_code=400, detail="无效的文件名。")
+        filepath = os.path.join("jsonl", filename)
+        if not os.path.exists(filepath):
+            raise HTTPException(status_code=404, detail="结果文件未找到。")
+
+        if not bayes_profile:
+            try:
+                async with aiofiles.open("config.json", "r", encoding="utf-8") as f:
+                    tasks = json.loads(await f.read())
+            except Exception:
+                tasks = []
+            for task in tasks if isinstance(tasks, list) else []:
+                keyword_file = f"{str(task.get('keyword') or '').replace(' ', '_')}_full_data.jsonl"
+                if keyword_file == filename and task.get("bayes_profile"):
+                    bayes_profile = task.get("bayes_profile")
+                    break
+
+        try:
+            stats = await asyncio.to_thread(rescore_result_file, filepath, bayes_profile=bayes_profile or "bayes_v1")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"重算结果时出错: {e}")
+
+    return {"message": f"已重算 {stats.get('updated', 0)} 条记录。", **stats}
+
+
 @router.get("/api/results/{filename}")
 async def get_result_file_content(
     filename: str,
@@ -479,15 +521,33 @@ async def get_result_file_content(
     sort_by: str = "crawl_time",
     sort_order: str = "desc",
     manual_keyword: str = None,
+    cursor: str = None,
 ):
-    """读取结果内容，支持分页、筛选和排序"""
+    """读取结果内容，支持分页、筛选和排序（筛选/排序/分页由存储层完成，只加载当前页）
+
+    传入 cursor 时使用游标分页（仅支持按抓取时间倒序；首页传空字符串）：返回 next_cursor，
+    不统计总数（total_items 为 null），翻页开销与页码无关。
+    """
     owner_id = _get_owner_id(request)
-    results: List[Dict[str, Any]] = []
     tasks: List[Dict[str, Any]] = []
+    filters = ResultFilters(
+        recommended_only=recommended_only,
+        task_name=task_name,
+        keyword=keyword,
+        ai_criteria=ai_criteria,
+        manual_keyword=manual_keyword,
+    )
+    offset = max(0, (page - 1) * limit)
+    page_size = max(1, limit)
+    keyset = cursor is not None
+    if keyset and (sort_by != "crawl_time" or sort_order != "desc"):
+        raise HTTPException(status_code=400, detail="游标分页仅支持按抓取时间倒序。")
+    next_cursor = None
+    total_items = None
 
     if owner_id:
-        storage = get_storage()
-        tasks = storage.get_tasks(owner_id=owner_id)
+        storage = get_async_storage()
+        tasks = await storage.get_tasks(owner_id=owner_id)
         target_tasks = tasks if filename == "all" else []
         if filename != "all":
             matched_task = _resolve_task_by_filename(filename, tasks)
@@ -495,9 +555,35 @@ async def get_result_file_content(
                 raise HTTPException(status_code=404, detail="结果文件未找到。")
             target_tasks = [matched_task]
 
-        for task in target_tasks:
-            task_records = storage.get_results(task.get("task_name"), owner_id=owner_id, limit=50000, offset=0)
-            results.extend([_decorate_record(record, task) for record in task_records])
+        target_tasks = [task for task in target_tasks if _task_matches_filters(task, filters)]
+        task_by_name = {task.get("task_name"): task for task in target_tasks}
+        if keyset:
+            try:
+                page_records, next_cursor = await storage.query_results_keyset(
+                    list(task_by_name.keys()),
+                    owner_id=owner_id,
+                    recommended_only=recommended_only,
+                    manual_keyword=manual_keyword,
+                    cursor=cursor or None,
+                    limit=page_size,
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        else:
+            page_records, total_items = await storage.query_results(
+                list(task_by_name.keys()),
+                owner_id=owner_id,
+                recommended_only=recommended_only,
+                manual_keyword=manual_keyword,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                limit=page_size,
+                offset=offset,
+            )
+        paginated_results = [
+            _decorate_record(record, task_by_name.get(record.get(TASK_NAME_KEY)) or {})
+            for record in page_records
+        ]
     else:
         if filename == "all":
             jsonl_dir = "jsonl"
@@ -505,12 +591,18 @@ async def get_result_file_content(
                 raise HTTPException(status_code=404, detail="结果文件目录未找到。")
 
             files = [f for f in os.listdir(jsonl_dir) if f.endswith(".jsonl")]
-            for file in files:
-                filepath = os.path.join(jsonl_dir, file)
+            filepaths = [os.path.join(jsonl_dir, file) for file in sorted(files)]
+            if keyset:
                 try:
-                    results.extend(await _load_records(filepath))
-                except Exception as e:
-                    logger.warning(f"读取文件失败: {file}, 错误: {e}", extra={"event": "result_file_load_failed"})
+                    paginated_results, next_cursor = await asyncio.to_thread(
+                        query_result_files_after, filepaths, filters, cursor or None, page_size, True
+                    )
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+            else:
+                paginated_results, total_items = await asyncio.to_thread(
+                    query_result_files, filepaths, filters, sort_by, sort_order, offset, page_size, True
+                )
         else:
             if not filename.endswith(".jsonl") or "/" in filename or ".." in filename:
                 raise HTTPException(status_code=400, detail="无效的文件名。")
@@ -518,7 +610,16 @@ async def get_result_file_content(
             if not os.path.exists(filepath):
                 raise HTTPException(status_code=404, detail="结果文件未找到。")
             try:
-                results = await _load_records(filepath)
+                if keyset:
+                    paginated_results, next_cursor = await asyncio.to_thread(
+                        query_result_files_after, [filepath], filters, cursor or None, page_size
+                    )
+                else:
+                    paginated_results, total_items = await asyncio.to_thread(
+                        query_result_files, [filepath], filters, sort_by, sort_order, offset, page_size
+                    )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"读取结果文件时出错: {e}")
 
@@ -528,22 +629,7 @@ async def get_result_file_content(
         except Exception:
             tasks = []
 
-    class _Filters:
-        def __init__(self):
-            self.recommended_only = recommended_only
-            self.task_name = task_name
-            self.keyword = keyword
-            self.ai_criteria = ai_criteria
-            self.manual_keyword = manual_keyword
-
-    filtered_results = [record for record in results if _matches_filters(record, _Filters())]
-    _sort_results(filtered_results, sort_by, sort_order)
-
-    total_items = len(filtered_results)
-    start = max(0, (page - 1) * limit)
-    end = start + max(1, limit)
-    paginated_results = filtered_results[start:end]
-    feedback_status_map = _build_feedback_status_map(owner_id=owner_id)
+    feedback_status_map = await run_storage_call(_build_feedback_status_map, owner_id=owner_id)
     _attach_feedback_status(paginated_results, feedback_status_map)
 
     return {
@@ -552,6 +638,7 @@ async def get_result_file_content(
         "limit": limit,
         "items": paginated_results,
         "tasks": tasks,
+        "next_cursor": next_cursor,
     }
 
 
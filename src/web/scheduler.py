@@ -9,9 +9,11 @@ from typing import Any, Dict, List, Optional, Union
 import aiofiles
 from apscheduler.triggers.cron import CronTrigger
 
+from src.config import SCRAPER_WORKER_POOL_ENABLED
 from src.logging_config import get_logger
 from src.storage import get_storage
 from src.web.auth import is_multi_user_mode
+from src.web.scraper_pool import get_scraper_worker_pool
 
 
 logger = get_logger(__name__, service="scheduler")
@@ -194,14 +196,34 @@ async def run_single_task(
             except Exception:
                 pass
 
-        preexec_fn = os.setsid if sys.platform != "win32" else None
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=log_file_handle,
-            stderr=log_file_handle,
-            preexec_fn=preexec_fn,
-            env=child_env,
-        )
+        if SCRAPER_WORKER_POOL_ENABLED():
+            # 常驻采集进程池：排队的任务在派发到进程后再登记 PID
+            async def _on_worker_started(handle):
+                await update_task_running_status(
+                    process_key if owner_id else task_id,
+                    True,
+                    handle.pid,
+                    owner_id=owner_id,
+                    task_name=task_name,
+                )
+
+            process = await get_scraper_worker_pool().submit(
+                task_name,
+                runtime_config_path or CONFIG_FILE,
+                "scheduled",
+                child_env,
+                account_hint=child_env.get("GOOFISH_BOUND_ACCOUNT"),
+                on_started=_on_worker_started,
+            )
+        else:
+            preexec_fn = os.setsid if sys.platform != "win32" else None
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=log_file_handle,
+                stderr=log_file_handle,
+                preexec_fn=preexec_fn,
+                env=child_env,
+            )
 
         fetcher_processes[process_key] = process
         await update_task_running_status(
@@ -0,0 +1,384 @@
+"""
+Scraper Worker Pool - 常驻采集进程池
+
+SCRAPER_WORKER_POOL_ENABLED 开启后，手动/定时任务不再各自启动一个 collector 进程，
+而是派发给最多 SCRAPER_WORKER_POOL_SIZE 个常驻的 `collector.py --worker` 进程：
+- 每个常驻进程同一时间只执行一个任务，任务之间复用浏览器与账号上下文（见 src/browser_pool.py）；
+- 任务的完整环境变量（用户私有 AI 配置、GOOFISH_* 等）随任务下发，只在该任务执行期间生效；
+- 没有空闲进程时任务排队；绑定账号的任务优先派给用过该账号的进程；
+- 常驻进程执行 SCRAPER_WORKER_MAX_TASKS 次任务或内存超限后自行退出，下次派发时重新启动；
+- 停止任务时终止其所在的常驻进程（连同浏览器），与单次运行模式一致。
+submit() 返回的 PooledTaskHandle 提供与 asyncio.subprocess.Process 相同的 pid/returncode/wait/terminate/kill，
+任务管理与调度器中的进程登记、停止和监控逻辑无需区分两种模式。
+"""
+
+import asyncio
+import json
+import os
+import signal
+import sys
+import uuid
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from src.config import SCRAPER_WORKER_POOL_ENABLED, SCRAPER_WORKER_POOL_SIZE
+from src.logging_config import get_logger
+
+logger = get_logger(__name__, service="web")
+
+# 与 collector.py 中的 WORKER_CONTROL_PREFIX 保持一致
+WORKER_CONTROL_PREFIX = b"@@GOOFISH_WORKER@@ "
+WORKER_LOG_FILE = os.path.join("logs", "fetcher.log")
+# 采集进程单行输出上限（AI 调试输出可能很长），超出的行丢弃
+STREAM_LIMIT_BYTES = 4 * 1024 * 1024
+SHUTDOWN_TIMEOUT_SECONDS = 10
+
+
+class PooledTaskHandle:
+    """进程池中的一次任务运行，接口与 asyncio.subprocess.Process 对齐；排队期间 pid 为 None。"""
+
+    def __init__(
+        self,
+        pool: "ScraperWorkerPool",
+        job: Dict[str, Any],
+        account_hint: Optional[str],
+        on_started: Optional[Callable[["PooledTaskHandle"], Awaitable[Any]]],
+    ):
+        self._pool = pool
+        self.job = job
+        self.account_hint = account_hint
+        self.on_started = on_started
+        self.worker: Optional["_Worker"] = None
+        self.returncode: Optional[int] = None
+        self._done = asyncio.Event()
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.worker.process.pid if self.worker is not None else None
+
+    async def wait(self) -> int:
+        await self._done.wait()
+        return self.returncode
+
+    def terminate(self) -> None:
+        self._pool._stop(self, signal.SIGTERM)
+
+    def kill(self) -> None:
+        self._pool._stop(self, getattr(signal, "SIGKILL", signal.SIGTERM))
+
+    def _finish(self, returncode: int) -> None:
+        if self.returncode is None:
+            self.returncode = returncode
+            self._done.set()
+
+
+class _Worker:
+    def __init__(self, process: asyncio.subprocess.Process, log_handle):
+        self.process = process
+        self.log_handle = log_handle
+        self.current: Optional[PooledTaskHandle] = None
+        self.accounts: Set[str] = set()
+        self.jobs_done = 0
+        self.retiring = False
+        self.last_stats: Dict[str, Any] = {}
+        self.reader: Optional[asyncio.Task] = None
+
+    @property
+    def idle(self) -> bool:
+        return self.current is None and not self.retiring and self.process.returncode is None
+
+
+class ScraperWorkerPool:
+    """常驻采集进程池（当前事件循环内使用）。"""
+
+    def __init__(self):
+        self._workers: List[_Worker] = []
+        self._pending: Deque[PooledTaskHandle] = deque()
+        self._dispatch_lock = asyncio.Lock()
+        self._closed = False
+        self.workers_started = 0
+        self.workers_retired = 0
+        self.jobs_dispatched = 0
+
+    async def submit(
+        self,
+        task_name: str,
+        config_path: str,
+        start_reason: str,
+        env: Dict[str, str],
+        account_hint: Optional[str] = None,
+        on_started: Optional[Callable[[PooledTaskHandle], Awaitable[Any]]] = None,
+    ) -> PooledTaskHandle:
+        """提交任务；有空闲进程（或可新建进程）时立即派发，否则排队。"""
+        job = {
+            "type": "run",
+            "job_id": uuid.uuid4().hex,
+            "task_name": task_name,
+            "config": config_path,
+            "start_reason": start_reason,
+            "env": dict(env),
+        }
+        handle = PooledTaskHandle(self, job, account_hint or None, on_started)
+        if self._closed:
+            handle._finish(1)
+            return handle
+        self._pending.append(handle)
+        await self._dispatch()
+        if handle.worker is None and handle.returncode is None:
+            logger.info(
+                f"采集进程均忙，任务排队等待: {task_name}（队列长度 {len(self._pending)}）",
+                extra={"event": "scraper_pool_task_queued", "task_name": task_name},
+            )
+        return handle
+
+    async def _dispatch(self) -> None:
+        async with self._dispatch_lock:
+            while self._pending and not self._closed:
+                handle = self._pending[0]
+                worker = self._pick_worker(handle.account_hint)
+                if worker is None:
+                    if len(self._workers) >= SCRAPER_WORKER_POOL_SIZE():
+                        return
+                    try:
+                        worker = await self._spawn_worker()
+                    except Exception as e:
+                        self._pending.popleft()
+                        logger.error(
+                            f"启动常驻采集进程失败: {e}",
+                            extra={"event": "scraper_pool_spawn_failed", "task_name": handle.job["task_name"]},
+                        )
+                        handle._finish(1)
+                        continue
+                self._pending.popleft()
+                await self._start_job(worker, handle)
+
+    def _pick_worker(self, account_hint: Optional[str]) -> Optional[_Worker]:
+        idle_workers = [worker for worker in self._workers if worker.idle]
+        if account_hint:
+            for worker in idle_workers:
+                if account_hint in worker.accounts:
+                    return worker
+        return idle_workers[0] if idle_workers else None
+
+    async def _spawn_worker(self) -> _Worker:
+        os.makedirs(os.path.dirname(WORKER_LOG_FILE), exist_ok=True)
+        log_handle = open(WORKER_LOG_FILE, "ab")
+        env = os.environ.copy()
+        env["PYTHONIOENCODING"] = "utf-8"
+        env["PYTHONUTF8"] = "1"
+        try:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                "-u",
+                "collector.py",
+                "--worker",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=log_handle,
+                preexec_fn=os.setsid if sys.platform != "win32" else None,
+                env=env,
+                limit=STREAM_LIMIT_BYTES,
+            )
+        except Exception:
+            log_handle.close()
+            raise
+        worker = _Worker(process, log_handle)
+        self._workers.append(worker)
+        self.workers_started += 1
+        worker.reader = asyncio.create_task(self._read_worker(worker))
+        logger.info(
+            f"常驻采集进程已启动: pid={process.pid}",
+            extra={"event": "scraper_pool_worker_started", "pid": process.pid},
+        )
+        return worker
+
+    async def _start_job(self, worker: _Worker, handle: PooledTaskHandle) -> None:
+        worker.current = handle
+        handle.worker = worker
+        if handle.account_hint:
+            worker.accounts.add(handle.account_hint)
+        self.jobs_dispatched += 1
+        try:
+            worker.process.stdin.write((json.dumps(handle.job, ensure_ascii=False) + "\n").encode("utf-8"))
+            await worker.process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError) as e:
+            # 进程已退出，由读取协程将任务标记为结束
+            logger.warning(
+                f"向常驻采集进程派发任务失败: {e}",
+                extra={"event": "scraper_pool_dispatch_failed", "task_name": handle.job["task_name"]},
+            )
+            return
+        logger.info(
+            f"任务已派发到常驻采集进程: {handle.job['task_name']}, pid={worker.process.pid}",
+            extra={"event": "scraper_pool_task_dispatched", "task_name": handle.job["task_name"], "pid": worker.process.pid},
+        )
+        if handle.on_started is not None:
+            try:
+                await handle.on_started(handle)
+            except Exception as e:
+                logger.warning(
+                    f"更新任务运行状态失败: {e}",
+                    extra={"event": "scraper_pool_on_started_failed", "task_name": handle.job["task_name"]},
+                )
+
+    async def _read_worker(self, worker: _Worker) -> None:
+        """转写常驻进程的输出到 fetcher.log，并处理任务完成消息。"""
+        stream = worker.process.stdout
+        try:
+            while True:
+                try:
+                    line = await stream.readline()
+                except ValueError:
+                    continue
+                if not line:
+                    break
+                if line.startswith(WORKER_CONTROL_PREFIX):
+                    await self._handle_event(worker, line[len(WORKER_CONTROL_PREFIX):])
+                    continue
+                worker.log_handle.write(line)
+                worker.log_handle.flush()
+        except Exception as e:
+            logger.warning(
+                f"读取常驻采集进程输出失败: {e}",
+                extra={"event": "scraper_pool_read_failed", "pid": worker.process.pid},
+            )
+        finally:
+            returncode = await worker.process.wait()
+            if worker in self._workers:
+                self._workers.remove(worker)
+            if worker.retiring:
+                self.workers_retired += 1
+            try:
+                worker.log_handle.close()
+            except Exception:
+                pass
+            if worker.current is not None:
+                worker.current._finish(returncode)
+                worker.current = None
+            logger.info(
+                f"常驻采集进程已退出: pid={worker.process.pid}, returncode={returncode}, 已执行 {worker.jobs_done} 次任务",
+                extra={"event": "scraper_pool_worker_exited", "pid": worker.process.pid},
+            )
+            if not self._closed:
+                await self._dispatch()
+
+    async def _handle_event(self, worker: _Worker, payload: bytes) -> None:
+        try:
+            event = json.loads(payload.decode("utf-8"))
+        except ValueError:
+            return
+        handle = worker.current
+        if event.get("type") != "done" or handle is None or event.get("job_id") != handle.job["job_id"]:
+            return
+        worker.current = None
+        worker.jobs_done = int(event.get("jobs_done") or worker.jobs_done + 1)
+        worker.retiring = bool(event.get("retire"))
+        worker.last_stats = {
+            key: event.get(key)
+            for key in ("rss_mb", "browser_launches", "contexts", "context_hits", "context_misses")
+        }
+        handle._finish(int(event.get("returncode") or 0))
+        if not worker.retiring:
+            await self._dispatch()
+
+    def _stop(self, handle: PooledTaskHandle, sig: int) -> None:
+        """排队中的任务直接取消；运行中的任务连同所在常驻进程（进程组）一起终止。"""
+        if handle.returncode is not None:
+            return
+        if handle.worker is None:
+            try:
+                self._pending.remove(handle)
+            except ValueError:
+                pass
+            handle._finish(-sig)
+            return
+        process = handle.worker.process
+        if process.returncode is not None:
+            return
+        try:
+            if sys.platform != "win32":
+                os.killpg(os.getpgid(process.pid), sig)
+            elif sig == signal.SIGTERM:
+                process.terminate()
+            else:
+                process.kill()
+        except ProcessLookupError:
+            pass
+
+    async def shutdown(self) -> None:
+        """取消排队任务并关闭所有常驻进程（先关闭 stdin 等其自行退出，超时后强制终止）。"""
+        self._closed = True
+        while self._pending:
+            self._pending.popleft()._finish(-signal.SIGTERM)
+        workers = list(self._workers)
+        for worker in workers:
+            try:
+                worker.process.stdin.close()
+            except Exception:
+                pass
+        readers = [worker.reader for worker in workers if worker.reader is not None]
+        if not readers:
+            return
+        _, pending = await asyncio.wait(readers, timeout=SHUTDOWN_TIMEOUT_SECONDS)
+        if pending:
+            for worker in workers:
+                if worker.process.returncode is None:
+                    try:
+                        if sys.platform != "win32":
+                            os.killpg(os.getpgid(worker.process.pid), signal.SIGKILL)
+                        else:
+                            worker.process.kill()
+                    except ProcessLookupError:
+                        pass
+            await asyncio.wait(pending, timeout=SHUTDOWN_TIMEOUT_SECONDS)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": True,
+            "size": SCRAPER_WORKER_POOL_SIZE(),
+            "queued": len(self._pending),
+            "workers_started": self.workers_started,
+            "workers_retired": self.workers_retired,
+            "jobs_dispatched": self.jobs_dispatched,
+            "workers": [
+                {
+                    "pid": worker.process.pid,
+                    "task_name": worker.current.job["task_name"] if worker.current is not None else None,
+                    "jobs_done": worker.jobs_done,
+                    "accounts": len(worker.accounts),
+                    **worker.last_stats,
+                }
+                for worker in self._workers
+            ],
+        }
+
+
+_pool: Optional[ScraperWorkerPool] = None
+_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_scraper_worker_pool() -> ScraperWorkerPool:
+    """获取当前事件循环内的采集进程池（首次调用时创建，常驻进程按需启动）。"""
+    global _pool, _pool_loop
+    loop = asyncio.get_running_loop()
+    if _pool is None or _pool_loop is not loop:
+        _pool = ScraperWorkerPool()
+        _pool_loop = loop
+    return _pool
+
+
+async def shutdown_scraper_worker_pool() -> None:
+    global _pool, _pool_loop
+    pool = _pool if _pool_loop is asyncio.get_running_loop() else None
+    _pool = None
+    _pool_loop = None
+    if pool is not None:
+        await pool.shutdown()
+
+
+def get_scraper_worker_pool_stats() -> Dict[str, Any]:
+    if not SCRAPER_WORKER_POOL_ENABLED():
+        return {"enabled": False}
+    if _pool is None:
+        return {"enabled": True, "size": SCRAPER_WORKER_POOL_SIZE(), "queued": 0, "workers": []}
+    return _pool.stats()
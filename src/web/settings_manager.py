@@ -83,6 +83,24 @@ def _reset_storage_runtime_caches():
     except Exception as exc:
         logger.warning(f"[数据库模式] 重置会话管理器单例失败: {exc}")
 
+    try:
+        from src.storage.auth_cache import invalidate_auth_cache
+        invalidate_auth_cache()
+    except Exception as exc:
+        logger.warning(f"[数据库模式] 清理会话权限缓存失败: {exc}")
+
+    try:
+        from src.notifier.routing import invalidate_notification_routing
+        invalidate_notification_routing()
+    except Exception as exc:
+        logger.warning(f"[数据库模式] 清理通知路由缓存失败: {exc}")
+
+    try:
+        from src.storage.utils import clear_user_cipher_cache
+        clear_user_cipher_cache()
+    except Exception as exc:
+        logger.warning(f"[数据库模式] 清理用户密钥缓存失败: {exc}")
+
 
 def _require_settings_admin(user: dict = Depends(require_auth)) -> dict:
     """要求当前用户具备系统设置管理权限。"""
@@ -327,6 +345,23 @@ def _build_notification_status(user: dict) -> dict:
     }
 
 
+@router.get("/api/settings/storage-metrics")
+async def get_storage_metrics_api(user: dict = Depends(_require_settings_admin)):
+    """返回存储线程池、数据库连接池、会话/权限缓存、通知路由缓存、通知发件箱与常驻采集进程池的指标。"""
+    from src.notifier.outbox import get_notification_outbox_stats
+    from src.notifier.routing import notification_routing_cache
+    from src.storage import get_storage_metrics
+    from src.storage.auth_cache import get_auth_cache_stats
+    from src.web.scraper_pool import get_scraper_worker_pool_stats
+    return {
+        **get_storage_metrics(),
+        "auth_cache": get_auth_cache_stats(),
+        "notification_routing": notification_routing_cache.stats(),
+        "notification_outbox": await get_notification_outbox_stats(),
+        "scraper_workers": get_scraper_worker_pool_stats(),
+    }
+
+
 @router.get("/api/settings/status")
 async def get_system_status(user: dict = Depends(_require_settings_admin)):
     """检查系统关键文件和配置的状态。"""
@@ -355,6 +390,13 @@ async def get_system_status(user: dict = Depends(_require_settings_admin)):
     ai_health = get_ai_health_snapshot(user)
     ai_config = ai_health.get("config") if isinstance(ai_health.get("config"), dict) else {}
     notification_status = _build_notification_status(user)
+    from src.ai_cache import get_ai_analysis_cache_stats
+    from src.storage.async_storage import run_storage_call
+    try:
+        ai_analysis_cache = await run_storage_call(get_ai_analysis_cache_stats)
+    except Exception as e:
+        logger.warning(f"读取AI分析缓存统计失败: {e}", extra={"event": "ai_cache_stats_failed"})
+        ai_analysis_cache = None
 
     openai_api_key_set = bool(ai_config.get("api_key_set"))
     openai_base_url_set = bool(ai_config.get("base_url_set"))
@@ -396,6 +438,7 @@ async def get_system_status(user: dict = Depends(_require_settings_admin)):
         },
         "storage_runtime": storage_runtime,
         "ai_api": ai_health,
+        "ai_analysis_cache": ai_analysis_cache,
         "notification_status": notification_status,
     }
     return status
@@ -13,16 +13,19 @@ from apscheduler.triggers.cron import CronTrigger
 from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
 from fastapi.responses import JSONResponse
 
+from src.config import SCRAPER_WORKER_POOL_ENABLED
 from src.logging_config import get_logger
 from src.notifier import notifier
 from src.prompt_utils import CriteriaGenerationTimeoutError, generate_criteria
 from src.scraper import delete_task_stats_file, get_task_stats
-from src.storage import get_storage
+from src.storage import get_async_storage, get_storage
+from src.storage.async_storage import run_storage_call
 from src.task import add_task, get_task, update_task
 from src.user_file_store import build_virtual_prompt_path, resolve_virtual_task_file
 from src.web.auth import get_current_user, is_multi_user_mode
 from src.web.models import Task, TaskGenerateRequestWithReference, TaskOrderUpdate, TaskUpdate
 from src.web.scheduler import reload_scheduler_jobs
+from src.web.scraper_pool import get_scraper_worker_pool
 
 router = APIRouter()
 logger = get_logger(__name__, service="web")
@@ -231,8 +234,8 @@ async def _save_local_tasks(tasks: List[Dict[str, Any]]) -> None:
 
 async def _build_runtime_task_config(owner_id: str, task_name: str) -> str:
     """按用户生成运行时任务配置，供 collector 子进程加载。"""
-    storage = get_storage()
-    task = storage.get_task_by_name(task_name, owner_id=owner_id)
+    storage = get_async_storage()
+    task = await storage.get_task_by_name(task_name, owner_id=owner_id)
     if not task:
         raise HTTPException(status_code=404, detail="任务不存在，无法启动")
     os.makedirs(RUNTIME_TASK_CONFIG_DIR, exist_ok=True)
@@ -254,8 +257,8 @@ async def _update_storage_task_running_status(
     is_running: bool,
     process_pid: Optional[int] = None,
 ) -> None:
-    storage = get_storage()
-    task = storage.get_task_by_name(task_name, owner_id=owner_id)
+    storage = get_async_storage()
+    task = await storage.get_task_by_name(task_name, owner_id=owner_id)
     if not task:
         return
     task["is_running"] = bool(is_running)
@@ -263,7 +266,7 @@ async def _update_storage_task_running_status(
         task["process_pid"] = int(process_pid)
     elif not is_running:
         task["process_pid"] = None
-    storage.save_task(task, owner_id=owner_id)
+    await storage.save_task(task, owner_id=owner_id)
 
 
 async def update_task_running_status(
@@ -361,24 +364,38 @@ async def start_task_process(
             cmd.extend(["--config", runtime_config_path])
             child_env["GOOFISH_OWNER_ID"] = owner_id
             child_env["GOOFISH_TASK_NAME"] = task_name
-            _apply_owner_ai_env_overrides(child_env, owner_id)
+            await run_storage_call(_apply_owner_ai_env_overrides, child_env, owner_id)
             try:
-                storage = get_storage()
-                task_data = storage.get_task_by_name(task_name, owner_id=owner_id) or {}
+                storage = get_async_storage()
+                task_data = await storage.get_task_by_name(task_name, owner_id=owner_id) or {}
                 bound_account = str(task_data.get("bound_account") or "").strip()
                 if bound_account:
                     child_env["GOOFISH_BOUND_ACCOUNT"] = bound_account
             except Exception:
                 pass
 
-        preexec_fn = os.setsid if sys.platform != "win32" else None
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=log_file_handle,
-            stderr=log_file_handle,
-            preexec_fn=preexec_fn,
-            env=child_env,
-        )
+        if SCRAPER_WORKER_POOL_ENABLED():
+            # 常驻采集进程池：排队的任务在派发到进程后再登记 PID
+            async def _on_worker_started(handle):
+                await update_task_running_status(task_id, True, handle.pid, owner_id=owner_id, task_name=task_name)
+
+            process = await get_scraper_worker_pool().submit(
+                task_name,
+                runtime_config_path or CONFIG_FILE,
+                "manual",
+                child_env,
+                account_hint=child_env.get("GOOFISH_BOUND_ACCOUNT"),
+                on_started=_on_worker_started,
+            )
+        else:
+            preexec_fn = os.setsid if sys.platform != "win32" else None
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=log_file_handle,
+                stderr=log_file_handle,
+                preexec_fn=preexec_fn,
+                env=child_env,
+            )
 
         fetcher_processes[process_key] = process
         await update_task_running_status(task_id, True, process.pid, owner_id=owner_id, task_name=task_name)
@@ -433,13 +450,13 @@ async def stop_task_process(
     process_pid = None
 
     if is_multi_user_mode() and owner_id:
-        storage = get_storage()
+        storage = get_async_storage()
         if not resolved_task_name:
-            tasks = storage.get_tasks(owner_id=owner_id)
+            tasks = await storage.get_tasks(owner_id=owner_id)
             if 0 <= task_id < len(tasks):
                 resolved_task_name = tasks[task_id].get("task_name")
         if resolved_task_name:
-            task_data = storage.get_task_by_name(resolved_task_name, owner_id=owner_id)
+            task_data = await storage.get_task_by_name(resolved_task_name, owner_id=owner_id)
             if task_data:
                 process_pid = task_data.get("process_pid")
     else:
@@ -578,12 +595,12 @@ async def _set_task_generating_status(task_id: int, is_generating: bool, owner_i
     generation_key = _make_generation_key(task_id, owner_id)
     updated = False
     if owner_id:
-        storage = get_storage()
-        tasks = storage.get_tasks(owner_id=owner_id)
+        storage = get_async_storage()
+        tasks = await storage.get_tasks(owner_id=owner_id)
         if 0 <= task_id < len(tasks):
             task_data = dict(tasks[task_id] or {})
             task_data["generating_ai_criteria"] = bool(is_generating)
-            storage.save_task(task_data, owner_id=owner_id)
+            await storage.save_task(task_data, owner_id=owner_id)
             updated = True
     else:
         tasks = await _load_local_tasks()
@@ -611,11 +628,11 @@ async def _clear_stale_generating_flags(tasks: List[Dict[str, Any]], owner_id: O
         return tasks
 
     if owner_id:
-        storage = get_storage()
+        storage = get_async_storage()
         for idx in stale_indices:
             task_data = dict(tasks[idx] or {})
             task_data["generating_ai_criteria"] = False
-            storage.save_task(task_data, owner_id=owner_id)
+            await storage.save_task(task_data, owner_id=owner_id)
             tasks[idx] = task_data
         return tasks
 
@@ -633,8 +650,8 @@ async def _refresh_local_scheduler() -> None:
 async def get_tasks(request: Request):
     owner_id = _get_owner_id(request)
     if owner_id:
-        storage = get_storage()
-        tasks = storage.get_tasks(owner_id=owner_id)
+        storage = get_async_storage()
+        tasks = await storage.get_tasks(owner_id=owner_id)
         tasks = await _clear_stale_generating_flags(tasks, owner_id=owner_id)
         return [_normalize_task_dict(task, idx) for idx, task in enumerate(tasks)]
     tasks = await _load_local_tasks()
@@ -648,14 +665,14 @@ async def reorder_tasks(payload: TaskOrderUpdate, request: Request):
     owner_id = _get_owner_id(request)
 
     if owner_id:
-        storage = get_storage()
-        tasks = storage.get_tasks(owner_id=owner_id)
+        storage = get_async_storage()
+        tasks = await storage.get_tasks(owner_id=owner_id)
         if len(ordered_ids) != len(tasks) or len(set(ordered_ids)) != len(ordered_ids):
             raise HTTPException(status_code=400, detail="排序数据不合法")
         if any(not isinstance(task_id, int) or task_id < 0 or task_id >= len(tasks) for task_id in ordered_ids):
             raise HTTPException(status_code=400, detail="排序数据不合法")
         ordered_names = [tasks[task_id].get("task_name") for task_id in ordered_ids]
-        storage.update_task_order(ordered_names, owner_id=owner_id)
+        await storage.update_task_order(ordered_names, owner_id=owner_id)
         await _refresh_local_scheduler()
         return {"message": "任务顺序已更新"}
 
@@ -678,8 +695,8 @@ async def generate_task(req: TaskGenerateRequestWithReference, request: Request)
     owner_id = _get_owner_id(request)
 
     if owner_id:
-        storage = get_storage()
-        existing_tasks = storage.get_tasks(owner_id=owner_id)
+        storage = get_async_storage()
+        existing_tasks = await storage.get_tasks(owner_id=owner_id)
     else:
         existing_tasks = await _load_local_tasks()
 
@@ -727,9 +744,9 @@ async def generate_task(req: TaskGenerateRequestWithReference, request: Request)
 
     task_model = Task(**task_data)
     if owner_id:
-        storage = get_storage()
-        created = storage.save_task(task_model.model_dump(), owner_id=owner_id)
-        tasks = storage.get_tasks(owner_id=owner_id)
+        storage = get_async_storage()
+        created = await storage.save_task(task_model.model_dump(), owner_id=owner_id)
+        tasks = await storage.get_tasks(owner_id=owner_id)
         index = next((idx for idx, t in enumerate(tasks) if t.get("task_name") == created.get("task_name")), 0)
         await _refresh_local_scheduler()
         return {"message": "AI任务创建成功。", "task": _normalize_task_dict(created, index)}
@@ -746,9 +763,9 @@ async def generate_task(req: TaskGenerateRequestWithReference, request: Request)
 @router.post("/api/tasks")
 async def create_task(task: Task, request: Request):
     owner_id = _get_owner_id(request)
-    storage = get_storage() if owner_id else None
+    storage = get_async_storage() if owner_id else None
 
-    existing_tasks = storage.get_tasks(owner_id=owner_id) if owner_id else await _load_local_tasks()
+    existing_tasks = await storage.get_tasks(owner_id=owner_id) if owner_id else await _load_local_tasks()
     task.task_name = _make_unique_task_name([t.get("task_name") for t in existing_tasks], task.task_name)
     if task.order is None:
         task.order = len(existing_tasks)
@@ -760,8 +777,8 @@ async def create_task(task: Task, request: Request):
     task_model = Task(**normalized_payload)
 
     if owner_id:
-        created = storage.save_task(task_model.model_dump(), owner_id=owner_id)
-        tasks = storage.get_tasks(owner_id=owner_id)
+        created = await storage.save_task(task_model.model_dump(), owner_id=owner_id)
+        tasks = await storage.get_tasks(owner_id=owner_id)
         index = next((idx for idx, t in enumerate(tasks) if t.get("task_name") == created.get("task_name")), 0)
         await _refresh_local_scheduler()
         return {"message": "任务创建成功。", "task": _normalize_task_dict(created, index)}
@@ -779,9 +796,9 @@ async def create_task(task: Task, request: Request):
 async def duplicate_task(task_id: int, request: Request):
     """复制任务并复制其 AI 标准文件。"""
     owner_id = _get_owner_id(request)
-    storage = get_storage() if owner_id else None
+    storage = get_async_storage() if owner_id else None
 
-    source_tasks = storage.get_tasks(owner_id=owner_id) if owner_id else await _load_local_tasks()
+    source_tasks = await storage.get_tasks(owner_id=owner_id) if owner_id else await _load_local_tasks()
     if not (0 <= task_id < len(source_tasks)):
         raise HTTPException(status_code=404, detail="任务未找到。")
 
@@ -806,8 +823,8 @@ async def duplicate_task(task_id: int, request: Request):
     task_model = Task(**normalized_payload)
 
     if owner_id:
-        created = storage.save_task(task_model.model_dump(), owner_id=owner_id)
-        tasks = storage.get_tasks(owner_id=owner_id)
+        created = await storage.save_task(task_model.model_dump(), owner_id=owner_id)
+        tasks = await storage.get_tasks(owner_id=owner_id)
         index = next((idx for idx, t in enumerate(tasks) if t.get("task_name") == created.get("task_name")), 0)
         await _refresh_local_scheduler()
         return {"message": "任务复制成功。", "task": _normalize_task_dict(created, index)}
@@ -830,8 +847,8 @@ async def update_task_api(task_id: int, task_update: TaskUpdate, background_task
         return JSONResponse(content={"message": "数据无变化，未执行更新。"}, status_code=200)
 
     if owner_id:
-        storage = get_storage()
-        tasks = storage.get_tasks(owner_id=owner_id)
+        storage = get_async_storage()
+        tasks = await storage.get_tasks(owner_id=owner_id)
         if not (0 <= task_id < len(tasks)):
             raise HTTPException(status_code=404, detail="任务未找到。")
         task_data = dict(tasks[task_id])
@@ -900,8 +917,8 @@ async def update_task_api(task_id: int, task_update: TaskUpdate, background_task
     task_model = Task(**task_data)
 
     if owner_id:
-        storage = get_storage()
-        updated = storage.save_task(task_model.model_dump(), owner_id=owner_id)
+        storage = get_async_storage()
+        updated = await storage.save_task(task_model.model_dump(), owner_id=owner_id)
         await _refresh_local_scheduler()
         return {"message": "任务更新成功。", "task": _normalize_task_dict(updated, task_id)}
 
@@ -918,8 +935,8 @@ async def start_single_task(task_id: int, request: Request):
     from src.web.main import fetcher_processes
 
     if owner_id:
-        storage = get_storage()
-        tasks = storage.get_tasks(owner_id=owner_id)
+        storage = get_async_storage()
+        tasks = await storage.get_tasks(owner_id=owner_id)
         if not (0 <= task_id < len(tasks)):
             raise HTTPException(status_code=404, detail="任务未找到。")
         task = tasks[task_id]
@@ -945,8 +962,8 @@ async def stop_single_task(task_id: int, request: Request):
 
     task_name = None
     if owner_id:
-        storage = get_storage()
-        tasks = storage.get_tasks(owner_id=owner_id)
+        storage = get_async_storage()
+        tasks = await storage.get_tasks(owner_id=owner_id)
         if 0 <= task_id < len(tasks):
             task_name = tasks[task_id].get("task_name")
     await stop_task_process(task_id, fetcher_processes, owner_id=owner_id, task_name=task_name)
@@ -959,13 +976,13 @@ async def delete_task(task_id: int, request: Request):
     from src.web.main import fetcher_processes
 
     if owner_id:
-        storage = get_storage()
-        tasks = storage.get_tasks(owner_id=owner_id)
+        storage = get_async_storage()
+        tasks = await storage.get_tasks(owner_id=owner_id)
         if not (0 <= task_id < len(tasks)):
             raise HTTPException(status_code=404, detail="任务未找到。")
         deleted_task = dict(tasks[task_id])
         await stop_task_process(task_id, fetcher_processes, owner_id=owner_id, task_name=deleted_task.get("task_name"))
-        storage.delete_task(deleted_task.get("task_name"), owner_id=owner_id)
+        await storage.delete_task(deleted_task.get("task_name"), owner_id=owner_id)
         await _refresh_local_scheduler()
     else:
         tasks = await _load_local_tasks()
@@ -999,8 +1016,8 @@ async def delete_task(task_id: int, request: Request):
 async def get_scheduled_jobs_api(request: Request):
     owner_id = _get_owner_id(request)
     if owner_id:
-        storage = get_storage()
-        tasks = storage.get_tasks(owner_id=owner_id)
+        storage = get_async_storage()
+        tasks = await storage.get_tasks(owner_id=owner_id)
         jobs = []
         now = datetime.now(timezone.utc)
         for idx, task in enumerate(tasks):
@@ -1070,8 +1087,8 @@ async def run_scheduled_job_now(job_id: str, request: Request):
             task_id = int(job_id.replace("task_", ""))
         except ValueError as exc:
             raise HTTPException(status_code=400, detail="无效的任务ID") from exc
-        storage = get_storage()
-        tasks = storage.get_tasks(owner_id=owner_id)
+        storage = get_async_storage()
+        tasks = await storage.get_tasks(owner_id=owner_id)
         if not (0 <= task_id < len(tasks)):
             raise HTTPException(status_code=404, detail=f"定时任务 {job_id} 未找到。")
         task_name = tasks[task_id].get("task_name")
@@ -1100,13 +1117,13 @@ async def update_scheduled_job_cron(task_id: int, cron_data: Dict[str, Any], req
             raise HTTPException(status_code=400, detail=f"无效的Cron表达式: {exc}") from exc
 
     if owner_id:
-        storage = get_storage()
-        tasks = storage.get_tasks(owner_id=owner_id)
+        storage = get_async_storage()
+        tasks = await storage.get_tasks(owner_id=owner_id)
         if not (0 <= task_id < len(tasks)):
             raise HTTPException(status_code=404, detail="任务未找到。")
         task = dict(tasks[task_id])
         task["cron"] = new_cron
-        storage.save_task(task, owner_id=owner_id)
+        await storage.save_task(task, owner_id=owner_id)
         await _refresh_local_scheduler()
         return {"message": "Cron 表达式已更新", "cron": new_cron}
 
@@ -1125,14 +1142,14 @@ async def cancel_scheduled_task(task_id: int, request: Request):
     from src.web.main import fetcher_processes
 
     if owner_id:
-        storage = get_storage()
-        tasks = storage.get_tasks(owner_id=owner_id)
+        storage = get_async_storage()
+        tasks = await storage.get_tasks(owner_id=owner_id)
         if not (0 <= task_id < len(tasks)):
             raise HTTPException(status_code=404, detail="任务未找到。")
         task = dict(tasks[task_id])
         task_name = task.get("task_name", f"任务 {task_id}")
         task["enabled"] = False
-        storage.save_task(task, owner_id=owner_id)
+        await storage.save_task(task, owner_id=owner_id)
         await stop_task_process(task_id, fetcher_processes, owner_id=owner_id, task_name=task_name)
         await _refresh_local_scheduler()
         return {"message": f"任务 '{task_name}' 已取消", "task_id": task_id}
@@ -709,6 +709,21 @@ async function fetchLogs(fromPos = 0, taskName = '', limit = 100, file = 'fetche
     }
 }
 
+function openLogStream(fromPos = 0, taskName = '', limit = 100, file = 'fetcher', level = '') {
+    const params = new URLSearchParams({
+        from_pos: fromPos,
+        limit: limit,
+        file: file
+    });
+    if (taskName) {
+        params.append('task_name', taskName);
+    }
+    if (level) {
+        params.append('level', level);
+    }
+    return new EventSource(`/api/logs/stream?${params}`);
+}
+
 async function exportLogs(days = 7) {
     try {
         const params = new URLSearchParams({ days: days });
@@ -1,5 +1,6 @@
 ﻿﻿﻿// 全局状态变量，保持与原入口一致
 var logRefreshInterval = null;
+var logEventSource = null;
 var taskRefreshInterval = null;
 var resultsRefreshInterval = null;
 var lastResultsSignature = null;
@@ -124,15 +124,7 @@ async function initializeLogsView() {
                 lastRenderedLevel = '';
             }
         } else if (logData.new_content) {
-            // 如果它正在显示空消息，替换它。
-            const rendered = buildLogHtml(logData.new_content, lastRenderedLevel);
-            if (!hasRenderedContent || logContainer.textContent === '正在加载...' || logContainer.textContent === '日志为空，等待内容...') {
-                logContainer.innerHTML = rendered.html;
-                hasRenderedContent = true;
-            } else {
-                logContainer.innerHTML += `<br>${rendered.html}`;
-            }
-            lastRenderedLevel = rendered.lastLevel;
+            appendLogContent(logData.new_content);
         }
         currentLogSize = logData.new_pos;
 
@@ -140,6 +132,64 @@ async function initializeLogsView() {
         if (shouldAutoScroll) {
             logContainer.scrollTop = logContainer.scrollHeight;
         }
+
+        // 筛选条件或读取位置变化后，实时推送需要从新位置重新订阅
+        if (isFullRefresh && logEventSource) {
+            startLogStream();
+        }
+    };
+
+    const appendLogContent = (content) => {
+        // 如果它正在显示空消息，替换它。
+        const rendered = buildLogHtml(content, lastRenderedLevel);
+        if (!hasRenderedContent || logContainer.textContent === '正在加载...' || logContainer.textContent === '日志为空，等待内容...') {
+            logContainer.innerHTML = rendered.html;
+            hasRenderedContent = true;
+        } else {
+            logContainer.innerHTML += `<br>${rendered.html}`;
+        }
+        lastRenderedLevel = rendered.lastLevel;
+    };
+
+    const stopLogStream = () => {
+        if (logEventSource) {
+            logEventSource.close();
+            logEventSource = null;
+        }
+    };
+
+    // 服务端推送新增日志，替代每秒轮询；连接断开时关闭并稍后从当前位置重连
+    const startLogStream = () => {
+        stopLogStream();
+        const source = openLogStream(
+            currentLogSize,
+            taskFilter ? taskFilter.value : '',
+            parseInt(limitFilter ? limitFilter.value : 100),
+            fileSelector ? fileSelector.value : 'fetcher',
+            levelFilter ? levelFilter.value : ''
+        );
+        source.onmessage = (event) => {
+            const data = JSON.parse(event.data);
+            const shouldAutoScroll = logContainer.scrollHeight - logContainer.clientHeight <= logContainer.scrollTop + 5;
+            if (data.new_content) {
+                appendLogContent(data.new_content);
+            }
+            currentLogSize = data.new_pos;
+            if (shouldAutoScroll) {
+                logContainer.scrollTop = logContainer.scrollHeight;
+            }
+        };
+        source.addEventListener('reset', () => updateLogs(true));
+        source.onerror = () => {
+            if (logEventSource !== source) return;
+            stopLogStream();
+            setTimeout(() => {
+                if (!logEventSource && autoRefreshCheckbox.checked && document.body.contains(logContainer)) {
+                    startLogStream();
+                }
+            }, 3000);
+        };
+        logEventSource = source;
     };
 
     refreshBtn.addEventListener('click', () => updateLogs(true));
@@ -252,14 +302,16 @@ async function initializeLogsView() {
     });
 
     const autoRefreshHandler = () => {
-        if (autoRefreshCheckbox.checked) {
-            if (logRefreshInterval) clearInterval(logRefreshInterval);
-            logRefreshInterval = setInterval(() => updateLogs(false), 1000);
+        if (logRefreshInterval) {
+            clearInterval(logRefreshInterval);
+            logRefreshInterval = null;
+        }
+        stopLogStream();
+        if (!autoRefreshCheckbox.checked) return;
+        if (typeof EventSource !== 'undefined') {
+            startLogStream();
         } else {
-            if (logRefreshInterval) {
-                clearInterval(logRefreshInterval);
-                logRefreshInterval = null;
-            }
+            logRefreshInterval = setInterval(() => updateLogs(false), 1000);
         }
     };
 
@@ -267,6 +319,6 @@ async function initializeLogsView() {
 
     // 默认启用自动刷新
     autoRefreshCheckbox.checked = true;
-    autoRefreshHandler();
     await updateLogs(true);
+    autoRefreshHandler();
 }
@@ -125,6 +125,10 @@ async function navigateTo(hash) {
         clearInterval(logRefreshInterval);
         logRefreshInterval = null;
     }
+    if (logEventSource) {
+        logEventSource.close();
+        logEventSource = null;
+    }
     if (taskRefreshInterval) {
         clearInterval(taskRefreshInterval);
         taskRefreshInterval = null;
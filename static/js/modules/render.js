@@ -969,6 +969,14 @@ function renderSystemStatus(status) {
     const visionLabel = visionStatusMap[aiVision.status] || '未知';
     const visionText = `${visionLabel}${aiVision.message ? `：${aiVision.message}` : ''}`;
 
+    const aiCache = status.ai_analysis_cache;
+    const aiCacheLevel = aiCache ? (aiCache.enabled ? 'ok' : 'unknown') : 'unknown';
+    const aiCacheText = !aiCache
+        ? '未知'
+        : (aiCache.enabled
+            ? `命中率 ${(aiCache.hit_rate * 100).toFixed(1)}%（命中 ${aiCache.hits} / 未命中 ${aiCache.misses}），节省 ${aiCache.hits} 次调用、约 ${Number(aiCache.saved_tokens).toLocaleString()} tokens`
+            : '已关闭');
+
     const notificationLevel = notificationStatus.ok ? 'ok' : 'warning';
     const notificationText = `${notificationStatus.message || '未知'}（${notificationStatus.source_label || '未知来源'}）`;
 
@@ -1006,6 +1014,10 @@ function renderSystemStatus(status) {
                     <span class="label">最近检测时间</span>
                     <span class="value">${renderLevelTag('info', aiCheckedAt)}</span>
                 </li>
+                <li class="status-item">
+                    <span class="label">AI 分析结果缓存</span>
+                    <span class="value">${renderLevelTag(aiCacheLevel, aiCacheText)}</span>
+                </li>
                 <li class="status-item">
                     <span class="label">通知渠道配置</span>
                     <span class="value">${renderLevelTag(notificationLevel, notificationText)}</span>
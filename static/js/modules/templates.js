@@ -92,6 +92,7 @@ var templates = {
                                 <option value="crawl_time">按浏览时间</option>
                                 <option value="publish_time">按发布时间</option>
                                 <option value="price">按价格</option>
+                                <option value="relevance">按相关度（搜索时）</option>
                             </select>
                         </div>
                         <div class="filter-group">